@@ -211,7 +211,8 @@ class TripDBHandler:
         line_id: str,
         input_text: str,
         requirement: Dict,
-        itinerary: List[Dict]
+        itinerary: List[Dict],
+        plan_state: Optional[Dict] = None
     ) -> Optional[int]:
         """儲存行程規劃
 
@@ -221,6 +222,8 @@ class TripDBHandler:
             restart_index: 重新規劃的索引
             requirement: 規劃需求
             itinerary: 規劃行程
+            plan_state: 規劃狀態(選填),取消地點後重新規劃時使用,
+                        見 TripPlanningSystem.export_plan_state
 
         Returns:
             Optional[int]: 新規劃的index,失敗時返回None
@@ -257,6 +260,8 @@ class TripDBHandler:
                     "duration": item["duration"]
                 } for item in itinerary]
             }
+            if plan_state:
+                record["plan_state"] = plan_state
 
             self.db.planner_records.insert_one(record)
             return new_index
@@ -21,6 +21,7 @@ class qdrant_search:
                     'qdrant_api_key': str
                 }
         black_list 設定要過濾的 placeID 清單
+        qdrant_client 選填，共用已建立的 QdrantClient(不需要每次查詢重新連線)
         ```
     
     - 
@@ -35,7 +36,7 @@ class qdrant_search:
 
         ```
         .cloud_search( input_query: list[str] = ["形容客戶行程的一句話"] )
-        .trip_search( input_query: dict[list] = { "上午" : "形容客戶行程的一句話"})
+        .trip_search( input_query: dict[list] = { "上午" : "形容客戶行程的一句話"}, with_scores: bool = False)
         ```
     '''
     def __init__(
@@ -50,6 +51,7 @@ class qdrant_search:
                                 'qdrant_api_key': str
                                 },
                 black_list: list=[],
+                qdrant_client: QdrantClient | None = None,
                 ):
         
         self.colleciton_name = collection_name
@@ -57,6 +59,7 @@ class qdrant_search:
         self.score_threshold = score_threshold
         self.limit = limit
         self.black_list = black_list
+        self.qdrant_client = qdrant_client
         
 
 
@@ -83,7 +86,8 @@ class qdrant_search:
         # 2. 使用 vector 搜尋 qdrant 回傳 '相似度 > 某個分數' 的資料
         qdrant_obj = qdrant_manager(collection_name=self.colleciton_name, 
                                     qdrant_url=config.get("qdrant_url"),
-                                    qdrant_api_key= config.get("qdrant_api_key"))
+                                    qdrant_api_key= config.get("qdrant_api_key"),
+                                    qdrant_client= self.qdrant_client)
         result = qdrant_obj.search_vector(vector, self.score_threshold, self.limit, self.black_list)
         return result
 
@@ -110,24 +114,29 @@ class qdrant_search:
         result = self.__search_query(input_query)
         return result
     
-    def trip_search(self, input_query: dict)-> dict[list]: 
+    def trip_search(self, input_query: dict, with_scores: bool = False)-> dict[list]: 
         '''
         - 對旅遊演算法
         - input :
 
             ```
             input_query: dict = { "上午" : "形容客戶行程的一句話"}
+            with_scores: bool = 是否一併回傳相似分數
             ```
         output :
 
             ```
             return { period : ["PlaceID", "PlaceID", …, "PlaceID"]} 
+            # with_scores=True 時
+            return { period : {"PlaceID": 分數, …, "PlaceID": 分數}}
             ```
         '''
         period, text = next(iter(input_query.items()))
-        result = list(self.__search_query(text)[0].keys())
+        match_data = self.__search_query(text)[0]
 
-        return {period : result}
+        if with_scores:
+            return {period : {placeID: value["分數"] for placeID, value in match_data.items()}}
+        return {period : list(match_data.keys())}
 
 
 if __name__ == "__main__":
@@ -38,13 +38,17 @@ class qdrant_manager:
     def __init__(   self,
                     collection_name: str|None = 'collection_name', 
                     qdrant_url: str = 'your_qdrant_url', 
-                    qdrant_api_key: str = 'your_qdrant_api_key')-> any:
-        # 加載環境變量
-        self.qdrant_client = QdrantClient(
-                url=qdrant_url, 
-                api_key=qdrant_api_key,
-                timeout=20,
-            )
+                    qdrant_api_key: str = 'your_qdrant_api_key',
+                    qdrant_client: QdrantClient | None = None)-> any:
+        # 傳入已建立的 qdrant_client 時直接共用(例如 ServiceContainer 的連線)
+        if qdrant_client is not None:
+            self.qdrant_client = qdrant_client
+        else:
+            self.qdrant_client = QdrantClient(
+                    url=qdrant_url, 
+                    api_key=qdrant_api_key,
+                    timeout=20,
+                )
         
         # 設定控制桶子
         self.collection_name = collection_name
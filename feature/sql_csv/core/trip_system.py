@@ -8,10 +8,19 @@ def trip_system(system_input, special_request_list):
      ```
     Args:
         system_input : 旅遊推薦端的向量搜尋結果 (五包)
+                       { period : ["PlaceID", …] } 或 { period : {"PlaceID": 分數, …} }
         special_request_list : 特殊要求
     return:
         points : 傳給 旅遊推薦的資料 (含 period)
     ```
+    ---
+    - 同一個地點在多個時段被檢索到時只建立一個 point :
+
+        ```
+        period : 第一個時段
+        periods : 所有時段 (依 上午 → 晚上 排序)
+        period_scores : { period : 分數 }   # 輸入有分數時才有
+        ```
     '''
 
     # 篩選
@@ -28,6 +37,13 @@ def trip_system(system_input, special_request_list):
         for k, v in system_input.items()
     }
 
+    # 分開 placeID 與檢索分數
+    period_scores = {}
+    for period, placeIDs in system_input.copy().items():
+        if isinstance(placeIDs, dict):
+            period_scores[period] = placeIDs
+            system_input[period] = list(placeIDs)
+
     for period, placeID_list in system_input.copy().items():
         if period in ['morning', 'afternoon', 'night']:
             placeID_list = filter_pipeline(
@@ -44,19 +60,32 @@ def trip_system(system_input, special_request_list):
             )
             system_input[period] = placeID_list
 
-    # 製造 points
+    # 製造 points : 每個地點一個 point
+    PERIOD_ORDER = list(PERIOD_MAPPING.values())
     ETL_dataframe = ETL_dataframe_generate()
-    points = []
+    points = {}
     for period, placeID_list in system_input.items():
         for place_ID in placeID_list:
-            point = trip_point_make(
-                place_ID=place_ID,
-                period=period,
-                ETL_dataframe=ETL_dataframe,
-            )
-            points.append(point)
+            if place_ID not in points:
+                points[place_ID] = trip_point_make(
+                    place_ID=place_ID,
+                    period=period,
+                    ETL_dataframe=ETL_dataframe,
+                )
+                points[place_ID]['periods'] = []
+            point = points[place_ID]
+            point['periods'].append(period)
+
+            score = period_scores.get(period, {}).get(place_ID)
+            if score is not None:
+                point.setdefault('period_scores', {})[period] = score
+
+    for point in points.values():
+        point['periods'].sort(
+            key=lambda p: PERIOD_ORDER.index(p) if p in PERIOD_ORDER else len(PERIOD_ORDER))
+        point['period'] = point['periods'][0]
 
-    return points
+    return list(points.values())
 
 
 if __name__ == "__main__":
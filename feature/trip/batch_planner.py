@@ -0,0 +1,142 @@
+# batch_planner.py
+
+"""批次規劃行程
+
+從 JSONL 檔讀取規劃請求(每行一筆，格式見 BatchPlanner)，
+在多個工作行程中平行規劃，結果依完成順序逐行寫入 JSONL，
+最後輸出吞吐量統計。
+
+執行方式(在專案根目錄):
+    python -m feature.trip.batch_planner requests.jsonl -o results.jsonl \\
+        --catalog feature/trip/sample_data.csv --workers 4
+    python -m feature.trip.batch_planner requests.jsonl --cache-path cache/routes.sqlite3
+
+catalog 支援 CSV(與 sample_data.csv 相同格式)、JSON(地點列表)與 JSONL。
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Dict, IO, Iterator, List, Optional
+
+from .src.core.planner.batch import BatchPlanner
+
+
+def load_catalog(path: str) -> List[Dict]:
+    """讀取共用的候選地點資料
+
+    Args:
+        path: CSV、JSON 或 JSONL 檔案路徑
+
+    Returns:
+        List[Dict]: 地點資料
+    """
+    if path.endswith('.csv'):
+        from .sample_data import convert_to_place_list, process_csv
+        return convert_to_place_list(process_csv(path))
+
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def read_requests(stream: IO[str]) -> Iterator[Dict]:
+    """逐行讀取 JSONL 請求(略過空白行)
+
+    無法解析的行仍會回傳,內容為 {'id': 行號, 'invalid': 原始內容},
+    規劃時會記錄為失敗而不中斷批次。
+    """
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield {'id': f'line-{line_no}', 'invalid': line.strip()}
+
+
+class ProgressReporter:
+    """把結果寫入 JSONL,並定期輸出進度到 stderr"""
+
+    def __init__(self, output: IO[str], every: int = 50):
+        self.output = output
+        self.every = every
+        self.count = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    def __call__(self, result: Dict) -> None:
+        self.output.write(json.dumps(result, ensure_ascii=False, default=str) + '\n')
+        self.output.flush()
+        self.count += 1
+        self.failed += result['error'] is not None
+        if self.every and self.count % self.every == 0:
+            seconds = time.perf_counter() - self.started
+            print(f"已完成 {self.count} 筆(失敗 {self.failed}),"
+                  f"{self.count / seconds:.1f} 筆/秒", file=sys.stderr)
+
+
+@contextlib.contextmanager
+def planning_output(verbose: bool):
+    """規劃過程的輸出:verbose 時改寫到標準錯誤,否則捨棄"""
+    if verbose:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+        return
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description='批次規劃行程')
+    parser.add_argument('requests', help='請求的 JSONL 檔案,- 表示標準輸入')
+    parser.add_argument('-o', '--output', default='-',
+                        help='結果的 JSONL 檔案,預設為標準輸出')
+    parser.add_argument('--catalog', help='共用的候選地點資料(CSV/JSON/JSONL)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='工作行程數,預設為 CPU 數')
+    parser.add_argument('--cache-path', default=None,
+                        help='共用的 SQLite 路線快取,預設為 ROUTE_CACHE_PATH')
+    parser.add_argument('--progress-every', type=int, default=50,
+                        help='每完成幾筆輸出一次進度,0 表示不輸出')
+    parser.add_argument('--verbose', action='store_true',
+                        help='顯示規劃過程的輸出')
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.catalog) if args.catalog else None
+    options = {'catalog': catalog, 'workers': args.workers,
+               'quiet': not args.verbose}
+    if args.cache_path:
+        options['cache_path'] = args.cache_path
+    planner = BatchPlanner(**options)
+
+    input_stream = (sys.stdin if args.requests == '-'
+                    else open(args.requests, encoding='utf-8'))
+    output_stream = (sys.stdout if args.output == '-'
+                     else open(args.output, 'w', encoding='utf-8'))
+    try:
+        reporter = ProgressReporter(output_stream, args.progress_every)
+        # workers=1 時在目前行程內規劃,規劃過程的輸出不能混入標準輸出的 JSONL
+        with planning_output(args.verbose):
+            for _ in planner.run(read_requests(input_stream), on_result=reporter):
+                pass
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    stats = planner.stats
+    print(f"完成 {stats['requests']} 筆(成功 {stats['succeeded']}、"
+          f"失敗 {stats['failed']}),耗時 {stats['elapsed_s']:.1f} 秒,"
+          f"{stats['plans_per_second']} 筆/秒,"
+          f"平均 {stats['mean_ms']}ms、p95 {stats['p95_ms']}ms", file=sys.stderr)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+# benchmarks/planner_benchmark.py
+
+"""規劃效能量測
+
+在 synthetic_catalog 產生的合成地點資料上量測 plan_trip 的效能，
+使用 LocalMapsClient 取代 Google Maps(可注入固定延遲模擬網路往返)，
+不需要 API 金鑰也不會產生費用。
+
+情境:
+- fresh: 完整規劃一次行程
+- restart: 取消行程中間的地點後以保存的規劃狀態重新規劃(只計算 replan)
+
+每個情境回報:
+- 耗時中位數(毫秒),以及其中等待地圖 API 的時間
+- tracemalloc 量測的記憶體峰值與規劃後留下的記憶體區塊數
+- API 呼叫次數與距離矩陣元素數
+
+執行方式(在專案根目錄):
+    python -m feature.trip.benchmarks.planner_benchmark
+    python -m feature.trip.benchmarks.planner_benchmark --sizes 100 1000 10000 100000
+    python -m feature.trip.benchmarks.planner_benchmark --latency-ms 80 --json result.json
+    python -m feature.trip.benchmarks.planner_benchmark --latency-ms 80 --prefetch 5
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 離線執行不需要真正的金鑰
+os.environ.setdefault('GOOGLE_MAPS_API_KEY', 'offline-benchmark')
+
+from .synthetic_catalog import generate_catalog  # noqa: E402
+from ..src.core.planner.system import TripPlanningSystem  # noqa: E402
+from ..src.core.services.geo_service import GeoService  # noqa: E402
+from ..src.core.services.local_maps_client import LocalMapsClient  # noqa: E402
+from ..src.core.utils import profiler  # noqa: E402
+from ..src.core.utils.profiler import PlanProfiler  # noqa: E402
+
+
+CATALOG_SIZES = (100, 1000, 10000, 100000)
+MODES = {'driving': '開車', 'transit': '大眾運輸',
+         'walking': '步行', 'bicycling': '騎車'}
+SCENARIOS = ('fresh', 'restart')
+
+
+def make_system(latency_ms: float = 0.0) -> Tuple[TripPlanningSystem, LocalMapsClient]:
+    """建立使用本地地圖用戶端的規劃系統,並清除路線快取"""
+    client = LocalMapsClient(latency_ms=latency_ms)
+    # 預設的 Google Maps 用戶端會因為沒有金鑰而印出警告,隨即被取代
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = TripPlanningSystem()
+    system.geo_service = GeoService(maps_client=client)
+    GeoService.get_route.cache_clear()
+    return system, client
+
+
+def make_requirement(mode: str) -> List[Dict]:
+    """固定的規劃需求(日期固定,營業時間判斷可以重現)"""
+    return [{
+        "出發時間": "09:00",
+        "結束時間": "21:00",
+        "出發地點": "台北車站",
+        "交通方式": MODES[mode],
+        "出發日": "10-20"
+    }]
+
+
+def prepare(scenario: str,
+            catalog: List[Dict],
+            mode: str,
+            strategy: str,
+            latency_ms: float,
+            strategy_options: Optional[Dict] = None
+            ) -> Tuple[Callable[[], List[Dict]], LocalMapsClient]:
+    """準備一次量測,回傳(要計時的函數, 地圖用戶端)
+
+    restart 情境會先完整規劃並匯出規劃狀態,這部分不列入計時。
+    """
+    system, client = make_system(latency_ms)
+    requirement = make_requirement(mode)
+
+    if scenario == 'fresh':
+        def run():
+            return system.plan_trip(catalog, requirement,
+                                    strategy=strategy, seed=0,
+                                    strategy_options=strategy_options)
+        return run, client
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        itinerary = system.plan_trip(catalog, requirement,
+                                     strategy=strategy, seed=0,
+                                     strategy_options=strategy_options)
+    state = system.export_plan_state(itinerary)
+    restart_index = max(1, (len(itinerary) - 1) // 2)
+    client.reset_counts()
+
+    def run():
+        return system.replan(state, itinerary, restart_index)
+    return run, client
+
+
+def measure(scenario: str,
+            catalog: List[Dict],
+            mode: str,
+            strategy: str = 'greedy',
+            latency_ms: float = 0.0,
+            repeat: int = 3,
+            memory: bool = True,
+            strategy_options: Optional[Dict] = None) -> Dict:
+    """量測一個情境
+
+    Args:
+        scenario: 'fresh' 或 'restart'
+        catalog: 地點資料
+        mode: 交通方式(MODES 的 key)
+        strategy: 規劃策略名稱
+        latency_ms: 每次 API 呼叫注入的延遲
+        repeat: 計時的次數(取中位數)
+        memory: 是否另外執行一次量測記憶體(tracemalloc 會拖慢執行)
+        strategy_options: 策略的額外設定(選填),例如 {'prefetch': 5}
+
+    Returns:
+        Dict: 量測結果
+    """
+    timings, external = [], []
+    itinerary, client, report = None, None, None
+
+    for _ in range(repeat):
+        run, client = prepare(scenario, catalog, mode, strategy, latency_ms,
+                              strategy_options)
+        plan_profiler = PlanProfiler()
+        start = time.perf_counter()
+        with profiler.activate(plan_profiler), \
+                contextlib.redirect_stdout(io.StringIO()):
+            itinerary = run()
+        timings.append((time.perf_counter() - start) * 1000)
+        report = plan_profiler.finish()
+        external.append(report['external_ms'])
+
+    result = {
+        'size': len(catalog),
+        'scenario': scenario,
+        'mode': mode,
+        'strategy': strategy,
+        'stops': len(itinerary),
+        'ms': statistics.median(timings),
+        'external_ms': statistics.median(external),
+        'api_calls': client.total_calls,
+        'api_elements': client.call_counts['distance_matrix_elements'],
+        'route_cache_hits': report['counters'].get('route_cache.hits', 0),
+        'peak_kb': None,
+        'allocations': None,
+    }
+
+    if memory:
+        result['peak_kb'], result['allocations'] = measure_memory(
+            scenario, catalog, mode, strategy, strategy_options)
+
+    return result
+
+
+def measure_memory(scenario: str,
+                   catalog: List[Dict],
+                   mode: str,
+                   strategy: str,
+                   strategy_options: Optional[Dict] = None) -> Tuple[float, int]:
+    """以 tracemalloc 量測一次規劃的記憶體峰值(KB)與新增的記憶體區塊數"""
+    run, _ = prepare(scenario, catalog, mode, strategy, latency_ms=0.0,
+                     strategy_options=strategy_options)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # 規劃結束時仍存在的新增區塊(暫時配置後已釋放的不列入,由峰值反映)
+    allocations = sum(max(0, stat.count_diff)
+                      for stat in after.compare_to(before, 'lineno'))
+    return peak / 1024, allocations
+
+
+def run_suite(sizes: List[int],
+              modes: List[str],
+              scenarios: List[str],
+              strategy: str = 'greedy',
+              latency_ms: float = 0.0,
+              repeat: int = 3,
+              memory: bool = True,
+              seed: int = 0,
+              on_result: Optional[Callable[[Dict], None]] = None,
+              strategy_options: Optional[Dict] = None) -> List[Dict]:
+    """執行所有 規模 × 情境 × 交通方式 的組合
+
+    Returns:
+        List[Dict]: 每個組合的 measure 結果
+    """
+    results = []
+    for size in sizes:
+        catalog = generate_catalog(size, seed=seed)
+        for scenario in scenarios:
+            for mode in modes:
+                result = measure(scenario, catalog, mode, strategy,
+                                 latency_ms, repeat, memory, strategy_options)
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    return results
+
+
+def print_result(result: Dict) -> None:
+    """輸出一列結果"""
+    peak = '-' if result['peak_kb'] is None else f"{result['peak_kb'] / 1024:.1f}"
+    allocations = '-' if result['allocations'] is None else result['allocations']
+    print(f"{result['size']:>8}  {result['scenario']:<8}{result['mode']:<10}"
+          f"{result['stops']:>4}{result['ms']:>11.1f}{result['external_ms']:>11.1f}"
+          f"{peak:>9}{allocations:>9}{result['api_calls']:>6}"
+          f"{result['api_elements']:>7}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='規劃效能量測')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=list(CATALOG_SIZES[:3]),
+                        help=f'地點數量,例如 {" ".join(map(str, CATALOG_SIZES))}')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES),
+                        default=list(MODES))
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS,
+                        default=list(SCENARIOS))
+    parser.add_argument('--strategy', default='greedy')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='每次 API 呼叫注入的延遲(毫秒)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='每個組合計時的次數(取中位數)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='不量測記憶體(節省時間)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='合成資料的亂數種子')
+    parser.add_argument('--prefetch', type=int, default=0,
+                        help='預先取得路線的候選地點數(greedy)')
+    parser.add_argument('--json', help='另外把結果寫入 JSON 檔案')
+    args = parser.parse_args()
+
+    print(f"策略: {args.strategy}, API 延遲: {args.latency_ms}ms, "
+          f"預先取得: {args.prefetch}, 每個組合 {args.repeat} 次")
+    print(f"{'地點數':>6}  {'情境':<6}{'交通方式':<6}{'站數':>4}{'耗時ms':>10}"
+          f"{'API ms':>11}{'峰值MB':>7}{'配置數':>6}{'API':>6}{'元素':>5}")
+
+    results = run_suite(
+        args.sizes, args.modes, args.scenarios,
+        strategy=args.strategy,
+        latency_ms=args.latency_ms,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        seed=args.seed,
+        on_result=print_result,
+        strategy_options={'prefetch': args.prefetch} if args.prefetch else None
+    )
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
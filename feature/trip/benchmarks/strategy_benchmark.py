@@ -0,0 +1,114 @@
+# benchmarks/strategy_benchmark.py
+
+"""規劃策略比較
+
+在 sample_data.py 的地點資料上比較各規劃策略的行程品質與耗時，
+使用 LocalMapsClient 取代 Google Maps，不需要網路也不會產生費用。
+
+執行方式(在專案根目錄):
+    python -m feature.trip.benchmarks.strategy_benchmark
+    python -m feature.trip.benchmarks.strategy_benchmark --seeds 20 --optw-budget 300
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import time
+from typing import Dict, List
+
+# 離線執行不需要真正的金鑰
+os.environ.setdefault('GOOGLE_MAPS_API_KEY', 'offline-benchmark')
+
+from ..sample_data import DEFAULT_LOCATIONS  # noqa: E402
+from ..src.core.planner.objectives import (  # noqa: E402
+    balanced_objective,
+    itinerary_stats
+)
+from ..src.core.planner.system import TripPlanningSystem  # noqa: E402
+from ..src.core.services.geo_service import GeoService  # noqa: E402
+from ..src.core.services.local_maps_client import LocalMapsClient  # noqa: E402
+
+
+MODES = {'driving': '開車', 'transit': '大眾運輸', 'walking': '步行'}
+
+
+def run_once(mode: str, strategy: str, seed: int,
+             strategy_options: Dict = None) -> Dict:
+    """規劃一次並回傳統計資料"""
+    client = LocalMapsClient()
+    system = TripPlanningSystem()
+    system.geo_service = GeoService(maps_client=client)
+    GeoService.get_route.cache_clear()
+
+    requirement = [{
+        "出發時間": "09:00",
+        "結束時間": "21:00",
+        "出發地點": "台北車站",
+        "交通方式": MODES[mode],
+        "出發日": "10-20"
+    }]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        itinerary = system.plan_trip(
+            DEFAULT_LOCATIONS,
+            requirement,
+            strategy=strategy,
+            strategy_options=strategy_options,
+            seed=seed
+        )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    stats = itinerary_stats(itinerary)
+    stats['objective'] = balanced_objective(itinerary)
+    stats['ms'] = elapsed_ms
+    stats['api_calls'] = client.total_calls
+    return stats
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    """彙總多次執行的結果"""
+    return {
+        'stops': statistics.mean(run['stops'] for run in runs),
+        'travel_minutes': statistics.mean(run['travel_minutes'] for run in runs),
+        'objective': statistics.mean(run['objective'] for run in runs),
+        'best_objective': max(run['objective'] for run in runs),
+        'ms': statistics.median(run['ms'] for run in runs),
+        'api_calls': statistics.mean(run['api_calls'] for run in runs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='規劃策略比較')
+    parser.add_argument('--seeds', type=int, default=10,
+                        help='每個策略執行的次數(不同亂數種子)')
+    parser.add_argument('--optw-budget', type=float, default=500,
+                        help='OPTW 的搜尋時間上限(毫秒)')
+    parser.add_argument('--beam-width', type=int, default=4)
+    args = parser.parse_args()
+
+    strategies = [
+        ('greedy', {}),
+        ('beam', {'beam_width': args.beam_width}),
+        ('optw', {'time_budget_ms': args.optw_budget}),
+    ]
+
+    print(f"地點數: {len(DEFAULT_LOCATIONS)}, 每個策略 {args.seeds} 次")
+    print(f"{'交通方式':<10}{'策略':<8}{'地點數':>8}{'交通分鐘':>10}"
+          f"{'目標值':>10}{'最佳':>8}{'耗時ms':>10}{'API':>6}")
+
+    for mode in MODES:
+        for strategy, options in strategies:
+            runs = [run_once(mode, strategy, seed, options)
+                    for seed in range(args.seeds)]
+            result = summarize(runs)
+            print(f"{mode:<12}{strategy:<10}{result['stops']:>8.1f}"
+                  f"{result['travel_minutes']:>12.1f}{result['objective']:>11.1f}"
+                  f"{result['best_objective']:>9.0f}{result['ms']:>12.1f}"
+                  f"{result['api_calls']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# benchmarks/synthetic_catalog.py
+
+"""合成的台北地點資料
+
+產生與 sample_data.DEFAULT_LOCATIONS 格式相同、規模可調(100 到 100,000 筆)
+的地點資料，用於離線效能量測。相同的 size 與 seed 一定產生相同的資料。
+
+分佈設計:
+1. 地點集中在台北市各行政區中心附近(常態分佈,約 1.5 公里)，
+   一成散佈在雙北範圍內
+2. 景點、餐廳、夜間地點的比例讓五個時段的地點數大致相同
+3. 營業時間混合全天、白天、週一公休、午晚餐分段、跨午夜營業等常見型態
+"""
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+
+# 行政區中心 (名稱, 緯度, 經度, 權重)
+DISTRICTS = [
+    ('中正區', 25.0324, 121.5199, 1.2),
+    ('大同區', 25.0633, 121.5130, 0.8),
+    ('中山區', 25.0685, 121.5266, 1.3),
+    ('松山區', 25.0497, 121.5776, 0.9),
+    ('大安區', 25.0268, 121.5435, 1.4),
+    ('萬華區', 25.0286, 121.4979, 0.9),
+    ('信義區', 25.0330, 121.5654, 1.2),
+    ('士林區', 25.0928, 121.5246, 1.0),
+    ('北投區', 25.1321, 121.5017, 0.7),
+    ('內湖區', 25.0698, 121.5888, 0.7),
+    ('南港區', 25.0545, 121.6066, 0.4),
+    ('文山區', 24.9897, 121.5703, 0.5),
+]
+
+# 雙北範圍(散佈的地點)
+BOUNDS = (24.95, 25.20, 121.40, 121.65)
+
+# 行政區內的分散程度(度,約 1.5 公里)
+DISTRICT_SPREAD = 0.014
+
+ALL_DAY = [{'start': '00:00', 'end': '23:59'}]
+DAYS = range(1, 8)
+
+
+def _daily(slots: List[Dict], closed_days: Tuple[int, ...] = ()) -> Dict[int, Optional[List[Dict]]]:
+    """每天相同的營業時段,closed_days 為公休日"""
+    return {day: (None if day in closed_days else slots) for day in DAYS}
+
+
+# 營業時間型態 (權重, 營業時間)
+ATTRACTION_HOURS = [
+    (50, _daily(ALL_DAY)),
+    (20, _daily([{'start': '09:00', 'end': '17:00'}], closed_days=(1,))),
+    (15, _daily([{'start': '10:00', 'end': '18:00'}])),
+    (10, _daily([{'start': '08:00', 'end': '22:00'}])),
+    (5, _daily([{'start': '09:30', 'end': '16:30'}], closed_days=(1, 2))),
+]
+
+RESTAURANT_HOURS = [
+    (40, _daily([{'start': '11:00', 'end': '14:00'},
+                 {'start': '17:00', 'end': '21:00'}])),
+    (30, _daily([{'start': '11:00', 'end': '21:00'}])),
+    (15, _daily([{'start': '11:30', 'end': '14:30'},
+                 {'start': '17:30', 'end': '22:00'}], closed_days=(1,))),
+    (10, _daily([{'start': '17:00', 'end': '23:00'}])),
+    (5, _daily(ALL_DAY)),
+]
+
+NIGHT_HOURS = [
+    (40, _daily([{'start': '17:00', 'end': '01:00'}])),
+    (30, _daily([{'start': '18:00', 'end': '02:00'}])),
+    (20, _daily([{'start': '19:00', 'end': '03:00'}], closed_days=(7,))),
+    (10, _daily(ALL_DAY)),
+]
+
+# 地點種類 (權重, 類型列表, 時段列表, 停留時間範圍, 營業時間型態)
+KINDS = [
+    (40, ['景點', '旅遊景點', '博物館', '公園', '寺廟'],
+     ['morning', 'afternoon'], (60, 150), ATTRACTION_HOURS),
+    (40, ['餐廳', '台灣餐廳', '日本餐廳', '火鍋餐廳', '素食餐廳', '咖啡廳'],
+     ['lunch', 'dinner'], (60, 90), RESTAURANT_HOURS),
+    (20, ['夜市', '酒吧', '居酒屋', '景點'],
+     ['night'], (60, 120), NIGHT_HOURS),
+]
+
+
+def _weighted(rng: random.Random, items: List[Tuple]) -> Tuple:
+    """依第一個欄位的權重隨機選擇"""
+    return rng.choices(items, weights=[item[0] for item in items])[0]
+
+
+def _location(rng: random.Random) -> Tuple[str, float, float]:
+    """產生一個座標,九成在行政區中心附近"""
+    if rng.random() < 0.1:
+        return ('雙北',
+                rng.uniform(BOUNDS[0], BOUNDS[1]),
+                rng.uniform(BOUNDS[2], BOUNDS[3]))
+
+    district, lat, lon, _ = rng.choices(
+        DISTRICTS, weights=[d[3] for d in DISTRICTS])[0]
+    return (district,
+            lat + rng.gauss(0, DISTRICT_SPREAD),
+            lon + rng.gauss(0, DISTRICT_SPREAD))
+
+
+def generate_catalog(size: int, seed: int = 0) -> List[Dict]:
+    """產生合成的地點資料
+
+    營業時間的字典在同型態的地點間共用(規劃過程不會修改營業時間)，
+    100,000 筆資料也只需要少量記憶體。
+
+    Args:
+        size: 地點數量
+        seed: 亂數種子
+
+    Returns:
+        List[Dict]: 地點資料,格式與 sample_data.DEFAULT_LOCATIONS 相同
+
+    使用範例:
+        >>> catalog = generate_catalog(10000)
+        >>> system.plan_trip(catalog, requirement)
+    """
+    rng = random.Random(seed)
+    catalog = []
+
+    for idx in range(size):
+        _, labels, periods, (low, high), hours_mix = _weighted(rng, KINDS)
+        district, lat, lon = _location(rng)
+        label = rng.choice(labels)
+
+        catalog.append({
+            'place_id': f'synthetic-{seed}-{idx}',
+            'name': f'{district}{label}{idx}',
+            'address': f'台北市{district}',
+            'rating': round(min(5.0, max(3.0, rng.gauss(4.2, 0.35))), 1),
+            'lat': round(lat, 7),
+            'lon': round(lon, 7),
+            'duration': rng.randrange(low, high + 1, 30),
+            'label': label,
+            'period': rng.choice(periods),
+            'hours': _weighted(rng, hours_mix)[1],
+        })
+
+    return catalog
+
+
+__all__ = ['DISTRICTS', 'generate_catalog']
@@ -7,6 +7,17 @@ load_dotenv()
 # 為了相容現有程式碼,保持同名變數
 GOOGLE_MAPS_API_KEY = os.getenv('GOOGLE_MAPS_API_KEY')
 
+# 路線快取設定(未設定路徑時只使用行程內快取)
+ROUTE_CACHE_PATH = os.getenv('ROUTE_CACHE_PATH')
+ROUTE_CACHE_TTL = int(os.getenv('ROUTE_CACHE_TTL', 7 * 24 * 60 * 60))
+ROUTE_CACHE_MAX_ENTRIES = int(os.getenv('ROUTE_CACHE_MAX_ENTRIES', 100000))
+
+# 地理編碼快取設定(與路線快取共用同一個檔案,地點座標很少變動)
+GEOCODE_CACHE_TTL = int(os.getenv('GEOCODE_CACHE_TTL', 30 * 24 * 60 * 60))
+
+# 交通時間估算器的校正結果(JSON 檔,未設定時使用固定的速度與係數)
+TRAVEL_ESTIMATOR_PATH = os.getenv('TRAVEL_ESTIMATOR_PATH')
+
 # 驗證必要的設定都存在
 if not GOOGLE_MAPS_API_KEY:
     raise ValueError("找不到必要的環境變數: GOOGLE_MAPS_API_KEY")
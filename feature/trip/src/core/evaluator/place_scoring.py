@@ -1,11 +1,17 @@
 # src/core/evaluator/place_scoring.py
 
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple, Union
 from dataclasses import dataclass
+import weakref
+import numpy as np
 from ..models.place import PlaceDetail
+from ..models.place_table import PERIOD_CODES, PlaceTable
+from ..models.business_hours import parse_minutes
 from ..services.time_service import TimeService
 from ..services.geo_service import GeoService
+from ..services.spatial_index import SpatialIndex
+from ..utils import profiler
 
 
 @dataclass
@@ -43,6 +49,14 @@ class PlaceScoring:
         'bicycling': 5
     }
 
+    # 不同地點類型的距離門檻調整係數
+    LABEL_THRESHOLD_FACTORS = {
+        '景點': 1.2,    # 景點可接受較遠的距離
+        '主要景點': 1.2,
+        '餐廳': 0.8,    # 餐廳要求較近
+        '小吃': 0.8
+    }
+
     # 效率評分的基準值
     EFFICIENCY_BASE = 1.5  # 基準效率比率
     EFFICIENCY_RATIOS = {
@@ -78,12 +92,18 @@ class PlaceScoring:
             self.DISTANCE_THRESHOLDS['driving']
         )
 
+        # score_batch 的靜態分數快取: 地點表 -> 靜態分數
+        # 每個地點表各自一筆,同時規劃多個地點表時不會互相覆蓋;
+        # 地點表被回收時自動移除
+        self._static_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
     def calculate_score(
         self,
         place: PlaceDetail,
         current_location: PlaceDetail,
         current_time: datetime,
-        travel_time: float
+        travel_time: float,
+        distance: Optional[float] = None
     ) -> float:
         """計算地點的綜合評分
 
@@ -92,6 +112,8 @@ class PlaceScoring:
             current_location: PlaceDetail - 當前位置 
             current_time: datetime - 當前時間
             travel_time: float - 預估交通時間(分鐘)
+            distance: Optional[float] - 已計算好的直線距離(公里),
+                      由策略批次計算後傳入可避免重複計算
 
         Returns:
             float: 評分結果,營業時間無效時返回負無限大
@@ -100,18 +122,15 @@ class PlaceScoring:
         if not self._check_business_hours(place, current_time):
             return float('-inf')
 
-        # 計算距離
-        distance = self.geo_service.calculate_distance(
-            {'lat': current_location.lat, 'lon': current_location.lon},
-            {'lat': place.lat, 'lon': place.lon}
-        )
+        # 計算距離(沒有預先計算時才逐一計算)
+        if distance is None:
+            distance = self.geo_service.calculate_distance(
+                {'lat': current_location.lat, 'lon': current_location.lon},
+                {'lat': place.lat, 'lon': place.lon}
+            )
 
         # 調整距離門檻
-        adjusted_threshold = self.distance_threshold
-        if place.label in ['景點', '主要景點']:
-            adjusted_threshold *= 1.2
-        elif place.label in ['餐廳', '小吃']:
-            adjusted_threshold *= 0.8
+        adjusted_threshold = self.get_distance_threshold(place.label)
 
         # 計算距離分數
         if distance <= adjusted_threshold:
@@ -137,6 +156,191 @@ class PlaceScoring:
 
         return self._normalize_score(weighted_score)
 
+    def score_batch(
+        self,
+        table: PlaceTable,
+        current: Union[int, PlaceDetail, Dict],
+        current_time: datetime,
+        rows: Optional[np.ndarray] = None,
+        distances: Optional[np.ndarray] = None,
+        travel_times: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """一次計算多個地點的綜合評分
+
+        與 calculate_score 的結果相同(浮點誤差內)，但:
+        1. 評分、距離門檻、期望效率等只跟地點有關的分數每個地點表只計算一次
+        2. 時段只判斷一次,距離、效率、時段與營業時間分數以陣列計算
+
+        Args:
+            table: PlaceTable - 候選地點表
+            current: 目前位置,可以是地點表的列號、PlaceDetail 或座標字典
+            current_time: datetime - 當前時間
+            rows: 要評分的列號(選填,預設為全部)
+            distances: 已計算好的直線距離(公里,選填),與 rows 對應
+            travel_times: 預估交通時間(分鐘,選填),預設為距離 × 2
+
+        Returns:
+            np.ndarray: 與 rows 對應的評分,不營業的地點為負無限大
+
+        使用範例:
+            >>> scores = scoring.score_batch(table, start, datetime(1900, 1, 1, 9))
+            >>> best_row = int(np.argmax(scores))
+        """
+        if rows is None:
+            rows = np.arange(len(table))
+        rows = np.asarray(rows, dtype=np.int64)
+
+        profiler.count('candidates_evaluated', len(rows))
+        with profiler.profile_span('scoring'):
+            return self._score_rows(
+                table, current, current_time, rows, distances, travel_times)
+
+    def _score_rows(
+        self,
+        table: PlaceTable,
+        current: Union[int, PlaceDetail, Dict],
+        current_time: datetime,
+        rows: np.ndarray,
+        distances: Optional[np.ndarray],
+        travel_times: Optional[np.ndarray]
+    ) -> np.ndarray:
+        """score_batch 的計算本體(rows 已轉為整數陣列)"""
+        static = self._static_components(table)
+
+        # 距離分數
+        if distances is None:
+            if isinstance(current, (int, np.integer)):
+                origin = {'lat': table.lat[current], 'lon': table.lon[current]}
+            elif isinstance(current, dict):
+                origin = current
+            else:
+                origin = {'lat': current.lat, 'lon': current.lon}
+            distances = self.geo_service.calculate_distances(
+                origin, table.lat[rows], table.lon[rows])
+        distances = np.asarray(distances, dtype=np.float64)
+        if travel_times is None:
+            travel_times = distances * 2
+        travel_times = np.asarray(travel_times, dtype=np.float64)
+
+        threshold = static['threshold'][rows]
+        distance_score = np.where(
+            distances <= threshold,
+            1.0 - distances / threshold,
+            np.maximum(0.0, 0.5 - (distances - threshold) / threshold)
+        )
+
+        # 效率分數
+        duration = table.duration[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = duration / travel_times / static['expected_ratio'][rows]
+        efficiency_score = np.where(
+            travel_times <= 0, 1.0, np.clip(ratio, 0.0, 1.0))
+
+        # 時段適合度: 時段差距 × 營業時間剩餘分數
+        weekday = current_time.isoweekday()
+        minute = current_time.hour * 60 + current_time.minute
+        current_code = PERIOD_CODES[self.time_service.get_time_period(current_time)]
+        period_diff = table.period_distance(rows, current_code)
+        period_score = np.where(
+            period_diff == 0, 1.0, np.maximum(0.3, 1.0 - period_diff * 0.2))
+
+        remaining = table.minutes_until_close(weekday, minute)[rows]
+        hours_score = np.where(
+            remaining < duration, 0.0,
+            np.where(remaining < duration * 1.5, 0.5, 1.0))
+        time_slot_score = np.minimum(1.0, period_score * hours_score)
+
+        weighted = (
+            static['rating'][rows] * self.weights.rating_weight +
+            efficiency_score * self.weights.efficiency_weight +
+            time_slot_score * self.weights.time_slot_weight +
+            distance_score * self.weights.distance_weight
+        )
+        scores = np.clip(weighted, self.MIN_SCORE, self.MAX_SCORE)
+
+        # 不營業的地點(remaining 為 -1)不可選
+        return np.where(remaining >= 0, scores, float('-inf'))
+
+    def _static_components(self, table: PlaceTable) -> Dict[str, np.ndarray]:
+        """只跟地點有關的分數,每個地點表計算一次"""
+        components = self._static_cache.get(table)
+        if components is not None:
+            return components
+
+        rating = table.rating
+        rating_score = np.where(
+            rating > 0,
+            np.where(rating >= 4.5,
+                     np.minimum(1.0, np.minimum(1.0, rating / 5.0) +
+                                (rating - 4.5) * 0.1),
+                     np.minimum(1.0, rating / 5.0)),
+            0.5
+        )
+        components = {
+            'rating': rating_score,
+            'threshold': np.array(
+                [self.get_distance_threshold(label) for label in table.labels],
+                dtype=np.float64),
+            'expected_ratio': np.array(
+                [self.EFFICIENCY_BASE * self.EFFICIENCY_RATIOS.get(label, 1.0)
+                 for label in table.labels],
+                dtype=np.float64),
+        }
+        self._static_cache[table] = components
+        return components
+
+    def get_distance_threshold(self, label: str) -> float:
+        """取得依地點類型調整後的距離門檻(公里)
+
+        景點可接受較遠的距離，餐廳則要求較近。
+
+        Args:
+            label: 地點類型
+
+        Returns:
+            float: 調整後的距離門檻
+        """
+        if label in self.LABEL_THRESHOLD_FACTORS:
+            return self.distance_threshold * self.LABEL_THRESHOLD_FACTORS[label]
+        return self.distance_threshold
+
+    @property
+    def search_radius(self) -> float:
+        """距離分數大於0的最遠距離(公里)
+
+        超過調整後門檻 1.5 倍的地點距離分數為0，
+        策略可用這個半徑搭配空間索引縮小候選範圍。
+        """
+        max_factor = max(1.0, *self.LABEL_THRESHOLD_FACTORS.values())
+        return self.distance_threshold * max_factor * 1.5
+
+    def find_candidates(
+        self,
+        index: SpatialIndex,
+        current_location: PlaceDetail,
+        max_distance: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """使用空間索引找出距離分數大於0的候選地點
+
+        Args:
+            index: SpatialIndex - 候選地點的空間索引
+            current_location: PlaceDetail - 當前位置
+            max_distance: Optional[float] - 額外的距離上限(例如使用者的
+                          可接受距離),取兩者中較小者
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (地點索引, 直線距離),依原始順序排列
+        """
+        radius = self.search_radius
+        if max_distance is not None:
+            radius = min(radius, max_distance)
+
+        return index.query_radius(
+            {'lat': current_location.lat, 'lon': current_location.lon},
+            radius,
+            sort=False
+        )
+
     def _calculate_rating_score(self, place: PlaceDetail) -> float:
         """計算基礎評分分數
 
@@ -282,7 +486,7 @@ class PlaceScoring:
     def _check_business_hours(self, place: PlaceDetail, current_time: datetime) -> bool:
         """檢查地點是否在營業時間內
 
-        使用地點的營業時間資訊來判斷當前是否營業。
+        使用地點預先編譯的營業時間來判斷當前是否營業。
 
         Args:
             place: 要檢查的地點
@@ -292,19 +496,9 @@ class PlaceScoring:
             bool: True 表示營業中,False 表示不營業
         """
         weekday = current_time.isoweekday()  # 1-7 代表週一到週日
-        time_str = current_time.strftime(self.time_service.TIME_FORMAT)
+        minute = current_time.hour * 60 + current_time.minute
 
-        # 檢查hours是否存在且有效
-        if not place.hours or weekday not in place.hours:
-            return False
-
-        # 檢查該天的營業時段
-        slots = place.hours[weekday]
-        if not slots or not isinstance(slots, list):
-            return False
-
-        # 使用place的is_open_at方法檢查營業狀態
-        return place.is_open_at(weekday, time_str)
+        return place.is_open_at_minute(weekday, minute)
 
     def _evaluate_business_hours_fit(
         self,
@@ -326,31 +520,17 @@ class PlaceScoring:
             float: 0-1 之間的適合度分數
         """
         weekday = current_time.isoweekday()
-        time_str = current_time.strftime(self.time_service.TIME_FORMAT)
+        minute = current_time.hour * 60 + current_time.minute
 
-        # 先檢查是否營業
-        if not self._check_business_hours(place, current_time):
+        # 取得目前所在營業時段的剩餘時間,不營業時為 None
+        remaining_minutes = place.minutes_until_close(weekday, minute)
+        if remaining_minutes is None:
             return 0.0
 
-        # 檢查剩餘營業時間
-        slots = place.hours.get(weekday, [])
-        if not slots or not isinstance(slots, list):
-            return 0.0
-
-        best_score = 0.0  # 取多個時段中的最佳分數
-
-        for slot in slots:
-            if not slot or not isinstance(slot, dict):
-                continue
-
-            current_slot_score = self._calculate_slot_score(
-                current_time,
-                slot,
-                place.duration_min
-            )
-            best_score = max(best_score, current_slot_score)
-
-        return best_score
+        return self._score_remaining_minutes(
+            remaining_minutes,
+            place.duration_min
+        )
 
     def _calculate_slot_score(
         self,
@@ -368,15 +548,12 @@ class PlaceScoring:
         Returns:
             float: 0-1 之間的分數
         """
-        # 解析結束時間
-        closing_time = datetime.strptime(slot['end'],
-                                         self.time_service.TIME_FORMAT).time()
         current_minutes = current_time.hour * 60 + current_time.minute
-        closing_minutes = closing_time.hour * 60 + closing_time.minute
+        opening_minutes = parse_minutes(slot['start'])
+        closing_minutes = parse_minutes(slot['end'])
 
         # 如果是跨日營業，調整結束時間
-        if closing_time < datetime.strptime(slot['start'],
-                                            self.time_service.TIME_FORMAT).time():
+        if closing_minutes < opening_minutes:
             closing_minutes += 24 * 60
 
         # 計算剩餘時間
@@ -384,7 +561,22 @@ class PlaceScoring:
         if remaining_minutes < 0:
             remaining_minutes += 24 * 60
 
-        # 根據剩餘時間評分
+        return self._score_remaining_minutes(remaining_minutes, duration_min)
+
+    def _score_remaining_minutes(
+        self,
+        remaining_minutes: int,
+        duration_min: int
+    ) -> float:
+        """根據剩餘營業時間評分
+
+        Args:
+            remaining_minutes: 距離打烊的分鐘數
+            duration_min: 預計停留時間
+
+        Returns:
+            float: 0-1 之間的分數
+        """
         if remaining_minutes < duration_min:
             return 0.0  # 剩餘時間不足
         elif remaining_minutes < duration_min * 1.5:
@@ -0,0 +1,190 @@
+# src/core/models/business_hours.py
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def parse_minutes(time_str: str) -> int:
+    """將 "HH:MM" 轉換為當天的分鐘數
+
+    Args:
+        time_str: HH:MM 格式時間字串
+
+    Returns:
+        int: 0-1439 之間的分鐘數
+
+    異常:
+        ValueError: 時間格式錯誤
+    """
+    try:
+        hour_str, minute_str = time_str.split(':')
+        hour, minute = int(hour_str), int(minute_str)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(f"時間格式錯誤: {time_str}")
+
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"時間格式錯誤: {time_str}")
+
+    return hour * 60 + minute
+
+
+def minute_of_week(day: int, minute: int) -> int:
+    """將(星期幾, 當天分鐘數)轉換為一週中的分鐘數
+
+    Args:
+        day: 1-7 代表週一到週日
+        minute: 當天的分鐘數(0-1439)
+
+    Returns:
+        int: 0 到 MINUTES_PER_WEEK-1 之間的分鐘數
+    """
+    return ((day - 1) * MINUTES_PER_DAY + minute) % MINUTES_PER_WEEK
+
+
+class CompiledHours:
+    """預先編譯的營業時間
+
+    把 PlaceDetail.hours 的字典格式轉換為「一週中的分鐘數」整數區間，
+    讓營業判斷、距離打烊時間與營業時段查詢都只需要整數比較與二分搜尋。
+
+    轉換規則:
+    1. 每個營業時段為包含結束分鐘的區間 [start, end]
+    2. 跨日時段(結束早於開始)拆成兩段，後半段落在隔天(週日接回週一)
+    3. 每一段都記錄所屬時段的實際打烊時間，用來計算剩餘營業分鐘數
+    """
+
+    __slots__ = ('_starts', '_pieces', '_max_length', '_open_starts', '_open_ends')
+
+    def __init__(self, hours: Optional[Dict[int, Any]]):
+        """編譯營業時間
+
+        Args:
+            hours: PlaceDetail.hours 格式的營業時間,無效的時段會被略過
+        """
+        # (開始, 結束(不含), 打烊分鐘, 原始時段)
+        pieces: List[Tuple[int, int, int, Dict]] = []
+
+        for day, slots in (hours or {}).items():
+            if not slots or not isinstance(slots, list):
+                continue
+            try:
+                day = int(day)
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= day <= 7:
+                continue
+
+            for slot in slots:
+                if not slot or not isinstance(slot, dict):
+                    continue
+                if 'start' not in slot or 'end' not in slot:
+                    continue
+                try:
+                    start = parse_minutes(slot['start'])
+                    end = parse_minutes(slot['end'])
+                except ValueError:
+                    continue
+
+                base = (day - 1) * MINUTES_PER_DAY
+                if end < start:
+                    # 跨日營業: 當天到午夜 + 隔天凌晨到打烊
+                    close = base + MINUTES_PER_DAY + end
+                    pieces.append((base + start, base + MINUTES_PER_DAY,
+                                   close, slot))
+                    next_base = (base + MINUTES_PER_DAY) % MINUTES_PER_WEEK
+                    pieces.append((next_base, next_base + end + 1,
+                                   next_base + end, slot))
+                else:
+                    pieces.append((base + start, base + end + 1,
+                                   base + end, slot))
+
+        pieces.sort(key=lambda piece: (piece[0], piece[1]))
+        self._pieces = pieces
+        self._starts = [piece[0] for piece in pieces]
+        self._max_length = max(
+            (piece[1] - piece[0] for piece in pieces), default=0)
+
+        # 合併重疊區間,供單純的營業判斷使用
+        open_starts: List[int] = []
+        open_ends: List[int] = []
+        for start, end, _, _ in pieces:
+            if open_ends and start <= open_ends[-1]:
+                open_ends[-1] = max(open_ends[-1], end)
+            else:
+                open_starts.append(start)
+                open_ends.append(end)
+        self._open_starts = open_starts
+        self._open_ends = open_ends
+
+    @property
+    def intervals(self) -> List[Tuple[int, int]]:
+        """合併後的營業區間 [(開始, 結束(不含)), ...]，單位為一週中的分鐘數"""
+        return list(zip(self._open_starts, self._open_ends))
+
+    @property
+    def pieces(self) -> List[Tuple[int, int, int]]:
+        """所有營業區段 [(開始, 結束(不含), 打烊分鐘), ...]，單位為一週中的分鐘數"""
+        return [piece[:3] for piece in self._pieces]
+
+    def is_open(self, day: int, minute: int) -> bool:
+        """檢查指定時間是否營業
+
+        Args:
+            day: 1-7 代表週一到週日
+            minute: 當天的分鐘數
+
+        Returns:
+            bool: True表示營業中
+        """
+        target = minute_of_week(day, minute)
+        idx = bisect_right(self._open_starts, target) - 1
+        return idx >= 0 and target < self._open_ends[idx]
+
+    def _containing_pieces(self, target: int):
+        """找出包含指定分鐘數的所有區段"""
+        idx = bisect_right(self._starts, target) - 1
+        while idx >= 0 and self._starts[idx] > target - self._max_length:
+            piece = self._pieces[idx]
+            if target < piece[1]:
+                yield piece
+            idx -= 1
+
+    def minutes_until_close(self, day: int, minute: int) -> Optional[int]:
+        """計算距離打烊還有多少分鐘
+
+        若同時落在多個營業時段內，取最晚打烊的時段。
+
+        Args:
+            day: 1-7 代表週一到週日
+            minute: 當天的分鐘數
+
+        Returns:
+            Optional[int]: 剩餘營業分鐘數,不在營業時間內則為 None
+        """
+        target = minute_of_week(day, minute)
+        remaining = [piece[2] - target
+                     for piece in self._containing_pieces(target)]
+        return max(remaining) if remaining else None
+
+    def matching_slot(self, day: int, minute: int) -> Optional[Dict]:
+        """取得包含指定時間的營業時段
+
+        Args:
+            day: 1-7 代表週一到週日
+            minute: 當天的分鐘數
+
+        Returns:
+            Optional[Dict]: 原始的營業時段 {'start': str, 'end': str}，
+                            不在營業時間內則為 None
+        """
+        target = minute_of_week(day, minute)
+        best = None
+        for piece in self._containing_pieces(target):
+            # 同時符合多個時段時取最早開始的時段,與原本的逐一比對順序一致
+            if best is None or piece[0] < best[0]:
+                best = piece
+        return best[3] if best else None
@@ -1,12 +1,86 @@
 # src/core/models/place.py
 
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 import pandas as pd
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
 from datetime import datetime
 
 from ..services.time_service import TimeService
 from ..utils.validator import TripValidator
+from .business_hours import CompiledHours, parse_minutes
+
+
+ALWAYS_OPEN = {i: [{'start': '00:00', 'end': '23:59'}] for i in range(1, 8)}
+VALID_PERIODS = ('morning', 'lunch', 'afternoon', 'dinner', 'night')
+
+
+def place_key(place: Union['PlaceDetail', Dict]) -> str:
+    """地點的識別 key:有 place_id 時使用 place_id,否則使用名稱
+
+    規劃時已訪問、已排除的地點都以這個 key 記錄，
+    名稱相同的不同地點不會互相排除。
+
+    Args:
+        place: PlaceDetail 或行程項目/地點字典
+
+    Returns:
+        str: place_id 或名稱
+    """
+    if isinstance(place, dict):
+        return place.get('place_id') or place['name']
+    return place.place_id or place.name
+
+
+def normalize_hours(hours: Optional[Dict]) -> Dict[int, Optional[list]]:
+    """整理營業時間格式
+
+    特殊規則:
+    1. 如果hours完全沒有資料 -> 全部24小時營業
+    2. 如果1-7都是None或'none' -> 全部24小時營業  
+    3. 如果部分天數有資料 -> 沒設定的視為休息(None)
+
+    Args:
+        hours: 原始營業時間
+
+    Returns:
+        Dict: 1-7 每天的營業時段列表,休息為 None
+    """
+    if hours is None:
+        return {day: list(slots) for day, slots in ALWAYS_OPEN.items()}
+
+    # 檢查是否全部都是None或'none'
+    all_closed = True
+    for day in range(1, 8):
+        value = hours.get(day)
+        if value not in [None, 'none', []]:
+            all_closed = False
+            break
+
+    if all_closed:
+        # 全部都是None -> 改成24小時
+        return {day: list(slots) for day, slots in ALWAYS_OPEN.items()}
+
+    # 處理每一天
+    processed = {}
+    for day in range(1, 8):
+        if day not in hours:
+            processed[day] = None
+            continue
+
+        value = hours[day]
+        if value in [None, 'none', []]:
+            processed[day] = None
+        else:
+            if not isinstance(value, list):
+                value = [value]
+            value = [
+                slot if isinstance(slot, dict) else {
+                    'start': slot['start'], 'end': slot['end']}
+                for slot in value
+            ]
+            processed[day] = value
+
+    return processed
 
 
 class PlaceDetail(BaseModel):
@@ -75,6 +149,19 @@ class PlaceDetail(BaseModel):
         examples=["morning", "lunch", "afternoon", "dinner", "night"]
     )
 
+    periods: Optional[List[str]] = Field(
+        default=None,
+        description="適合遊玩的所有時段(同一地點在多個時段被檢索到時),"
+                    "None 表示只有 period",
+        examples=[["morning", "afternoon"]]
+    )
+
+    period_scores: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="各時段的向量檢索分數",
+        examples=[{"morning": 0.82, "afternoon": 0.64}]
+    )
+
     hours: Dict[int, Optional[Any]] = Field(
         description="""營業時間資訊，格式：
         {
@@ -95,6 +182,10 @@ class PlaceDetail(BaseModel):
         examples=["https://example.com/route?..."]
     )
 
+    # 預先編譯的營業時間(由 hours 產生,不會輸出)
+    _compiled_hours: Optional[CompiledHours] = PrivateAttr(default=None)
+    _compiled_source: Optional[Dict] = PrivateAttr(default=None)
+
     def __init__(self, **data):
         # 檢查是否有 duration 或 duration_min
         if 'duration' not in data and 'duration_min' in data:
@@ -108,8 +199,30 @@ class PlaceDetail(BaseModel):
         if 'address' not in data:
             data['address'] = ""
 
+        # 只有 periods 時,以最早的時段作為 period
+        if not data.get('period') and data.get('periods'):
+            data['period'] = min(
+                data['periods'],
+                key=lambda p: VALID_PERIODS.index(p) if p in VALID_PERIODS else 0)
+
         super().__init__(**data)
 
+    def _compile_hours(self) -> CompiledHours:
+        """把 hours 編譯為整數分鐘區間"""
+        self._compiled_hours = CompiledHours(self.hours)
+        self._compiled_source = self.hours
+        return self._compiled_hours
+
+    @property
+    def compiled_hours(self) -> CompiledHours:
+        """取得編譯後的營業時間
+
+        第一次使用時才編譯;若 hours 在建立後被整個替換,會自動重新編譯
+        """
+        if self._compiled_hours is None or self._compiled_source is not self.hours:
+            return self._compile_hours()
+        return self._compiled_hours
+
     @field_validator('address')
     def validate_address(cls, v: Optional[str]) -> str:
         """驗證地址格式"""
@@ -120,11 +233,20 @@ class PlaceDetail(BaseModel):
     @field_validator('period')
     def validate_period(cls, v: str) -> str:
         """驗證時段標記的正確性"""
-        valid_periods = {'morning', 'lunch', 'afternoon', 'dinner', 'night'}
-        if v not in valid_periods:
+        if v not in VALID_PERIODS:
             raise ValueError(f'無效的時段標記: {v}')
         return v
 
+    @field_validator('periods')
+    def validate_periods(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        """驗證所有時段標記,並依時段順序排列、去除重複"""
+        if not v:
+            return None
+        invalid = [period for period in v if period not in VALID_PERIODS]
+        if invalid:
+            raise ValueError(f'無效的時段標記: {invalid[0]}')
+        return [period for period in VALID_PERIODS if period in v]
+
     @field_validator('label')
     def validate_label(cls, v):
         """驗證label格式"""
@@ -134,55 +256,8 @@ class PlaceDetail(BaseModel):
 
     @model_validator(mode='before')
     def validate_hours(cls, values: Dict) -> Dict:
-        """前處理驗證
-
-        特殊規則:
-        1. 如果hours完全沒有資料 -> 全部24小時營業
-        2. 如果1-7都是None或'none' -> 全部24小時營業  
-        3. 如果部分天數有資料 -> 沒設定的視為休息(None)
-        """
-        if 'hours' not in values:
-            values['hours'] = {i: [{'start': '00:00', 'end': '23:59'}]
-                               for i in range(1, 8)}
-            return values
-
-        hours = values['hours']
-
-        # 檢查是否全部都是None或'none'
-        all_closed = True
-        for day in range(1, 8):
-            value = hours.get(day)
-            if value not in [None, 'none', []]:
-                all_closed = False
-                break
-
-        if all_closed:
-            # 全部都是None -> 改成24小時
-            values['hours'] = {i: [{'start': '00:00', 'end': '23:59'}]
-                               for i in range(1, 8)}
-            return values
-
-        # 處理每一天
-        processed = {}
-        for day in range(1, 8):
-            if day not in hours:
-                processed[day] = None
-                continue
-
-            value = hours[day]
-            if value in [None, 'none', []]:
-                processed[day] = None
-            else:
-                if not isinstance(value, list):
-                    value = [value]
-                value = [
-                    slot if isinstance(slot, dict) else {
-                        'start': slot['start'], 'end': slot['end']}
-                    for slot in value
-                ]
-                processed[day] = value
-
-        values['hours'] = processed
+        """前處理驗證,規則見 normalize_hours"""
+        values['hours'] = normalize_hours(values.get('hours'))
         return values
 
     @field_validator('lat', 'lon')
@@ -196,6 +271,27 @@ class PlaceDetail(BaseModel):
             raise ValueError(f"{field} 座標錯誤: 超出有效範圍")
         return v
 
+    def has_period(self, period: str) -> bool:
+        """地點是否適合在指定時段遊玩"""
+        if self.periods:
+            return period in self.periods
+        return period == self.period
+
+    def for_period(self, period: str) -> 'PlaceDetail':
+        """取得以指定時段排入行程的地點
+
+        多時段的地點被選入某個時段時，行程項目與用餐狀態都以該時段為準。
+
+        Args:
+            period: 排入行程的時段
+
+        Returns:
+            PlaceDetail: period 相同時為本身,否則為複本(共用已編譯的營業時間)
+        """
+        if period == self.period:
+            return self
+        return self.model_copy(update={'period': period})
+
     def calculate_distance(self, other: Union['PlaceDetail', Dict]) -> float:
         """計算與另一個地點的距離
 
@@ -248,42 +344,45 @@ class PlaceDetail(BaseModel):
         Returns:
             bool: True表示營業中,False表示不營業
         """
-        # 檢查該天是否有營業時間設定
-        if not self.hours or day not in self.hours:
-            return False
-
-        # 檢查時段是否有效
-        time_slots = self.hours[day]
-        if not time_slots or not isinstance(time_slots, list):
-            return False
-
-        check_time = datetime.strptime(
-            time_str,
-            TimeService.TIME_FORMAT
-        ).time()
-
-        for slot in time_slots:
-            if not slot or not isinstance(slot, dict):
-                continue
+        return self.is_open_at_minute(day, parse_minutes(time_str))
 
-            # 確保slot有start和end
-            if 'start' not in slot or 'end' not in slot:
-                continue
+    def is_open_at_minute(self, day: int, minute: int) -> bool:
+        """檢查指定時間是否在營業時間內(整數分鐘版本)
 
-            try:
-                start = datetime.strptime(
-                    slot['start'], TimeService.TIME_FORMAT
-                ).time()
-                end = datetime.strptime(
-                    slot['end'], TimeService.TIME_FORMAT
-                ).time()
-            except ValueError:
-                continue
+        跨日時段(例如 22:00-03:00)的凌晨部分屬於隔天。
 
-            if TimeService.is_time_in_range(check_time, start, end, allow_overnight=True):
-                return True
+        Args:
+            day: 1-7 代表週一到週日
+            minute: 當天的分鐘數(0-1439)
 
-        return False
+        Returns:
+            bool: True表示營業中,False表示不營業
+        """
+        return self.compiled_hours.is_open(day, minute)
+
+    def minutes_until_close(self, day: int, minute: int) -> Optional[int]:
+        """計算距離打烊還有多少分鐘
+
+        Args:
+            day: 1-7 代表週一到週日
+            minute: 當天的分鐘數(0-1439)
+
+        Returns:
+            Optional[int]: 剩餘營業分鐘數,不在營業時間內則為 None
+        """
+        return self.compiled_hours.minutes_until_close(day, minute)
+
+    def find_open_slot(self, day: int, minute: int) -> Optional[Dict]:
+        """取得包含指定時間的營業時段
+
+        Args:
+            day: 1-7 代表週一到週日
+            minute: 當天的分鐘數(0-1439)
+
+        Returns:
+            Optional[Dict]: {'start': str, 'end': str},不在營業時間內則為 None
+        """
+        return self.compiled_hours.matching_slot(day, minute)
 
     def is_suitable_for_current_time(self, current_time: datetime) -> bool:
         """檢查當前時間是否適合遊玩此地點
@@ -328,8 +427,7 @@ class PlaceDetail(BaseModel):
                 'end': str
             }
         """
-        current = datetime.strptime(
-            current_time, TimeService.TIME_FORMAT).time()
+        current = parse_minutes(current_time)
 
         for day_offset in range(7):
             check_day = ((current_day - 1 + day_offset) % 7) + 1
@@ -342,8 +440,7 @@ class PlaceDetail(BaseModel):
                 if slot is None:
                     continue
 
-                start_time = datetime.strptime(slot['start'],
-                                               TimeService.TIME_FORMAT).time()
+                start_time = parse_minutes(slot['start'])
 
                 if day_offset == 0 and start_time <= current:
                     continue
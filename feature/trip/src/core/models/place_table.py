@@ -0,0 +1,490 @@
+# src/core/models/place_table.py
+
+import math
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .business_hours import CompiledHours, minute_of_week
+from .place import PlaceDetail, normalize_hours
+
+
+PERIODS = ('morning', 'lunch', 'afternoon', 'dinner', 'night')
+PERIOD_CODES = {period: code for code, period in enumerate(PERIODS)}
+# 各時段在 period_mask 中的位元
+PERIOD_BITS = {period: 1 << code for period, code in PERIOD_CODES.items()}
+
+
+def period_bits(periods) -> int:
+    """時段列表對應的位元遮罩"""
+    bits = 0
+    for period in periods:
+        bits |= PERIOD_BITS[period]
+    return bits
+
+
+class PlaceTable:
+    """以欄位陣列保存的候選地點表
+
+    plan_trip 每次規劃都要處理數百個候選地點，逐一建立 pydantic 的
+    PlaceDetail 會對每個欄位執行驗證。PlaceTable 改為:
+    1. 一次驗證整批資料(座標、評分、停留時間、時段),錯誤時指出第幾筆
+    2. 數值欄位存成 NumPy 陣列(lat/lon/rating/duration/period_code/period_mask)
+    3. 營業時間預先編譯，並把所有營業區間攤平成陣列，
+       營業判斷與距離打烊時間可以一次算出所有地點的結果
+    4. 名稱與類型字串只保留一份(intern)
+    5. PlaceDetail 只在需要時才建立(model_construct,不重新驗證)並快取
+
+    同一個地點在多個時段被檢索到時只佔一列(periods):
+    period_mask 記錄地點適合的所有時段(PERIOD_BITS),
+    period_code 為第一個時段，period_scores 為各時段的檢索分數。
+    已訪問的地點以 place_key(place_id,沒有時為名稱)識別。
+
+    PlaceTable 同時是 PlaceDetail 的序列(len/索引/迭代)，
+    可以直接傳給原本接收 List[PlaceDetail] 的程式。
+
+    使用範例:
+        >>> table = PlaceTable.from_locations(locations)
+        >>> mask = table.period_match('lunch') & \\
+        ...     table.open_mask(weekday=1, minute=12 * 60)
+        >>> lunch_places = [table.place(i, 'lunch') for i in np.flatnonzero(mask)]
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        lat: np.ndarray,
+        lon: np.ndarray,
+        rating: np.ndarray,
+        duration: np.ndarray,
+        period_code: np.ndarray,
+        labels: List[str],
+        hours: List[Dict],
+        place_ids: Optional[List[Optional[str]]] = None,
+        addresses: Optional[List[str]] = None,
+        urls: Optional[List[Optional[str]]] = None,
+        compiled_hours: Optional[List[CompiledHours]] = None,
+        places: Optional[List[Optional[PlaceDetail]]] = None,
+        period_mask: Optional[np.ndarray] = None,
+        period_scores: Optional[np.ndarray] = None,
+        intervals: Optional[Tuple[np.ndarray, ...]] = None
+    ):
+        """建立地點表(欄位需已驗證,一般請使用 from_locations)"""
+        size = len(names)
+        self.names = names
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.rating = np.asarray(rating, dtype=np.float64)
+        self.duration = np.asarray(duration, dtype=np.int64)
+        self.period_code = np.asarray(period_code, dtype=np.int8)
+        if period_mask is None:
+            period_mask = np.left_shift(1, self.period_code.astype(np.uint8))
+        self.period_mask = np.asarray(period_mask, dtype=np.uint8)
+        # 各時段的檢索分數 (地點數, 時段數),沒有檢索分數時為 None,未檢索到為 NaN
+        self.period_scores = period_scores
+        self.labels = labels
+        self.hours = hours
+        self.place_ids = place_ids or [None] * size
+        self.addresses = addresses or [""] * size
+        self.urls = urls or [None] * size
+        self.compiled_hours = compiled_hours or [CompiledHours(h) for h in hours]
+
+        # 已建立的 PlaceDetail(依需要建立)
+        self._places: List[Optional[PlaceDetail]] = places or [None] * size
+        # 多時段地點排入其他時段的 PlaceDetail {(索引, 時段): PlaceDetail}
+        self._period_places: Dict[Tuple[int, str], PlaceDetail] = {}
+
+        # 名稱 -> 所有同名地點的索引
+        self._name_rows: Dict[str, List[int]] = {}
+        for idx, name in enumerate(names):
+            self._name_rows.setdefault(name, []).append(idx)
+
+        # place_key -> 索引(沒有 place_id 的地點以名稱為 key)
+        self._key_rows: Dict[str, List[int]] = {}
+        for idx, place_id in enumerate(self.place_ids):
+            if place_id:
+                self._key_rows.setdefault(place_id, []).append(idx)
+
+        if intervals is None:
+            self._build_interval_arrays()
+        else:
+            (self._interval_rows, self._interval_starts,
+             self._interval_ends, self._interval_closes) = intervals
+
+    @classmethod
+    def from_locations(
+        cls,
+        locations: Sequence[Union[Dict, PlaceDetail]],
+        trusted: bool = False
+    ) -> 'PlaceTable':
+        """從地點字典或 PlaceDetail 建立地點表
+
+        Args:
+            locations: 地點列表,可混合字典與 PlaceDetail
+            trusted: True 表示資料來自已驗證的資料集,略過數值範圍檢查
+
+        Returns:
+            PlaceTable: 地點表
+
+        異常:
+            ValueError: 資料缺少必要欄位或超出有效範圍,訊息包含第幾筆資料
+        """
+        if isinstance(locations, PlaceTable):
+            return locations
+
+        size = len(locations)
+        names: List[str] = []
+        labels: List[str] = []
+        hours: List[Dict] = []
+        compiled: List[CompiledHours] = []
+        place_ids: List[Optional[str]] = []
+        addresses: List[str] = []
+        urls: List[Optional[str]] = []
+        places: List[Optional[PlaceDetail]] = []
+        lat = np.empty(size, dtype=np.float64)
+        lon = np.empty(size, dtype=np.float64)
+        rating = np.empty(size, dtype=np.float64)
+        duration = np.empty(size, dtype=np.int64)
+        period_code = np.empty(size, dtype=np.int8)
+        period_mask = np.empty(size, dtype=np.uint8)
+        # (索引, {時段: 檢索分數})
+        scored_rows: List[Tuple[int, Dict[str, float]]] = []
+
+        for idx, location in enumerate(locations):
+            if isinstance(location, PlaceDetail):
+                # 已驗證過的物件直接取用欄位
+                place = location
+                names.append(sys.intern(place.name))
+                labels.append(sys.intern(place.label))
+                hours.append(place.hours)
+                compiled.append(place.compiled_hours)
+                place_ids.append(place.place_id)
+                addresses.append(place.address)
+                urls.append(place.url)
+                places.append(place)
+                lat[idx], lon[idx] = place.lat, place.lon
+                rating[idx] = place.rating
+                duration[idx] = place.duration_min
+                period_code[idx] = PERIOD_CODES[place.period]
+                period_mask[idx] = period_bits(place.periods or [place.period])
+                if place.period_scores:
+                    scored_rows.append((idx, place.period_scores))
+                continue
+
+            try:
+                name = location['name']
+                lat[idx] = location['lat']
+                lon[idx] = location['lon']
+                periods = location.get('periods') or [location['period']]
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"第 {idx} 筆地點資料錯誤: {str(e)}")
+
+            for value in [location.get('period') or periods[0], *periods]:
+                if value not in PERIOD_CODES:
+                    raise ValueError(f"第 {idx} 筆地點資料錯誤: 無效的時段標記: {value}")
+            # 沒有 period 時以最早的時段為主
+            period = location.get('period') or min(periods, key=PERIOD_CODES.get)
+
+            rating[idx] = location.get('rating') or 0.0
+            duration[idx] = cls._duration(location)
+            period_code[idx] = PERIOD_CODES[period]
+            period_mask[idx] = period_bits(periods) | PERIOD_BITS[period]
+            if location.get('period_scores'):
+                scored_rows.append((idx, location['period_scores']))
+
+            day_hours = normalize_hours(location.get('hours'))
+            names.append(sys.intern(str(name)))
+            labels.append(sys.intern(cls._label(location.get('label', '景點'))))
+            hours.append(day_hours)
+            compiled.append(CompiledHours(day_hours))
+            place_ids.append(location.get('place_id'))
+            address = location.get('address')
+            addresses.append("" if address is None else str(address))
+            urls.append(location.get('url'))
+            places.append(None)
+
+        if not trusted:
+            cls._validate_columns(lat, lon, rating, duration)
+
+        period_scores = None
+        if scored_rows:
+            period_scores = np.full((size, len(PERIODS)), np.nan, dtype=np.float32)
+            for idx, scores in scored_rows:
+                for period, score in scores.items():
+                    if period in PERIOD_CODES and score is not None:
+                        period_scores[idx, PERIOD_CODES[period]] = score
+
+        return cls(
+            names=names, lat=lat, lon=lon, rating=rating, duration=duration,
+            period_code=period_code, labels=labels, hours=hours,
+            place_ids=place_ids, addresses=addresses, urls=urls,
+            compiled_hours=compiled, places=places,
+            period_mask=period_mask, period_scores=period_scores
+        )
+
+    @staticmethod
+    def _duration(location: Dict) -> int:
+        """與 PlaceDetail 相同的停留時間規則:duration 優先,其次 duration_min,預設 60"""
+        if 'duration' in location and location['duration'] is not None:
+            return int(location['duration'])
+        if location.get('duration_min') is not None:
+            return int(location['duration_min'])
+        return 60
+
+    @staticmethod
+    def _label(label: Any) -> str:
+        """與 PlaceDetail.validate_label 相同:缺少類型時為「未分類」"""
+        if label is None or (isinstance(label, float) and math.isnan(label)):
+            return "未分類"
+        return str(label)
+
+    @staticmethod
+    def _validate_columns(lat: np.ndarray,
+                          lon: np.ndarray,
+                          rating: np.ndarray,
+                          duration: np.ndarray) -> None:
+        """一次檢查所有數值欄位的範圍"""
+        checks = [
+            ('lat', ~((lat >= -90) & (lat <= 90))),
+            ('lon', ~((lon >= -180) & (lon <= 180))),
+            ('rating', ~((rating >= 0) & (rating <= 5))),
+            ('duration', duration < 0),
+        ]
+        for field, invalid in checks:
+            if invalid.any():
+                idx = int(np.flatnonzero(invalid)[0])
+                raise ValueError(f"第 {idx} 筆地點資料錯誤: {field} 超出有效範圍")
+
+    def _build_interval_arrays(self) -> None:
+        """把所有地點的營業區間攤平成陣列,供整批查詢使用"""
+        rows, starts, ends, closes = [], [], [], []
+        for row, compiled in enumerate(self.compiled_hours):
+            for start, end, close in compiled.pieces:
+                rows.append(row)
+                starts.append(start)
+                ends.append(end)
+                closes.append(close)
+        self._interval_rows = np.array(rows, dtype=np.int64)
+        self._interval_starts = np.array(starts, dtype=np.int64)
+        self._interval_ends = np.array(ends, dtype=np.int64)
+        self._interval_closes = np.array(closes, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, idx: int) -> PlaceDetail:
+        return self.place(idx)
+
+    def __iter__(self) -> Iterator[PlaceDetail]:
+        for idx in range(len(self)):
+            yield self.place(idx)
+
+    def place(self, idx: int, period: Optional[str] = None) -> PlaceDetail:
+        """取得第 idx 筆地點的 PlaceDetail(第一次使用時建立)
+
+        Args:
+            idx: 索引
+            period: 選填,排入行程的時段。多時段的地點會回傳 period 為該時段的
+                    PlaceDetail(同樣會快取)
+
+        Returns:
+            PlaceDetail: 地點
+        """
+        place = self._places[idx]
+        if place is None:
+            periods = self.periods_of(idx)
+            place = PlaceDetail.model_construct(
+                place_id=self.place_ids[idx],
+                name=self.names[idx],
+                address=self.addresses[idx],
+                rating=float(self.rating[idx]),
+                lat=float(self.lat[idx]),
+                lon=float(self.lon[idx]),
+                duration=int(self.duration[idx]),
+                duration_min=int(self.duration[idx]),
+                label=self.labels[idx],
+                period=PERIODS[self.period_code[idx]],
+                periods=periods if len(periods) > 1 else None,
+                period_scores=self._period_scores_of(idx),
+                hours=self.hours[idx],
+                url=self.urls[idx]
+            )
+            # 共用已編譯的營業時間
+            place._compiled_hours = self.compiled_hours[idx]
+            place._compiled_source = place.hours
+            self._places[idx] = place
+
+        if period is None or period == place.period:
+            return place
+        variant = self._period_places.get((idx, period))
+        if variant is None:
+            variant = self._period_places[(idx, period)] = place.for_period(period)
+        return variant
+
+    def document(self, idx: int) -> Dict:
+        """第 idx 筆地點的 JSON 字典(不建立 PlaceDetail)
+
+        內容與 PlaceDetail.model_dump(mode='json') 相同,
+        營業時間的星期 key 為字串(MongoDB 只接受字串 key)。
+        """
+        periods = self.periods_of(idx)
+        return {
+            'place_id': self.place_ids[idx],
+            'name': self.names[idx],
+            'address': self.addresses[idx],
+            'rating': float(self.rating[idx]),
+            'lat': float(self.lat[idx]),
+            'lon': float(self.lon[idx]),
+            'duration': int(self.duration[idx]),
+            'duration_min': int(self.duration[idx]),
+            'label': self.labels[idx],
+            'period': PERIODS[self.period_code[idx]],
+            'periods': periods if len(periods) > 1 else None,
+            'period_scores': self._period_scores_of(idx),
+            'hours': {str(day): [dict(slot) for slot in slots] if slots else slots
+                      for day, slots in (self.hours[idx] or {}).items()},
+            'url': self.urls[idx]
+        }
+
+    def periods_of(self, idx: int) -> List[str]:
+        """第 idx 筆地點適合的所有時段(依時段順序)"""
+        bits = int(self.period_mask[idx])
+        return [period for period in PERIODS if bits & PERIOD_BITS[period]]
+
+    def _period_scores_of(self, idx: int) -> Optional[Dict[str, float]]:
+        """第 idx 筆地點各時段的檢索分數,沒有時為 None"""
+        if self.period_scores is None:
+            return None
+        scores = {period: float(score)
+                  for period, score in zip(PERIODS, self.period_scores[idx])
+                  if not np.isnan(score)}
+        return scores or None
+
+    def period_match(self, period: str) -> np.ndarray:
+        """所有地點是否適合在指定時段遊玩(未知的時段全部為 False)"""
+        bit = PERIOD_BITS.get(period)
+        if bit is None:
+            return np.zeros(len(self), dtype=bool)
+        return (self.period_mask & bit) != 0
+
+    def period_distance(self, rows: np.ndarray, code: int) -> np.ndarray:
+        """各地點最接近的時段與指定時段的差距
+
+        單一時段的地點即 |period_code - code|。
+
+        Args:
+            rows: 要計算的列號
+            code: 時段代碼(PERIOD_CODES)
+
+        Returns:
+            np.ndarray: 與 rows 對應的整數陣列
+        """
+        masks = self.period_mask[rows]
+        distance = np.full(masks.shape, len(PERIODS), dtype=np.int64)
+        for other, bit in enumerate(PERIOD_BITS.values()):
+            distance = np.where(masks & bit,
+                                np.minimum(distance, abs(other - code)), distance)
+        return distance
+
+    def take(self, rows: Sequence[int]) -> 'PlaceTable':
+        """只保留指定列的地點表
+
+        共用已編譯的營業時間與已建立的 PlaceDetail,不重新驗證。
+
+        Args:
+            rows: 要保留的列號(依序)
+
+        Returns:
+            PlaceTable: 新的地點表,第 i 列為原本的第 rows[i] 列
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        picked = rows.tolist()
+
+        # 列號遞增時直接切出攤平的營業區間,不必重新攤平
+        intervals = None
+        if len(rows) == 0 or (np.all(np.diff(rows) > 0) and
+                              0 <= rows[0] and rows[-1] < len(self)):
+            new_rows = np.full(len(self), -1, dtype=np.int64)
+            new_rows[rows] = np.arange(len(rows))
+            kept = new_rows[self._interval_rows] >= 0
+            intervals = (new_rows[self._interval_rows[kept]],
+                         self._interval_starts[kept],
+                         self._interval_ends[kept],
+                         self._interval_closes[kept])
+
+        return PlaceTable(
+            names=[self.names[i] for i in picked],
+            lat=self.lat[rows], lon=self.lon[rows], rating=self.rating[rows],
+            duration=self.duration[rows], period_code=self.period_code[rows],
+            labels=[self.labels[i] for i in picked],
+            hours=[self.hours[i] for i in picked],
+            place_ids=[self.place_ids[i] for i in picked],
+            addresses=[self.addresses[i] for i in picked],
+            urls=[self.urls[i] for i in picked],
+            compiled_hours=[self.compiled_hours[i] for i in picked],
+            places=[self._places[i] for i in picked],
+            period_mask=self.period_mask[rows],
+            period_scores=(None if self.period_scores is None
+                           else self.period_scores[rows]),
+            intervals=intervals
+        )
+
+    def coordinates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """所有地點的(緯度陣列, 經度陣列)"""
+        return self.lat, self.lon
+
+    def index_of(self, name: str) -> Optional[int]:
+        """依名稱取得(第一筆的)索引,找不到時為 None"""
+        rows = self._name_rows.get(name)
+        return rows[0] if rows else None
+
+    def rows_of(self, key: str) -> List[int]:
+        """place_key 對應的索引
+
+        先以 place_id 查詢，找不到時視為名稱
+        (沒有 place_id 的地點，或只記錄名稱的舊行程)。
+        """
+        return self._key_rows.get(key) or self._name_rows.get(key) or []
+
+    def mask_of(self, keys) -> np.ndarray:
+        """place_key 集合對應的布林遮罩(例如已訪問的地點),見 rows_of"""
+        mask = np.zeros(len(self), dtype=bool)
+        for key in keys:
+            rows = self.rows_of(key)
+            if rows:
+                mask[rows] = True
+        return mask
+
+    def open_mask(self, weekday: int, minute: int) -> np.ndarray:
+        """所有地點在指定時間是否營業
+
+        Args:
+            weekday: 1-7 代表週一到週日
+            minute: 當天的分鐘數
+
+        Returns:
+            np.ndarray: 布林陣列,與 PlaceDetail.is_open_at_minute 相同
+        """
+        target = minute_of_week(weekday, minute)
+        hit = (self._interval_starts <= target) & (target < self._interval_ends)
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self._interval_rows[hit]] = True
+        return mask
+
+    def minutes_until_close(self, weekday: int, minute: int) -> np.ndarray:
+        """所有地點距離打烊的分鐘數
+
+        Returns:
+            np.ndarray: 剩餘營業分鐘數,不營業的地點為 -1;
+                        與 PlaceDetail.minutes_until_close 相同(None 對應 -1)
+        """
+        target = minute_of_week(weekday, minute)
+        hit = (self._interval_starts <= target) & (target < self._interval_ends)
+        remaining = np.full(len(self), -1, dtype=np.int64)
+        np.maximum.at(remaining, self._interval_rows[hit],
+                      self._interval_closes[hit] - target)
+        return remaining
+
+
+__all__ = ['PERIODS', 'PERIOD_CODES', 'PERIOD_BITS', 'period_bits', 'PlaceTable']
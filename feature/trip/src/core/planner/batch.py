@@ -0,0 +1,317 @@
+# src/core/planner/batch.py
+
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..models.place_table import PlaceTable
+from ..services.geo_service import GeoService
+from ..utils.cache_backend import create_cache_backend
+from ..utils.geocode_cache import GeocodeCache
+from .registry import DEFAULT_STRATEGY
+from .system import TripPlanningSystem
+from ...config.config import (
+    GEOCODE_CACHE_TTL,
+    ROUTE_CACHE_MAX_ENTRIES,
+    ROUTE_CACHE_PATH
+)
+
+
+class BatchPlanner:
+    """批次規劃大量行程
+
+    適合一次產生大量建議行程(例如活動用的種子行程、回歸測試)，
+    取代在迴圈中反覆建立 TripController / TripPlanningSystem:
+
+    1. 每個工作行程只建立一次規劃系統與 Google Maps 用戶端
+    2. 共用的地點資料(catalog)在每個工作行程只轉換一次地點表
+    3. 所有工作行程共用同一個 SQLite 路線/地理編碼快取，
+       一個工作行程取得的路線其他工作行程直接使用
+    4. 結果依完成順序逐筆回傳，可以直接寫入 JSONL
+
+    每筆請求的格式:
+        {
+            'id': str,                  # 選填,預設為第幾筆(從 0 開始)
+            'requirement': Dict|List,   # 與 plan_trip 相同的規劃需求
+            'locations': List[Dict],    # 選填,這筆請求專用的候選地點
+            'place_ids': List[str],     # 選填,從 catalog 中選取的候選地點
+            'strategy': str,            # 選填,規劃策略
+            'strategy_options': Dict,   # 選填
+            'seed': int,                # 選填
+            'samples': int,             # 選填,多樣本時在工作行程內依序規劃
+            'deadline': float           # 選填,規劃期限(秒),使用情形記錄在結果的 deadline
+        }
+    沒有 locations 與 place_ids 時使用整個 catalog。
+
+    使用範例:
+        >>> planner = BatchPlanner(catalog, workers=4)
+        >>> for result in planner.run(requests):
+        ...     print(result['id'], result['error'] or len(result['itinerary']))
+        >>> planner.stats['plans_per_second']
+    """
+
+    def __init__(self,
+                 catalog: Optional[List[Dict]] = None,
+                 workers: Optional[int] = None,
+                 cache_path: Optional[str] = ROUTE_CACHE_PATH,
+                 maps_client=None,
+                 quiet: bool = True):
+        """初始化
+
+        Args:
+            catalog: 共用的候選地點資料(選填)
+            workers: 工作行程數,預設為 CPU 數,1 表示在目前行程內依序規劃
+            cache_path: 共用的 SQLite 快取檔案,預設為 ROUTE_CACHE_PATH;
+                        未設定且使用多個工作行程時,建立本次批次專用的暫存檔
+            maps_client: 選填,自訂的地圖用戶端(例如 LocalMapsClient),
+                         會複製到每個工作行程
+            quiet: 是否隱藏工作行程中規劃過程的輸出;
+                   workers=1 時不隱藏(redirect_stdout 會影響目前行程的所有執行緒)
+        """
+        self.catalog = list(catalog or [])
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.cache_path = cache_path
+        self.maps_client = maps_client
+        self.quiet = quiet
+        self.stats: Dict = {}
+
+    def run(self,
+            requests: Iterable[Dict],
+            on_result: Optional[Callable[[Dict], None]] = None) -> Iterator[Dict]:
+        """規劃所有請求,依完成順序逐筆回傳結果
+
+        請求會逐筆讀取(同時進行的請求不超過工作行程數的兩倍)，
+        可以直接傳入讀取 JSONL 檔案的產生器。
+
+        Args:
+            requests: 請求列表或產生器
+            on_result: 選填,每完成一筆時呼叫
+
+        Returns:
+            Iterator[Dict]: 每筆結果:
+                {
+                    'id': 請求的 id,
+                    'index': 第幾筆請求,
+                    'itinerary': List[Dict] | None,
+                    'error': str | None,
+                    'elapsed_ms': float,
+                    'seed': 使用的亂數種子
+                }
+            全部完成後 self.stats 為統計資料(見 _summarize)
+        """
+        started = time.perf_counter()
+        elapsed = []
+        failed = 0
+
+        for result in self._results(requests):
+            elapsed.append(result['elapsed_ms'])
+            failed += result['error'] is not None
+            if on_result:
+                on_result(result)
+            yield result
+
+        self.stats = self._summarize(
+            elapsed, failed, time.perf_counter() - started)
+
+    def _results(self, requests: Iterable[Dict]) -> Iterator[Dict]:
+        """依工作行程數選擇在目前行程或工作行程中規劃"""
+        indexed = enumerate(requests)
+
+        if self.workers <= 1:
+            # 在目前行程內規劃:結束後還原路線快取後端與規劃系統,
+            # 之後在這個行程中的規劃不會繼續使用批次的快取檔案
+            backend = GeoService.get_route.get_backend()
+            state = _worker_state()
+            try:
+                _init_batch_worker(self.catalog, self.maps_client,
+                                   self.cache_path, quiet=False)
+                for index, request in indexed:
+                    yield _run_batch_request(index, request)
+            finally:
+                GeoService.get_route.set_backend(backend)
+                _restore_worker_state(state)
+            return
+
+        cache_path, temporary = self.cache_path, None
+        if not cache_path:
+            temporary = tempfile.NamedTemporaryFile(
+                prefix='batch_route_cache_', suffix='.sqlite3', delete=False)
+            temporary.close()
+            cache_path = temporary.name
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_batch_worker,
+                initargs=(self.catalog, self.maps_client, cache_path, self.quiet)
+            ) as pool:
+                pending = set()
+                for index, request in indexed:
+                    pending.add(pool.submit(_run_batch_request, index, request))
+                    if len(pending) >= self.workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+        finally:
+            if temporary is not None:
+                for suffix in ('', '-wal', '-shm'):
+                    with contextlib.suppress(OSError):
+                        os.remove(cache_path + suffix)
+
+    @staticmethod
+    def _summarize(elapsed: List[float], failed: int, seconds: float) -> Dict:
+        """批次的統計資料
+
+        Returns:
+            Dict: {
+                'requests': int,            # 請求數
+                'succeeded': int,
+                'failed': int,
+                'elapsed_s': float,         # 整個批次的耗時
+                'plans_per_second': float,  # 吞吐量
+                'mean_ms': float,           # 每筆規劃的平均耗時
+                'p95_ms': float             # 每筆規劃耗時的第 95 百分位數
+            }
+        """
+        count = len(elapsed)
+        ordered = sorted(elapsed)
+        return {
+            'requests': count,
+            'succeeded': count - failed,
+            'failed': failed,
+            'elapsed_s': round(seconds, 3),
+            'plans_per_second': round(count / seconds, 2) if seconds > 0 else None,
+            'mean_ms': round(statistics.fmean(elapsed), 1) if elapsed else None,
+            'p95_ms': (round(ordered[min(count - 1, int(count * 0.95))], 1)
+                       if elapsed else None),
+        }
+
+
+# 工作行程內的規劃系統與地點資料(每個工作行程初始化一次)
+_batch_system: Optional[TripPlanningSystem] = None
+_batch_catalog: Optional[PlaceTable] = None
+_batch_catalog_index: Dict[str, Dict] = {}
+_batch_quiet: bool = True
+
+
+def _worker_state() -> Tuple:
+    """目前的工作行程狀態(在目前行程內規劃時用來還原)"""
+    return _batch_system, _batch_catalog, _batch_catalog_index, _batch_quiet
+
+
+def _restore_worker_state(state: Tuple) -> None:
+    global _batch_system, _batch_catalog, _batch_catalog_index, _batch_quiet
+    _batch_system, _batch_catalog, _batch_catalog_index, _batch_quiet = state
+
+
+def _init_batch_worker(catalog: List[Dict],
+                       maps_client=None,
+                       cache_path: Optional[str] = None,
+                       quiet: bool = True) -> None:
+    """初始化工作行程:建立規劃系統、連接共用快取並轉換一次地點表"""
+    global _batch_system, _batch_catalog, _batch_catalog_index, _batch_quiet
+    _batch_quiet = quiet
+
+    # ROUTE_CACHE_PATH 的後端在載入 geo_service 時已經建立
+    geocode_cache = None
+    if cache_path and cache_path != ROUTE_CACHE_PATH:
+        backend = create_cache_backend(
+            cache_path, max_entries=ROUTE_CACHE_MAX_ENTRIES)
+        GeoService.get_route.set_backend(backend)
+        geocode_cache = GeocodeCache(backend=backend, ttl=GEOCODE_CACHE_TTL)
+
+    with _silenced(quiet):
+        _batch_system = TripPlanningSystem()
+        if maps_client is not None or geocode_cache is not None:
+            _batch_system.geo_service = GeoService(
+                maps_client=(maps_client or
+                             getattr(_batch_system.geo_service, 'maps_client', None)),
+                geocode_cache=geocode_cache)
+
+    _batch_catalog = PlaceTable.from_locations(catalog) if catalog else None
+    _batch_catalog_index = {
+        place.get('place_id') or place.get('placeID'): place
+        for place in catalog
+        if isinstance(place, dict)
+    }
+
+
+def _run_batch_request(index: int, request: Dict) -> Dict:
+    """在工作行程中規劃一筆請求,錯誤記錄在結果中而不中斷批次"""
+    result = {
+        'id': request.get('id', index) if isinstance(request, dict) else index,
+        'index': index,
+        'itinerary': None,
+        'error': None,
+        'elapsed_ms': 0.0,
+        'seed': None,
+        'deadline': None,
+    }
+    started = time.perf_counter()
+
+    try:
+        requirement = request.get('requirement')
+        if not requirement:
+            raise ValueError("請求缺少 requirement")
+        if isinstance(requirement, dict):
+            requirement = [requirement]
+
+        with _silenced(_batch_quiet):
+            result['itinerary'] = _batch_system.plan_trip(
+                _request_locations(request),
+                requirement,
+                strategy=request.get('strategy') or DEFAULT_STRATEGY,
+                strategy_options=request.get('strategy_options'),
+                samples=request.get('samples') or 1,
+                seed=request.get('seed'),
+                workers=1,
+                deadline=request.get('deadline')
+            )
+        result['seed'] = _batch_system.seed
+        result['deadline'] = _batch_system.last_context.deadline
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {str(e)}"
+
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def _request_locations(request: Dict):
+    """取得一筆請求的候選地點
+
+    Returns:
+        請求專用的地點、從 catalog 選取的地點,或整個 catalog 的地點表
+
+    異常:
+        ValueError: 沒有候選地點,或 place_ids 不在 catalog 中
+    """
+    if request.get('locations'):
+        return request['locations']
+
+    place_ids = request.get('place_ids')
+    if place_ids:
+        missing = [pid for pid in place_ids if pid not in _batch_catalog_index]
+        if missing:
+            raise ValueError(f"catalog 中找不到地點: {', '.join(missing[:5])}")
+        return [_batch_catalog_index[pid] for pid in place_ids]
+
+    if _batch_catalog is None:
+        raise ValueError("請求沒有候選地點,也沒有提供 catalog")
+    return _batch_catalog
+
+
+def _silenced(quiet: bool):
+    """quiet 時隱藏規劃過程的輸出"""
+    return contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+
+
+__all__ = ['BatchPlanner']
@@ -0,0 +1,319 @@
+# src/core/planner/beam_search.py
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.place import PlaceDetail, place_key
+from ..models.place_table import PlaceTable
+from ..services.spatial_index import SpatialIndex
+from ..utils import profiler
+from .registry import register_strategy
+from .strategy import BasePlanningStrategy
+
+
+@dataclass(frozen=True)
+class BeamState:
+    """beam search 中的一條部分行程
+
+    每條行程各自保存時段與用餐狀態，不共用 TimeService 的狀態。
+    """
+    location: PlaceDetail
+    time: datetime                  # 離開目前地點的時間
+    period: str                     # 目前時段
+    lunch_completed: bool
+    dinner_completed: bool
+    visited: FrozenSet[str]         # 已訪問地點的 place_key
+    path: Tuple[PlaceDetail, ...] = ()
+    score: float = 0.0              # 累計評分
+    travel_minutes: int = 0         # 累計交通時間(預估)
+
+    def rank(self) -> Tuple[float, int, int]:
+        """排序用的鍵值:評分高優先,其次地點多、交通時間短"""
+        return (self.score, len(self.path), -self.travel_minutes)
+
+
+@register_strategy('beam')
+class BeamSearchStrategy(BasePlanningStrategy):
+    """Beam search 行程規劃策略
+
+    與貪婪法每一步只保留一個選擇不同，同時保留評分最高的 K 條部分行程:
+    1. 每一輪把每條行程延伸到評分最高的幾個候選地點
+    2. 交通時間只使用快取或直線估算，不呼叫路線 API
+    3. 依累計評分保留最好的 beam_width 條行程
+    4. 延伸次數用完時，以貪婪法(同樣使用估算的路線)完成目前最好的行程
+    5. 搜尋結束後只對勝出的行程取得實際路線，並依實際時間修正
+
+    設定(config，可由 plan_trip 的 strategy_options 傳入):
+        - beam_width: 保留的行程數(預設 4)
+        - branch_factor: 每條行程每一輪延伸的候選數(預設 5)
+        - expansion_budget: 最多延伸的行程數(每個候選地點的延伸算一次),
+          用來限制規劃時間(預設 2000,每一輪最多 beam_width * branch_factor 次)
+
+    有規劃期限(deadline)時，期限到時停止延伸，使用目前累計評分最高的行程。
+
+    使用範例:
+        >>> system.plan_trip(locations, requirement, strategy='beam',
+        ...                  strategy_options={'beam_width': 8})
+    """
+
+    DEFAULT_BEAM_WIDTH = 4
+    DEFAULT_BRANCH_FACTOR = 5
+    DEFAULT_EXPANSION_BUDGET = 2000
+
+    def __init__(self, time_service, geo_service, place_scoring, config: Dict):
+        super().__init__(time_service, geo_service, place_scoring, config)
+
+        self.beam_width = max(1, int(
+            config.get('beam_width', self.DEFAULT_BEAM_WIDTH)))
+        self.branch_factor = max(1, int(
+            config.get('branch_factor', self.DEFAULT_BRANCH_FACTOR)))
+        self.expansion_budget = max(1, int(
+            config.get('expansion_budget', self.DEFAULT_EXPANSION_BUDGET)))
+
+        # 統計資訊
+        self.expansions = 0
+
+    def _plan_places(
+        self,
+        current_location: PlaceDetail,
+        available_places: List[PlaceDetail],
+        current_time: datetime,
+        trip_date: datetime
+    ) -> Tuple[datetime, Optional[Dict]]:
+        """以 beam search 選擇地點,再依實際路線建立行程"""
+        available_places = PlaceTable.from_locations(available_places, trusted=True)
+        spatial_index = self.geo_service.build_spatial_index(
+            available_places,
+            min(self.distance_threshold, self.place_scoring.search_radius)
+        )
+        self.expansions = 0
+
+        initial = BeamState(
+            location=current_location,
+            time=current_time,
+            period=self.time_service.current_period,
+            lunch_completed=self.time_service.lunch_completed,
+            dinner_completed=self.time_service.dinner_completed,
+            visited=frozenset(self.visited_places)
+        )
+
+        best = initial
+        beam = [initial]
+        while beam:
+            # 期限到時以目前最好的行程結束
+            if self._deadline_expired():
+                break
+            if self.expansions >= self.expansion_budget:
+                # 延伸次數用完,不提前結束行程
+                best = self._complete_greedily(
+                    best, available_places, spatial_index, trip_date)
+                break
+            profiler.count('iterations')
+            children = []
+            for state in beam:
+                children.extend(self._expand(
+                    state, available_places, spatial_index, trip_date))
+
+            if not children:
+                break
+
+            beam = self._select_beam(children)
+            if beam[0].rank() > best.rank():
+                best = beam[0]
+
+        print(f"beam search: 延伸 {self.expansions} 條行程,"
+              f"選出 {len(best.path)} 個地點")
+
+        return self._commit_path(best, current_location, current_time, trip_date)
+
+    def _expand(
+        self,
+        state: BeamState,
+        table: PlaceTable,
+        spatial_index: SpatialIndex,
+        trip_date: datetime
+    ) -> List[BeamState]:
+        """把一條部分行程延伸到評分最高的幾個候選地點
+
+        每個嘗試延伸的候選地點計入一次 expansions,用完時不再延伸。
+
+        Returns:
+            List[BeamState]: 可以在結束時間前返回終點的延伸行程
+        """
+        period, scored = self._score_candidates(
+            state, table, spatial_index, trip_date)
+
+        children = []
+        for place, score in scored[:self.branch_factor]:
+            if self.expansions >= self.expansion_budget:
+                break
+            self.expansions += 1
+            child = self._extend_state(state, period, place, score)
+            if child is not None:
+                children.append(child)
+        return children
+
+    def _complete_greedily(
+        self,
+        state: BeamState,
+        table: PlaceTable,
+        spatial_index: SpatialIndex,
+        trip_date: datetime
+    ) -> BeamState:
+        """每一步加入評分最高且能準時返回終點的地點,直到無法再加入
+
+        延伸次數用完後使用，與 beam 相同只使用快取或估算的路線;期限到時停止。
+        """
+        while not self._deadline_expired():
+            period, scored = self._score_candidates(
+                state, table, spatial_index, trip_date)
+            for place, score in scored:
+                child = self._extend_state(state, period, place, score)
+                if child is not None:
+                    profiler.count('beam.greedy_completion')
+                    state = child
+                    break
+            else:
+                return state
+        return state
+
+    def _score_candidates(
+        self,
+        state: BeamState,
+        table: PlaceTable,
+        spatial_index: SpatialIndex,
+        trip_date: datetime
+    ) -> Tuple[str, List[Tuple[PlaceDetail, float]]]:
+        """評分從部分行程的目前位置出發的候選地點
+
+        Returns:
+            Tuple[str, List[Tuple[PlaceDetail, float]]]:
+                下一個地點的時段，以及可選的(地點, 分數),依分數由高到低排列
+        """
+        if state.time >= self.end_time:
+            return state.period, []
+
+        period = self.time_service.advance_period(
+            state.period, state.time,
+            state.lunch_completed, state.dinner_completed)
+
+        with profiler.profile_span('candidate_filtering'):
+            suitable = self._suitable_mask(
+                table, period, state.visited, trip_date.isoweekday(),
+                state.time.hour * 60 + state.time.minute)
+
+            # 與貪婪法相同:先找附近的地點,附近沒有才檢查全部
+            indices, distances = self.place_scoring.find_candidates(
+                spatial_index, state.location, self.distance_threshold)
+            keep = suitable[indices]
+            rows, distances = indices[keep], np.round(distances[keep], 1)
+
+            if rows.size == 0:
+                rows = np.flatnonzero(suitable)
+                if rows.size == 0:
+                    return period, []
+                distances = self.geo_service.calculate_distances(
+                    {'lat': state.location.lat, 'lon': state.location.lon},
+                    table.lat[rows], table.lon[rows])
+
+        scores = self.place_scoring.score_batch(
+            table, state.location, state.time, rows=rows, distances=distances,
+            travel_times=self._scoring_travel_times(distances, state.time))
+
+        scored = [(table.place(row, period), score)
+                  for row, score in zip(rows.tolist(), scores.tolist())
+                  if score > float('-inf')]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return period, scored
+
+    def _extend_state(
+        self,
+        state: BeamState,
+        period: str,
+        place: PlaceDetail,
+        score: float
+    ) -> Optional[BeamState]:
+        """以預估交通時間加入地點,無法準時返回終點時回傳 None"""
+        travel_info = self.geo_service.get_route_estimate(
+            {'lat': state.location.lat, 'lon': state.location.lon},
+            {'lat': place.lat, 'lon': place.lon},
+            self.travel_mode,
+            state.time
+        )
+        arrival_time = self._calculate_arrival_time(
+            state.time, travel_info['duration_minutes'])
+        departure_time = self._calculate_departure_time(
+            arrival_time, place.duration_min)
+
+        to_end_info = self.geo_service.get_route_estimate(
+            {'lat': place.lat, 'lon': place.lon},
+            {'lat': self.end_location.lat, 'lon': self.end_location.lon},
+            self.travel_mode,
+            departure_time
+        )
+        final_time = self._calculate_arrival_time(
+            departure_time, to_end_info['duration_minutes'])
+        if final_time > self.end_time:
+            return None
+
+        # 與 TimeService.update_meal_status 相同的用餐狀態規則
+        lunch_completed = state.lunch_completed or (
+            place.period == 'lunch' and period == 'lunch')
+        dinner_completed = state.dinner_completed or (
+            place.period == 'dinner' and period == 'dinner')
+
+        return BeamState(
+            location=place,
+            time=departure_time,
+            period=period,
+            lunch_completed=lunch_completed,
+            dinner_completed=dinner_completed,
+            visited=state.visited | {place_key(place)},
+            path=state.path + (place,),
+            score=state.score + score,
+            travel_minutes=state.travel_minutes + travel_info['duration_minutes']
+        )
+
+    def _select_beam(self, children: List[BeamState]) -> List[BeamState]:
+        """保留最好的 beam_width 條行程
+
+        訪問相同地點且停在同一個地點的行程只保留最好的一條，
+        避免 beam 被同一組地點的不同排列佔滿。
+        """
+        children.sort(key=lambda state: state.rank(), reverse=True)
+
+        beam = []
+        seen = set()
+        for state in children:
+            key = (state.visited, place_key(state.location))
+            if key in seen:
+                continue
+            seen.add(key)
+            beam.append(state)
+            if len(beam) >= self.beam_width:
+                break
+        return beam
+
+    def _commit_path(
+        self,
+        best: BeamState,
+        current_location: PlaceDetail,
+        current_time: datetime,
+        trip_date: datetime
+    ) -> Tuple[datetime, Optional[Dict]]:
+        """只對勝出的行程取得實際路線並加入行程"""
+        result = self._commit_route(
+            list(best.path), current_location, current_time, trip_date)
+
+        # 同步時段狀態,與貪婪法結束時一致
+        self.time_service.current_period = best.period
+        self.time_service.lunch_completed = best.lunch_completed
+        self.time_service.dinner_completed = best.dinner_completed
+
+        return result
+
+
+__all__ = ['BeamSearchStrategy', 'BeamState']
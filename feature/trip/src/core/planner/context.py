@@ -0,0 +1,48 @@
+# src/core/planner/context.py
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..models.place import PlaceDetail
+from ..services.time_service import TimeService
+
+
+@dataclass
+class PlanContext:
+    """一次規劃請求的狀態
+
+    TripPlanningSystem 只保存各請求共用的服務(地理服務、評分、指標 hook)，
+    每次 plan_trip 的時間設定、起終點、策略與結果都放在各自的 PlanContext，
+    因此同一個規劃系統可以同時在多個執行緒中使用。
+
+    TimeService 會在規劃過程中記錄目前時段與用餐狀態，每個請求各自一份。
+
+    使用範例:
+        >>> itinerary = system.plan_trip(locations, requirement)
+        >>> context = system.last_context    # 目前執行緒最近一次的規劃
+        >>> context.seed, context.execution_time
+    """
+
+    time_service: TimeService
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    start_location: Optional[PlaceDetail] = None
+    end_location: Optional[PlaceDetail] = None
+    strategy: Any = None
+
+    # 規劃結果
+    seed: Optional[int] = None           # 使用的亂數種子
+    best_seed: Optional[int] = None      # 多樣本時最佳樣本的亂數種子
+    sample_results: List[Dict] = field(default_factory=list)
+    execution_time: float = 0.0
+    profile_report: Optional[Dict] = None
+    post_optimization: Optional[Dict] = None  # ItineraryOptimizer.stats
+    isochrone: Optional[Dict] = None          # IsochroneFilter.filter 的統計
+    deadline: Optional[Dict] = None           # PlanDeadline.report(),沒有期限時為 None
+
+    # 規劃的輸入,供 export_plan_state 使用
+    last_plan: Optional[Dict] = None
+
+
+__all__ = ['PlanContext']
@@ -0,0 +1,107 @@
+# src/core/planner/deadline.py
+
+import time
+from typing import Dict, List, Optional, Union
+
+from ..utils import profiler
+
+
+class PlanDeadline:
+    """一次規劃的時間期限
+
+    LINE 的 reply token 與 gunicorn 的 --timeout 都有時間限制，
+    規劃太久時使用者完全拿不到結果。有期限時:
+    1. 剩餘時間少於 route_reserve 時不再呼叫路線 API，改用快取或估算的路線
+       (保留時間給已送出的請求與建立行程)
+    2. 期限到時各策略停止搜尋，以目前找到的地點建立完整行程(含返回終點)
+    3. 多樣本時期限到後不再開始新的樣本，規劃後的順序調整在期限將至時停止
+
+    結果有任何一項受到期限影響時 truncated 為 True，
+    原因記錄在 reasons:
+    - 'search': 策略提前結束搜尋
+    - 'estimated_routes': 規劃時使用了估算的路線(estimated_legs 為路段數)
+    - 'samples': 有樣本沒有規劃
+    - 'post_optimization': 沒有調整或提前結束調整順序
+
+    使用範例:
+        >>> itinerary = system.plan_trip(locations, requirement, deadline=8)
+        >>> report = system.last_context.deadline
+        >>> report['truncated'], report['reasons'], report['estimated_legs']
+    """
+
+    # 剩餘時間少於這個秒數時改用估算的路線(不超過期限的 1/4)
+    DEFAULT_ROUTE_RESERVE_SECONDS = 2.0
+
+    def __init__(self, seconds: float, route_reserve: Optional[float] = None):
+        """初始化並開始計時
+
+        Args:
+            seconds: 期限(秒)
+            route_reserve: 剩餘多少秒時改用估算的路線,
+                           預設為 min(DEFAULT_ROUTE_RESERVE_SECONDS, seconds / 4)
+
+        異常:
+            ValueError: 期限不是正數
+        """
+        if not seconds or seconds <= 0:
+            raise ValueError(f"規劃期限必須大於 0 秒: {seconds}")
+
+        self.seconds = float(seconds)
+        if route_reserve is None:
+            route_reserve = min(self.DEFAULT_ROUTE_RESERVE_SECONDS, self.seconds / 4)
+        self.route_reserve = float(route_reserve)
+        self.reasons: List[str] = []
+        self.estimated_legs = 0
+        self._started = time.monotonic()
+
+    @classmethod
+    def of(cls, deadline: Union[None, float, 'PlanDeadline']) -> Optional['PlanDeadline']:
+        """由秒數建立期限(已是 PlanDeadline 時直接使用,None 表示沒有期限)"""
+        if deadline is None or isinstance(deadline, cls):
+            return deadline
+        return cls(deadline)
+
+    def elapsed(self) -> float:
+        """已經過的秒數"""
+        return time.monotonic() - self._started
+
+    def remaining(self) -> float:
+        """剩餘的秒數(可能為負數)"""
+        return self.seconds - self.elapsed()
+
+    def expired(self) -> bool:
+        """期限是否已到"""
+        return self.remaining() <= 0
+
+    def low(self) -> bool:
+        """剩餘時間是否已不足以呼叫路線 API"""
+        return self.remaining() <= self.route_reserve
+
+    def truncate(self, reason: str) -> None:
+        """記錄結果因期限而不完整的原因"""
+        if reason not in self.reasons:
+            self.reasons.append(reason)
+            profiler.count(f'deadline.truncated.{reason}')
+
+    def record_estimated(self) -> None:
+        """記錄一段因期限而使用估算的路線"""
+        self.estimated_legs += 1
+        profiler.count('deadline.estimated_legs')
+        self.truncate('estimated_routes')
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.reasons)
+
+    def report(self) -> Dict:
+        """期限的使用情形,存放在 PlanContext.deadline"""
+        return {
+            'seconds': self.seconds,
+            'elapsed_ms': round(self.elapsed() * 1000, 3),
+            'truncated': self.truncated,
+            'reasons': list(self.reasons),
+            'estimated_legs': self.estimated_legs,
+        }
+
+
+__all__ = ['PlanDeadline']
@@ -0,0 +1,92 @@
+# src/core/planner/objectives.py
+
+from typing import Callable, Dict, List, Union
+
+
+Objective = Callable[[List[Dict]], float]
+
+
+def itinerary_stats(itinerary: List[Dict]) -> Dict[str, float]:
+    """計算行程的統計資料
+
+    Args:
+        itinerary: plan_trip 回傳的行程列表
+
+    Returns:
+        Dict: {
+            'stops': int,            # 不含起點與終點的地點數
+            'travel_minutes': int,   # 總交通時間
+            'travel_km': float,      # 總交通距離
+            'visit_minutes': int     # 總停留時間
+        }
+    """
+    stops = [item for item in itinerary
+             if item.get('label') not in ('起點', '終點')]
+    travel = [item.get('transport', {}) for item in itinerary[1:]]
+    return {
+        'stops': len(stops),
+        'travel_minutes': sum(leg.get('time', 0) or 0 for leg in travel),
+        'travel_km': round(sum(leg.get('travel_distance', 0) or 0
+                               for leg in travel), 1),
+        'visit_minutes': sum(item.get('duration', 0) or 0 for item in stops)
+    }
+
+
+def balanced_objective(itinerary: List[Dict]) -> float:
+    """平衡地點數與交通時間:每多一個地點相當於少 60 分鐘交通"""
+    stats = itinerary_stats(itinerary)
+    return stats['stops'] * 60 - stats['travel_minutes']
+
+
+def travel_time_objective(itinerary: List[Dict]) -> float:
+    """交通時間越短越好"""
+    return -itinerary_stats(itinerary)['travel_minutes']
+
+
+def stops_objective(itinerary: List[Dict]) -> float:
+    """地點越多越好,地點數相同時交通時間短的優先"""
+    stats = itinerary_stats(itinerary)
+    return stats['stops'] * 10000 - stats['travel_minutes']
+
+
+def visit_time_objective(itinerary: List[Dict]) -> float:
+    """實際遊玩時間越長越好,相同時交通時間短的優先"""
+    stats = itinerary_stats(itinerary)
+    return stats['visit_minutes'] * 10000 - stats['travel_minutes']
+
+
+# 目標函數名稱 -> 函數(數值越大越好)
+OBJECTIVES: Dict[str, Objective] = {
+    'balanced': balanced_objective,
+    'travel_time': travel_time_objective,
+    'stops': stops_objective,
+    'visit_time': visit_time_objective,
+}
+
+DEFAULT_OBJECTIVE = 'balanced'
+
+
+def get_objective(objective: Union[str, Objective, None] = None) -> Objective:
+    """取得目標函數
+
+    Args:
+        objective: 目標函數名稱,或自訂函數(接收行程列表,回傳越大越好的分數)
+
+    Returns:
+        Objective: 目標函數
+
+    異常:
+        ValueError: 未知的目標函數名稱
+    """
+    if callable(objective):
+        return objective
+
+    name = objective or DEFAULT_OBJECTIVE
+    if name not in OBJECTIVES:
+        raise ValueError(
+            f"未知的目標函數: {name},可用的目標函數: {sorted(OBJECTIVES)}")
+    return OBJECTIVES[name]
+
+
+__all__ = ['DEFAULT_OBJECTIVE', 'OBJECTIVES', 'get_objective',
+           'itinerary_stats']
@@ -0,0 +1,376 @@
+# src/core/planner/orienteering.py
+
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.place import PlaceDetail
+from ..models.place_table import PlaceTable
+from ..utils import profiler
+from .registry import register_strategy
+from .strategy import BasePlanningStrategy
+
+
+# 一條路線的模擬結果:(目標值, 交通分鐘數)
+Evaluation = Tuple[float, int]
+
+
+@register_strategy('optw')
+class OrienteeringStrategy(BasePlanningStrategy):
+    """帶時間窗的定向越野問題(OPTW)求解策略
+
+    把行程規劃視為定向越野問題：在結束時間前返回終點的條件下，
+    挑選並排列地點使總獎勵最高。限制條件與貪婪法相同:
+    1. 地點的時段(period)必須符合當下的時段，用餐時段由 TimeService 決定
+    2. 出發前往地點時必須在營業時間內
+    3. 加上返回終點的時間不能超過結束時間
+
+    求解方式(只使用 CPU，在 time_budget_ms 內結束):
+    1. 以直線距離預先計算候選地點間的交通時間矩陣
+    2. 最佳插入法建立初始路線
+    3. 迭代局部搜尋：插入、替換、2-opt、交換，陷入局部最佳時隨機移除
+       一段地點再重新插入
+    4. 只對最佳路線取得實際路線，依實際時間修正
+
+    設定(config，可由 plan_trip 的 strategy_options 傳入):
+        - time_budget_ms: 搜尋時間上限(毫秒,預設 500)
+        - max_candidates: 最多考慮的候選地點數(預設 120)
+        - max_iterations: 迭代局部搜尋的最多輪數(預設 200)
+
+    有規劃期限(deadline)時，期限比 time_budget_ms 先到就提前結束搜尋。
+
+    使用範例:
+        >>> system.plan_trip(locations, requirement, strategy='optw',
+        ...                  strategy_options={'time_budget_ms': 300})
+    """
+
+    DEFAULT_TIME_BUDGET_MS = 500
+    DEFAULT_MAX_CANDIDATES = 120
+    DEFAULT_MAX_ITERATIONS = 200
+
+    # 獎勵:每個地點的基本分數加上評分(0-1)
+    PRIZE_BASE = 1.0
+    # 每分鐘交通時間扣除的分數(約 2 小時交通抵一個地點)
+    TRAVEL_PENALTY = 1 / 120
+
+    def __init__(self, time_service, geo_service, place_scoring, config: Dict):
+        super().__init__(time_service, geo_service, place_scoring, config)
+
+        self.time_budget_ms = float(
+            config.get('time_budget_ms', self.DEFAULT_TIME_BUDGET_MS))
+        self.max_candidates = max(1, int(
+            config.get('max_candidates', self.DEFAULT_MAX_CANDIDATES)))
+        self.max_iterations = max(0, int(
+            config.get('max_iterations', self.DEFAULT_MAX_ITERATIONS)))
+
+        # 統計資訊
+        self.evaluations = 0
+        self.iterations = 0
+
+    def _plan_places(
+        self,
+        current_location: PlaceDetail,
+        available_places: List[PlaceDetail],
+        current_time: datetime,
+        trip_date: datetime
+    ) -> Tuple[datetime, Optional[Dict]]:
+        """求解 OPTW,再依實際路線建立行程"""
+        self._search_until = time.perf_counter() + self.time_budget_ms / 1000
+        self.evaluations = 0
+        self.iterations = 0
+
+        with profiler.profile_span('candidate_filtering'):
+            candidates = self._select_candidates(
+                current_location, available_places, current_time)
+        if not candidates:
+            print("沒有可以在結束時間前往返的地點")
+            return current_time, None
+
+        self._prepare(current_location, candidates, current_time, trip_date)
+
+        route = self._local_search(self._insert_greedily([]))
+        best, best_eval = route, self._evaluate(route)
+
+        while (self.iterations < self.max_iterations and
+               not self._out_of_time()):
+            self.iterations += 1
+            route = self._local_search(
+                self._insert_greedily(self._perturb(best)))
+            evaluation = self._evaluate(route)
+            if evaluation is not None and evaluation[0] > best_eval[0]:
+                best, best_eval = route, evaluation
+
+        profiler.count('iterations', self.iterations)
+        profiler.count('route_evaluations', self.evaluations)
+        print(f"OPTW: {len(candidates)} 個候選,{self.iterations} 輪,"
+              f"評估 {self.evaluations} 條路線,選出 {len(best)} 個地點")
+
+        # 同步時段狀態,與貪婪法結束時一致
+        states = self._trace(best)
+        period, _, lunch_completed, dinner_completed = states[-1]
+        self.time_service.current_period = period
+        self.time_service.lunch_completed = lunch_completed
+        self.time_service.dinner_completed = dinner_completed
+
+        # 多時段的地點以造訪時的時段排入行程
+        path = [self._places[node].for_period(state[0])
+                for node, state in zip(best, states)]
+        return self._commit_route(path, current_location, current_time, trip_date)
+
+    def _select_candidates(
+        self,
+        current_location: PlaceDetail,
+        available_places: List[PlaceDetail],
+        current_time: datetime
+    ) -> List[PlaceDetail]:
+        """挑選可以單獨往返的候選地點,超過上限時保留評分高的地點"""
+        table = PlaceTable.from_locations(available_places, trusted=True)
+        unvisited = ~table.mask_of(self.visited_places)
+        if not unvisited.any():
+            return []
+
+        index = self.geo_service.build_spatial_index(
+            table,
+            min(self.distance_threshold, self.place_scoring.search_radius)
+        )
+        rows, distances = index.query_radius(
+            {'lat': current_location.lat, 'lon': current_location.lon},
+            self.distance_threshold,
+            sort=False
+        )
+        keep = unvisited[rows]
+        rows, distances = rows[keep], distances[keep]
+        if rows.size == 0:
+            return []
+
+        # 起點 -> 地點 -> 終點 放不進剩餘時間的地點不可能出現在任何路線中
+        to_end = self.geo_service.haversine_matrix(
+            table.lat[rows], table.lon[rows],
+            np.array([self.end_location.lat]), np.array([self.end_location.lon])
+        )[:, 0]
+        minutes = (self.geo_service.estimate_travel_minutes(
+                       np.round(distances, 1), self.travel_mode) +
+                   table.duration[rows] +
+                   self.geo_service.estimate_travel_minutes(
+                       np.round(to_end, 1), self.travel_mode))
+        available = (self.end_time - current_time).total_seconds() / 60
+        rows = rows[minutes <= available]
+
+        # 依獎勵排序(穩定排序,與原始順序一致),只建立保留的地點
+        prizes = self.PRIZE_BASE + np.minimum(1.0, table.rating[rows] / 5.0)
+        order = np.argsort(-prizes, kind='stable')[:self.max_candidates]
+        return [table[row] for row in rows[order].tolist()]
+
+    def _prepare(
+        self,
+        current_location: PlaceDetail,
+        candidates: List[PlaceDetail],
+        current_time: datetime,
+        trip_date: datetime
+    ) -> None:
+        """建立節點、交通時間矩陣與各節點的獎勵
+
+        節點 0 為目前位置，1..n 為候選地點，n+1 為終點。
+        """
+        nodes = [current_location] + candidates + [self.end_location]
+        lats, lons = self.geo_service.coordinates_to_arrays(nodes)
+        distances = np.round(
+            self.geo_service.haversine_matrix(lats, lons, lats, lons), 1)
+
+        self._places = nodes
+        self._end_node = len(nodes) - 1
+        self._travel = self.geo_service.estimate_travel_minutes(
+            distances, self.travel_mode).tolist()
+        self._prizes = [0.0] + [self._prize(place) for place in candidates] + [0.0]
+        self._weekday = trip_date.isoweekday()
+        self._initial_state = (
+            self.time_service.current_period,
+            current_time,
+            self.time_service.lunch_completed,
+            self.time_service.dinner_completed
+        )
+
+    def _prize(self, place: PlaceDetail) -> float:
+        """地點的獎勵"""
+        return self.PRIZE_BASE + min(1.0, place.rating / 5.0)
+
+    def _trace(self, route: List[int]) -> List[Tuple[str, datetime, bool, bool]]:
+        """模擬路線,回傳每個位置選擇地點前的狀態
+
+        Returns:
+            List: 長度為 len(route)+1,第 i 個元素為前往 route[i] 前的
+                  (時段, 出發時間, 中餐完成, 晚餐完成);
+                  路線在第 k 個地點不可行時只回傳前 k+1 個狀態
+        """
+        period, current, lunch_completed, dinner_completed = self._initial_state
+        states = []
+        previous = 0
+        for node in route:
+            period = self.time_service.advance_period(
+                period, current, lunch_completed, dinner_completed)
+            states.append((period, current, lunch_completed, dinner_completed))
+
+            place = self._places[node]
+            if not self._can_visit(place, period, current):
+                return states
+
+            current = current + timedelta(
+                minutes=self._travel[previous][node] + place.duration_min)
+            lunch_completed = lunch_completed or (
+                place.has_period('lunch') and period == 'lunch')
+            dinner_completed = dinner_completed or (
+                place.has_period('dinner') and period == 'dinner')
+            previous = node
+
+        period = self.time_service.advance_period(
+            period, current, lunch_completed, dinner_completed)
+        states.append((period, current, lunch_completed, dinner_completed))
+        return states
+
+    def _can_visit(self, place: PlaceDetail, period: str, current: datetime) -> bool:
+        """是否可以在目前的時段與時間前往地點"""
+        return (current < self.end_time and
+                place.has_period(period) and
+                place.is_open_at_minute(
+                    self._weekday, current.hour * 60 + current.minute))
+
+    def _evaluate(self, route: List[int]) -> Optional[Evaluation]:
+        """計算路線的目標值,不可行時回傳 None"""
+        self.evaluations += 1
+        states = self._trace(route)
+        if len(states) <= len(route):
+            return None
+
+        _, departure, _, _ = states[-1]
+        last = route[-1] if route else 0
+        travel = sum(self._travel[a][b] for a, b in zip([0] + route, route))
+        travel += self._travel[last][self._end_node]
+
+        if departure + timedelta(
+                minutes=self._travel[last][self._end_node]) > self.end_time:
+            return None
+
+        prize = sum(self._prizes[node] for node in route)
+        return prize - self.TRAVEL_PENALTY * travel, travel
+
+    def _better(self, route: List[int], value: float) -> Optional[float]:
+        """路線可行且目標值高於 value 時回傳新的目標值"""
+        evaluation = self._evaluate(route)
+        if evaluation is not None and evaluation[0] > value + 1e-9:
+            return evaluation[0]
+        return None
+
+    def _insert_greedily(self, route: List[int]) -> List[int]:
+        """最佳插入法:反覆插入讓目標值提升最多的地點"""
+        route = list(route)
+        evaluation = self._evaluate(route)
+        value = evaluation[0] if evaluation else float('-inf')
+
+        while not self._out_of_time():
+            best = self._best_insertion(route, value)
+            if best is None:
+                break
+            route, value = best
+        return route
+
+    def _best_insertion(self, route: List[int],
+                        value: float) -> Optional[Tuple[List[int], float]]:
+        """找出讓目標值提升最多的單一插入"""
+        states = self._trace(route)
+        in_route = set(route)
+        best = None
+
+        for position, (period, current, _, _) in enumerate(states):
+            for node in range(1, self._end_node):
+                if node in in_route:
+                    continue
+                # 插入點之前的路線不變,可以先用時段與營業時間過濾
+                if not self._can_visit(self._places[node], period, current):
+                    continue
+                candidate = route[:position] + [node] + route[position:]
+                new_value = self._better(
+                    candidate, best[1] if best else value)
+                if new_value is not None:
+                    best = (candidate, new_value)
+        return best
+
+    def _local_search(self, route: List[int]) -> List[int]:
+        """局部搜尋:依序嘗試插入、替換、2-opt、交換,直到無法改善"""
+        evaluation = self._evaluate(route)
+        if evaluation is None:
+            return route
+        value = evaluation[0]
+
+        improved = True
+        while improved and not self._out_of_time():
+            improved = False
+            for move in (self._insertion_move, self._replace_move,
+                         self._two_opt_move, self._swap_move):
+                result = move(route, value)
+                if result is not None:
+                    route, value = result
+                    improved = True
+                    break
+        return route
+
+    def _insertion_move(self, route: List[int],
+                        value: float) -> Optional[Tuple[List[int], float]]:
+        return self._best_insertion(route, value)
+
+    def _replace_move(self, route: List[int],
+                      value: float) -> Optional[Tuple[List[int], float]]:
+        """把路線中的一個地點換成路線外的地點"""
+        states = self._trace(route)
+        in_route = set(route)
+        for position, (period, current, _, _) in enumerate(states[:-1]):
+            for node in range(1, self._end_node):
+                if node in in_route or not self._can_visit(
+                        self._places[node], period, current):
+                    continue
+                candidate = route[:position] + [node] + route[position + 1:]
+                new_value = self._better(candidate, value)
+                if new_value is not None:
+                    return candidate, new_value
+        return None
+
+    def _two_opt_move(self, route: List[int],
+                      value: float) -> Optional[Tuple[List[int], float]]:
+        """反轉路線中的一段"""
+        for i in range(len(route) - 1):
+            for j in range(i + 2, len(route) + 1):
+                candidate = route[:i] + route[i:j][::-1] + route[j:]
+                new_value = self._better(candidate, value)
+                if new_value is not None:
+                    return candidate, new_value
+        return None
+
+    def _swap_move(self, route: List[int],
+                   value: float) -> Optional[Tuple[List[int], float]]:
+        """交換路線中兩個不相鄰的地點(相鄰的情況已由 2-opt 涵蓋)"""
+        for i in range(len(route) - 2):
+            for j in range(i + 2, len(route)):
+                candidate = list(route)
+                candidate[i], candidate[j] = candidate[j], candidate[i]
+                new_value = self._better(candidate, value)
+                if new_value is not None:
+                    return candidate, new_value
+        return None
+
+    def _perturb(self, route: List[int]) -> List[int]:
+        """隨機移除一段連續的地點,跳出局部最佳解"""
+        if not route:
+            return []
+        length = self.rng.randint(1, max(1, len(route) // 3))
+        start = self.rng.randrange(len(route) - length + 1)
+        route = route[:start] + route[start + length:]
+
+        # 移除用餐地點可能讓後面的時段不成立,只保留可行的前段
+        return route[:len(self._trace(route)) - 1]
+
+    def _out_of_time(self) -> bool:
+        return time.perf_counter() >= self._search_until or self._deadline_expired()
+
+
+__all__ = ['OrienteeringStrategy']
@@ -0,0 +1,343 @@
+# src/core/planner/post_optimizer.py
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from ..models.place import PlaceDetail, place_key
+from ..models.place_table import PlaceTable
+from ..utils import profiler
+from .deadline import PlanDeadline
+from .strategy import BasePlanningStrategy
+
+
+# 一條路線的模擬結果:(總交通距離, 返回終點的時間, 各地點的造訪時段),不可行時為 None
+Evaluation = Tuple[float, datetime, List[str]]
+
+
+class ItineraryOptimizer:
+    """規劃完成後以 2-opt / or-opt 調整地點順序
+
+    貪婪法每一步只看下一站，行程常常來回折返。這個階段不更換地點，
+    只調整已選地點的造訪順序，使總交通距離變短:
+    1. 2-opt: 反轉一段連續的地點
+    2. or-opt: 把 1-3 個連續的地點移到其他位置
+
+    交通時間與距離矩陣只使用原行程的實際路線、路線快取與估算(不呼叫 API)。
+    每個順序都以與規劃策略相同的規則模擬，破壞時段(含用餐時段)、
+    營業時間或結束時間的調整一律不採用。
+    找到更好的順序後，只對順序改變的路段取得實際路線，
+    依實際路線再檢查一次，不可行或沒有變短時保留原行程。
+    有規劃期限時，期限將至就停止調整；來不及取得實際路線時保留原行程。
+
+    使用範例:
+        >>> optimizer = ItineraryOptimizer(strategy, places)
+        >>> itinerary = optimizer.optimize(itinerary)
+        >>> optimizer.stats['distance_before'], optimizer.stats['distance_after']
+    """
+
+    DEFAULT_MAX_ROUNDS = 50
+    # or-opt 移動的最長連續地點數
+    OR_OPT_MAX_SEGMENT = 3
+
+    def __init__(self,
+                 strategy: BasePlanningStrategy,
+                 places: PlaceTable,
+                 max_rounds: int = DEFAULT_MAX_ROUNDS,
+                 deadline: Optional[PlanDeadline] = None):
+        """初始化
+
+        Args:
+            strategy: 產生行程的規劃策略(使用它的時間、終點與行程格式)
+            places: 規劃時的候選地點表,用來取得地點的營業時間
+            max_rounds: 最多改善幾次
+            deadline: 規劃期限(選填)
+        """
+        self.strategy = strategy
+        self.places = places
+        self.max_rounds = max_rounds
+        self.deadline = deadline
+        self.stats: Dict = {
+            'moves': 0,
+            'distance_before': None,
+            'distance_after': None,
+            'refetched_legs': 0,
+            'reverted': False,
+        }
+
+    def optimize(self, itinerary: List[Dict]) -> List[Dict]:
+        """調整行程中地點的順序
+
+        Args:
+            itinerary: 規劃策略回傳的完整行程(含起點與終點)
+
+        Returns:
+            List[Dict]: 調整後的行程,無法改善時為原行程
+        """
+        with profiler.profile_span('post_optimization'):
+            return self._optimize(itinerary)
+
+    def _optimize(self, itinerary: List[Dict]) -> List[Dict]:
+        if len(itinerary) < 4:
+            return itinerary
+
+        stops = self._stop_places(itinerary[1:-1])
+        if stops is None:
+            return itinerary
+
+        self._prepare(itinerary, stops)
+        original = list(range(1, len(stops) + 1))
+        evaluation = self._evaluate(original)
+        if evaluation is None:
+            # 原行程的順序在模擬中不成立(例如營業時間資料不一致),不調整
+            return itinerary
+        self.stats['distance_before'] = round(evaluation[0], 3)
+
+        route, distance = original, evaluation[0]
+        for _ in range(self.max_rounds):
+            if self._deadline_low():
+                break
+            improved = self._improve(route, distance)
+            if improved is None:
+                break
+            route, distance = improved
+            self.stats['moves'] += 1
+
+        profiler.count('post_optimizer.moves', self.stats['moves'])
+        if route == original:
+            self.stats['distance_after'] = self.stats['distance_before']
+            return itinerary
+
+        if self._deadline_low():
+            # 來不及取得改變路段的實際路線
+            self.stats['distance_after'] = self.stats['distance_before']
+            return itinerary
+
+        optimized = self._rebuild(itinerary, route)
+        if optimized is None:
+            self.stats['reverted'] = True
+            self.stats['distance_after'] = self.stats['distance_before']
+            profiler.count('post_optimizer.reverted')
+            return itinerary
+        return optimized
+
+    def _deadline_low(self) -> bool:
+        """規劃期限是否將至,將至時記錄順序調整不完整"""
+        if self.deadline is None or not self.deadline.low():
+            return False
+        self.deadline.truncate('post_optimization')
+        return True
+
+    def _stop_places(self, items: List[Dict]) -> Optional[List[PlaceDetail]]:
+        """取得行程中各地點的 PlaceDetail,有地點不在候選地點表中時為 None"""
+        stops = []
+        for item in items:
+            rows = self.places.rows_of(place_key(item))
+            if not rows:
+                return None
+            stops.append(self.places[rows[0]])
+        return stops
+
+    def _prepare(self, itinerary: List[Dict], stops: List[PlaceDetail]) -> None:
+        """建立節點與交通時間/距離矩陣
+
+        節點 0 為起點，1..n 為行程中的地點，n+1 為終點。
+        原行程的路段使用實際路線，其他路段使用快取或估算。
+        """
+        strategy = self.strategy
+        start = itinerary[0]
+        self._nodes = [{'lat': float(item['lat']), 'lon': float(item['lon'])}
+                       for item in itinerary]
+        self._stops = [None] + stops + [None]
+        self._end_node = len(itinerary) - 1
+        self._weekday = self._trip_date(start).isoweekday()
+
+        # 原行程的路段 {(起點節點, 終點節點): 交通資訊}
+        self._original_legs = {
+            (node - 1, node): self._travel_info(itinerary[node])
+            for node in range(1, len(itinerary))
+        }
+
+        # 以原行程離開各節點的時間(決定快取時段)查詢其他路段
+        departures = [strategy.start_time]
+        for item in itinerary[1:-1]:
+            departures.append(self._departure_of(item))
+
+        size = len(self._nodes)
+        self._minutes = [[0] * size for _ in range(size)]
+        self._km = [[0.0] * size for _ in range(size)]
+        for a in range(self._end_node):
+            for b in range(1, size):
+                if a == b:
+                    continue
+                route = self._original_legs.get((a, b)) or \
+                    strategy.geo_service.get_route_estimate(
+                        self._nodes[a], self._nodes[b],
+                        strategy.travel_mode, departures[a])
+                self._minutes[a][b] = int(route['duration_minutes'])
+                self._km[a][b] = float(route['distance_km'])
+
+    def _evaluate(self, route: List[int]) -> Optional[Evaluation]:
+        """以矩陣模擬路線,不可行時回傳 None"""
+        legs = [(self._minutes[a][b], self._km[a][b])
+                for a, b in zip([0] + route, route + [self._end_node])]
+        return self._simulate(route, legs)
+
+    def _simulate(self,
+                  route: List[int],
+                  legs: List[Tuple[int, float]]) -> Optional[Evaluation]:
+        """依規劃策略的規則模擬路線
+
+        與 OrienteeringStrategy._trace 相同:前往地點前更新時段，
+        地點的時段必須符合、出發時必須營業中，另外抵達時也必須營業中，
+        最後返回終點不能超過結束時間。
+
+        Args:
+            route: 地點節點的順序
+            legs: 每一段路線的 (交通分鐘數, 距離),最後一段為返回終點
+
+        Returns:
+            Optional[Evaluation]: (總交通距離, 返回終點的時間, 各地點的造訪時段)
+        """
+        strategy = self.strategy
+        time_service = strategy.time_service
+        period, lunch_completed, dinner_completed = 'morning', False, False
+        current = strategy.start_time
+        distance = 0.0
+        periods = []
+
+        for node, (minutes, km) in zip(route, legs):
+            place = self._stops[node]
+            period = time_service.advance_period(
+                period, current, lunch_completed, dinner_completed)
+            if (current >= strategy.end_time or not place.has_period(period) or
+                    not place.is_open_at_minute(
+                        self._weekday, current.hour * 60 + current.minute)):
+                return None
+
+            arrival = current + timedelta(minutes=minutes)
+            if not place.is_open_at_minute(
+                    self._weekday, arrival.hour * 60 + arrival.minute):
+                return None
+
+            current = arrival + timedelta(minutes=place.duration_min)
+            distance += km
+            periods.append(period)
+            lunch_completed = lunch_completed or period == 'lunch'
+            dinner_completed = dinner_completed or period == 'dinner'
+
+        minutes, km = legs[-1]
+        final_time = current + timedelta(minutes=minutes)
+        if final_time > strategy.end_time:
+            return None
+        return distance + km, final_time, periods
+
+    def _improve(self,
+                 route: List[int],
+                 distance: float) -> Optional[Tuple[List[int], float]]:
+        """找出第一個讓總距離變短且可行的 2-opt 或 or-opt 調整"""
+        for candidate in self._neighbours(route):
+            evaluation = self._evaluate(candidate)
+            if evaluation is not None and evaluation[0] < distance - 1e-9:
+                return candidate, evaluation[0]
+        return None
+
+    def _neighbours(self, route: List[int]):
+        """依序產生 2-opt 與 or-opt 的候選順序"""
+        size = len(route)
+        for i in range(size - 1):
+            for j in range(i + 2, size + 1):
+                yield route[:i] + route[i:j][::-1] + route[j:]
+
+        for length in range(1, min(self.OR_OPT_MAX_SEGMENT, size - 1) + 1):
+            for i in range(size - length + 1):
+                segment = route[i:i + length]
+                rest = route[:i] + route[i + length:]
+                for position in range(len(rest) + 1):
+                    if position == i:
+                        continue
+                    yield rest[:position] + segment + rest[position:]
+
+    def _rebuild(self,
+                 itinerary: List[Dict],
+                 route: List[int]) -> Optional[List[Dict]]:
+        """依新順序取得實際路線並建立行程,不可行或沒有變短時為 None
+
+        原行程已有的路段直接沿用，只有順序改變的路段才取得實際路線。
+        """
+        strategy = self.strategy
+        trip_date = self._trip_date(itinerary[0])
+
+        # 先取得實際路線並模擬
+        legs_info = []
+        current = strategy.start_time
+        for a, b in zip([0] + route, route + [self._end_node]):
+            info = self._original_legs.get((a, b))
+            if info is None:
+                info = strategy.geo_service.get_route(
+                    origin=self._nodes[a],
+                    destination=self._nodes[b],
+                    mode=strategy.travel_mode,
+                    departure_time=current
+                )
+                self.stats['refetched_legs'] += 1
+            legs_info.append(info)
+            if b != self._end_node:
+                current = (current + timedelta(minutes=int(info['duration_minutes'])) +
+                           timedelta(minutes=self._stops[b].duration_min))
+
+        profiler.count('post_optimizer.refetched_legs', self.stats['refetched_legs'])
+        evaluation = self._simulate(
+            route,
+            [(int(info['duration_minutes']), float(info['distance_km']))
+             for info in legs_info])
+        if evaluation is None or evaluation[0] >= self.stats['distance_before'] - 1e-9:
+            return None
+
+        # 建立行程項目(起點沿用原本的項目)
+        optimized = [itinerary[0]]
+        current = strategy.start_time
+        for step, (node, info, period) in enumerate(
+                zip(route, legs_info, evaluation[2]), start=1):
+            place = self._stops[node].for_period(period)
+            arrival = strategy._calculate_arrival_time(current, info['duration_minutes'])
+            current = strategy._calculate_departure_time(arrival, place.duration_min)
+            item = strategy._create_itinerary_item(
+                place, arrival, current, info, trip_date)
+            item['step'] = step
+            optimized.append(item)
+
+        end_location = strategy.end_location.model_copy()
+        end_location.period = strategy.time_service.get_time_period(evaluation[1])
+        end_item = strategy._create_itinerary_item(
+            end_location, evaluation[1], evaluation[1], legs_info[-1], trip_date)
+        end_item['step'] = len(optimized)
+        optimized.append(end_item)
+
+        strategy.total_distance = evaluation[0]
+        self.stats['distance_after'] = round(evaluation[0], 3)
+        return optimized
+
+    @staticmethod
+    def _travel_info(item: Dict) -> Dict:
+        """由行程項目還原前往該地點的交通資訊"""
+        transport = item['transport']
+        return {
+            'duration_minutes': transport['time'],
+            'distance_km': transport['travel_distance'],
+            'transport_mode': transport['mode_eng'],
+            'route_info': item.get('route_info'),
+        }
+
+    def _departure_of(self, item: Dict) -> datetime:
+        """行程項目的離開時間(與 strategy.start_time 同一天)"""
+        clock = datetime.strptime(item['end_time'], '%H:%M')
+        return self.strategy.start_time.replace(hour=clock.hour, minute=clock.minute)
+
+    @staticmethod
+    def _trip_date(item: Dict) -> datetime:
+        return datetime.strptime(item['date'], '%Y-%m-%d').replace(
+            tzinfo=ZoneInfo('Asia/Taipei'))
+
+
+__all__ = ['ItineraryOptimizer']
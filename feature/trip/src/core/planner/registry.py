@@ -0,0 +1,68 @@
+# src/core/planner/registry.py
+
+from typing import Callable, Dict, List, Type
+
+
+# 策略名稱 -> 策略類別
+_STRATEGIES: Dict[str, Type] = {}
+
+DEFAULT_STRATEGY = 'greedy'
+
+
+def register_strategy(name: str) -> Callable[[Type], Type]:
+    """註冊規劃策略的裝飾器
+
+    策略類別需與 BasePlanningStrategy 相同的建構參數
+    (time_service, geo_service, place_scoring, config) 與 execute 介面。
+
+    Args:
+        name: 策略名稱,供 TripPlanningSystem.plan_trip(strategy=...) 使用
+
+    Returns:
+        Callable: 類別裝飾器
+
+    使用範例:
+        >>> @register_strategy('beam')
+        ... class BeamSearchStrategy(BasePlanningStrategy):
+        ...     ...
+    """
+    def decorator(strategy_class: Type) -> Type:
+        _STRATEGIES[name] = strategy_class
+        strategy_class.strategy_name = name
+        return strategy_class
+    return decorator
+
+
+def get_strategy(name: str = None) -> Type:
+    """取得已註冊的策略類別
+
+    Args:
+        name: 策略名稱,未指定時使用預設策略
+
+    Returns:
+        Type: 策略類別
+
+    異常:
+        ValueError: 策略名稱未註冊
+    """
+    _load_builtin_strategies()
+    name = name or DEFAULT_STRATEGY
+    if name not in _STRATEGIES:
+        raise ValueError(
+            f"未知的規劃策略: {name},可用的策略: {available_strategies()}")
+    return _STRATEGIES[name]
+
+
+def available_strategies() -> List[str]:
+    """列出所有已註冊的策略名稱"""
+    _load_builtin_strategies()
+    return sorted(_STRATEGIES)
+
+
+def _load_builtin_strategies() -> None:
+    """載入內建策略模組,模組載入時會自行註冊"""
+    from . import strategy, beam_search, orienteering  # noqa: F401
+
+
+__all__ = ['DEFAULT_STRATEGY', 'available_strategies', 'get_strategy',
+           'register_strategy']
@@ -0,0 +1,115 @@
+# src/core/planner/replan.py
+
+import hashlib
+from typing import Dict, List, Optional, Union
+
+from ..models.place import PlaceDetail, place_key
+from ..models.place_table import PlaceTable
+from ..utils.cache_core import LRUCache
+
+
+# 規劃狀態的格式版本,格式改變時遞增,舊版狀態會被忽略
+PLAN_STATE_VERSION = 1
+
+# 候選地點池快取:pool_key -> PlaceTable 或 List[PlaceDetail]
+# 同一個行程內重新規劃時不需要再轉換地點資料
+_place_pool_cache = LRUCache(maxsize=32)
+
+
+def place_to_document(place: PlaceDetail) -> Dict:
+    """把 PlaceDetail 轉為可存入 MongoDB 的字典
+
+    營業時間的星期 key 會轉為字串(MongoDB 只接受字串 key)。
+    """
+    document = place.model_dump(mode='json')
+    document['hours'] = {str(day): slots
+                         for day, slots in (place.hours or {}).items()}
+    return document
+
+
+def place_from_document(document: Dict) -> PlaceDetail:
+    """從 place_to_document 的結果還原 PlaceDetail"""
+    data = dict(document)
+    data['hours'] = {int(day): slots
+                     for day, slots in (data.get('hours') or {}).items()}
+    return PlaceDetail(**data)
+
+
+def build_plan_state(
+    places: Union[PlaceTable, List[PlaceDetail]],
+    requirement: List[Dict],
+    strategy: str,
+    strategy_options: Optional[Dict],
+    seed: Optional[int],
+    routes: List[Dict]
+) -> Dict:
+    """建立可保存的規劃狀態
+
+    保存重新規劃時需要的資料，讓使用者取消某個地點時
+    不需要重新查詢 LLM、向量資料庫與地點資料，也不需要重新取得已知的路線。
+
+    Args:
+        places: 候選地點池(PlaceTable 或已轉換的 PlaceDetail)
+        requirement: 原始的規劃需求(中文 key)
+        strategy: 規劃策略名稱
+        strategy_options: 策略設定
+        seed: 亂數種子
+        routes: GeoService.export_routes 匯出的實際路線
+
+    Returns:
+        Dict: 規劃狀態,可直接存入 planner_records
+    """
+    if isinstance(places, PlaceTable):
+        # 直接由欄位轉換,不建立 PlaceDetail
+        pool = [places.document(idx) for idx in range(len(places))]
+        keys = [place_id or name
+                for place_id, name in zip(places.place_ids, places.names)]
+    else:
+        places = list(places)
+        pool = [place_to_document(place) for place in places]
+        keys = [place_key(place) for place in places]
+
+    # 以地點識別碼識別地點池,不需要序列化整個地點池
+    pool_key = hashlib.sha1(
+        '\n'.join(sorted(keys)).encode('utf-8')).hexdigest()
+
+    # 同一個行程內重新規劃時直接使用這些物件
+    _place_pool_cache.set(pool_key, places)
+
+    return {
+        'version': PLAN_STATE_VERSION,
+        'pool_key': pool_key,
+        'pool': pool,
+        'requirement': requirement,
+        'strategy': strategy,
+        'strategy_options': strategy_options or {},
+        'seed': seed,
+        'routes': routes,
+    }
+
+
+def is_valid_plan_state(plan_state: Optional[Dict]) -> bool:
+    """檢查規劃狀態是否可用於重新規劃"""
+    return (isinstance(plan_state, dict) and
+            plan_state.get('version') == PLAN_STATE_VERSION and
+            bool(plan_state.get('pool')))
+
+
+def restore_places(plan_state: Dict) -> List[PlaceDetail]:
+    """取得規劃狀態中的候選地點池
+
+    同一個行程內已轉換過的地點池直接從快取取得
+    (PlaceTable 的 PlaceDetail 在這時才建立)。
+
+    Returns:
+        List[PlaceDetail]: 候選地點(回傳新的列表,可安全修改)
+    """
+    places = _place_pool_cache.get_or_compute(
+        plan_state['pool_key'],
+        lambda: [place_from_document(doc) for doc in plan_state['pool']]
+    )
+    return list(places)
+
+
+__all__ = ['PLAN_STATE_VERSION', 'build_plan_state', 'is_valid_plan_state',
+           'place_from_document', 'place_to_document', 'restore_places']
@@ -1,17 +1,34 @@
 # src/core/planner/strategy.py
 
+from collections import Counter
 from datetime import datetime, timedelta
 from math import ceil
 import random
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple, Union
 from zoneinfo import ZoneInfo
 
-from ..models.place import PlaceDetail
+import numpy as np
+
+from ..models.place import PlaceDetail, place_key
+from ..models.place_table import PlaceTable
 from ..services.time_service import TimeService
 from ..services.geo_service import GeoService
+from ..services.async_geo_service import RouteFetcher
+from ..services.spatial_index import SpatialIndex
 from ..evaluator.place_scoring import PlaceScoring
+from ..utils import profiler
+from .deadline import PlanDeadline
+from .registry import register_strategy
+
+
+# 路線取得方式,見 BasePlanningStrategy.__init__ 的 routing 設定
+ROUTING_MODES = ('api', 'estimate')
+
+# 可行性檢查排除候選地點的原因,見 BasePlanningStrategy._feasible_mask
+FEASIBILITY_REASONS = ('closed_on_arrival', 'end_time_overrun')
 
 
+@register_strategy('greedy')
 class BasePlanningStrategy:
     """行程規劃策略基礎類別
 
@@ -39,6 +56,24 @@ class BasePlanningStrategy:
                 - start_time: datetime 
                 - end_time: datetime 
                 - travel_mode: str
+                選填:
+                - seed: int - 隨機選擇的亂數種子
+                - routing: str - 路線取得方式
+                    'api'(預設): 評分以距離 × 2 估算交通時間,每一步以距離矩陣
+                                  同時取得前往地點與返回終點的實際路線
+                    'estimate': 評分使用交通時間估算器,只有實際採用的路段
+                                (前往地點與最後返回終點)才呼叫路線 API
+                - prefetch: int - 預先取得路線的候選地點數(預設 0,不預先取得)。
+                    選定地點後，以預估的離開時間找出下一步評分最高的地點，
+                    在背景同時取得這些地點的路線，下一步通常直接命中快取
+                - prefetch_concurrency: int - 同時進行的路線請求上限
+                    (預設 2 × (prefetch + 1))
+                - feasibility_pruning: bool - 評分前以交通時間下限排除
+                    一定不可行的地點(預設 True,見 _feasible_mask)
+                - max_route_rejections: int - 實際路線超過結束時間時,
+                    排除該地點重新選擇的次數上限(預設 3,超過後結束規劃)
+                - deadline: PlanDeadline - 規劃期限(由 plan_trip(deadline=...) 設定)。
+                    期限將至時路線改用快取或估算，期限到時停止選擇地點
         """
         # 基礎服務元件
         self.time_service = time_service
@@ -54,8 +89,29 @@ class BasePlanningStrategy:
         self.start_time = config['start_time']
         self.end_time = config['end_time']
         self.travel_mode = config['travel_mode']
-        self.distance_threshold = config.get('distance_threshold', 30)
+        try:
+            self.distance_threshold = float(config.get('distance_threshold') or 30)
+        except (TypeError, ValueError):
+            # 使用者輸入 "none" 等非數字時使用預設門檻
+            self.distance_threshold = 30.0
         self.end_location = config.get('end_location')
+        self.routing = config.get('routing') or 'api'
+        if self.routing not in ROUTING_MODES:
+            raise ValueError(f"未知的路線取得方式: {self.routing}")
+        self.prefetch = int(config.get('prefetch') or 0)
+        # 預設讓本步驟與所有預先取得的路段(每個地點兩段)可以同時進行
+        self.prefetch_concurrency = int(
+            config.get('prefetch_concurrency') or 2 * (self.prefetch + 1))
+        self._route_fetcher: Optional[RouteFetcher] = None
+        self.feasibility_pruning = config.get('feasibility_pruning', True)
+        self.max_route_rejections = int(config.get('max_route_rejections', 3))
+        self.deadline: Optional[PlanDeadline] = config.get('deadline')
+        # 終點到地點表各地點的直線距離 (地點表, 終點座標, 距離)
+        self._end_distances = None
+
+        # 隨機選擇使用的亂數產生器,指定 seed 時結果可以重現
+        self.seed = config.get('seed')
+        self.rng = random.Random(self.seed)
 
         # 時段管理
         self.period_sequence = [
@@ -65,7 +121,9 @@ class BasePlanningStrategy:
         self.current_period = 'morning'
 
         # 狀態追蹤
-        self.visited_places = set()  # 使用set避免重複選擇地點
+        self.visited_places = set()  # 已訪問地點的 place_key,避免重複選擇地點
+        self.rejected_places = set()  # 實際路線不可行、不再選擇的地點(place_key)
+        self.rejections = Counter()  # 各原因排除的候選地點數
         self._itinerary = []  # 儲存規劃的行程
         self.total_distance = 0.0  # 總行程距離
 
@@ -76,91 +134,506 @@ class BasePlanningStrategy:
     def select_next_place(
         self,
         current_location: PlaceDetail,
-        available_places: List[PlaceDetail],
+        available_places: Union[PlaceTable, List[PlaceDetail]],
         current_time: datetime,
         trip_date: datetime,
-    ) -> Optional[Tuple[PlaceDetail, Dict]]:
+        spatial_index: Optional[SpatialIndex] = None,
+    ) -> Optional[Tuple[PlaceDetail, Dict, Optional[Dict]]]:
         """選擇下一個地點
 
         Args:
             current_location: 當前位置
-            available_places: 可選擇的地點列表
+            available_places: 可選擇的地點(PlaceTable 或 PlaceDetail 列表)
             current_time: 當前時間
+            spatial_index: 選填,由同一個地點表建立的空間索引。有提供時只考慮
+                           可接受距離內的地點,範圍內沒有合適地點才檢查全部
 
         Returns:
-            Optional[Tuple[PlaceDetail, Dict]]: 選中的地點和交通資訊,
-                                            若無合適地點則返回None
+            Optional[Tuple[PlaceDetail, Dict, Optional[Dict]]]:
+                選中的地點、前往該地點的交通資訊、以及從該地點返回終點的
+                交通資訊(沒有終點時為 None),若無合適地點則返回None
         """
+        table = PlaceTable.from_locations(available_places, trusted=True)
+
         # 1. 取得當前時段
         current_period = self.time_service.get_current_period(current_time)
 
-        # 2. 篩選符合時段且有效的地點
-        suitable_places = []
-
-        for place in available_places:
-            # 檢查基本條件
-            if (place.period != current_period or
-                    place.name in self.visited_places):
-                continue
+        # 2-4. 篩選並評分候選地點,取評分最高的前3-5個地點
+        candidates, top_places = self._rank_candidates(
+            current_location,
+            table,
+            current_time,
+            trip_date.isoweekday(),
+            current_period,
+            self.visited_places | self.rejected_places,
+            spatial_index
+        )
 
-            # 檢查營業時間
-            weekday = trip_date.isoweekday()
-            time_str = current_time.strftime(TimeService.TIME_FORMAT)
-            if not place.is_open_at(weekday, time_str):
-                continue
+        profiler.record_step(period=current_period, candidates=candidates)
 
-            suitable_places.append(place)
+        if not candidates:
+            print(f"沒有符合{current_period}時段且能準時返回的地點")
+            return None
 
-        if not suitable_places:
-            print(f"沒有符合{current_period}時段的地點")
+        if not top_places:
+            print("沒有在可接受距離內的地點")
             return None
 
-        # 3. 計算直線距離並評分
-        scored_places = []
-        for place in suitable_places:
-            distance = self.geo_service.calculate_distance(
-                {'lat': current_location.lat, 'lon': current_location.lon},
-                {'lat': place.lat, 'lon': place.lon}
-            )
+        # 5. 隨機選擇一個
+        selected_place, _ = self.rng.choice(
+            top_places[:max(3, len(top_places))]
+        )
+
+        # 6. 更新用餐狀態
+        self.time_service.update_meal_status(selected_place.period)
 
-            estimated_time = distance * 2
-            score = self.place_scoring.calculate_score(
-                place=place,
-                current_location=current_location,
-                current_time=current_time,
-                travel_time=estimated_time
+        # 7. 只對選中的地點取得路線資訊(含返回終點的路線,一次批次請求)
+        if self._deadline_low():
+            # 規劃期限將至,不再呼叫路線 API
+            travel_info, to_end_info = self._estimate_step_legs(
+                current_location,
+                selected_place,
+                current_time
+            )
+        elif self._route_fetcher is not None:
+            # 同時在背景預先取得下一步可能需要的路線
+            travel_info, to_end_info = self._fetch_step_legs_with_prefetch(
+                current_location,
+                selected_place,
+                table,
+                current_time,
+                trip_date,
+                spatial_index
+            )
+        else:
+            travel_info, to_end_info = self._fetch_step_legs(
+                current_location,
+                selected_place,
+                current_time
             )
-            if score > float('-inf'):
-                scored_places.append((place, score))
 
-        if not scored_places:
-            print("沒有在可接受距離內的地點")
-            return None
+        return selected_place, travel_info, to_end_info
+
+    def _rank_candidates(
+        self,
+        current_location: PlaceDetail,
+        table: PlaceTable,
+        current_time: datetime,
+        weekday: int,
+        period: str,
+        visited: Set[str],
+        spatial_index: Optional[SpatialIndex] = None,
+        record: bool = True
+    ) -> Tuple[int, List[Tuple[PlaceDetail, float]]]:
+        """篩選並評分候選地點(不修改規劃狀態)
+
+        Args:
+            current_location: 目前位置
+            table: 候選地點表
+            current_time: 目前時間
+            weekday: 星期幾(1-7)
+            period: 目前時段
+            visited: 已訪問(或已排除)的地點 place_key
+            spatial_index: 選填,由同一個地點表建立的空間索引
+            record: 是否把可行性檢查排除的地點數計入 self.rejections
+                    (預先取得的評分不計入)
+
+        Returns:
+            Tuple[int, List[Tuple[PlaceDetail, float]]]:
+                符合條件且可行的候選地點數,以及評分最高的前 5 個(地點, 分數)
+        """
+        with profiler.profile_span('candidate_filtering'):
+            # 一次篩選所有符合時段、未訪問且營業中的地點
+            current_minute = current_time.hour * 60 + current_time.minute
+            suitable = self._suitable_mask(
+                table, period, visited, weekday, current_minute)
+
+            rows = np.empty(0, dtype=np.int64)
+            distances = None
+
+            if spatial_index is not None:
+                # 只檢查附近的地點
+                indices, nearby_distances = self.place_scoring.find_candidates(
+                    spatial_index, current_location, self.distance_threshold)
+                keep = suitable[indices]
+                rows = indices[keep]
+                distances = np.round(nearby_distances[keep], 1)
+
+                feasible = self._feasible_mask(
+                    current_location, table, rows, current_time, weekday, record)
+                rows, distances = rows[feasible], distances[feasible]
+
+            if rows.size == 0:
+                rows = np.flatnonzero(suitable)
+                distances = None
+                if spatial_index is not None:
+                    # 附近的地點已經檢查過,只檢查範圍外的地點
+                    rows = rows[~np.isin(rows, indices)]
+                rows = rows[self._feasible_mask(
+                    current_location, table, rows, current_time, weekday, record)]
+
+        if rows.size == 0:
+            return 0, []
+
+        # 一次計算所有候選地點的直線距離與評分
+        if self.routing == 'estimate' and distances is None:
+            distances = self.geo_service.calculate_distances(
+                {'lat': current_location.lat, 'lon': current_location.lon},
+                table.lat[rows], table.lon[rows])
+        scores = self.place_scoring.score_batch(
+            table,
+            current_location,
+            current_time,
+            rows=rows,
+            distances=distances,
+            travel_times=self._scoring_travel_times(distances, current_time)
+        )
+
+        # 多時段的地點以目前時段排入行程
+        scored_places = [
+            (table.place(row, period), score)
+            for row, score in zip(rows.tolist(), scores.tolist())
+            if score > float('-inf')
+        ]
 
-        # 4. 取評分最高的前3-5個地點
         top_places = sorted(
             scored_places,
             key=lambda x: x[1],
             reverse=True
         )[:5]
+        return int(rows.size), top_places
 
-        # 5. 隨機選擇一個
-        selected_place, _ = random.choice(
-            top_places[:max(3, len(top_places))]
+    def _feasible_mask(
+        self,
+        current_location: PlaceDetail,
+        table: PlaceTable,
+        rows: np.ndarray,
+        current_time: datetime,
+        weekday: int,
+        record: bool = True
+    ) -> np.ndarray:
+        """以交通時間下限一次排除一定不可行的候選地點
+
+        交通時間下限由直線距離與 GeoService.MAX_SPEEDS 計算，
+        實際路線不會更快，因此排除的地點取得實際路線後也一定不可行:
+        1. closed_on_arrival: 最快抵達時，目前的營業時段已經結束
+        2. end_time_overrun: 最快抵達、停留 duration_min 後返回終點，
+           仍會超過結束時間
+
+        Args:
+            current_location: 目前位置
+            table: 候選地點表
+            rows: 要檢查的列號
+            current_time: 目前時間
+            weekday: 星期幾(1-7)
+            record: 是否記錄各原因排除的地點數
+
+        Returns:
+            np.ndarray: 與 rows 對應的布林遮罩,True 表示可能可行
+        """
+        if not self.feasibility_pruning or rows.size == 0:
+            return np.ones(rows.size, dtype=bool)
+
+        with profiler.profile_span('feasibility'):
+            minute = current_time.hour * 60 + current_time.minute
+            to_place = GeoService.haversine_matrix(
+                np.array([current_location.lat]), np.array([current_location.lon]),
+                table.lat[rows], table.lon[rows])[0]
+            arrival = self.geo_service.min_travel_minutes(to_place, self.travel_mode)
+
+            remaining = table.minutes_until_close(weekday, minute)[rows]
+            closed = arrival >= remaining
+
+            # 與 _calculate_arrival_time 相同以整數分鐘累計
+            total = arrival + table.duration[rows]
+            if self.end_location:
+                total += self.geo_service.min_travel_minutes(
+                    self._distances_to_end(table)[rows], self.travel_mode)
+            budget = int((self.end_time - current_time).total_seconds() // 60)
+            overrun = ~closed & (total > budget)
+
+        if record:
+            profiler.count('feasibility.checked', int(rows.size))
+            for reason, mask in zip(FEASIBILITY_REASONS, (closed, overrun)):
+                rejected = int(np.count_nonzero(mask))
+                if rejected:
+                    self.rejections[reason] += rejected
+                    profiler.count(f'feasibility.rejected.{reason}', rejected)
+
+        return ~(closed | overrun)
+
+    def _distances_to_end(self, table: PlaceTable) -> np.ndarray:
+        """地點表各地點到終點的直線距離(公里),終點不變時只計算一次"""
+        end_point = (self.end_location.lat, self.end_location.lon)
+        cached = self._end_distances
+        if cached is None or cached[0] is not table or cached[1] != end_point:
+            distances = GeoService.haversine_matrix(
+                np.array([end_point[0]]), np.array([end_point[1]]),
+                table.lat, table.lon)[0]
+            cached = self._end_distances = (table, end_point, distances)
+        return cached[2]
+
+    def _fetch_step_legs_with_prefetch(
+        self,
+        current_location: PlaceDetail,
+        place: PlaceDetail,
+        table: PlaceTable,
+        current_time: datetime,
+        trip_date: datetime,
+        spatial_index: Optional[SpatialIndex]
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """取得本步驟的路線,同時預先取得下一步的路線
+
+        1. 先送出本步驟前往地點的路線請求(優先取得),
+           返回終點的路段在取得後以實際離開時間由 _return_leg 取得
+        2. 以預估交通時間推算離開選中地點的時間，預先取得下一步
+           評分最高的地點的路線，與本步驟的請求同時進行
+        3. 實際離開時間與預估落在不同的快取時段時，以實際時間重新預先取得
+
+        Returns:
+            Tuple[Dict, Optional[Dict]]: 與 _fetch_step_legs 相同
+        """
+        current_point = {"lat": current_location.lat,
+                         "lon": current_location.lon}
+        place_point = {"lat": place.lat, "lon": place.lon}
+
+        pending = self._route_fetcher.submit(
+            [(current_point, place_point)], self.travel_mode, current_time)
+
+        estimate = self.geo_service.get_route_estimate(
+            current_point, place_point, self.travel_mode, current_time)
+        expected_departure = self._departure_after(
+            place, current_time, estimate['duration_minutes'])
+        self._prefetch_next_legs(
+            place, table, expected_departure, trip_date, spatial_index)
+
+        travel_info = pending.result()[0]
+        departure_time = self._departure_after(
+            place, current_time, travel_info['duration_minutes'])
+        to_end_info = self._return_leg(place, departure_time)
+
+        bucket_minutes = GeoService.get_route.time_bucket_minutes
+        if ((departure_time.hour * 60 + departure_time.minute) // bucket_minutes !=
+                (expected_departure.hour * 60 + expected_departure.minute) // bucket_minutes):
+            self._prefetch_next_legs(
+                place, table, departure_time, trip_date, spatial_index)
+
+        return travel_info, to_end_info
+
+    def _departure_after(self,
+                         place: PlaceDetail,
+                         start_time: datetime,
+                         travel_minutes: float) -> datetime:
+        """從 start_time 出發、前往並停留在 place 後的離開時間"""
+        return self._calculate_departure_time(
+            self._calculate_arrival_time(start_time, travel_minutes),
+            place.duration_min
         )
 
-        # 6. 只對選中的地點取得路線資訊
+    def _prefetch_next_legs(
+        self,
+        place: PlaceDetail,
+        table: PlaceTable,
+        departure_time: datetime,
+        trip_date: datetime,
+        spatial_index: Optional[SpatialIndex]
+    ) -> None:
+        """預先取得下一步評分最高的地點的路線
+
+        以與 select_next_place 相同的方式評分從 place 出發的候選地點，
+        在背景取得 place→候選地點 的路線。
+        下一步選中這些地點時直接命中快取，請求仍在進行時則等待同一個請求。
+
+        Args:
+            place: 本步驟選中的地點
+            table: 候選地點表
+            departure_time: 離開 place 的時間(決定路線的快取時段)
+            trip_date: 行程日期
+            spatial_index: 選填,由同一個地點表建立的空間索引
+        """
+        if departure_time >= self.end_time:
+            return
+
+        period = self.time_service.advance_period(
+            self.time_service.current_period,
+            departure_time,
+            self.time_service.lunch_completed,
+            self.time_service.dinner_completed
+        )
+        _, top_places = self._rank_candidates(
+            place,
+            table,
+            departure_time,
+            trip_date.isoweekday(),
+            period,
+            self.visited_places | self.rejected_places | {place_key(place)},
+            spatial_index,
+            record=False
+        )
+
+        # 返回終點的路段要以實際離開候選地點的時間查詢,不預先取得
+        place_point = {'lat': place.lat, 'lon': place.lon}
+        legs = [(place_point, {'lat': candidate.lat, 'lon': candidate.lon})
+                for candidate, _ in top_places[:self.prefetch]]
+
+        profiler.count('prefetched_legs', len(legs))
+        self._route_fetcher.prefetch(legs, self.travel_mode, departure_time)
+
+    @staticmethod
+    def _suitable_mask(
+        table: PlaceTable,
+        period: str,
+        visited: Set[str],
+        weekday: int,
+        minute: int
+    ) -> np.ndarray:
+        """符合時段、尚未訪問且營業中的地點
+
+        Args:
+            table: PlaceTable - 候選地點表
+            period: str - 目前時段
+            visited: Set[str] - 已訪問的地點 place_key
+            weekday: int - 星期幾(1-7)
+            minute: int - 當天的分鐘數
+
+        Returns:
+            np.ndarray: 布林遮罩
+        """
+        mask = table.period_match(period)
+        if visited:
+            mask &= ~table.mask_of(visited)
+        if mask.any():
+            mask &= table.open_mask(weekday, minute)
+        return mask
+
+    def _scoring_travel_times(self,
+                              distances: Optional[np.ndarray],
+                              departure_time: datetime) -> Optional[np.ndarray]:
+        """評分使用的交通時間
+
+        routing 為 'estimate' 時使用交通時間估算器,
+        否則回傳 None(score_batch 以距離 × 2 估算)。
+        """
+        if self.routing != 'estimate' or distances is None:
+            return None
+        return self.geo_service.estimate_travel_minutes(
+            distances, self.travel_mode, departure_time)
+
+    def _fetch_step_legs(
+        self,
+        current_location: PlaceDetail,
+        place: PlaceDetail,
+        departure_time: datetime
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """取得本步驟需要的兩段路線
+
+        前往地點的路段會排入行程，以 get_route 取得含導航資訊的路線;
+        返回終點的路段只用來檢查時間，由 _return_leg 取得。
+
+        Args:
+            current_location: 目前位置
+            place: 選中的地點
+            departure_time: 出發時間
+
+        Returns:
+            Tuple[Dict, Optional[Dict]]: (前往地點的路線, 返回終點的路線),
+                                         沒有終點時第二個值為 None
+        """
         travel_info = self.geo_service.get_route(
             origin={"lat": current_location.lat, "lon": current_location.lon},
-            destination={"lat": selected_place.lat, "lon": selected_place.lon},
+            destination={"lat": place.lat, "lon": place.lon},
             mode=self.travel_mode,
-            departure_time=current_time
+            departure_time=departure_time
         )
+        place_departure = self._departure_after(
+            place, departure_time, travel_info['duration_minutes'])
+        return travel_info, self._return_leg(place, place_departure)
 
-        # 7. 更新用餐狀態
-        self.time_service.update_meal_status(selected_place.period)
+    def _return_leg(self,
+                    place: PlaceDetail,
+                    departure_time: datetime) -> Optional[Dict]:
+        """從 place 返回終點的路線,只用來檢查能否準時返回
+
+        以實際離開 place 的時間查詢。不需要導航資訊，因此使用一個元素的
+        距離矩陣請求(estimate 模式只使用快取或估算);
+        真正返回終點時才由 execute 以 get_route 取得實際路線。
+
+        Returns:
+            Optional[Dict]: 路線資訊,沒有終點時為 None
+        """
+        if not self.end_location:
+            return None
+
+        place_point = {"lat": place.lat, "lon": place.lon}
+        end_point = {"lat": self.end_location.lat, "lon": self.end_location.lon}
+        if self.routing == 'estimate':
+            return self.geo_service.get_route_estimate(
+                place_point, end_point, self.travel_mode, departure_time)
+        return self.geo_service.get_route_matrix(
+            [place_point], [end_point], self.travel_mode, departure_time)[0][0]
+
+    def _estimate_step_legs(
+        self,
+        current_location: PlaceDetail,
+        place: PlaceDetail,
+        departure_time: datetime
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """以快取或估算取得本步驟的兩段路線(不呼叫 API)
+
+        Returns:
+            Tuple[Dict, Optional[Dict]]: 與 _fetch_step_legs 相同
+        """
+        place_point = {"lat": place.lat, "lon": place.lon}
+        travel_info = self._get_route(
+            {"lat": current_location.lat, "lon": current_location.lon},
+            place_point,
+            departure_time
+        )
+        to_end_info = None
+        if self.end_location:
+            to_end_info = self.geo_service.get_route_estimate(
+                place_point,
+                {"lat": self.end_location.lat, "lon": self.end_location.lon},
+                self.travel_mode,
+                departure_time
+            )
+        return travel_info, to_end_info
+
+    def _get_route(
+        self,
+        origin: Dict[str, float],
+        destination: Dict[str, float],
+        departure_time: Optional[datetime] = None
+    ) -> Dict:
+        """取得會排入行程的路線
+
+        規劃期限將至時改用快取或估算的路線(不呼叫 API),
+        並記錄估算的路段數。
+        """
+        if not self._deadline_low():
+            return self.geo_service.get_route(
+                origin=origin,
+                destination=destination,
+                mode=self.travel_mode,
+                departure_time=departure_time
+            )
+
+        route = self.geo_service.get_route_estimate(
+            origin, destination, self.travel_mode, departure_time)
+        if route.get('is_estimated'):
+            self.deadline.record_estimated()
+        return route
 
-        return selected_place, travel_info
+    def _deadline_low(self) -> bool:
+        """規劃期限是否將至(剩餘時間不足以呼叫路線 API)"""
+        return self.deadline is not None and self.deadline.low()
+
+    def _deadline_expired(self) -> bool:
+        """規劃期限是否已到,已到時記錄搜尋提前結束"""
+        if self.deadline is None or not self.deadline.expired():
+            return False
+        self.deadline.truncate('search')
+        return True
 
     def execute(
         self,
@@ -205,6 +678,8 @@ class BasePlanningStrategy:
         # 重置時間服務狀態
         self.time_service.reset()
         self.visited_places.clear()
+        self.rejected_places.clear()
+        self.rejections.clear()
 
         if requirement and requirement.get('date'):
             current_year = datetime.now(ZoneInfo('Asia/Taipei')).year
@@ -222,7 +697,7 @@ class BasePlanningStrategy:
         if previous_trip:
             self._itinerary.extend(previous_trip)
             # 把之前的地點加入已訪問集合
-            self.visited_places.update(item['name'] for item in previous_trip)
+            self.visited_places.update(place_key(item) for item in previous_trip)
 
             # 檢查並設定時段狀態
             for item in previous_trip:
@@ -257,32 +732,130 @@ class BasePlanningStrategy:
                 },
                 trip_date=trip_date
             )
-            self.visited_places.add(current_location.name)
+            self.visited_places.add(place_key(current_location))
             self._itinerary.append(start_item)
 
         print(f"\n=== 開始規劃行程 ===")
 
-        # 初始化規劃狀態
-        remaining_places = available_places.copy()
+        # 依照策略依序選擇地點
+        if self.prefetch > 0:
+            self._route_fetcher = RouteFetcher(
+                self.geo_service, self.prefetch_concurrency)
+        try:
+            visit_time, last_to_end_info = self._plan_places(
+                current_location,
+                available_places,
+                current_time,
+                trip_date
+            )
+        finally:
+            if self._route_fetcher is not None:
+                # 不等待沒有用到的預先取得
+                self._route_fetcher.close(wait=False)
+                self._route_fetcher = None
+
+        # 加入返回終點
+        if self._itinerary[-1]['name'] != self.end_location.name:  # 使用設定的終點
+            # 計算返回終點的路線:已以實際離開時間取得含導航資訊的路線時直接使用,
+            # 否則(只用來檢查時間的距離矩陣或估算)以實際離開時間重新取得
+            final_travel_info = last_to_end_info
+            if final_travel_info is None or final_travel_info.get('route_info') is None:
+                final_travel_info = self._get_route(
+                    origin={
+                        "lat": float(self._itinerary[-1]['lat']),
+                        "lon": float(self._itinerary[-1]['lon'])
+                    },
+                    destination={
+                        "lat": self.end_location.lat,  # 使用設定的終點
+                        "lon": self.end_location.lon
+                    },
+                    departure_time=visit_time
+                )
+
+            final_arrival_time = self._calculate_arrival_time(
+                visit_time,
+                final_travel_info['duration_minutes']
+            )
+
+            # 根據實際抵達時間更新終點的period
+            self.end_location.period = self.time_service.get_time_period(
+                final_arrival_time
+            )
+
+            # 加入終點到行程
+            end_item = self._create_itinerary_item(
+                place=self.end_location,  # 使用設定的終點
+                arrival_time=final_arrival_time,
+                departure_time=final_arrival_time,
+                travel_info=final_travel_info,
+                trip_date=trip_date
+            )
+            self._itinerary.append(end_item)
+            self.total_distance += final_travel_info['distance_km']
+
+        print(f"\n=== 行程規劃完成 ===")
+        print(f"規劃地點數: {len(self._itinerary)}")
+        print(f"總行程距離: {self.total_distance:.0f} 公里")
+
+        return self._itinerary
+
+    def _plan_places(
+        self,
+        current_location: PlaceDetail,
+        available_places: List[PlaceDetail],
+        current_time: datetime,
+        trip_date: datetime
+    ) -> Tuple[datetime, Optional[Dict]]:
+        """依序選擇地點並加入行程(不含起點與終點)
+
+        預設使用貪婪法：每一步從評分最高的幾個地點中隨機選擇。
+        其他策略可覆寫這個方法，沿用 execute 的起點、終點與行程格式處理。
+
+        Args:
+            current_location: PlaceDetail - 目前位置
+            available_places: List[PlaceDetail] - 所有可選擇的地點
+            current_time: datetime - 目前時間
+            trip_date: datetime - 行程日期
+
+        Returns:
+            Tuple[datetime, Optional[Dict]]: 最後一個地點的離開時間,
+                以及最後一個地點返回終點的交通資訊(尚未取得時為 None)
+        """
+        # 初始化規劃狀態(已選的地點由 visited_places 排除)
+        table = PlaceTable.from_locations(available_places, trusted=True)
+        # 候選地點的空間索引,整個規劃只建立一次
+        spatial_index = self.geo_service.build_spatial_index(
+            table,
+            min(self.distance_threshold, self.place_scoring.search_radius)
+        )
         current_loc = current_location
         visit_time = current_time
-        iteration = 1
+        last_to_end_info = None  # 最後一個地點返回終點的路線
 
         # 主要規劃迴圈
-        while remaining_places and visit_time < self.end_time:
+        while len(table) and visit_time < self.end_time:
+            if self._deadline_expired():
+                print("已到規劃期限,以目前選出的地點結束規劃")
+                break
+            profiler.count('iterations')
+            # 選點會更新用餐狀態,實際路線不可行時還原
+            meal_state = (self.time_service.current_period,
+                          self.time_service.lunch_completed,
+                          self.time_service.dinner_completed)
             # 選擇下一個地點
             next_place = self.select_next_place(
                 current_loc,
-                remaining_places,
+                table,
                 visit_time,
-                trip_date
+                trip_date,
+                spatial_index=spatial_index
             )
 
             if not next_place:
                 print("找不到合適的下一個地點,結束規劃")
                 break
 
-            place, travel_info = next_place
+            place, travel_info, to_home_info = next_place
 
             # 計算到達和離開時間
             arrival_time = self._calculate_arrival_time(
@@ -294,16 +867,16 @@ class BasePlanningStrategy:
                 place.duration_min
             )
 
-            # 預估返回終點所需時間
-            to_home_info = self.geo_service.get_route(
-                origin={"lat": place.lat, "lon": place.lon},
-                destination={
-                    "lat": self.end_location.lat,
-                    "lon": self.end_location.lon
-                },
-                mode=self.travel_mode,
-                departure_time=departure_time
-            )
+            # 預估返回終點所需時間(已在選點時一起取得)
+            if to_home_info is None:
+                to_home_info = self._get_route(
+                    origin={"lat": place.lat, "lon": place.lon},
+                    destination={
+                        "lat": self.end_location.lat,
+                        "lon": self.end_location.lon
+                    },
+                    departure_time=departure_time
+                )
 
             final_time = self._calculate_arrival_time(
                 departure_time,
@@ -312,6 +885,16 @@ class BasePlanningStrategy:
 
             # 檢查是否超過結束時間
             if final_time > self.end_time:
+                # 交通時間下限可行但實際路線不可行:排除這個地點重新選擇
+                if self.rejections['route_overrun'] < self.max_route_rejections:
+                    print(f"加入 {place.name} 後會超過結束時間,改選其他地點")
+                    self.rejected_places.add(place_key(place))
+                    self.rejections['route_overrun'] += 1
+                    profiler.count('feasibility.rejected.route_overrun')
+                    (self.time_service.current_period,
+                     self.time_service.lunch_completed,
+                     self.time_service.dinner_completed) = meal_state
+                    continue
                 print("加入此地點後會超過結束時間,直接返回終點")
                 break
 
@@ -328,53 +911,91 @@ class BasePlanningStrategy:
             # 更新規劃狀態
             current_loc = place
             visit_time = departure_time
-            remaining_places.remove(place)
-            self.visited_places.add(place.name)
+            self.visited_places.add(place_key(place))
             self.total_distance += travel_info['distance_km']
+            last_to_end_info = to_home_info
 
-            iteration += 1
+        return visit_time, last_to_end_info
 
-        # 加入返回終點
-        if self._itinerary[-1]['name'] != self.end_location.name:  # 使用設定的終點
-            # 計算返回終點的路線
-            final_travel_info = self.geo_service.get_route(
-                origin={
-                    "lat": float(self._itinerary[-1]['lat']),
-                    "lon": float(self._itinerary[-1]['lon'])
-                },
-                destination={
-                    "lat": self.end_location.lat,  # 使用設定的終點
-                    "lon": self.end_location.lon
-                },
-                mode=self.travel_mode
-            )
+    def _commit_route(
+        self,
+        path: List[PlaceDetail],
+        current_location: PlaceDetail,
+        current_time: datetime,
+        trip_date: datetime
+    ) -> Tuple[datetime, Optional[Dict]]:
+        """依序取得實際路線,把已決定好順序的地點加入行程
 
-            final_arrival_time = self._calculate_arrival_time(
-                visit_time,
-                final_travel_info['duration_minutes']
-            )
+        供先用預估交通時間搜尋、最後才呼叫路線 API 的策略使用。
+        實際交通時間可能與預估不同:
+        1. 地點在實際出發時已經不營業時，行程在該地點前結束
+        2. 無法在結束時間前返回終點時，從最後面移除地點
 
-            # 根據實際抵達時間更新終點的period
-            self.end_location.period = self.time_service.get_time_period(
-                final_arrival_time
-            )
+        Args:
+            path: List[PlaceDetail] - 依序造訪的地點
+            current_location: PlaceDetail - 目前位置
+            current_time: datetime - 目前時間
+            trip_date: datetime - 行程日期
 
-            # 加入終點到行程
-            end_item = self._create_itinerary_item(
-                place=self.end_location,  # 使用設定的終點
-                arrival_time=final_arrival_time,
-                departure_time=final_arrival_time,
-                travel_info=final_travel_info,
-                trip_date=trip_date
+        Returns:
+            Tuple[datetime, Optional[Dict]]: 最後一個地點的離開時間,
+                以及返回終點的交通資訊(沒有加入任何地點時為 None)
+        """
+        weekday = trip_date.isoweekday()
+        end_point = {'lat': self.end_location.lat, 'lon': self.end_location.lon}
+
+        # (地點, 到達時間, 離開時間, 交通資訊)
+        legs = []
+        current_loc, visit_time = current_location, current_time
+        for place in path:
+            current_minute = visit_time.hour * 60 + visit_time.minute
+            if not place.is_open_at_minute(weekday, current_minute):
+                print(f"依實際路線 {place.name} 已不營業,提前結束行程")
+                break
+
+            travel_info = self._get_route(
+                origin={'lat': current_loc.lat, 'lon': current_loc.lon},
+                destination={'lat': place.lat, 'lon': place.lon},
+                departure_time=visit_time
             )
-            self._itinerary.append(end_item)
-            self.total_distance += final_travel_info['distance_km']
+            arrival_time = self._calculate_arrival_time(
+                visit_time, travel_info['duration_minutes'])
+            departure_time = self._calculate_departure_time(
+                arrival_time, place.duration_min)
+
+            legs.append((place, arrival_time, departure_time, travel_info))
+            current_loc, visit_time = place, departure_time
+
+        # 確認可以準時返回終點
+        to_end_info = None
+        while legs:
+            place, _, departure_time, _ = legs[-1]
+            to_end_info = self._get_route(
+                origin={'lat': place.lat, 'lon': place.lon},
+                destination=end_point,
+                departure_time=departure_time
+            )
+            final_time = self._calculate_arrival_time(
+                departure_time, to_end_info['duration_minutes'])
+            if final_time <= self.end_time:
+                break
+            print(f"依實際路線無法準時返回終點,移除 {place.name}")
+            legs.pop()
+            to_end_info = None
 
-        print(f"\n=== 行程規劃完成 ===")
-        print(f"規劃地點數: {len(self._itinerary)}")
-        print(f"總行程距離: {self.total_distance:.0f} 公里")
+        visit_time = legs[-1][2] if legs else current_time
+        for place, arrival_time, departure_time, travel_info in legs:
+            self._itinerary.append(self._create_itinerary_item(
+                place,
+                arrival_time,
+                departure_time,
+                travel_info,
+                trip_date
+            ))
+            self.visited_places.add(place_key(place))
+            self.total_distance += travel_info['distance_km']
 
-        return self._itinerary
+        return visit_time, to_end_info
 
     def _calculate_arrival_time(self,
                                 start_time: datetime,
@@ -441,6 +1062,19 @@ class BasePlanningStrategy:
                 - transport: Dict
                 - period: str
         """
+        with profiler.profile_span('itinerary_building'):
+            return self._build_itinerary_item(
+                place, arrival_time, departure_time, travel_info, trip_date)
+
+    def _build_itinerary_item(
+        self,
+        place: PlaceDetail,
+        arrival_time: datetime,
+        departure_time: datetime,
+        travel_info: Dict,
+        trip_date: datetime = None
+    ) -> Dict:
+        """_create_itinerary_item 的實際內容"""
         # 如果沒有傳入日期 預設明天
         if not trip_date:
             trip_date = datetime.now(
@@ -459,27 +1093,12 @@ class BasePlanningStrategy:
         time_diff = rounded_arrival - arrival_time
         rounded_departure = departure_time + time_diff
 
-        # 取得當天的營業時間
-        weekday = trip_date.isoweekday()
-        day_hours = place.hours.get(weekday, [])
-
         # 找出符合抵達時間的營業時段
-        matching_hours = None
-        for slot in day_hours:
-            if not slot:
-                continue
-            start = datetime.strptime(slot['start'], '%H:%M').time()
-            end = datetime.strptime(slot['end'], '%H:%M').time()
-
-            # 一般情況或跨日檢查
-            if end < start:  # 跨日營業
-                if arrival_time.time() >= start or arrival_time.time() <= end:
-                    matching_hours = slot
-                    break
-            else:  # 一般情況
-                if start <= arrival_time.time() <= end:
-                    matching_hours = slot
-                    break
+        weekday = trip_date.isoweekday()
+        matching_hours = place.find_open_slot(
+            weekday,
+            arrival_time.hour * 60 + arrival_time.minute
+        )
 
         # 計算交通時段
         travel_end = arrival_time
@@ -1,14 +1,32 @@
 # src/core/planner/system.py
 
 
+import copy
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Union
+
+import googlemaps
+
 from ..evaluator.place_scoring import PlaceScoring
-from ..models.place import PlaceDetail
-from .strategy import BasePlanningStrategy
+from ..models.place import PlaceDetail, place_key
+from ..models.place_table import PlaceTable
+from .context import PlanContext
+from .deadline import PlanDeadline
+from .objectives import DEFAULT_OBJECTIVE, get_objective, itinerary_stats
+from .post_optimizer import ItineraryOptimizer
+from .registry import DEFAULT_STRATEGY, get_strategy
+from .replan import build_plan_state, is_valid_plan_state, restore_places
 from ..services.geo_service import GeoService
+from ..services.isochrone import IsochroneFilter
 from ..services.time_service import TimeService
+from ..utils.geocode_cache import normalize_address
 from ..utils.navigation_translator import NavigationTranslator
+from ..utils import profiler
+from ..utils.profiler import MetricsHook, PlanProfiler
 
 
 class TripPlanningSystem:
@@ -19,11 +37,22 @@ class TripPlanningSystem:
     2. 地理服務：計算距離和規劃路線
     3. 評分服務：評估地點適合度
     4. 策略系統：執行實際的規劃邏輯
+
+    每次規劃的狀態(時間設定、起終點、策略與結果)放在 PlanContext，
+    同一個實例可以同時在多個執行緒中規劃(例如 gunicorn 的多個執行緒共用)。
+    seed、execution_time、profile_report 等屬性回傳目前執行緒
+    最近一次規劃的結果(見 last_context)。
     """
 
+    # 從目前執行緒最近一次的 PlanContext 讀取的屬性
+    CONTEXT_ATTRIBUTES = (
+        'strategy', 'start_time', 'end_time', 'start_location', 'end_location',
+        'seed', 'best_seed', 'sample_results', 'execution_time', 'profile_report'
+    )
+
     def __init__(self):
         """初始化規劃系統並連結所有需要的服務"""
-        # 初始化時間服務，設定預設用餐時間
+        # 預設用餐時間的時間服務,每次規劃複製一份使用
         self.time_service = TimeService(
             lunch_time="12:00",   # 預設中午12點用餐
             dinner_time="18:00"   # 預設晚上6點用餐
@@ -36,41 +65,173 @@ class TripPlanningSystem:
             geo_service=self.geo_service
         )
 
-        # 初始化策略系統
-        self.strategy = None
+        self.metrics_hooks: List[MetricsHook] = []
+
+        # 各執行緒最近一次規劃的 PlanContext
+        self._local = threading.local()
 
-        # 初始化時間相關屬性
-        self.start_time = None
-        self.end_time = None
+    @property
+    def last_context(self) -> Optional[PlanContext]:
+        """目前執行緒最近一次規劃的狀態,尚未規劃過時為 None"""
+        return getattr(self._local, 'context', None)
 
-        # 執行狀態追蹤
-        self.execution_time = 0.0
+    def __getattr__(self, name: str):
+        """seed、execution_time 等屬性從目前執行緒的 PlanContext 讀取"""
+        if name in TripPlanningSystem.CONTEXT_ATTRIBUTES:
+            context = self.last_context
+            if context is None:
+                context = PlanContext(time_service=self.time_service)
+            return getattr(context, name)
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def plan_trip(
         self,
         locations: List[Dict],
         requirement: Dict,
         previous_trip: List[Dict] = None,
-        restart_index: int = None
+        restart_index: int = None,
+        strategy: str = DEFAULT_STRATEGY,
+        strategy_options: Optional[Dict] = None,
+        samples: int = 1,
+        seed: Optional[int] = None,
+        objective: Union[str, Callable[[List[Dict]], float]] = DEFAULT_OBJECTIVE,
+        workers: Optional[int] = None,
+        profile: bool = False,
+        post_optimize: bool = False,
+        isochrone: Union[None, str, Dict] = 'bound',
+        deadline: Union[None, float, PlanDeadline] = None
     ) -> List[Dict]:
         """執行行程規劃
 
         Args:
-            locations: 可用的景點列表
+            locations: 可用的景點列表(字典、PlaceDetail 或已建立的 PlaceTable)
             requirement: 規劃需求
             previous_trip: 之前規劃的行程(選填)
             restart_index: 從哪個點重新開始(選填)
+            strategy: 規劃策略名稱,例如 'greedy'(預設)或 'beam'
+            strategy_options: 策略的額外設定(選填),
+                例如 {'beam_width': 8, 'expansion_budget': 5000}
+            samples: 規劃的樣本數,大於 1 時平行規劃多個樣本並回傳最佳結果
+            seed: 亂數種子,指定後相同輸入會得到相同行程;
+                  多樣本時第 i 個樣本使用 seed + i
+            objective: 選擇最佳樣本的目標函數名稱或自訂函數(越大越好),
+                       見 objectives.OBJECTIVES
+            workers: 平行規劃的行程數,預設為 min(samples, CPU 數),
+                     1 表示在目前行程內依序規劃
+            profile: 是否記錄各階段的耗時與計數,報告存放在
+                     self.profile_report(格式見 PlanProfiler.report,
+                     只有目前執行緒看得到);
+                     已註冊 metrics_hooks 時也會記錄並即時通知 hook。
+                     多樣本平行規劃時只記錄主行程的部分
+            post_optimize: 是否在規劃後以 2-opt / or-opt 調整地點順序、
+                           縮短總交通距離(見 ItineraryOptimizer);
+                           結果記錄在 last_context.post_optimization。
+                           從中間重新規劃(previous_trip)時不調整
+            isochrone: 規劃前依起點/終點的等時圈移除無法往返的候選地點
+                       (見 IsochroneFilter):'bound'(預設,只移除一定不可行的地點)、
+                       'estimate'(同時移除預估無法往返的地點)、
+                       設定字典(例如 {'policy': 'estimate', 'backend': 'matrix'})
+                       或 None(不篩選);結果記錄在 last_context.isochrone
+            deadline: 規劃期限(秒或 PlanDeadline,選填)。期限將至時路線改用
+                      快取或估算，期限到時以目前找到的地點完成行程;
+                      結果是否受影響記錄在 last_context.deadline(見 PlanDeadline)
 
         Returns:
             List[Dict]: 規劃好的行程列表
+
+        使用範例:
+            >>> itinerary = system.plan_trip(locations, requirement, profile=True)
+            >>> report = system.profile_report
+            >>> report['external_ms'], report['counters']['route_cache.hits']
+        """
+        deadline = PlanDeadline.of(deadline)
+        options = dict(
+            previous_trip=previous_trip,
+            restart_index=restart_index,
+            strategy=strategy,
+            strategy_options=strategy_options,
+            samples=samples,
+            seed=seed,
+            objective=objective,
+            workers=workers,
+            post_optimize=post_optimize,
+            isochrone=isochrone,
+            deadline=deadline
+        )
+
+        context = PlanContext(time_service=copy.copy(self.time_service))
+
+        try:
+            # 已在其他規劃(例如多樣本)的記錄範圍內時沿用同一個 profiler
+            if not (profile or self.metrics_hooks) or profiler.active_profiler():
+                return self._plan_trip(context, locations, requirement, **options)
+
+            plan_profiler = PlanProfiler(self.metrics_hooks)
+            with profiler.activate(plan_profiler):
+                try:
+                    return self._plan_trip(context, locations, requirement, **options)
+                finally:
+                    context.profile_report = plan_profiler.finish()
+        finally:
+            if deadline is not None:
+                context.deadline = deadline.report()
+            self._local.context = context
+
+    def add_metrics_hook(self, hook: MetricsHook) -> None:
+        """註冊指標後端,之後每次規劃的計時與計數都會送給 hook
+
+        Args:
+            hook: MetricsHook 的實例
         """
+        self.metrics_hooks.append(hook)
+
+    def _plan_trip(
+        self,
+        context: PlanContext,
+        locations: List[Dict],
+        requirement: Dict,
+        previous_trip: List[Dict],
+        restart_index: int,
+        strategy: str,
+        strategy_options: Optional[Dict],
+        samples: int,
+        seed: Optional[int],
+        objective: Union[str, Callable[[List[Dict]], float]],
+        workers: Optional[int],
+        post_optimize: bool,
+        isochrone: Union[None, str, Dict],
+        deadline: Optional[PlanDeadline]
+    ) -> List[Dict]:
+        """plan_trip 的實際內容(參數說明見 plan_trip),狀態記錄在 context"""
+        if samples > 1:
+            return self._plan_samples(
+                context,
+                locations,
+                requirement,
+                previous_trip=previous_trip,
+                restart_index=restart_index,
+                strategy=strategy,
+                strategy_options=strategy_options,
+                samples=samples,
+                seed=seed,
+                objective=objective,
+                workers=workers,
+                post_optimize=post_optimize,
+                isochrone=isochrone,
+                deadline=deadline
+            )
+
         start_time = datetime.now()
+        context.seed = seed
+        original_requirement = requirement
 
         try:
             # 把 requirement 的 key 中文改成英文
             requirement = self._convert_keys(requirement)
 
             # 如果要從中間開始規劃
+            restart_point = None
             if (previous_trip and
                 restart_index is not None and
                 restart_index > 0 and
@@ -85,63 +246,103 @@ class TripPlanningSystem:
             requirement = self._set_defaults(requirement)
 
             # 設定時間屬性
-            self.start_time = datetime.strptime(
+            context.start_time = datetime.strptime(
                 requirement['start_time'], '%H:%M'
             )
-            self.end_time = datetime.strptime(
+            context.end_time = datetime.strptime(
                 requirement['end_time'], '%H:%M'
             )
 
             # 設定起點和終點
-            self.start_location = self._get_start_location(
-                requirement.get('start_point')
-            )
-            self.end_location = self._get_end_location(
-                requirement.get('end_point')
+            # 從中間開始時直接使用之前行程的座標,不需要重新查詢地點
+            if restart_point is not None:
+                context.start_location = self._restart_location(
+                    restart_point, context)
+            else:
+                context.start_location = self._get_start_location(
+                    requirement.get('start_point'), context
+                )
+            context.end_location = self._get_end_location(
+                requirement.get('end_point'), context
             )
 
             # 更新時間服務的用餐時間設定
             if requirement.get('lunch_time'):
-                self.time_service = TimeService(
+                context.time_service = TimeService(
                     lunch_time=requirement['lunch_time'],
                     dinner_time=requirement.get('dinner_time', "18:00")
                 )
 
-            # 轉換地點資料為 PlaceDetail 物件
-            available_places = [
-                PlaceDetail(**location) if isinstance(location, dict)
-                else location for location in locations
-            ]
-
-            # 準備規劃上下文
-            context = {
-                'start_time': self.start_time,
-                'end_time': self.end_time,
-                'travel_mode': requirement.get('transport_mode', 'driving'),
+            # 轉換地點資料為地點表(整批驗證,PlaceDetail 只在需要時建立)
+            with profiler.profile_span('candidate_loading'):
+                available_places = PlaceTable.from_locations(locations)
+
+            travel_mode = requirement.get('transport_mode', 'driving')
+
+            # 移除在規劃時間內無法往返的地點
+            candidates = available_places
+            if isochrone:
+                isochrone_filter = IsochroneFilter(
+                    self.geo_service,
+                    **({'policy': isochrone} if isinstance(isochrone, str) else isochrone))
+                candidates, context.isochrone = isochrone_filter.filter(
+                    available_places,
+                    context.start_location,
+                    context.end_location,
+                    travel_mode,
+                    context.start_time,
+                    context.end_time
+                )
+
+            # 準備策略設定
+            config = {
+                'start_time': context.start_time,
+                'end_time': context.end_time,
+                'travel_mode': travel_mode,
                 'distance_threshold': requirement.get('distance_threshold', 30),
-                'start_location': self.start_location,
-                'end_location': self.end_location,
+                'start_location': context.start_location,
+                'end_location': context.end_location,
             }
 
+            config.update(strategy_options or {})
+            config['seed'] = seed
+            config['deadline'] = deadline
+
             # 初始化並執行規劃策略
-            self.strategy = BasePlanningStrategy(
-                time_service=self.time_service,
+            strategy_class = get_strategy(strategy)
+            context.strategy = strategy_class(
+                time_service=context.time_service,
                 geo_service=self.geo_service,
                 place_scoring=self.place_scoring,
-                config=context
+                config=config
             )
 
             # 執行規劃
-            itinerary = self.strategy.execute(
-                current_location=self.start_location,
-                available_places=available_places,
-                current_time=context['start_time'],
+            itinerary = context.strategy.execute(
+                current_location=context.start_location,
+                available_places=candidates,
+                current_time=config['start_time'],
                 previous_trip=previous_trip[:restart_index] if previous_trip else None,
                 requirement=requirement
             )
 
+            if post_optimize and not previous_trip:
+                optimizer = ItineraryOptimizer(
+                    context.strategy, candidates, deadline=deadline)
+                itinerary = optimizer.optimize(itinerary)
+                context.post_optimization = optimizer.stats
+
             # 記錄執行時間
-            self.execution_time = (datetime.now() - start_time).total_seconds()
+            context.execution_time = (datetime.now() - start_time).total_seconds()
+
+            # 重新規劃時的起點與時間不同,保存篩選前的候選地點
+            context.last_plan = {
+                'places': available_places,
+                'requirement': original_requirement,
+                'strategy': strategy,
+                'strategy_options': strategy_options,
+                'seed': seed
+            }
 
             return itinerary
 
@@ -149,6 +350,211 @@ class TripPlanningSystem:
             print(f"行程規劃失敗: {str(e)}")
             raise
 
+    def _plan_samples(
+        self,
+        context: PlanContext,
+        locations: List[Dict],
+        requirement: Dict,
+        previous_trip: List[Dict],
+        restart_index: int,
+        strategy: str,
+        strategy_options: Optional[Dict],
+        samples: int,
+        seed: Optional[int],
+        objective: Union[str, Callable[[List[Dict]], float]],
+        workers: Optional[int],
+        post_optimize: bool,
+        isochrone: Union[None, str, Dict],
+        deadline: Optional[PlanDeadline]
+    ) -> List[Dict]:
+        """平行規劃多個樣本並回傳目標函數最高的行程
+
+        每個樣本使用不同的亂數種子(seed + i)，沒有指定 seed 時會隨機產生
+        一個並記錄在 context.seed，方便重現結果。
+        各工作行程只在啟動時接收一次地點資料，路線快取則透過
+        ROUTE_CACHE_PATH 設定的 SQLite 檔案共用。
+        有規劃期限時，依序規劃的樣本共用同一個期限，期限到時不再開始新的樣本;
+        平行規劃時各工作行程以送出時的剩餘時間為期限。
+
+        Returns:
+            List[Dict]: 最佳樣本的行程,樣本摘要記錄在 context.sample_results
+        """
+        start_time = datetime.now()
+        score = get_objective(objective)
+
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 31)
+        context.seed = seed
+        seeds = [seed + i for i in range(samples)]
+
+        options = {
+            'requirement': requirement,
+            'previous_trip': previous_trip,
+            'restart_index': restart_index,
+            'strategy': strategy,
+            'strategy_options': strategy_options,
+            'post_optimize': post_optimize,
+            'isochrone': isochrone,
+            'deadline': deadline
+        }
+
+        if workers is None:
+            workers = min(samples, os.cpu_count() or 1)
+
+        if workers <= 1:
+            results = []
+            for sample_seed in seeds:
+                # 至少規劃一個樣本
+                if results and deadline is not None and deadline.expired():
+                    deadline.truncate('samples')
+                    break
+                results.append(_plan_sample(self, locations, sample_seed, options))
+        else:
+            if deadline is not None:
+                # 工作行程無法共用計時,改傳剩餘秒數
+                options['deadline'] = max(deadline.remaining(), 0.001)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_sample_worker,
+                initargs=(locations, self._shareable_maps_client())
+            ) as pool:
+                results = list(pool.map(
+                    _run_sample_in_worker,
+                    seeds,
+                    [options] * len(seeds)
+                ))
+
+        # 依樣本順序比較,分數相同時保留種子較小的樣本
+        best_itinerary, best_score = None, None
+        for sample_seed, (itinerary, error, truncated) in zip(seeds, results):
+            summary = {'seed': sample_seed, 'error': error}
+            for reason in truncated:
+                deadline.truncate(reason)
+            if itinerary is not None:
+                summary.update(itinerary_stats(itinerary))
+                summary['score'] = score(itinerary)
+                if best_score is None or summary['score'] > best_score:
+                    best_itinerary, best_score = itinerary, summary['score']
+                    context.best_seed = sample_seed
+            context.sample_results.append(summary)
+
+        context.execution_time = (datetime.now() - start_time).total_seconds()
+
+        if best_itinerary is None:
+            raise RuntimeError(
+                f"所有樣本規劃失敗: {context.sample_results[0]['error']}")
+
+        # 重新規劃時以最佳樣本的種子規劃單一樣本
+        context.last_plan = {
+            'places': locations,
+            'requirement': requirement,
+            'strategy': strategy,
+            'strategy_options': strategy_options,
+            'seed': context.best_seed
+        }
+
+        return best_itinerary
+
+    def export_plan_state(self,
+                          itinerary: List[Dict],
+                          context: Optional[PlanContext] = None) -> Optional[Dict]:
+        """匯出最近一次規劃的狀態,供之後的 replan 使用
+
+        包含候選地點池、原始需求、策略設定與亂數種子，
+        以及行程各路段已取得的實際路線。
+
+        Args:
+            itinerary: 最近一次 plan_trip 回傳的行程
+            context: 規劃的 PlanContext,預設為目前執行緒最近一次的規劃
+
+        Returns:
+            Optional[Dict]: 可存入 planner_records 的規劃狀態,
+                            尚未規劃過時為 None
+        """
+        context = context or self.last_context
+        last_plan = context.last_plan if context is not None else None
+        if last_plan is None:
+            return None
+
+        return build_plan_state(
+            places=PlaceTable.from_locations(last_plan['places']),
+            requirement=last_plan['requirement'],
+            strategy=last_plan['strategy'],
+            strategy_options=last_plan['strategy_options'],
+            seed=last_plan['seed'],
+            routes=self.geo_service.export_routes(itinerary)
+        )
+
+    def replan(
+        self,
+        plan_state: Dict,
+        previous_trip: List[Dict],
+        restart_index: int,
+        excluded_places: Optional[List[str]] = None,
+        deadline: Union[None, float, PlanDeadline] = None
+    ) -> List[Dict]:
+        """使用保存的規劃狀態,從 restart_index 重新規劃後半段行程
+
+        與 plan_trip(restart_index=...) 相同，但:
+        1. 候選地點池直接使用保存的資料(同一個行程內不需要重新轉換)
+        2. 已取得的路線寫回快取,重複的路段不再呼叫 API
+        3. 被取消的地點(previous_trip[restart_index])不會再被選中
+
+        Args:
+            plan_state: export_plan_state 的回傳值
+            previous_trip: 之前規劃的行程
+            restart_index: 從哪個點重新開始
+            excluded_places: 額外要排除的地點 place_key(選填,
+                             有 place_id 時為 place_id,否則為名稱)
+            deadline: 規劃期限(選填,見 plan_trip)
+
+        Returns:
+            List[Dict]: 重新規劃的行程
+
+        異常:
+            ValueError: 規劃狀態無效或版本不符
+
+        使用範例:
+            >>> itinerary = system.plan_trip(locations, requirement)
+            >>> state = system.export_plan_state(itinerary)
+            >>> system.replan(state, itinerary, restart_index=3)
+        """
+        if not is_valid_plan_state(plan_state):
+            raise ValueError("無效的規劃狀態,請重新規劃完整行程")
+
+        self.geo_service.import_routes(plan_state.get('routes') or [])
+
+        excluded = set(excluded_places or [])
+        if previous_trip and restart_index is not None and \
+                0 < restart_index < len(previous_trip):
+            excluded.add(place_key(previous_trip[restart_index]))
+
+        # 以 place_key 排除,同名的其他分店(例如連鎖店)仍可選入
+        places = [place for place in restore_places(plan_state)
+                  if place_key(place) not in excluded]
+
+        return self.plan_trip(
+            places,
+            plan_state['requirement'],
+            previous_trip=previous_trip,
+            restart_index=restart_index,
+            strategy=plan_state.get('strategy') or DEFAULT_STRATEGY,
+            strategy_options=plan_state.get('strategy_options'),
+            seed=plan_state.get('seed'),
+            deadline=deadline
+        )
+
+    def _shareable_maps_client(self):
+        """取得可以傳給工作行程的地圖用戶端
+
+        googlemaps.Client 含有網路連線，由工作行程自行建立;
+        其他自訂用戶端(例如 LocalMapsClient)直接複製到工作行程。
+        """
+        maps_client = getattr(self.geo_service, 'maps_client', None)
+        if maps_client is None or isinstance(maps_client, googlemaps.Client):
+            return None
+        return maps_client
+
     def print_itinerary(self, itinerary: List[Dict], show_navigation: bool = False) -> None:
         """輸出行程規劃結果
 
@@ -191,13 +597,14 @@ class TripPlanningSystem:
 
         print(f"規劃耗時: {self.execution_time:.2f}秒")
 
-    def _get_start_location(self, start_point: str) -> PlaceDetail:
+    def _get_start_location(self, start_point: str, context: PlanContext) -> PlaceDetail:
         """處理起點設定
 
         將起點資訊轉換為 PlaceDetail 物件
 
         Args:
             start_point: str - 起點的名稱
+            context: PlanContext - 目前的規劃狀態
 
         Returns:
             PlaceDetail - 起點的完整資訊物件
@@ -210,28 +617,42 @@ class TripPlanningSystem:
             'lon': 121.5168608,
             'duration_min': 0,
             'label': '交通樞紐',
-            'period': self.time_service.get_time_period(self.start_time),
+            'period': context.time_service.get_time_period(context.start_time),
             'hours': {
                 i: [{'start': '00:00', 'end': '23:59'}] for i in range(1, 8)
             }
         }
 
-        if not start_point or start_point == "台北車站":
-            # 使用預設起點
+        if not start_point or normalize_address(start_point) == "台北車站":
+            # 使用預設起點(含「臺北車站」、「北車」等別稱)
             return PlaceDetail(**default_location)
 
         try:
             # 如果有指定其他起點，取得該地點資訊
             location = self._get_location_info(start_point)
             # 根據start_time設定period
-            location['period'] = self.time_service.get_time_period(
-                self.start_time)
+            location['period'] = context.time_service.get_time_period(
+                context.start_time)
             return PlaceDetail(**location)
         except Exception as e:
             print(f"無法取得起點資訊，使用預設起點: {str(e)}")
             return PlaceDetail(**default_location)
 
-    def _get_end_location(self, end_point: str) -> PlaceDetail:
+    def _restart_location(self, restart_point: Dict, context: PlanContext) -> PlaceDetail:
+        """把之前行程中的地點轉換為重新規劃的起點"""
+        return PlaceDetail(
+            place_id=restart_point.get('place_id'),
+            name=restart_point['name'],
+            address=restart_point.get('address') or "",
+            lat=float(restart_point['lat']),
+            lon=float(restart_point['lon']),
+            duration_min=0,
+            label='交通樞紐',
+            period=context.time_service.get_time_period(context.start_time),
+            hours={i: [{'start': '00:00', 'end': '23:59'}] for i in range(1, 8)}
+        )
+
+    def _get_end_location(self, end_point: str, context: PlanContext) -> PlaceDetail:
         """取得終點位置資訊
 
         如果沒有指定終點，會使用起點作為終點
@@ -239,6 +660,7 @@ class TripPlanningSystem:
 
         Args:
             end_point: Optional[str] - 終點名稱，可以是 None
+            context: PlanContext - 目前的規劃狀態(需要已設定起點)
 
         Returns:
             PlaceDetail - 終點的完整資訊物件
@@ -248,10 +670,10 @@ class TripPlanningSystem:
         """
         if not end_point or end_point == "none":
             # 使用起點資料但給予新的period
-            end_location = self.start_location.model_copy()
+            end_location = context.start_location.model_copy()
             # 根據end_time設定暫時period (之後會更新)
-            end_location.period = self.time_service.get_time_period(
-                self.end_time
+            end_location.period = context.time_service.get_time_period(
+                context.end_time
             )
             return end_location
 
@@ -259,12 +681,12 @@ class TripPlanningSystem:
             # 如果有指定終點，取得該地點資訊
             location = self._get_location_info(end_point)
             # 設定暫時period
-            location['period'] = self.time_service.get_time_period(
-                self.end_time)
+            location['period'] = context.time_service.get_time_period(
+                context.end_time)
             return PlaceDetail(**location)
         except Exception as e:
             print(f"無法取得終點資訊，使用起點作為終點: {str(e)}")
-            return self.start_location
+            return context.start_location
 
     def _get_location_info(self, place_name: str) -> Dict:
         """取得地點詳細資訊
@@ -434,3 +856,51 @@ class TripPlanningSystem:
                 default_requirement[key] = value
 
         return default_requirement
+
+
+# 工作行程內的規劃系統與地點資料(每個工作行程初始化一次)
+_worker_system: Optional[TripPlanningSystem] = None
+_worker_locations: Optional[List] = None
+
+
+def _init_sample_worker(locations: List, maps_client=None) -> None:
+    """初始化工作行程:建立規劃系統並保存唯讀的地點資料"""
+    global _worker_system, _worker_locations
+    _worker_system = TripPlanningSystem()
+    if maps_client is not None:
+        _worker_system.geo_service = GeoService(maps_client=maps_client)
+    _worker_locations = locations
+
+
+def _run_sample_in_worker(seed: int, options: Dict):
+    """在工作行程中規劃一個樣本"""
+    return _plan_sample(_worker_system, _worker_locations, seed, options)
+
+
+def _plan_sample(system: TripPlanningSystem,
+                 locations: List,
+                 seed: int,
+                 options: Dict):
+    """規劃一個樣本
+
+    Returns:
+        Tuple[Optional[List[Dict]], Optional[str], List[str]]:
+            (行程, 錯誤訊息, 因規劃期限而不完整的原因)
+    """
+    try:
+        itinerary = system.plan_trip(
+            locations,
+            options['requirement'],
+            previous_trip=options['previous_trip'],
+            restart_index=options['restart_index'],
+            strategy=options['strategy'],
+            strategy_options=options['strategy_options'],
+            seed=seed,
+            post_optimize=options.get('post_optimize', False),
+            isochrone=options.get('isochrone', 'bound'),
+            deadline=options.get('deadline')
+        )
+        report = system.last_context.deadline
+        return itinerary, None, report['reasons'] if report else []
+    except Exception as e:
+        return None, str(e), []
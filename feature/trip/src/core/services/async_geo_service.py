@@ -0,0 +1,225 @@
+# src/core/services/async_geo_service.py
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .geo_service import GeoService
+
+
+# 一段路線 (起點, 終點),座標格式為 {'lat': float, 'lon': float}
+Leg = Tuple[Dict[str, float], Dict[str, float]]
+
+
+class AsyncGeoService:
+    """GeoService 的 asyncio 版本
+
+    同時取得多段路線，並以 concurrency 限制同時進行的 API 請求數。
+    路線仍由 GeoService.get_route 取得，因此:
+    1. 與同步版本共用同一份(可持久化的)路線快取
+    2. 同一段路線同時只會請求一次，其他請求等待同一個結果(不佔用請求名額)
+    3. API 失敗時同樣改用交通時間估算器
+
+    googlemaps.Client 是同步的用戶端，請求在執行緒池中執行。
+
+    使用範例:
+        >>> async_geo = AsyncGeoService(geo_service, concurrency=8)
+        >>> routes = await async_geo.get_routes(
+        ...     [(current, place), (place, end)], mode='transit')
+    """
+
+    DEFAULT_CONCURRENCY = 8
+
+    def __init__(self,
+                 geo_service: Optional[GeoService] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY):
+        """初始化
+
+        Args:
+            geo_service: 實際取得路線的地理服務,預設建立新的 GeoService
+            concurrency: 同時進行的 API 請求上限
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency 必須大於 0: {concurrency}")
+        self.geo_service = geo_service if geo_service is not None else GeoService()
+        self.concurrency = concurrency
+        # asyncio 物件只能在同一個事件迴圈中使用,每個迴圈各自建立
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        # 進行中的請求 {(事件迴圈, 快取鍵值): Task}
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def _fetch(self,
+                     origin: Dict[str, float],
+                     destination: Dict[str, float],
+                     mode: str,
+                     departure_time: Optional[datetime]) -> Dict:
+        """在請求名額內以執行緒呼叫同步的 get_route"""
+        async with self._semaphore():
+            return await asyncio.to_thread(
+                self.geo_service.get_route,
+                origin, destination, mode, departure_time)
+
+    async def get_route(self,
+                        origin: Dict[str, float],
+                        destination: Dict[str, float],
+                        mode: str = 'driving',
+                        departure_time: Optional[datetime] = None) -> Dict:
+        """非同步取得兩點間的路線,格式與 GeoService.get_route 相同"""
+        # 快取中有路線時不佔用請求名額
+        route = self.geo_service.get_cached_route(
+            origin, destination, mode, departure_time)
+        if route is not None:
+            return route
+
+        cache_key = GeoService.get_route.cache_key(
+            self.geo_service, origin, destination, mode, departure_time)
+        if cache_key is None:
+            return await self._fetch(origin, destination, mode, departure_time)
+
+        inflight_key = (asyncio.get_running_loop(), cache_key)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch(origin, destination, mode, departure_time))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(
+                lambda _: self._inflight.pop(inflight_key, None))
+
+        # 其中一個等待者被取消時,不影響其他等待同一個請求的呼叫端
+        return await asyncio.shield(task)
+
+    async def get_routes(self,
+                         legs: Sequence[Leg],
+                         mode: str = 'driving',
+                         departure_time: Optional[datetime] = None) -> List[Dict]:
+        """同時取得多段路線
+
+        Args:
+            legs: [(起點, 終點), ...]
+            mode: 交通方式
+            departure_time: 出發時間(所有路段相同)
+
+        Returns:
+            List[Dict]: 與 legs 順序相同的路線資訊
+        """
+        return list(await asyncio.gather(*(
+            self.get_route(origin, destination, mode, departure_time)
+            for origin, destination in legs
+        )))
+
+
+class RouteFetcher:
+    """AsyncGeoService 的同步介面
+
+    在背景執行緒中執行事件迴圈，讓同步的規劃策略可以:
+    1. fetch: 同時取得多段路線並等待結果
+    2. prefetch: 送出預先取得的請求後立即返回，結果寫入路線快取，
+       之後對同一段路線的查詢直接命中快取(或等待進行中的請求)
+
+    使用完畢需要呼叫 close(或使用 with 區塊)結束背景執行緒。
+
+    使用範例:
+        >>> with RouteFetcher(geo_service, concurrency=8) as fetcher:
+        ...     fetcher.prefetch(candidate_legs, 'driving', departure_time)
+        ...     to_place, to_end = fetcher.fetch(
+        ...         [(current, place), (place, end)], 'driving', departure_time)
+    """
+
+    def __init__(self,
+                 geo_service: Optional[GeoService] = None,
+                 concurrency: int = AsyncGeoService.DEFAULT_CONCURRENCY):
+        """初始化並啟動背景事件迴圈
+
+        Args:
+            geo_service: 實際取得路線的地理服務
+            concurrency: 同時進行的 API 請求上限
+        """
+        self.async_geo = AsyncGeoService(geo_service, concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='route-fetch')
+        self._loop = asyncio.new_event_loop()
+        self._loop.set_default_executor(self._executor)
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name='route-fetcher', daemon=True)
+        self._thread.start()
+        self._pending: List[Future] = []
+
+    def submit(self,
+               legs: Sequence[Leg],
+               mode: str = 'driving',
+               departure_time: Optional[datetime] = None) -> Future:
+        """送出請求,回傳 concurrent.futures.Future(結果為路線列表)
+
+        目前的 profiler 會一併傳入背景工作,API 呼叫次數照常計入。
+        """
+        if self._loop.is_closed():
+            raise RuntimeError("RouteFetcher 已關閉")
+        future = asyncio.run_coroutine_threadsafe(
+            self.async_geo.get_routes(list(legs), mode, departure_time),
+            self._loop)
+        self._pending = [item for item in self._pending if not item.done()]
+        self._pending.append(future)
+        return future
+
+    def fetch(self,
+              legs: Sequence[Leg],
+              mode: str = 'driving',
+              departure_time: Optional[datetime] = None) -> List[Dict]:
+        """同時取得多段路線並等待結果"""
+        return self.submit(legs, mode, departure_time).result()
+
+    def prefetch(self,
+                 legs: Sequence[Leg],
+                 mode: str = 'driving',
+                 departure_time: Optional[datetime] = None) -> None:
+        """預先取得路線,不等待結果(失敗時改用估算,不會拋出例外)"""
+        if legs:
+            self.submit(legs, mode, departure_time)
+
+    def close(self, wait: bool = True) -> None:
+        """結束背景事件迴圈
+
+        Args:
+            wait: 是否等待尚未完成的預先取得(不等待時直接取消)
+        """
+        if self._loop.is_closed():
+            return
+        if wait:
+            for future in self._pending:
+                future.exception()
+        else:
+            asyncio.run_coroutine_threadsafe(
+                self._cancel_pending(), self._loop).result()
+        self._pending.clear()
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    async def _cancel_pending() -> None:
+        """取消事件迴圈中尚未完成的工作(已送出的 API 請求仍會完成並寫入快取)"""
+        tasks = [task for task in asyncio.all_tasks()
+                 if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __enter__(self) -> 'RouteFetcher':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+__all__ = ['AsyncGeoService', 'RouteFetcher']
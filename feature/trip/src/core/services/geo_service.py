@@ -1,12 +1,40 @@
 # src/core/services/geo_service.py
 
-from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Union
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple, Optional, Union, Sequence
 import math
 import googlemaps
+import numpy as np
 from ..models.place import PlaceDetail
 from ..utils.cache_decorator import geo_cache
-from ...config.config import GOOGLE_MAPS_API_KEY
+from ..utils.cache_backend import create_cache_backend
+from ..utils.geocode_cache import GeocodeCache
+from ..utils import profiler
+from .spatial_index import SpatialIndex
+from .travel_estimator import TravelTimeEstimator
+from ...config.config import (
+    GOOGLE_MAPS_API_KEY,
+    ROUTE_CACHE_PATH,
+    ROUTE_CACHE_TTL,
+    ROUTE_CACHE_MAX_ENTRIES,
+    GEOCODE_CACHE_TTL,
+    TRAVEL_ESTIMATOR_PATH
+)
+
+# 路線的持久化快取(由 ROUTE_CACHE_PATH 設定,多個 worker 共用)
+route_cache_backend = create_cache_backend(
+    ROUTE_CACHE_PATH,
+    max_entries=ROUTE_CACHE_MAX_ENTRIES
+)
+
+# 地理編碼快取(以 geocode: 前綴與路線共用同一個持久化後端)
+default_geocode_cache = GeocodeCache(
+    backend=route_cache_backend,
+    ttl=GEOCODE_CACHE_TTL
+)
+
+# 交通時間估算器(由 TRAVEL_ESTIMATOR_PATH 載入校正結果,全行程共用)
+default_travel_estimator = TravelTimeEstimator.load(TRAVEL_ESTIMATOR_PATH)
 
 
 class GeoService:
@@ -28,16 +56,46 @@ class GeoService:
     # 地球半徑（公里）
     EARTH_RADIUS = 6371.0087714
 
-    # 預設的移動速度（公里/小時）
-    DEFAULT_SPEEDS = {
-        'driving': 40,    # 開車
-        'transit': 30,    # 大眾運輸
-        'walking': 5,     # 步行
-        'bicycling': 15   # 騎車
+    # 預設的移動速度（公里/小時）,與交通時間估算器相同
+    DEFAULT_SPEEDS = TravelTimeEstimator.DEFAULT_SPEEDS
+
+    # 門到門的最高平均速度（公里/小時）,用來計算交通時間的下限
+    # 開車以國道速限、大眾運輸以捷運/台鐵在市區的最高速度為上限
+    MAX_SPEEDS = {
+        'driving': 110,
+        'transit': 100,
+        'walking': 7,
+        'bicycling': 30
     }
 
-    def __init__(self):
-        """初始化地理服務"""
+    # Distance Matrix API 單次請求的限制
+    MATRIX_MAX_ORIGINS = 25
+    MATRIX_MAX_DESTINATIONS = 25
+    MATRIX_MAX_ELEMENTS = 100
+
+    def __init__(self,
+                 maps_client=None,
+                 geocode_cache: Optional[GeocodeCache] = None,
+                 estimator: Optional[TravelTimeEstimator] = None):
+        """初始化地理服務
+
+        Args:
+            maps_client: 選填,自訂的地圖用戶端(需提供與 googlemaps.Client
+                         相同的 directions/distance_matrix/geocode 介面),
+                         例如測試用的 LocalMapsClient
+            geocode_cache: 選填,地理編碼快取,預設使用全行程共用的快取
+            estimator: 選填,交通時間估算器,預設使用全行程共用的估算器
+        """
+        self.geocode_cache = (geocode_cache if geocode_cache is not None
+                              else default_geocode_cache)
+        self.estimator = (estimator if estimator is not None
+                          else default_travel_estimator)
+
+        if maps_client is not None:
+            self.maps_client = maps_client
+            self.has_google_maps = True
+            return
+
         try:
             self.maps_client = googlemaps.Client(key=GOOGLE_MAPS_API_KEY)
             self.has_google_maps = True
@@ -86,7 +144,131 @@ class GeoService:
 
         return round(self.EARTH_RADIUS * c, 1)
 
-    @geo_cache(maxsize=256)
+    @staticmethod
+    def coordinates_to_arrays(points: Sequence[Union[Dict, object]]
+                              ) -> Tuple[np.ndarray, np.ndarray]:
+        """將地點列表轉換為緯度、經度陣列
+
+        支援包含 lat/lon 的字典或具有 lat/lon 屬性的物件(如 PlaceDetail)，
+        PlaceTable 則直接回傳它的欄位陣列。
+
+        Args:
+            points: 地點列表
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (緯度陣列, 經度陣列)
+        """
+        if hasattr(points, 'coordinates'):
+            return points.coordinates()
+        lats = np.empty(len(points), dtype=np.float64)
+        lons = np.empty(len(points), dtype=np.float64)
+        for i, point in enumerate(points):
+            if isinstance(point, dict):
+                lats[i] = point['lat']
+                lons[i] = point['lon']
+            else:
+                lats[i] = point.lat
+                lons[i] = point.lon
+        return lats, lons
+
+    def calculate_distances(self,
+                            origin: Dict[str, float],
+                            lats: np.ndarray,
+                            lons: np.ndarray) -> np.ndarray:
+        """計算一個起點到多個地點的直線距離
+
+        與 calculate_distance 使用相同的 Haversine 公式與四捨五入規則，
+        但一次處理整個座標陣列，避免在評分迴圈中逐一呼叫。
+
+        Args:
+            origin: 起點座標 {'lat': float, 'lon': float}
+            lats: 目標地點的緯度陣列
+            lons: 目標地點的經度陣列
+
+        Returns:
+            np.ndarray: 每個目標地點與起點的距離（公里）
+
+        使用範例:
+            >>> lats, lons = geo_service.coordinates_to_arrays(places)
+            >>> distances = geo_service.calculate_distances(
+                    {'lat': 25.0, 'lon': 121.5}, lats, lons
+                )
+        """
+        if not self.validate_coordinates(origin['lat'], origin['lon']):
+            raise ValueError("無效的座標")
+
+        matrix = self.calculate_distance_matrix(
+            np.array([origin['lat']], dtype=np.float64),
+            np.array([origin['lon']], dtype=np.float64),
+            lats,
+            lons
+        )
+        return matrix[0]
+
+    def calculate_distance_matrix(self,
+                                  origin_lats: np.ndarray,
+                                  origin_lons: np.ndarray,
+                                  dest_lats: np.ndarray,
+                                  dest_lons: np.ndarray) -> np.ndarray:
+        """計算多個起點到多個終點的直線距離矩陣
+
+        Args:
+            origin_lats: 起點緯度陣列 (長度 M)
+            origin_lons: 起點經度陣列 (長度 M)
+            dest_lats: 終點緯度陣列 (長度 N)
+            dest_lons: 終點經度陣列 (長度 N)
+
+        Returns:
+            np.ndarray: M x N 的距離矩陣（公里）
+        """
+        origin_lats = np.asarray(origin_lats, dtype=np.float64)
+        origin_lons = np.asarray(origin_lons, dtype=np.float64)
+        dest_lats = np.asarray(dest_lats, dtype=np.float64)
+        dest_lons = np.asarray(dest_lons, dtype=np.float64)
+
+        # 一次驗證所有座標
+        if not (self._validate_coordinate_arrays(origin_lats, origin_lons) and
+                self._validate_coordinate_arrays(dest_lats, dest_lons)):
+            raise ValueError("無效的座標")
+
+        return np.round(
+            self.haversine_matrix(origin_lats, origin_lons,
+                                  dest_lats, dest_lons),
+            1
+        )
+
+    @classmethod
+    def haversine_matrix(cls,
+                         origin_lats: np.ndarray,
+                         origin_lons: np.ndarray,
+                         dest_lats: np.ndarray,
+                         dest_lons: np.ndarray) -> np.ndarray:
+        """向量化的 Haversine 公式(不驗證座標、不四捨五入)
+
+        Returns:
+            np.ndarray: M x N 的距離矩陣（公里）
+        """
+        lat1 = np.radians(origin_lats)[:, np.newaxis]
+        lon1 = np.radians(origin_lons)[:, np.newaxis]
+        lat2 = np.radians(dest_lats)[np.newaxis, :]
+        lon2 = np.radians(dest_lons)[np.newaxis, :]
+
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+
+        a = (np.sin(dlat / 2) ** 2 +
+             np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2)
+        c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+        return cls.EARTH_RADIUS * c
+
+    @staticmethod
+    def _validate_coordinate_arrays(lats: np.ndarray, lons: np.ndarray) -> bool:
+        """驗證座標陣列是否都在有效範圍內"""
+        return bool(np.all((lats >= -90) & (lats <= 90) &
+                           (lons >= -180) & (lons <= 180)))
+
+    @geo_cache(maxsize=256, backend=route_cache_backend, ttl=ROUTE_CACHE_TTL)
     def get_route(self,
                   origin: Dict[str, float],
                   destination: Dict[str, float],
@@ -117,7 +299,277 @@ class GeoService:
             print(f"警告：Google Maps 路線規劃失敗，切換到備用方案: {str(e)}")
 
         # API 失敗時使用預估方式
-        return self._calculate_estimated_travel_info(origin, destination, mode)
+        return self._calculate_estimated_travel_info(
+            origin, destination, mode, departure_time)
+
+    def get_cached_route(self,
+                         origin: Dict[str, float],
+                         destination: Dict[str, float],
+                         mode: str = 'driving',
+                         departure_time: Optional[datetime] = None,
+                         include_matrix: bool = False
+                         ) -> Optional[Dict]:
+        """只查詢快取中的路線,不呼叫 API
+
+        Args:
+            include_matrix: 沒有完整路線時,是否使用距離矩陣取得的路線
+                            (沒有 route_info,只有距離與時間)
+
+        Returns:
+            Optional[Dict]: 快取中的路線資訊,沒有時為 None
+        """
+        route_cache = GeoService.get_route
+        cache_key = route_cache.cache_key(
+            self, origin, destination, mode, departure_time)
+        if cache_key is None:
+            return None
+        route = route_cache.cache_get(cache_key)
+        if route is None and include_matrix:
+            route = route_cache.cache_get(self._matrix_cache_key(cache_key))
+        return route
+
+    def get_route_estimate(self,
+                           origin: Dict[str, float],
+                           destination: Dict[str, float],
+                           mode: str = 'driving',
+                           departure_time: Optional[datetime] = None
+                           ) -> Dict:
+        """不呼叫 API 的路線資訊
+
+        快取中有路線(包含距離矩陣取得的路線)時直接使用，否則以直線距離估算。
+        適合需要評估大量候選路線的策略(例如 beam search)。
+
+        Returns:
+            Dict: 路線資訊,估算的結果 is_estimated 為 True
+        """
+        route = self.get_cached_route(
+            origin, destination, mode, departure_time, include_matrix=True)
+        if route is not None:
+            return route
+        return self._get_estimated_route(origin, destination, mode, departure_time)
+
+    @staticmethod
+    def _matrix_cache_key(route_key: str) -> str:
+        """距離矩陣元素的快取 key
+
+        矩陣元素沒有 route_info,與 get_route 的路線分開存放,
+        之後的 get_route 仍會取得含導航資訊的完整路線。
+        """
+        return 'matrix:' + route_key[len('route:'):]
+
+    def _store_matrix_route(self,
+                            origin: Dict[str, float],
+                            destination: Dict[str, float],
+                            mode: str,
+                            departure_time: Optional[datetime],
+                            route: Dict) -> None:
+        """把距離矩陣取得的路線寫入快取(不會被 get_route 使用)"""
+        route_cache = GeoService.get_route
+        cache_key = route_cache.cache_key(
+            self, origin, destination, mode, departure_time)
+        if cache_key is not None:
+            route_cache.cache_set(self._matrix_cache_key(cache_key), route)
+
+    def export_routes(self, itinerary: List[Dict]) -> List[Dict]:
+        """匯出行程各路段已在快取中的實際路線
+
+        供重新規劃時保存已取得的路線(包含距離矩陣取得的路線)，預估的路線不匯出。
+        直接計算各路段的快取 key,不掃描整個快取。
+        路段可能在評估候選地點時就已取得(以前一個地點的出發時間查詢),
+        且行程的 end_time 是出發時間進位到 5 分鐘後的結果，
+        因此查詢前一個地點出發前 4 分鐘到本路段出發之間的每個時間分段;
+        返回終點的路段可能沒有指定出發時間,也查詢目前時間的分段。
+
+        Args:
+            itinerary: List[Dict] - plan_trip 回傳的行程
+
+        Returns:
+            List[Dict]: [{'key': str, 'route': Dict}, ...],可用 import_routes 還原
+        """
+        route_cache = GeoService.get_route
+        bucket = timedelta(minutes=route_cache.time_bucket_minutes)
+        routes = []
+        exported = set()
+        for index in range(1, len(itinerary)):
+            previous, item = itinerary[index - 1], itinerary[index]
+            origin = {'lat': float(previous['lat']), 'lon': float(previous['lon'])}
+            destination = {'lat': float(item['lat']), 'lon': float(item['lon'])}
+            mode = (item.get('transport') or {}).get('mode_eng') or 'driving'
+
+            departure = datetime.strptime(previous['end_time'], '%H:%M')
+            earliest = itinerary[max(index - 2, 0)]['end_time']
+            departure_time = (datetime.strptime(earliest, '%H:%M') -
+                              timedelta(minutes=4))
+            departure_times = []
+            while departure_time < departure:
+                departure_times.append(departure_time)
+                departure_time += bucket
+            departure_times.append(departure)
+            if index == len(itinerary) - 1:
+                departure_times.append(None)
+
+            for departure_time in departure_times:
+                cache_key = route_cache.cache_key(
+                    self, origin, destination, mode, departure_time)
+                if cache_key is None:
+                    continue
+                for key in (cache_key, self._matrix_cache_key(cache_key)):
+                    if key in exported:
+                        continue
+                    route = route_cache.cache_get(key)
+                    if isinstance(route, dict) and not route.get('is_estimated'):
+                        exported.add(key)
+                        routes.append({'key': key, 'route': route})
+        return routes
+
+    def import_routes(self, routes: List[Dict]) -> int:
+        """把 export_routes 匯出的路線寫回快取
+
+        Args:
+            routes: List[Dict] - export_routes 的回傳值
+
+        Returns:
+            int: 寫入的路線數
+        """
+        route_cache = GeoService.get_route
+        for item in routes:
+            route_cache.cache_set(item['key'], item['route'])
+        return len(routes)
+
+    def get_route_matrix(self,
+                         origins: List[Dict[str, float]],
+                         destinations: List[Dict[str, float]],
+                         mode: str = 'driving',
+                         departure_time: Optional[datetime] = None
+                         ) -> List[List[Dict]]:
+        """批次取得多個起點到多個終點的路線資訊
+
+        使用 Distance Matrix API,並依照 API 限制(每次最多 25 個起點、
+        25 個終點、100 個元素)自動分批。任何無法取得的元素都會改用直線
+        距離預估。
+
+        Args:
+            origins: 起點座標列表 [{'lat': float, 'lon': float}, ...]
+            destinations: 終點座標列表 [{'lat': float, 'lon': float}, ...]
+            mode: 交通方式('driving'/'transit'/'walking'/'bicycling')
+            departure_time: 出發時間,預設為當前時間
+
+        已在快取中的路線(get_route 或之前的矩陣)不會重新請求。
+        新取得的元素沒有 route_info,寫入快取時與 get_route 的路線分開存放,
+        因此之後的 get_route 仍會取得含導航資訊的完整路線。
+
+        Returns:
+            List[List[Dict]]: matrix[i][j] 為 origins[i] 到 destinations[j]
+            的路線資訊,格式與 get_route 相同(新請求的元素 route_info 為 None)
+
+        使用範例:
+            >>> legs = geo_service.get_route_matrix(
+                    [current, candidate], [candidate, end], mode='driving'
+                )
+            >>> to_candidate, candidate_to_end = legs[0][0], legs[1][1]
+        """
+        matrix: List[List[Optional[Dict]]] = [
+            [None] * len(destinations) for _ in origins
+        ]
+        if not origins or not destinations:
+            return matrix
+
+        # 先從快取取得已知的路線
+        for i, origin in enumerate(origins):
+            for j, destination in enumerate(destinations):
+                matrix[i][j] = self.get_cached_route(
+                    origin, destination, mode, departure_time,
+                    include_matrix=True)
+
+        # 只請求包含缺漏元素的起點與終點
+        missing_rows = [i for i in range(len(origins))
+                        if any(leg is None for leg in matrix[i])]
+        missing_cols = [j for j in range(len(destinations))
+                        if any(matrix[i][j] is None for i in missing_rows)]
+        if not missing_rows:
+            return matrix
+
+        dest_chunk = min(self.MATRIX_MAX_DESTINATIONS, len(missing_cols))
+        origin_chunk = min(self.MATRIX_MAX_ORIGINS,
+                           max(1, self.MATRIX_MAX_ELEMENTS // dest_chunk))
+
+        for o_start in range(0, len(missing_rows), origin_chunk):
+            row_batch = missing_rows[o_start:o_start + origin_chunk]
+            for d_start in range(0, len(missing_cols), dest_chunk):
+                col_batch = missing_cols[d_start:d_start + dest_chunk]
+                origin_batch = [origins[i] for i in row_batch]
+                dest_batch = [destinations[j] for j in col_batch]
+
+                rows = None
+                try:
+                    if self.has_google_maps:
+                        rows = self._get_google_maps_matrix(
+                            origin_batch, dest_batch, mode, departure_time)
+                except Exception as e:
+                    print(f"警告：Google Maps 距離矩陣失敗，切換到備用方案: {str(e)}")
+
+                for bi, i in enumerate(row_batch):
+                    for bj, j in enumerate(col_batch):
+                        if matrix[i][j] is not None:
+                            continue
+                        profiler.count('route_cache.misses')
+                        leg = rows[bi][bj] if rows else None
+                        if leg is None:
+                            leg = self._get_estimated_route(
+                                origins[i], destinations[j], mode,
+                                departure_time)
+                        matrix[i][j] = leg
+                        self._store_matrix_route(
+                            origins[i], destinations[j], mode,
+                            departure_time, leg)
+
+        return matrix
+
+    def _get_google_maps_matrix(self,
+                                origins: List[Dict[str, float]],
+                                destinations: List[Dict[str, float]],
+                                mode: str,
+                                departure_time: Optional[datetime]
+                                ) -> List[List[Optional[Dict]]]:
+        """呼叫 Distance Matrix API 取得單一批次的結果
+
+        Returns:
+            List[List[Optional[Dict]]]: 狀態不是 OK 的元素為 None
+        """
+        # 確保出發時間是未來時間
+        if departure_time is None or departure_time < datetime.now():
+            departure_time = datetime.now()
+
+        profiler.count('api_calls.distance_matrix')
+        profiler.count('api_elements', len(origins) * len(destinations))
+        with profiler.profile_span('route_fetching'):
+            result = self.maps_client.distance_matrix(
+                origins=[f"{p['lat']},{p['lon']}" for p in origins],
+                destinations=[f"{p['lat']},{p['lon']}" for p in destinations],
+                mode=mode,
+                departure_time=departure_time
+            )
+
+        if not result or 'rows' not in result:
+            raise RuntimeError("無法取得距離矩陣")
+
+        rows = []
+        for row in result['rows']:
+            legs = []
+            for element in row['elements']:
+                if element.get('status') != 'OK':
+                    legs.append(None)
+                    continue
+                legs.append({
+                    'distance_km': element['distance']['value'] / 1000,
+                    'duration_minutes': int(element['duration']['value'] / 60),
+                    'route_info': None,
+                    'is_estimated': False,
+                    'transport_mode': mode
+                })
+            rows.append(legs)
+
+        return rows
 
     def _get_google_maps_route(self,
                                origin: Dict[str, float],
@@ -134,12 +586,14 @@ class GeoService:
         dest_str = f"{destination['lat']},{destination['lon']}"
 
         # 呼叫 Google Maps API
-        result = self.maps_client.directions(
-            origin=origin_str,
-            destination=dest_str,
-            mode=mode,
-            departure_time=departure_time
-        )
+        profiler.count('api_calls.directions')
+        with profiler.profile_span('route_fetching'):
+            result = self.maps_client.directions(
+                origin=origin_str,
+                destination=dest_str,
+                mode=mode,
+                departure_time=departure_time
+            )
 
         if not result:
             raise RuntimeError("無法取得路線資訊")
@@ -157,27 +611,135 @@ class GeoService:
     def _get_estimated_route(self,
                              origin: Dict[str, float],
                              destination: Dict[str, float],
-                             mode: str) -> Dict:
-        """使用直線距離估算路線"""
+                             mode: str,
+                             departure_time: Optional[datetime] = None) -> Dict:
+        """使用直線距離與交通時間估算器估算路線"""
         # 計算直線距離
         distance = self.calculate_distance(origin, destination)
-
-        # 根據交通方式計算預估時間
-        speed = self.DEFAULT_SPEEDS.get(mode, self.DEFAULT_SPEEDS['driving'])
-        duration = (distance / speed) * 60  # 轉換為分鐘
-
-        # 加入路程曲折的修正係數（實際路程通常比直線距離長）
-        distance_factor = 1.3 if mode == 'driving' else 1.2
-        time_factor = 1.4 if mode == 'driving' else 1.3
+        departure_minute = self._departure_minute(departure_time)
 
         return {
-            'distance_km': round(distance * distance_factor, 1),
-            'duration_minutes': int(duration * time_factor),
+            'distance_km': round(float(self.estimator.estimate_distance(
+                distance, mode, departure_minute)), 1),
+            'duration_minutes': int(self.estimator.estimate_minutes(
+                distance, mode, departure_minute)),
             'route_info': None,
             'is_estimated': True,
             'transport_mode': mode
         }
 
+    def estimate_travel_minutes(self,
+                                distance_km: Union[float, np.ndarray],
+                                mode: str = 'driving',
+                                departure_time: Optional[datetime] = None
+                                ) -> np.ndarray:
+        """由直線距離估算交通時間(分鐘),支援整個距離陣列
+
+        與 _get_estimated_route 使用相同的估算器(self.estimator)，
+        適合一次估算整個交通時間矩陣。
+
+        Args:
+            distance_km: 直線距離(公里),純量或陣列
+            mode: 交通方式
+            departure_time: 出發時間(選填),估算器已校正時用來選擇時段係數
+
+        Returns:
+            np.ndarray: 無條件捨去的整數分鐘數
+        """
+        return self.estimator.estimate_minutes(
+            distance_km, mode, self._departure_minute(departure_time))
+
+    @classmethod
+    def min_travel_minutes(cls,
+                           distance_km: Union[float, np.ndarray],
+                           mode: str = 'driving') -> np.ndarray:
+        """由直線距離計算交通時間的下限(分鐘),支援整個距離陣列
+
+        實際路程不會短於直線距離，速度也不會超過 MAX_SPEEDS，
+        因此實際路線的分鐘數(無條件捨去後)不會小於回傳值，
+        可以用來在取得路線前排除一定不可行的地點。
+
+        Args:
+            distance_km: 直線距離(公里,不要四捨五入),純量或陣列
+            mode: 交通方式
+
+        Returns:
+            np.ndarray: 無條件捨去的整數分鐘數
+        """
+        speed = cls.MAX_SPEEDS.get(mode, max(cls.MAX_SPEEDS.values()))
+        minutes = np.asarray(distance_km, dtype=np.float64) / speed * 60
+        return np.floor(minutes).astype(np.int64)
+
+    @staticmethod
+    def _departure_minute(departure_time: Optional[datetime]) -> Optional[int]:
+        """出發時間的當天分鐘數"""
+        if departure_time is None:
+            return None
+        return departure_time.hour * 60 + departure_time.minute
+
+    def collect_route_samples(self) -> List[Dict]:
+        """從路線快取(含持久化後端)收集實際路線,作為估算器的學習樣本
+
+        包含距離矩陣取得的路線，預估的路線不列入。出發時間取自快取鍵值中的時段。
+
+        Returns:
+            List[Dict]: TravelTimeEstimator.fit 格式的樣本
+        """
+        route_cache = GeoService.get_route
+        bucket_minutes = route_cache.time_bucket_minutes
+        samples = []
+
+        cache_keys = route_cache.scan_keys('route:') + route_cache.scan_keys('matrix:')
+        for cache_key in cache_keys:
+            try:
+                origin, destination, mode, bucket = \
+                    cache_key.split(':', 1)[1].split('_')
+                origin_lat, origin_lon = map(float, origin.split(','))
+                dest_lat, dest_lon = map(float, destination.split(','))
+                departure_minute = int(bucket.lstrip('t')) * bucket_minutes
+            except ValueError:
+                continue
+
+            route = route_cache.cache_get(cache_key)
+            if not isinstance(route, dict) or route.get('is_estimated'):
+                continue
+
+            samples.append({
+                'mode': mode,
+                'departure_minute': departure_minute,
+                'straight_km': self.calculate_distance(
+                    {'lat': origin_lat, 'lon': origin_lon},
+                    {'lat': dest_lat, 'lon': dest_lon}),
+                'duration_minutes': route.get('duration_minutes'),
+                'distance_km': route.get('distance_km'),
+            })
+
+        return samples
+
+    def calibrate_estimator(self,
+                            samples: Optional[List[Dict]] = None,
+                            path: Optional[str] = TRAVEL_ESTIMATOR_PATH) -> Dict:
+        """以實際路線校正交通時間估算器,並保存校正結果
+
+        Args:
+            samples: 學習樣本,預設為 collect_route_samples() 的結果
+            path: 保存的 JSON 檔路徑,預設為 TRAVEL_ESTIMATOR_PATH,空值表示不保存
+
+        Returns:
+            Dict: 校正前後的誤差統計(見 TravelTimeEstimator.fit)
+
+        使用範例:
+            >>> stats = geo_service.calibrate_estimator()
+            >>> stats['before']['mae_minutes'], stats['after']['mae_minutes']
+        """
+        if samples is None:
+            samples = self.collect_route_samples()
+
+        stats = self.estimator.fit(samples)
+        if path:
+            self.estimator.save(path)
+        return stats
+
     def validate_coordinates(self, lat: float, lon: float) -> bool:
         """驗證座標是否有效
 
@@ -247,19 +809,40 @@ class GeoService:
             'max_lon': round(center['lon'] + lon_change, 6)
         }
 
+    def build_spatial_index(self,
+                            points: Sequence[Union[Dict, object]],
+                            radius_km: Optional[float] = None) -> SpatialIndex:
+        """建立地點的空間索引
+
+        網格大小依照預期的查詢半徑決定(半徑的一半)，
+        讓每次半徑查詢只需要檢查約 5x5 個格子。
+
+        Args:
+            points: 具有 lat/lon 的點(字典或 PlaceDetail)
+            radius_km: 預期的查詢半徑(公里),未指定時使用 2 公里的網格
+
+        Returns:
+            SpatialIndex: 空間索引
+        """
+        cell_size = max(radius_km / 2, 0.1) if radius_km else 2.0
+        return SpatialIndex(points, cell_size_km=cell_size)
+
     def find_points_in_range(self,
                              center: Dict[str, float],
                              points: List[Dict[str, float]],
-                             max_distance_km: float) -> List[Dict]:
+                             max_distance_km: float,
+                             index: Optional[SpatialIndex] = None) -> List[Dict]:
         """尋找指定範圍內的所有點
 
-        這個方法先使用矩形範圍快速過濾，然後再精確計算距離，
-        這種兩階段的策略可以大幅提升處理大量點的效能。
+        使用空間索引只檢查中心點附近格子內的點，再精確計算距離。
+        對同一批點重複查詢時，可傳入 build_spatial_index 建好的索引，
+        查詢成本只與附近的點數有關。
 
         Args:
             center: 中心點座標 {'lat': float, 'lon': float}
             points: 所有待檢查的點的列表
             max_distance_km: 最大距離（公里）
+            index: 選填,由 points 建立的空間索引
 
         Returns:
             List[Dict]: 在範圍內的點的列表，每個點包含原始資料和距離
@@ -271,20 +854,25 @@ class GeoService:
                     center, points, 5
                 )
         """
-        # 先計算矩形範圍
-        bounds = self.calculate_bounds(center, max_distance_km)
+        if not self.validate_coordinates(center['lat'], center['lon']):
+            raise ValueError(f"無效的中心點座標: {center}")
+
+        if max_distance_km <= 0:
+            raise ValueError(f"半徑必須大於0: {max_distance_km}")
 
-        # 第一階段：快速過濾
+        if index is None:
+            index = self.build_spatial_index(points, max_distance_km)
+
+        # 距離以 0.1 公里為單位比較,與 calculate_distance 一致
+        indices, distances = index.query_radius(center, max_distance_km + 0.05)
         candidates = []
-        for point in points:
-            if self._is_point_in_bounds(point, bounds):
-                # 計算實際距離
-                distance = self.calculate_distance(center, point)
-                if distance <= max_distance_km:
-                    candidates.append({
-                        **point,
-                        'distance': round(distance, 2)
-                    })
+        for idx, distance in zip(indices.tolist(), distances.tolist()):
+            distance = round(distance, 1)
+            if distance <= max_distance_km:
+                candidates.append({
+                    **index.points[idx],
+                    'distance': round(distance, 2)
+                })
 
         # 依據距離排序
         return sorted(candidates, key=lambda x: x['distance'])
@@ -365,13 +953,16 @@ class GeoService:
     def _calculate_estimated_travel_info(self,
                                          origin: Dict[str, float],
                                          destination: Dict[str, float],
-                                         mode: str) -> Dict:
+                                         mode: str,
+                                         departure_time: Optional[datetime] = None
+                                         ) -> Dict:
         """計算預估的交通資訊（不需要 API）
 
         Args:
             origin: 起點座標 {'lat': float, 'lon': float}
             destination: 終點座標 {'lat': float, 'lon': float}
             mode: 交通方式('driving'/'transit'/'walking'/'bicycling')
+            departure_time: 出發時間(選填)
 
         Returns:
             Dict: {
@@ -380,28 +971,20 @@ class GeoService:
                 'is_estimated': True      # 標記為預估資料
             }
         """
-        # 計算直線距離
-        distance = self.calculate_distance(origin, destination)
-
-        # 根據交通方式選擇預設速度
-        speed = self.DEFAULT_SPEEDS.get(mode, 30)  # 預設 30 km/h
-
-        # 計算預估時間（分鐘）
-        duration = (distance / speed) * 60
-
-        # 加入路程曲折的修正係數（實際路程通常比直線距離長）
-        distance_factor = 1.3 if mode == 'driving' else 1.2  # 開車路線較曲折
-        time_factor = 1.4 if mode == 'driving' else 1.3     # 開車考慮紅綠燈等因素
-
+        route = self._get_estimated_route(
+            origin, destination, mode, departure_time)
         return {
-            'distance_km': round(distance * distance_factor, 1),
-            'duration_minutes': int(duration * time_factor),
+            'distance_km': route['distance_km'],
+            'duration_minutes': route['duration_minutes'],
             'is_estimated': True
         }
 
     def geocode(self, address: str) -> Dict[str, float]:
         """將地址或地點名稱轉換為座標
 
+        查詢結果會以標準化後的地名快取(含持久化後端)，
+        重複查詢同一個地點不會再呼叫 API。
+
         Args:
             address: str - 地址或地點名稱
 
@@ -412,22 +995,78 @@ class GeoService:
             RuntimeError - 如果無法取得座標
         """
         try:
-            if not self.has_google_maps:
-                raise RuntimeError("Google Maps API 未初始化")
-
-            result = self.maps_client.geocode(address)
-            if not result:
-                raise RuntimeError(f"找不到地點: {address}")
-
-            location = result[0]['geometry']['location']
-            return {
-                'name': address,
-                'lat': location['lat'],
-                'lon': location['lng'],
-                'duration_min': 0,
-                'label': '交通樞紐',
-                'period': 'morning',  # 起點預設為上午時段
-                'hours': {i: [{'start': '00:00', 'end': '23:59'}] for i in range(1, 8)}
-            }
+            location = self.geocode_cache.get_or_fetch(
+                address, self._fetch_geocode)
         except Exception as e:
             raise RuntimeError(f"地理編碼錯誤: {str(e)}")
+
+        return self._build_geocode_result(address, location)
+
+    def geocode_many(self,
+                     addresses: Sequence[str]) -> Dict[str, Dict]:
+        """批次地理編碼
+
+        重複或別稱相同的地名只查詢一次，查詢失敗的地名不會出現在結果中。
+
+        Args:
+            addresses: 地址或地點名稱列表
+
+        Returns:
+            Dict[str, Dict] - {原始地名: geocode() 格式的結果}
+
+        使用範例:
+            >>> geo_service.geocode_many(['台北車站', '臺北車站', '台北101'])
+        """
+        results = {}
+        resolved: Dict[str, Optional[Dict]] = {}
+
+        for address in addresses:
+            cache_key = self.geocode_cache.key(address)
+            if cache_key not in resolved:
+                try:
+                    resolved[cache_key] = self.geocode_cache.get_or_fetch(
+                        address, self._fetch_geocode)
+                except Exception as e:
+                    print(f"警告：無法取得地點座標 {address}: {str(e)}")
+                    resolved[cache_key] = None
+
+            location = resolved[cache_key]
+            if location is not None:
+                results[address] = self._build_geocode_result(address, location)
+
+        return results
+
+    def _fetch_geocode(self, address: str) -> Dict:
+        """呼叫 Geocoding API 取得座標
+
+        Returns:
+            Dict - {'lat': float, 'lon': float, 'formatted_address': str}
+        """
+        if not self.has_google_maps:
+            raise RuntimeError("Google Maps API 未初始化")
+
+        profiler.count('api_calls.geocode')
+        with profiler.profile_span('geocoding'):
+            result = self.maps_client.geocode(address)
+        if not result:
+            raise RuntimeError(f"找不到地點: {address}")
+
+        location = result[0]['geometry']['location']
+        return {
+            'lat': location['lat'],
+            'lon': location['lng'],
+            'formatted_address': result[0].get('formatted_address', address)
+        }
+
+    @staticmethod
+    def _build_geocode_result(address: str, location: Dict) -> Dict:
+        """依照使用者輸入的名稱組合 geocode 的回傳格式"""
+        return {
+            'name': address,
+            'lat': location['lat'],
+            'lon': location['lon'],
+            'duration_min': 0,
+            'label': '交通樞紐',
+            'period': 'morning',  # 起點預設為上午時段
+            'hours': {i: [{'start': '00:00', 'end': '23:59'}] for i in range(1, 8)}
+        }
@@ -0,0 +1,274 @@
+# src/core/services/isochrone.py
+
+import hashlib
+import math
+from datetime import datetime
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from ..models.place import PlaceDetail
+from ..models.place_table import PlaceTable
+from ..utils import profiler
+from ..utils.cache_core import LRUCache
+from .geo_service import GeoService
+
+
+# 等時圈快取:
+# (後端, 交通方式, 起點網格, 終點網格, 出發時段, 候選地點座標的雜湊)
+#   -> (網格中心到各地點的距離, 各地點到網格中心的距離, 去程分鐘, 回程分鐘)
+_reach_cache = LRUCache(maxsize=64)
+
+# 每一緯度的公里數(與 SpatialIndex 相同)
+KM_PER_DEGREE = math.pi * GeoService.EARTH_RADIUS / 180
+
+# 候選地點的可達區間,依序為 0/1/2
+REACH_BANDS = ('reachable', 'marginal', 'unreachable')
+
+Point = Union[PlaceDetail, Dict[str, float]]
+
+
+def clear_isochrone_cache() -> None:
+    """清除等時圈快取(例如重新校正交通時間估算器之後)"""
+    _reach_cache.clear()
+
+
+class IsochroneFilter:
+    """以起點與終點的等時圈在規劃前篩選候選地點
+
+    向量檢索回傳的候選地點中，有許多在規劃時間內根本到不了
+    (例如步行時遠在其他行政區的地點)。規劃前先計算每個地點
+    起點 → 地點(停留)→ 終點 所需的時間，分成三個區間:
+    1. reachable: 以預估交通時間可以在規劃時間內往返
+    2. marginal: 預估無法往返，但以交通時間下限(GeoService.MAX_SPEEDS)可以
+    3. unreachable: 以交通時間下限仍無法往返，任何策略都不可能選入
+
+    policy 為 'bound'(預設)時只移除 unreachable，不會移除任何可行的地點;
+    'estimate' 時同時移除 marginal，候選地點更少，但預估偏高時可能少掉可行的地點。
+
+    交通時間以起點/終點所在網格的中心計算，依
+    (後端, 交通方式, 起點網格, 終點網格, 出發時段, 候選地點) 快取，
+    同一區域、同一時段出發的請求(例如重新規劃、多樣本、批次規劃)直接使用結果。
+    交通時間下限會扣掉實際位置與網格中心的距離，因此仍然是實際路線的下限。
+
+    backend:
+    - 'estimate': 交通時間估算器(預設,不呼叫 API)
+    - 'matrix': Distance Matrix API(與路線快取共用,網格中心相同的請求不重複呼叫)
+
+    使用範例:
+        >>> isochrone = IsochroneFilter(geo_service, policy='estimate')
+        >>> table, stats = isochrone.filter(
+        ...     table, start, end, 'walking', start_time, end_time)
+        >>> stats['dropped'], stats['reachable']
+    """
+
+    DEFAULT_CELL_KM = 1.0
+    # 移除的地點少於這個比例時不重建地點表(重建的成本高於少掉的評分)
+    MIN_DROP_RATIO = 0.05
+    POLICIES = ('bound', 'estimate')
+    BACKENDS = ('estimate', 'matrix')
+
+    def __init__(self,
+                 geo_service: GeoService,
+                 policy: str = 'bound',
+                 backend: str = 'estimate',
+                 cell_km: float = DEFAULT_CELL_KM):
+        """初始化
+
+        Args:
+            geo_service: 地理服務(交通時間估算器與 Distance Matrix API)
+            policy: 'bound' 只移除 unreachable,'estimate' 同時移除 marginal
+            backend: 'estimate' 或 'matrix'
+            cell_km: 快取網格的大小(公里)
+
+        異常:
+            ValueError: policy 或 backend 不支援
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"不支援的等時圈篩選方式: {policy}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"不支援的等時圈計算方式: {backend}")
+
+        self.geo_service = geo_service
+        self.policy = policy
+        self.backend = backend
+        self.cell_km = cell_km
+
+    def filter(self,
+               table: PlaceTable,
+               start: Point,
+               end: Optional[Point],
+               mode: str,
+               start_time: datetime,
+               end_time: datetime) -> Tuple[PlaceTable, Dict]:
+        """移除無法在規劃時間內往返的候選地點
+
+        Args:
+            table: 候選地點表
+            start: 起點
+            end: 終點(選填,沒有時只計算去程)
+            mode: 交通方式
+            start_time: 出發時間
+            end_time: 結束時間
+
+        Returns:
+            Tuple[PlaceTable, Dict]: 保留的地點表(移除的地點少於 MIN_DROP_RATIO
+                時為原地點表),以及各區間的地點數、候選地點數(candidates)與移除數(dropped)
+        """
+        with profiler.profile_span('isochrone'):
+            bands = self.classify(table, start, end, mode, start_time, end_time)
+            limit = REACH_BANDS.index(
+                'marginal' if self.policy == 'estimate' else 'unreachable')
+            keep = bands < limit
+
+        stats = {band: int(np.count_nonzero(bands == code))
+                 for code, band in enumerate(REACH_BANDS)}
+        stats['candidates'] = len(table)
+        stats['dropped'] = len(table) - int(np.count_nonzero(keep))
+        if not stats['dropped'] or stats['dropped'] < self.MIN_DROP_RATIO * len(table):
+            stats['dropped'] = 0
+            return table, stats
+
+        profiler.count('isochrone.dropped', stats['dropped'])
+        return table.take(np.flatnonzero(keep)), stats
+
+    def classify(self,
+                 table: PlaceTable,
+                 start: Point,
+                 end: Optional[Point],
+                 mode: str,
+                 start_time: datetime,
+                 end_time: datetime) -> np.ndarray:
+        """各地點的可達區間
+
+        Returns:
+            np.ndarray: REACH_BANDS 的索引(0 reachable、1 marginal、2 unreachable)
+        """
+        lower, estimate = self.round_trip_minutes(table, start, end, mode, start_time)
+        budget = int((end_time - start_time).total_seconds() // 60)
+
+        bands = np.zeros(len(table), dtype=np.int8)
+        bands[estimate + table.duration > budget] = REACH_BANDS.index('marginal')
+        bands[lower + table.duration > budget] = REACH_BANDS.index('unreachable')
+        return bands
+
+    def round_trip_minutes(self,
+                           table: PlaceTable,
+                           start: Point,
+                           end: Optional[Point],
+                           mode: str,
+                           departure_time: datetime) -> Tuple[np.ndarray, np.ndarray]:
+        """各地點 起點→地點 加 地點→終點 的交通時間(不含停留時間)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (交通時間下限, 預估交通時間),單位分鐘
+        """
+        start_cell = self._cell(start)
+        end_cell = self._cell(end) if end is not None else None
+        bucket = self._time_bucket(departure_time)
+        fingerprint = hashlib.sha1(
+            table.lat.tobytes() + table.lon.tobytes()).hexdigest()
+        key = (self.backend, mode, start_cell, end_cell, bucket, fingerprint)
+
+        cached = _reach_cache.get(key)
+        if cached is None:
+            cached = self._compute(table, start_cell, end_cell, mode, departure_time)
+            _reach_cache.set(key, cached)
+        else:
+            profiler.count('isochrone.cache_hits')
+        to_km, back_km, to_minutes, back_minutes = cached
+
+        # 實際位置到地點的距離 >= 網格中心到地點的距離 - 實際位置到網格中心的距離
+        lower = self.geo_service.min_travel_minutes(
+            np.maximum(0.0, to_km - self._offset(start, start_cell)), mode)
+        if end is not None:
+            lower = lower + self.geo_service.min_travel_minutes(
+                np.maximum(0.0, back_km - self._offset(end, end_cell)), mode)
+        return lower, to_minutes + back_minutes
+
+    def _compute(self,
+                 table: PlaceTable,
+                 start_cell: Tuple[int, int],
+                 end_cell: Optional[Tuple[int, int]],
+                 mode: str,
+                 departure_time: datetime) -> Tuple[np.ndarray, ...]:
+        """計算網格中心與各地點之間的距離與交通時間"""
+        center = self._cell_center(start_cell)
+        to_km = GeoService.haversine_matrix(
+            np.array([center['lat']]), np.array([center['lon']]),
+            table.lat, table.lon)[0]
+        to_minutes = self._travel_minutes(
+            center, table, to_km, mode, departure_time, outbound=True)
+
+        back_km = np.zeros(len(table))
+        back_minutes = np.zeros(len(table), dtype=np.int64)
+        if end_cell is not None:
+            end_center = self._cell_center(end_cell)
+            back_km = GeoService.haversine_matrix(
+                table.lat, table.lon,
+                np.array([end_center['lat']]), np.array([end_center['lon']]))[:, 0]
+            back_minutes = self._travel_minutes(
+                end_center, table, back_km, mode, departure_time, outbound=False)
+
+        return to_km, back_km, to_minutes, back_minutes
+
+    def _travel_minutes(self,
+                        center: Dict[str, float],
+                        table: PlaceTable,
+                        distances: np.ndarray,
+                        mode: str,
+                        departure_time: datetime,
+                        outbound: bool) -> np.ndarray:
+        """網格中心與各地點之間的預估交通時間(分鐘)"""
+        if self.backend == 'estimate' or len(table) == 0:
+            return self.geo_service.estimate_travel_minutes(
+                distances, mode, departure_time)
+
+        points = [{'lat': float(lat), 'lon': float(lon)}
+                  for lat, lon in zip(table.lat, table.lon)]
+        if outbound:
+            legs = self.geo_service.get_route_matrix(
+                [center], points, mode, departure_time)[0]
+        else:
+            legs = [row[0] for row in self.geo_service.get_route_matrix(
+                points, [center], mode, departure_time)]
+        return np.array([int(leg['duration_minutes']) for leg in legs],
+                        dtype=np.int64)
+
+    def _cell(self, point: Point) -> Tuple[int, int]:
+        """點所在的網格(緯度方向、經度方向的格數)"""
+        lat, lon = self._coordinates(point)
+        row = math.floor(lat * KM_PER_DEGREE / self.cell_km)
+        lat_center = (row + 0.5) * self.cell_km / KM_PER_DEGREE
+        lon_km = KM_PER_DEGREE * math.cos(math.radians(lat_center))
+        return row, math.floor(lon * lon_km / self.cell_km)
+
+    def _cell_center(self, cell: Tuple[int, int]) -> Dict[str, float]:
+        """網格中心的座標"""
+        row, column = cell
+        lat = (row + 0.5) * self.cell_km / KM_PER_DEGREE
+        lon_km = KM_PER_DEGREE * math.cos(math.radians(lat))
+        return {'lat': lat, 'lon': (column + 0.5) * self.cell_km / lon_km}
+
+    def _offset(self, point: Point, cell: Tuple[int, int]) -> float:
+        """點到所在網格中心的距離(公里)"""
+        lat, lon = self._coordinates(point)
+        center = self._cell_center(cell)
+        return float(GeoService.haversine_matrix(
+            np.array([lat]), np.array([lon]),
+            np.array([center['lat']]), np.array([center['lon']]))[0, 0])
+
+    @staticmethod
+    def _coordinates(point: Point) -> Tuple[float, float]:
+        if isinstance(point, dict):
+            return float(point['lat']), float(point['lon'])
+        return float(point.lat), float(point.lon)
+
+    @staticmethod
+    def _time_bucket(departure_time: datetime) -> int:
+        """出發時間所在的時段(與路線快取相同的分段)"""
+        bucket_minutes = GeoService.get_route.time_bucket_minutes
+        return (departure_time.hour * 60 + departure_time.minute) // bucket_minutes
+
+
+__all__ = ['REACH_BANDS', 'IsochroneFilter', 'clear_isochrone_cache']
@@ -0,0 +1,177 @@
+# src/core/services/local_maps_client.py
+
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+
+class LocalMapsClient:
+    """本地版的 Google Maps 用戶端
+
+    提供與 googlemaps.Client 相同介面與回傳格式的 directions、
+    distance_matrix 與 geocode，但完全不連網，使用直線距離估算。
+
+    用途:
+    1. 測試與效能量測時替代真正的 Google Maps 服務
+    2. 記錄 API 呼叫次數，方便比較不同規劃方式的成本
+    3. 可注入固定延遲，模擬網路往返時間
+
+    使用範例:
+        >>> client = LocalMapsClient(latency_ms=50)
+        >>> geo_service = GeoService(maps_client=client)
+    """
+
+    # 各交通方式的預估速度(公里/小時)與路程曲折係數
+    SPEEDS = {
+        'driving': 40,
+        'transit': 30,
+        'walking': 5,
+        'bicycling': 15
+    }
+    DISTANCE_FACTORS = {
+        'driving': 1.3,
+        'transit': 1.2,
+        'walking': 1.2,
+        'bicycling': 1.2
+    }
+
+    EARTH_RADIUS = 6371.0087714
+
+    def __init__(self,
+                 latency_ms: float = 0.0,
+                 places: Optional[Dict[str, Tuple[float, float]]] = None):
+        """初始化
+
+        Args:
+            latency_ms: 每次呼叫注入的延遲(毫秒)
+            places: 地名到座標的對照表,供 geocode 使用
+                   {'台北車站': (25.0480194, 121.5168608)}
+        """
+        self.latency_ms = latency_ms
+        self.places = dict(places or {})
+        self.call_counts = {
+            'directions': 0,
+            'distance_matrix': 0,
+            'distance_matrix_elements': 0,
+            'geocode': 0
+        }
+        # 可能同時從多個執行緒呼叫(例如 RouteFetcher)
+        self._count_lock = threading.Lock()
+
+    def directions(self,
+                   origin: str,
+                   destination: str,
+                   mode: str = 'driving',
+                   departure_time: Optional[datetime] = None,
+                   **kwargs) -> List[Dict]:
+        """模擬 Directions API"""
+        self._simulate_call('directions')
+        distance_m, duration_s = self._estimate(
+            self._parse_location(origin),
+            self._parse_location(destination),
+            mode
+        )
+        return [{
+            'legs': [{
+                'distance': {'value': distance_m,
+                             'text': f"{distance_m / 1000:.1f} 公里"},
+                'duration': {'value': duration_s,
+                             'text': f"{duration_s // 60} 分鐘"},
+                'steps': []
+            }],
+            'overview_polyline': {'points': ''},
+            'summary': 'local estimate'
+        }]
+
+    def distance_matrix(self,
+                        origins: Sequence[Union[str, Tuple[float, float]]],
+                        destinations: Sequence[Union[str, Tuple[float, float]]],
+                        mode: str = 'driving',
+                        departure_time: Optional[datetime] = None,
+                        **kwargs) -> Dict:
+        """模擬 Distance Matrix API"""
+        self._simulate_call('distance_matrix')
+        with self._count_lock:
+            self.call_counts['distance_matrix_elements'] += (
+                len(origins) * len(destinations))
+
+        parsed_destinations = [self._parse_location(d) for d in destinations]
+        rows = []
+        for origin in origins:
+            origin_point = self._parse_location(origin)
+            elements = []
+            for dest_point in parsed_destinations:
+                distance_m, duration_s = self._estimate(
+                    origin_point, dest_point, mode)
+                elements.append({
+                    'status': 'OK',
+                    'distance': {'value': distance_m},
+                    'duration': {'value': duration_s}
+                })
+            rows.append({'elements': elements})
+
+        return {'status': 'OK', 'rows': rows}
+
+    def geocode(self, address: str, **kwargs) -> List[Dict]:
+        """模擬 Geocoding API,只認得 places 對照表中的地點"""
+        self._simulate_call('geocode')
+        if address not in self.places:
+            return []
+
+        lat, lon = self.places[address]
+        return [{
+            'formatted_address': address,
+            'geometry': {'location': {'lat': lat, 'lng': lon}}
+        }]
+
+    @property
+    def total_calls(self) -> int:
+        """所有 API 呼叫的總次數(不含矩陣元素數)"""
+        return (self.call_counts['directions'] +
+                self.call_counts['distance_matrix'] +
+                self.call_counts['geocode'])
+
+    def reset_counts(self) -> None:
+        """清除呼叫次數統計"""
+        for key in self.call_counts:
+            self.call_counts[key] = 0
+
+    def _simulate_call(self, name: str) -> None:
+        """記錄呼叫並注入延遲"""
+        with self._count_lock:
+            self.call_counts[name] += 1
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+    def _parse_location(self,
+                        location: Union[str, Tuple[float, float], Dict]
+                        ) -> Tuple[float, float]:
+        """解析 "lat,lon" 字串、(lat, lon) tuple 或座標字典"""
+        if isinstance(location, dict):
+            return float(location['lat']), float(
+                location.get('lon', location.get('lng')))
+        if isinstance(location, (tuple, list)):
+            return float(location[0]), float(location[1])
+
+        lat_str, lon_str = str(location).split(',')
+        return float(lat_str), float(lon_str)
+
+    def _estimate(self,
+                  origin: Tuple[float, float],
+                  destination: Tuple[float, float],
+                  mode: str) -> Tuple[int, int]:
+        """估算距離(公尺)與時間(秒)"""
+        lat1, lon1 = map(math.radians, origin)
+        lat2, lon2 = map(math.radians, destination)
+        a = (math.sin((lat2 - lat1) / 2) ** 2 +
+             math.cos(lat1) * math.cos(lat2) *
+             math.sin((lon2 - lon1) / 2) ** 2)
+        straight_km = 2 * self.EARTH_RADIUS * math.asin(math.sqrt(a))
+
+        road_km = straight_km * self.DISTANCE_FACTORS.get(mode, 1.3)
+        speed = self.SPEEDS.get(mode, self.SPEEDS['driving'])
+        duration_s = int(road_km / speed * 3600)
+
+        return int(road_km * 1000), duration_s
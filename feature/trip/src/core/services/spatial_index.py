@@ -0,0 +1,216 @@
+# src/core/services/spatial_index.py
+
+import math
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class SpatialIndex:
+    """地點的空間索引(均勻網格)
+
+    把所有點依經緯度放進固定大小的網格，查詢時只需要檢查範圍附近的格子，
+    讓每次查詢的工作量取決於附近地點的密度，而不是整個地點清單的大小。
+
+    網格以公里為單位：緯度方向每格 cell_size_km，經度方向依照
+    索引中最高緯度的 cos 值換算，確保每格在東西方向至少 cell_size_km 寬。
+
+    支援的查詢:
+    1. query_radius: 指定半徑內的所有點(精確的 Haversine 距離)
+    2. nearest: 最近的 k 個點
+    3. query_bounds: 矩形範圍(與 GeoService.calculate_bounds 格式相同)
+
+    使用範例:
+        >>> index = SpatialIndex(places, cell_size_km=2)
+        >>> indices, distances = index.query_radius(
+                {'lat': 25.0480194, 'lon': 121.5168608}, 5)
+        >>> nearby = [index.points[i] for i in indices]
+    """
+
+    EARTH_RADIUS = 6371.0087714
+    KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+    def __init__(self,
+                 points: Sequence[Union[Dict, object]],
+                 cell_size_km: float = 2.0):
+        """建立索引
+
+        Args:
+            points: 具有 lat/lon 的點(字典或 PlaceDetail 等物件),
+                    或 PlaceTable(查詢結果的索引即為地點表的列號)
+            cell_size_km: 網格邊長(公里)
+
+        異常:
+            ValueError: 網格大小不是正數
+        """
+        if cell_size_km <= 0:
+            raise ValueError(f"網格大小必須大於0: {cell_size_km}")
+
+        # PlaceTable 直接使用欄位陣列,不需要逐一建立 PlaceDetail
+        self.points = points if hasattr(points, 'coordinates') else list(points)
+        self.cell_size_km = cell_size_km
+        self.lats, self.lons = self._to_arrays(self.points)
+
+        max_abs_lat = float(np.abs(self.lats).max()) if len(self.points) else 0.0
+        self._lat_step = cell_size_km / self.KM_PER_DEGREE
+        self._lon_step = cell_size_km / (
+            self.KM_PER_DEGREE * max(math.cos(math.radians(max_abs_lat)), 1e-6))
+
+        # 格子座標 -> 點的索引陣列
+        rows = np.floor(self.lats / self._lat_step).astype(np.int64)
+        cols = np.floor(self.lons / self._lon_step).astype(np.int64)
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for idx, cell in enumerate(zip(rows.tolist(), cols.tolist())):
+            cells.setdefault(cell, []).append(idx)
+        self._cells = {cell: np.array(indices, dtype=np.int64)
+                       for cell, indices in cells.items()}
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def query_radius(self,
+                     center: Dict[str, float],
+                     radius_km: float,
+                     sort: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """查詢半徑內的所有點
+
+        Args:
+            center: 中心點座標 {'lat': float, 'lon': float}
+            radius_km: 半徑(公里)
+            sort: True 依距離由近到遠排序,False 依原始順序排列
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (點的索引, 距離(公里))
+        """
+        lat, lon = float(center['lat']), float(center['lon'])
+        candidates = self._candidates_in_bounds(
+            self._bounds(lat, lon, radius_km))
+        if candidates.size == 0:
+            return candidates, np.empty(0)
+
+        distances = self._haversine(lat, lon, candidates)
+        mask = distances <= radius_km
+        candidates, distances = candidates[mask], distances[mask]
+
+        order = np.argsort(distances, kind='stable') if sort \
+            else np.argsort(candidates)
+        return candidates[order], distances[order]
+
+    def nearest(self,
+                center: Dict[str, float],
+                k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """查詢最近的 k 個點
+
+        從一個網格大小開始逐步加倍搜尋半徑，直到找到 k 個點為止。
+
+        Args:
+            center: 中心點座標 {'lat': float, 'lon': float}
+            k: 點的數量
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (點的索引, 距離(公里)),由近到遠
+        """
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        radius = self.cell_size_km
+        # 半徑超過地球半周長時一定涵蓋所有點
+        while radius < math.pi * self.EARTH_RADIUS:
+            indices, distances = self.query_radius(center, radius)
+            if len(indices) >= k:
+                return indices[:k], distances[:k]
+            radius *= 2
+
+        all_indices = np.arange(len(self.points))
+        distances = self._haversine(
+            float(center['lat']), float(center['lon']), all_indices)
+        order = np.argsort(distances, kind='stable')[:k]
+        return all_indices[order], distances[order]
+
+    def query_bounds(self, bounds: Dict[str, float]) -> np.ndarray:
+        """查詢矩形範圍內的點
+
+        Args:
+            bounds: {'min_lat', 'max_lat', 'min_lon', 'max_lon'}
+
+        Returns:
+            np.ndarray: 範圍內的點的索引(依原始順序)
+        """
+        candidates = self._candidates_in_bounds(bounds)
+        if candidates.size == 0:
+            return candidates
+
+        lats, lons = self.lats[candidates], self.lons[candidates]
+        mask = ((bounds['min_lat'] <= lats) & (lats <= bounds['max_lat']) &
+                (bounds['min_lon'] <= lons) & (lons <= bounds['max_lon']))
+        return np.sort(candidates[mask])
+
+    def _bounds(self, lat: float, lon: float,
+                radius_km: float) -> Dict[str, float]:
+        """計算涵蓋半徑的矩形範圍(以範圍內最高緯度換算經度,避免漏掉點)"""
+        lat_change = radius_km / self.KM_PER_DEGREE
+        edge_lat = min(abs(lat) + lat_change, 89.9)
+        lon_change = radius_km / (
+            self.KM_PER_DEGREE * math.cos(math.radians(edge_lat)))
+        return {
+            'min_lat': lat - lat_change,
+            'max_lat': lat + lat_change,
+            'min_lon': lon - lon_change,
+            'max_lon': lon + lon_change
+        }
+
+    def _candidates_in_bounds(self, bounds: Dict[str, float]) -> np.ndarray:
+        """取出與矩形範圍重疊的格子中所有點的索引"""
+        if not self._cells:
+            return np.empty(0, dtype=np.int64)
+
+        row_min = math.floor(bounds['min_lat'] / self._lat_step)
+        row_max = math.floor(bounds['max_lat'] / self._lat_step)
+        col_min = math.floor(bounds['min_lon'] / self._lon_step)
+        col_max = math.floor(bounds['max_lon'] / self._lon_step)
+
+        query_cells = (row_max - row_min + 1) * (col_max - col_min + 1)
+        if query_cells > len(self._cells):
+            # 查詢範圍比有資料的格子還多時,直接檢查有資料的格子
+            chunks = [indices for (row, col), indices in self._cells.items()
+                      if row_min <= row <= row_max and col_min <= col <= col_max]
+        else:
+            chunks = []
+            for row in range(row_min, row_max + 1):
+                for col in range(col_min, col_max + 1):
+                    indices = self._cells.get((row, col))
+                    if indices is not None:
+                        chunks.append(indices)
+
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def _haversine(self, lat: float, lon: float,
+                   indices: np.ndarray) -> np.ndarray:
+        """計算中心點到指定點的 Haversine 距離(公里)"""
+        lat1, lon1 = math.radians(lat), math.radians(lon)
+        lat2 = np.radians(self.lats[indices])
+        lon2 = np.radians(self.lons[indices])
+        a = (np.sin((lat2 - lat1) / 2) ** 2 +
+             math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+        return 2 * self.EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    @staticmethod
+    def _to_arrays(points: Sequence[Union[Dict, object]]
+                   ) -> Tuple[np.ndarray, np.ndarray]:
+        """取出所有點的經緯度陣列"""
+        if hasattr(points, 'coordinates'):
+            return points.coordinates()
+        lats = np.empty(len(points), dtype=float)
+        lons = np.empty(len(points), dtype=float)
+        for i, point in enumerate(points):
+            if isinstance(point, dict):
+                lats[i], lons[i] = point['lat'], point['lon']
+            else:
+                lats[i], lons[i] = point.lat, point.lon
+        return lats, lons
+
+
+__all__ = ['SpatialIndex']
@@ -1,8 +1,30 @@
 # src/core/services/time_service.py
 
 from datetime import datetime, time, timedelta
+from functools import lru_cache
 from typing import Any, Dict, List, Union, Tuple, Optional
 
+import numpy as np
+
+
+MINUTES_PER_DAY = 24 * 60
+
+
+@lru_cache(maxsize=4096)
+def _slot_minutes(time_str: str) -> int:
+    """把營業時段的 "HH:MM" 轉為分鐘數(同一個字串只解析一次)"""
+    parsed = datetime.strptime(time_str, TimeService.TIME_FORMAT)
+    return parsed.hour * 60 + parsed.minute
+
+
+def _minute_of_day(value: Union[datetime, time, str, int]) -> int:
+    """把 datetime/time/"HH:MM"/分鐘數 統一轉為當天的分鐘數(忽略秒數)"""
+    if isinstance(value, (int, np.integer)):
+        return int(value) % MINUTES_PER_DAY
+    if isinstance(value, str):
+        return _slot_minutes(value)
+    return value.hour * 60 + value.minute
+
 
 class TimeService:
     """時間管理服務
@@ -13,6 +35,10 @@ class TimeService:
     3. 時段判斷與轉換
     4. 用餐時間管理
     5. 用餐狀態追蹤 (新增)
+
+    時間一律換算成「當天的分鐘數」比較。用餐時間設定後會預先建立
+    一天 1440 分鐘的時段對照表，get_time_period 只需要查表;
+    修改 lunch_time / dinner_time 時才重新建立。
     """
 
     # 原本的類別變數保持不變
@@ -28,17 +54,109 @@ class TimeService:
             lunch_time: str - 中餐時間,格式 "HH:MM" 
             dinner_time: str - 晚餐時間,格式 "HH:MM"
         """
-        # 原有的時間設定
-        self.lunch_time = datetime.strptime(
+        # 原有的時間設定(設定時會重建時段對照表)
+        self._lunch_time = datetime.strptime(
             lunch_time, self.TIME_FORMAT).time()
-        self.dinner_time = datetime.strptime(
+        self._dinner_time = datetime.strptime(
             dinner_time, self.TIME_FORMAT).time()
+        self._rebuild_tables()
 
         # 新增狀態追蹤
         self.current_period = 'morning'  # 目前時段
         self.lunch_completed = False     # 中餐完成狀態
         self.dinner_completed = False    # 晚餐完成狀態
 
+    @property
+    def lunch_time(self) -> time:
+        """中餐時間"""
+        return self._lunch_time
+
+    @lunch_time.setter
+    def lunch_time(self, value: Union[time, str]) -> None:
+        if isinstance(value, str):
+            value = datetime.strptime(value, self.TIME_FORMAT).time()
+        self._lunch_time = value
+        self._rebuild_tables()
+
+    @property
+    def dinner_time(self) -> time:
+        """晚餐時間"""
+        return self._dinner_time
+
+    @dinner_time.setter
+    def dinner_time(self, value: Union[time, str]) -> None:
+        if isinstance(value, str):
+            value = datetime.strptime(value, self.TIME_FORMAT).time()
+        self._dinner_time = value
+        self._rebuild_tables()
+
+    def _rebuild_tables(self) -> None:
+        """依用餐時間建立分鐘數設定與一天的時段對照表
+
+        對照表與原本逐一比較 time 物件的規則相同:
+        - 用餐時段為用餐時間前後 MEAL_WINDOW 分鐘(含兩端,跨午夜時取餘數)
+        - 中餐時段前為 morning;中餐後依晚餐時段分為 afternoon/dinner/night
+        - 其餘情況(例如用餐時段跨午夜)依小時判斷
+        """
+        self.lunch_minutes = _minute_of_day(self._lunch_time)
+        self.dinner_minutes = _minute_of_day(self._dinner_time)
+
+        minutes = np.arange(MINUTES_PER_DAY)
+        lunch_start = (self.lunch_minutes - self.MEAL_WINDOW) % MINUTES_PER_DAY
+        lunch_end = (self.lunch_minutes + self.MEAL_WINDOW) % MINUTES_PER_DAY
+        dinner_start = (self.dinner_minutes - self.MEAL_WINDOW) % MINUTES_PER_DAY
+        dinner_end = (self.dinner_minutes + self.MEAL_WINDOW) % MINUTES_PER_DAY
+
+        # 依小時判斷的預設值
+        codes = np.select(
+            [minutes < 11 * 60, minutes < 14 * 60,
+             minutes < 17 * 60, minutes < 20 * 60],
+            [0, 1, 2, 3], default=4)
+
+        after_lunch = minutes > lunch_end
+        codes = np.where(
+            after_lunch,
+            np.where(minutes < dinner_start, 2,
+                     np.where(minutes <= dinner_end, 3, 4)),
+            codes)
+        codes = np.where((lunch_start <= minutes) & (minutes <= lunch_end), 1, codes)
+        codes = np.where(minutes < lunch_start, 0, codes)
+
+        self._period_codes = codes.astype(np.int8)
+        self._period_codes.setflags(write=False)
+
+    @property
+    def period_codes(self) -> np.ndarray:
+        """一天每分鐘的時段代碼(PERIODS 的索引),唯讀"""
+        return self._period_codes
+
+    def get_time_periods(self, minutes: np.ndarray) -> np.ndarray:
+        """批次判斷時段
+
+        Args:
+            minutes: 當天分鐘數的陣列(超過一天會取餘數)
+
+        Returns:
+            np.ndarray: 時段代碼陣列,PERIODS[code] 為時段名稱
+        """
+        minutes = np.asarray(minutes, dtype=np.int64) % MINUTES_PER_DAY
+        return self._period_codes[minutes]
+
+    def in_meal_window(self, minutes: np.ndarray, meal: str) -> np.ndarray:
+        """批次判斷是否在用餐時間前後 MEAL_WINDOW 分鐘內
+
+        與 advance_period 的時段轉換條件相同。
+
+        Args:
+            minutes: 當天分鐘數的陣列
+            meal: 'lunch' 或 'dinner'
+
+        Returns:
+            np.ndarray: 布林陣列
+        """
+        meal_minutes = self.lunch_minutes if meal == 'lunch' else self.dinner_minutes
+        return np.abs(np.asarray(minutes) - meal_minutes) <= self.MEAL_WINDOW
+
     def get_current_period(self, current_time: datetime) -> str:
         """判斷當前時段
 
@@ -55,33 +173,58 @@ class TimeService:
             str - 時段名稱('morning'/'lunch'/'afternoon'/'dinner'/'night')
         """
 
-        # 轉換為分鐘方便比較
+        next_period = self.advance_period(
+            self.current_period,
+            current_time,
+            self.lunch_completed,
+            self.dinner_completed
+        )
+
+        if next_period != self.current_period:
+            print(f"轉換時段: {self.current_period} -> {next_period}")
+            self.current_period = next_period
+
+        return self.current_period
+
+    def advance_period(self,
+                       period: str,
+                       current_time: datetime,
+                       lunch_completed: bool,
+                       dinner_completed: bool) -> str:
+        """計算時段轉換結果(不修改服務狀態)
+
+        與 get_current_period 使用相同的轉換規則，但狀態由呼叫端傳入，
+        讓同時追蹤多條候選行程的策略(例如 beam search)可以各自保存時段狀態。
+
+        Args:
+            period: str - 目前時段
+            current_time: datetime - 要判斷的時間點
+            lunch_completed: bool - 是否已完成中餐
+            dinner_completed: bool - 是否已完成晚餐
+
+        Returns:
+            str - 轉換後的時段名稱
+        """
         current_minutes = current_time.hour * 60 + current_time.minute
-        lunch_minutes = self.lunch_time.hour * 60 + self.lunch_time.minute
-        dinner_minutes = self.dinner_time.hour * 60 + self.dinner_time.minute
 
         # 時段轉換判斷
-        if self.current_period == 'morning':
-            if abs(current_minutes - lunch_minutes) <= self.MEAL_WINDOW:
-                self.current_period = 'lunch'
-                print("轉換時段: morning -> lunch")
-
-        elif self.current_period == 'lunch':
-            if self.lunch_completed:
-                self.current_period = 'afternoon'
-                print("轉換時段: lunch -> afternoon")
-
-        elif self.current_period == 'afternoon':
-            if abs(current_minutes - dinner_minutes) <= self.MEAL_WINDOW:
-                self.current_period = 'dinner'
-                print("轉換時段: afternoon -> dinner")
-
-        elif self.current_period == 'dinner':
-            if self.dinner_completed:
-                self.current_period = 'night'
-                print("轉換時段: dinner -> night")
+        if period == 'morning':
+            if abs(current_minutes - self.lunch_minutes) <= self.MEAL_WINDOW:
+                return 'lunch'
 
-        return self.current_period
+        elif period == 'lunch':
+            if lunch_completed:
+                return 'afternoon'
+
+        elif period == 'afternoon':
+            if abs(current_minutes - self.dinner_minutes) <= self.MEAL_WINDOW:
+                return 'dinner'
+
+        elif period == 'dinner':
+            if dinner_completed:
+                return 'night'
+
+        return period
 
     def update_meal_status(self, place_period: str) -> None:
         """更新用餐完成狀態
@@ -230,6 +373,7 @@ class TimeService:
                      - datetime 物件
                      - time 物件
                      - HH:MM 格式的時間字串
+                     - 當天的分鐘數
 
         Returns:
             str: 時段名稱
@@ -239,52 +383,7 @@ class TimeService:
             >>> time_service.get_time_period(now)
             >>> time_service.get_time_period("12:30")
         """
-        # 統一轉換為 time 物件
-        if isinstance(check_time, str):
-            time_obj = datetime.strptime(check_time, self.TIME_FORMAT).time()
-        elif isinstance(check_time, datetime):
-            time_obj = check_time.time()
-        else:
-            time_obj = check_time
-
-        # 根據用餐時間判斷時段
-        if self.lunch_time:
-            lunch_start = self._add_minutes_to_time(
-                self.lunch_time, -self.MEAL_WINDOW)
-            lunch_end = self._add_minutes_to_time(
-                self.lunch_time, self.MEAL_WINDOW)
-
-            if time_obj < lunch_start:
-                return 'morning'
-            elif lunch_start <= time_obj <= lunch_end:
-                return 'lunch'
-
-        if self.dinner_time:
-            dinner_start = self._add_minutes_to_time(
-                self.dinner_time, -self.MEAL_WINDOW)
-            dinner_end = self._add_minutes_to_time(
-                self.dinner_time, self.MEAL_WINDOW)
-
-            if (self.lunch_time and time_obj > self._add_minutes_to_time(self.lunch_time, self.MEAL_WINDOW)):
-                if time_obj < dinner_start:
-                    return 'afternoon'
-                elif dinner_start <= time_obj <= dinner_end:
-                    return 'dinner'
-                else:
-                    return 'night'
-
-        # 如果沒有設定用餐時間，根據時間判斷
-        hour = time_obj.hour
-        if hour < 11:
-            return 'morning'
-        elif hour < 14:
-            return 'lunch'
-        elif hour < 17:
-            return 'afternoon'
-        elif hour < 20:
-            return 'dinner'
-        else:
-            return 'night'
+        return self.PERIODS[self._period_codes[_minute_of_day(check_time)]]
 
     def _add_minutes_to_time(self, base_time: time, minutes: int) -> time:
         """將分鐘數加到時間上
@@ -330,6 +429,8 @@ class TimeService:
             Tuple[bool, Optional[int]]: 
             - 第一個值表示是否在營業時間內
             - 第二個值表示可停留時間（分鐘），若不在營業時間內則為None
+
+        時間以分鐘為單位比較，秒數不列入計算。
         """
         # 轉換時間格式
         if isinstance(current_time, str):
@@ -343,51 +444,91 @@ class TimeService:
         if weekday not in hours or not hours[weekday]:
             return False, None
 
-        # 取得當前時間的time物件
-        current_time = current_dt.time()
+        remaining = self._remaining_in_slots(
+            _minute_of_day(current_dt), hours[weekday])
+        if remaining is None:
+            return False, None
+        if duration_minutes > 0:
+            return True, min(remaining, duration_minutes)
+        return True, None
+
+    def _remaining_in_slots(self,
+                            current_minute: int,
+                            slots: List[Dict[str, str]]) -> Optional[int]:
+        """計算第一個包含指定時間的營業時段還能停留幾分鐘
+
+        營業時段包含結束的那一分鐘;跨日時段(結束早於開始)延續到隔天。
+
+        Args:
+            current_minute: 當天的分鐘數
+            slots: 當天的營業時段
 
-        # 檢查每個營業時段
-        for slot in hours[weekday]:
+        Returns:
+            Optional[int]: 到打烊的分鐘數,不在任何營業時段內則為 None
+        """
+        for slot in slots:
             if slot is None:
                 continue
 
-            start = datetime.strptime(slot['start'], self.TIME_FORMAT).time()
-            end = datetime.strptime(slot['end'], self.TIME_FORMAT).time()
-
-            # 處理跨日營業的情況
-            is_overnight = end < start
-
-            if is_overnight:
-                # 跨日營業的邏輯
-                if start <= current_time or current_time <= end:
-                    if duration_minutes > 0:
-                        # 計算剩餘可停留時間
-                        if current_time >= start:
-                            # 計算到午夜的時間加上隔天到結束的時間
-                            remaining = self._calculate_overnight_duration(
-                                current_time, end)
-                        else:
-                            # 計算到結束時間的分鐘數
-                            remaining = self._calculate_duration(
-                                current_time, end)
-
-                        if remaining >= duration_minutes:
-                            return True, duration_minutes
-                        else:
-                            return True, remaining
-                    return True, None
+            start = _slot_minutes(slot['start'])
+            end = _slot_minutes(slot['end'])
+
+            if end < start:
+                # 跨日營業: 開始後算到隔天打烊,凌晨則直接算到打烊
+                if current_minute >= start:
+                    return MINUTES_PER_DAY - current_minute + end
+                if current_minute <= end:
+                    return end - current_minute
+            elif start <= current_minute <= end:
+                return end - current_minute
+
+        return None
+
+    def is_business_hours_batch(self,
+                                minutes: np.ndarray,
+                                weekday: int,
+                                hours: Dict[int, List[Dict[str, str]]],
+                                duration_minutes: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """批次檢查同一天多個時間點是否在營業時間內
+
+        與 is_business_hours 的規則相同,適合一次評估多個抵達時間。
+
+        Args:
+            minutes: 當天分鐘數的陣列
+            weekday: 1-7 代表週一到週日
+            hours: 營業時間設定
+            duration_minutes: 預計停留時間（分鐘）
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]:
+            - 布林陣列，表示是否在營業時間內
+            - 可停留分鐘數(最多 duration_minutes)，不在營業時間內為 -1；
+              duration_minutes 為 0 時為到打烊的分鐘數
+        """
+        minutes = np.asarray(minutes, dtype=np.int64)
+        remaining = np.full(minutes.shape, -1, dtype=np.int64)
+
+        # 依時段順序處理,只填入尚未被前面時段命中的時間點
+        for slot in hours.get(weekday) or []:
+            if slot is None:
+                continue
+            start = _slot_minutes(slot['start'])
+            end = _slot_minutes(slot['end'])
+            pending = remaining < 0
+            if end < start:
+                evening = pending & (minutes >= start)
+                early = pending & ~evening & (minutes <= end)
+                remaining[evening] = MINUTES_PER_DAY - minutes[evening] + end
+                remaining[early] = end - minutes[early]
             else:
-                # 一般營業時間的邏輯
-                if start <= current_time <= end:
-                    if duration_minutes > 0:
-                        remaining = self._calculate_duration(current_time, end)
-                        if remaining >= duration_minutes:
-                            return True, duration_minutes
-                        else:
-                            return True, remaining
-                    return True, None
-
-        return False, None
+                hit = pending & (start <= minutes) & (minutes <= end)
+                remaining[hit] = end - minutes[hit]
+
+        is_open = remaining >= 0
+        if duration_minutes > 0:
+            remaining = np.where(is_open,
+                                 np.minimum(remaining, duration_minutes), -1)
+        return is_open, remaining
 
     @classmethod
     def is_time_in_range(cls, check_time: time, start: time, end: time, allow_overnight: bool = False) -> bool:
@@ -526,11 +667,12 @@ class TimeService:
         else:
             current_dt = current_time
 
+        current_minute = _minute_of_day(current_dt)
+        current_weekday = current_dt.isoweekday()
+
         # 檢查未來7天的時間
         for day_offset in range(7):
-            # 計算要檢查的日期
-            check_dt = current_dt + timedelta(days=day_offset)
-            weekday = check_dt.isoweekday()
+            weekday = (current_weekday - 1 + day_offset) % 7 + 1
 
             # 檢查該天是否有營業
             if weekday not in business_hours:
@@ -545,29 +687,21 @@ class TimeService:
                 if slot is None:
                     continue
 
-                start_time = datetime.strptime(
-                    slot['start'], self.TIME_FORMAT).time()
-                end_time = datetime.strptime(
-                    slot['end'], self.TIME_FORMAT).time()
+                start = _slot_minutes(slot['start'])
+                end = _slot_minutes(slot['end'])
 
                 # 如果是當天，需要考慮現在的時間
-                if day_offset == 0:
-                    if start_time <= check_dt.time():
-                        continue
+                if day_offset == 0 and start <= current_minute:
+                    continue
 
                 # 計算可用時間長度
-                available_duration = self._calculate_duration(
-                    start_time, end_time)
-                if available_duration >= duration_minutes:
-                    # 計算需要等待的時間
-                    wait_minutes = self._calculate_wait_minutes(
-                        current_dt, check_dt, start_time)
-
+                if end - start >= duration_minutes:
                     return {
                         'day': weekday,
                         'start': slot['start'],
                         'end': slot['end'],
-                        'wait_minutes': wait_minutes
+                        'wait_minutes': (day_offset * MINUTES_PER_DAY +
+                                         start - current_minute)
                     }
 
         return None
@@ -589,6 +723,6 @@ class TimeService:
         Returns:
             int: 需要等待的分鐘數
         """
-        target_dt = datetime.combine(target_dt.date(), target_time)
-        delta = target_dt - current_dt
-        return int(delta.total_seconds() / 60)
+        days = (target_dt.date() - current_dt.date()).days
+        return (days * MINUTES_PER_DAY +
+                _minute_of_day(target_time) - _minute_of_day(current_dt))
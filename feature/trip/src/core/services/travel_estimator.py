@@ -0,0 +1,349 @@
+# src/core/services/travel_estimator.py
+
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+# 校正係數的鍵值: (交通方式, 時段區間, 距離區間),None 表示不分
+CorrectionKey = Tuple[str, Optional[int], Optional[int]]
+
+
+class TravelTimeEstimator:
+    """離線的交通時間估算器
+
+    以直線距離、各交通方式的速度與曲折係數估算交通時間與路程，
+    並可以從快取中的 Google 實際路線學習校正係數:
+
+    1. 依 交通方式 × 出發時段 × 距離區間 分組，
+       每組取 實際時間 / 基本估算 的中位數作為校正係數
+    2. 樣本數不足 MIN_SAMPLES 的組別依序退回
+       (交通方式, 距離區間) -> (交通方式) -> 不校正
+    3. 校正結果可存成 JSON 檔，下次啟動時直接載入
+
+    未校正時的結果與原本 GeoService 的預估方式完全相同。
+
+    使用範例:
+        >>> estimator = TravelTimeEstimator()
+        >>> estimator.fit(geo_service.collect_route_samples())
+        >>> estimator.estimate_minutes(np.array([1.2, 5.0]), 'driving', 8 * 60)
+        >>> estimator.save('cache/travel_estimator.json')
+    """
+
+    # 預設的移動速度(公里/小時)
+    DEFAULT_SPEEDS = {
+        'driving': 40,
+        'transit': 30,
+        'walking': 5,
+        'bicycling': 15
+    }
+
+    # 路程曲折係數(實際路程通常比直線距離長)
+    DISTANCE_FACTORS = {'driving': 1.3}
+    DEFAULT_DISTANCE_FACTOR = 1.2
+
+    # 時間係數(開車考慮紅綠燈等因素)
+    TIME_FACTORS = {'driving': 1.4}
+    DEFAULT_TIME_FACTOR = 1.3
+
+    # 出發時段的分界(當天分鐘數):
+    # 凌晨、上午尖峰、白天、下午尖峰、晚上
+    TIME_BAND_EDGES = (7 * 60, 10 * 60, 16 * 60, 19 * 60)
+
+    # 直線距離區間的分界(公里)
+    DISTANCE_BAND_EDGES = (1.0, 3.0, 10.0)
+
+    # 一個組別至少需要的樣本數
+    MIN_SAMPLES = 5
+
+    # 太短的路線誤差主要來自上下車與找路，不列入學習
+    MIN_SAMPLE_KM = 0.1
+
+    FORMAT_VERSION = 1
+
+    def __init__(self,
+                 time_corrections: Optional[Dict[CorrectionKey, float]] = None,
+                 distance_corrections: Optional[Dict[CorrectionKey, float]] = None,
+                 stats: Optional[Dict] = None):
+        """初始化
+
+        Args:
+            time_corrections: 交通時間的校正係數(選填,一般由 fit 產生)
+            distance_corrections: 路程距離的校正係數(選填)
+            stats: 校正時計算的誤差統計(選填)
+        """
+        self.time_corrections: Dict[CorrectionKey, float] = dict(time_corrections or {})
+        self.distance_corrections: Dict[CorrectionKey, float] = dict(distance_corrections or {})
+        self.stats: Dict = dict(stats or {})
+
+    @property
+    def is_calibrated(self) -> bool:
+        """是否已有校正係數"""
+        return bool(self.time_corrections)
+
+    @classmethod
+    def time_band(cls, departure_minute: Optional[int]) -> Optional[int]:
+        """出發時間(當天分鐘數)所屬的時段區間,未指定時為 None"""
+        if departure_minute is None:
+            return None
+        return int(np.searchsorted(cls.TIME_BAND_EDGES,
+                                   int(departure_minute) % (24 * 60),
+                                   side='right'))
+
+    @classmethod
+    def distance_bands(cls, distance_km: np.ndarray) -> np.ndarray:
+        """直線距離所屬的距離區間"""
+        return np.searchsorted(cls.DISTANCE_BAND_EDGES, distance_km, side='right')
+
+    def base_minutes(self,
+                     distance_km: Union[float, np.ndarray],
+                     mode: str = 'driving') -> np.ndarray:
+        """未校正的交通時間(分鐘,浮點數)"""
+        speed = self.DEFAULT_SPEEDS.get(mode, self.DEFAULT_SPEEDS['driving'])
+        time_factor = self.TIME_FACTORS.get(mode, self.DEFAULT_TIME_FACTOR)
+        return np.asarray(distance_km, dtype=float) / speed * 60 * time_factor
+
+    def base_distance(self,
+                      distance_km: Union[float, np.ndarray],
+                      mode: str = 'driving') -> np.ndarray:
+        """未校正的路程距離(公里)"""
+        factor = self.DISTANCE_FACTORS.get(mode, self.DEFAULT_DISTANCE_FACTOR)
+        return np.asarray(distance_km, dtype=float) * factor
+
+    def _factors(self,
+                 corrections: Dict[CorrectionKey, float],
+                 distance_km: np.ndarray,
+                 mode: str,
+                 departure_minute: Optional[int]) -> np.ndarray:
+        """依距離區間查詢校正係數(找不到的組別依序退回較粗的分組)"""
+        if not corrections:
+            return np.ones(np.shape(distance_km))
+
+        band = self.time_band(departure_minute)
+        lookup = []
+        for distance_band in range(len(self.DISTANCE_BAND_EDGES) + 1):
+            for key in ((mode, band, distance_band),
+                        (mode, None, distance_band),
+                        (mode, None, None)):
+                if key in corrections:
+                    lookup.append(corrections[key])
+                    break
+            else:
+                lookup.append(1.0)
+
+        return np.asarray(lookup)[self.distance_bands(distance_km)]
+
+    def estimate_minutes(self,
+                         distance_km: Union[float, np.ndarray],
+                         mode: str = 'driving',
+                         departure_minute: Optional[int] = None) -> np.ndarray:
+        """由直線距離估算交通時間,支援整個距離陣列
+
+        Args:
+            distance_km: 直線距離(公里),純量或陣列
+            mode: 交通方式
+            departure_minute: 出發時間(當天分鐘數),選填
+
+        Returns:
+            np.ndarray: 無條件捨去的整數分鐘數
+        """
+        distance_km = np.asarray(distance_km, dtype=float)
+        minutes = self.base_minutes(distance_km, mode) * self._factors(
+            self.time_corrections, distance_km, mode, departure_minute)
+        return np.floor(minutes).astype(int)
+
+    def estimate_distance(self,
+                          distance_km: Union[float, np.ndarray],
+                          mode: str = 'driving',
+                          departure_minute: Optional[int] = None) -> np.ndarray:
+        """由直線距離估算路程距離(公里)"""
+        distance_km = np.asarray(distance_km, dtype=float)
+        return self.base_distance(distance_km, mode) * self._factors(
+            self.distance_corrections, distance_km, mode, departure_minute)
+
+    def fit(self, samples: Iterable[Dict]) -> Dict:
+        """從實際路線學習校正係數
+
+        Args:
+            samples: 實際路線樣本,每筆包含:
+                - mode: str - 交通方式
+                - straight_km: float - 直線距離
+                - duration_minutes: float - 實際交通時間
+                - distance_km: float - 實際路程(選填)
+                - departure_minute: int - 出發時間(當天分鐘數,選填)
+
+        Returns:
+            Dict: 誤差統計,與 self.stats 相同
+        """
+        samples = [sample for sample in samples
+                   if sample.get('straight_km', 0) >= self.MIN_SAMPLE_KM and
+                   sample.get('duration_minutes') is not None]
+
+        before = self.evaluate(samples, calibrated=False)
+        self.time_corrections = self._fit_ratios(samples, 'duration_minutes')
+        self.distance_corrections = self._fit_ratios(samples, 'distance_km')
+        self.stats = {
+            'samples': len(samples),
+            'groups': len(self.time_corrections),
+            'before': before,
+            'after': self.evaluate(samples),
+        }
+        return self.stats
+
+    def _fit_ratios(self,
+                    samples: List[Dict],
+                    field: str) -> Dict[CorrectionKey, float]:
+        """依各層分組計算 實際值 / 基本估算 的中位數"""
+        groups: Dict[CorrectionKey, List[float]] = {}
+        for sample in samples:
+            actual = sample.get(field)
+            if actual is None:
+                continue
+            mode = sample['mode']
+            straight_km = float(sample['straight_km'])
+            if field == 'duration_minutes':
+                base = float(self.base_minutes(straight_km, mode))
+            else:
+                base = float(self.base_distance(straight_km, mode))
+            if base <= 0:
+                continue
+
+            ratio = float(actual) / base
+            band = self.time_band(sample.get('departure_minute'))
+            distance_band = int(self.distance_bands(straight_km))
+            keys = [(mode, None, None), (mode, None, distance_band)]
+            if band is not None:
+                keys.append((mode, band, distance_band))
+            for key in keys:
+                groups.setdefault(key, []).append(ratio)
+
+        return {key: float(np.median(ratios))
+                for key, ratios in groups.items()
+                if len(ratios) >= self.MIN_SAMPLES}
+
+    def evaluate(self,
+                 samples: Sequence[Dict],
+                 calibrated: bool = True) -> Dict:
+        """計算估算交通時間的誤差
+
+        Args:
+            samples: 與 fit 相同格式的樣本
+            calibrated: False 時以未校正的估算計算(比較用)
+
+        Returns:
+            Dict: {
+                'count': int,
+                'mae_minutes': float,     # 平均絕對誤差
+                'bias_minutes': float,    # 平均誤差(正值表示高估)
+                'p90_abs_minutes': float, # 絕對誤差的第 90 百分位數
+                'mape': float,            # 平均絕對百分比誤差
+                'by_mode': {交通方式: 同上(不含 by_mode)}
+            }
+        """
+        errors: Dict[str, List[Tuple[float, float]]] = {}
+        for sample in samples:
+            if sample.get('duration_minutes') is None:
+                continue
+            mode = sample['mode']
+            if calibrated:
+                estimate = float(self.estimate_minutes(
+                    sample['straight_km'], mode, sample.get('departure_minute')))
+            else:
+                estimate = math.floor(float(self.base_minutes(
+                    sample['straight_km'], mode)))
+            actual = float(sample['duration_minutes'])
+            errors.setdefault(mode, []).append((estimate - actual, actual))
+
+        report = self._error_summary(
+            [item for items in errors.values() for item in items])
+        report['by_mode'] = {mode: self._error_summary(items)
+                             for mode, items in sorted(errors.items())}
+        return report
+
+    @staticmethod
+    def _error_summary(errors: List[Tuple[float, float]]) -> Dict:
+        """(誤差, 實際值) 列表的統計"""
+        if not errors:
+            return {'count': 0, 'mae_minutes': None, 'bias_minutes': None,
+                    'p90_abs_minutes': None, 'mape': None}
+
+        diff = np.array([error for error, _ in errors])
+        actual = np.array([value for _, value in errors])
+        positive = actual > 0
+        return {
+            'count': len(errors),
+            'mae_minutes': round(float(np.mean(np.abs(diff))), 2),
+            'bias_minutes': round(float(np.mean(diff)), 2),
+            'p90_abs_minutes': round(float(np.percentile(np.abs(diff), 90)), 2),
+            'mape': (round(float(np.mean(np.abs(diff[positive]) / actual[positive])), 4)
+                     if positive.any() else None),
+        }
+
+    def to_dict(self) -> Dict:
+        """轉為可存成 JSON 的字典"""
+        def encode(corrections):
+            return [{'mode': mode, 'time_band': band,
+                     'distance_band': distance_band, 'factor': factor}
+                    for (mode, band, distance_band), factor
+                    in sorted(corrections.items(), key=str)]
+
+        return {
+            'version': self.FORMAT_VERSION,
+            'time_corrections': encode(self.time_corrections),
+            'distance_corrections': encode(self.distance_corrections),
+            'stats': self.stats,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TravelTimeEstimator':
+        """從 to_dict 的結果還原
+
+        異常:
+            ValueError: 格式版本不符
+        """
+        if data.get('version') != cls.FORMAT_VERSION:
+            raise ValueError(f"不支援的估算器格式版本: {data.get('version')}")
+
+        def decode(items):
+            return {(item['mode'], item['time_band'], item['distance_band']):
+                    float(item['factor']) for item in items}
+
+        return cls(
+            time_corrections=decode(data.get('time_corrections', [])),
+            distance_corrections=decode(data.get('distance_corrections', [])),
+            stats=data.get('stats')
+        )
+
+    def save(self, path: str) -> None:
+        """把校正結果存成 JSON 檔"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> 'TravelTimeEstimator':
+        """載入校正結果
+
+        檔案不存在或無法讀取時回傳未校正的估算器。
+
+        Args:
+            path: JSON 檔路徑,空值表示不使用校正
+
+        Returns:
+            TravelTimeEstimator: 估算器
+        """
+        if not path or not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"警告：無法載入交通時間估算器,使用預設值: {str(e)}")
+            return cls()
+
+
+__all__ = ['TravelTimeEstimator']
@@ -0,0 +1,353 @@
+# src/core/utils/cache_backend.py
+
+import fnmatch
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional, Union
+
+
+Value = Union[bytes, str]
+
+
+class CacheBackend:
+    """持久化快取後端的介面
+
+    介面刻意與 Redis 用戶端(redis.Redis)相容的子集合一致:
+    - get(key) -> Optional[bytes]
+    - set(key, value, ex=None)  # ex: 存活秒數
+    - delete(*keys)
+    - scan_iter(match)  # 依 glob 樣式列出鍵值(選用,校正估算器時使用)
+
+    因此可以直接把 redis.Redis 實例當作後端使用，
+    本地則使用 SQLiteCacheBackend 或 MemoryCacheBackend。
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Value, ex: Optional[int] = None) -> bool:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> int:
+        raise NotImplementedError
+
+    def scan_iter(self, match: str = '*') -> Iterator[str]:
+        """列出符合 glob 樣式且未過期的鍵值"""
+        raise NotImplementedError
+
+    def info(self) -> Dict:
+        """後端的統計資訊"""
+        return {}
+
+
+class _Metrics:
+    """執行緒安全的計數器"""
+
+    def __init__(self, *names: str):
+        self._lock = threading.Lock()
+        self._counts = {name: 0 for name in names}
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+def _to_bytes(value: Value) -> bytes:
+    """統一轉為 bytes,與 Redis 的行為一致"""
+    return value.encode('utf-8') if isinstance(value, str) else bytes(value)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """單一行程內的記憶體後端
+
+    主要作為測試用的本地替代品，行為與 Redis 的 get/set/delete 一致，
+    支援 TTL 與最大筆數限制(超過時移除最早寫入的項目)。
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """初始化
+
+        Args:
+            max_entries: 最大快取筆數
+        """
+        self.max_entries = max_entries
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._metrics = _Metrics('hits', 'misses', 'sets', 'expired', 'evictions')
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._metrics.incr('misses')
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                self._metrics.incr('expired')
+                self._metrics.incr('misses')
+                return None
+
+            self._metrics.incr('hits')
+            return value
+
+    def set(self, key: str, value: Value, ex: Optional[int] = None) -> bool:
+        expires_at = time.time() + ex if ex else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (_to_bytes(value), expires_at)
+            self._metrics.incr('sets')
+
+            while len(self._data) > self.max_entries:
+                oldest_key = next(iter(self._data))
+                del self._data[oldest_key]
+                self._metrics.incr('evictions')
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    removed += 1
+            return removed
+
+    def scan_iter(self, match: str = '*') -> Iterator[str]:
+        now = time.time()
+        with self._lock:
+            keys = [key for key, (_, expires_at) in self._data.items()
+                    if expires_at is None or expires_at > now]
+        return iter(fnmatch.filter(keys, match))
+
+    def clear(self) -> None:
+        """清除所有項目"""
+        with self._lock:
+            self._data.clear()
+
+    def info(self) -> Dict:
+        with self._lock:
+            size = len(self._data)
+        return {
+            'backend': 'memory',
+            'size': size,
+            'max_entries': self.max_entries,
+            **self._metrics.snapshot()
+        }
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """以 SQLite 檔案實作的持久化快取後端
+
+    特點:
+    1. 重新啟動後資料仍然存在
+    2. 使用 WAL 模式，多個 gunicorn worker(多行程)可同時讀寫同一個檔案
+    3. 每個執行緒使用自己的連線，fork 後會自動重新連線
+    4. 支援 TTL 與最大筆數限制(定期清除過期與最舊的項目)
+    """
+
+    # 每寫入幾次檢查一次容量
+    PRUNE_INTERVAL = 100
+
+    def __init__(self,
+                 path: str,
+                 max_entries: int = 100000,
+                 timeout: float = 5.0):
+        """初始化
+
+        Args:
+            path: SQLite 檔案路徑,目錄不存在時會自動建立
+            max_entries: 最大快取筆數
+            timeout: 等待其他行程釋放鎖的秒數
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sets_since_prune = 0
+        self._prune_lock = threading.Lock()
+        self._metrics = _Metrics('hits', 'misses', 'sets', 'expired',
+                                 'evictions', 'errors')
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def _connection(self) -> sqlite3.Connection:
+        """取得目前執行緒(與行程)專用的連線"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            ' key TEXT PRIMARY KEY,'
+            ' value BLOB NOT NULL,'
+            ' expires_at REAL,'
+            ' created_at REAL NOT NULL)'
+        )
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_cache_created ON cache(created_at)')
+        conn.commit()
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None:
+                self._metrics.incr('misses')
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                with conn:
+                    conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+                self._metrics.incr('expired')
+                self._metrics.incr('misses')
+                return None
+
+            self._metrics.incr('hits')
+            return bytes(value)
+        except sqlite3.Error as e:
+            self._metrics.incr('errors')
+            print(f"警告：讀取快取失敗: {str(e)}")
+            return None
+
+    def set(self, key: str, value: Value, ex: Optional[int] = None) -> bool:
+        now = time.time()
+        expires_at = now + ex if ex else None
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache '
+                    '(key, value, expires_at, created_at) VALUES (?, ?, ?, ?)',
+                    (key, sqlite3.Binary(_to_bytes(value)), expires_at, now)
+                )
+            self._metrics.incr('sets')
+            self._maybe_prune()
+            return True
+        except sqlite3.Error as e:
+            self._metrics.incr('errors')
+            print(f"警告：寫入快取失敗: {str(e)}")
+            return False
+
+    def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        try:
+            conn = self._connection()
+            with conn:
+                cursor = conn.executemany(
+                    'DELETE FROM cache WHERE key = ?', [(k,) for k in keys])
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            self._metrics.incr('errors')
+            print(f"警告：刪除快取失敗: {str(e)}")
+            return 0
+
+    def scan_iter(self, match: str = '*') -> Iterator[str]:
+        # 先以樣式中第一個萬用字元前的前綴縮小範圍
+        prefix = match.split('*', 1)[0].split('?', 1)[0].split('[', 1)[0]
+        escaped = (prefix.replace('\\', '\\\\')
+                   .replace('%', '\\%').replace('_', '\\_'))
+        try:
+            rows = self._connection().execute(
+                "SELECT key FROM cache WHERE key LIKE ? ESCAPE '\\'"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (escaped + '%', time.time())
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._metrics.incr('errors')
+            print(f"警告：讀取快取失敗: {str(e)}")
+            return iter([])
+        return iter(fnmatch.filter([row[0] for row in rows], match))
+
+    def clear(self) -> None:
+        """清除所有項目"""
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM cache')
+
+    def prune(self) -> int:
+        """清除過期項目,並在超過容量時移除最舊的項目
+
+        Returns:
+            int: 移除的筆數
+        """
+        conn = self._connection()
+        with conn:
+            expired = conn.execute(
+                'DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                (time.time(),)
+            ).rowcount
+            count = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+            overflow = max(0, count - self.max_entries)
+            if overflow:
+                conn.execute(
+                    'DELETE FROM cache WHERE key IN ('
+                    ' SELECT key FROM cache ORDER BY created_at LIMIT ?)',
+                    (overflow,)
+                )
+
+        self._metrics.incr('expired', expired)
+        self._metrics.incr('evictions', overflow)
+        return expired + overflow
+
+    def _maybe_prune(self) -> None:
+        """每寫入 PRUNE_INTERVAL 次檢查一次容量"""
+        with self._prune_lock:
+            self._sets_since_prune += 1
+            if self._sets_since_prune < self.PRUNE_INTERVAL:
+                return
+            self._sets_since_prune = 0
+        self.prune()
+
+    def info(self) -> Dict:
+        try:
+            size = self._connection().execute(
+                'SELECT COUNT(*) FROM cache').fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'size': size,
+            'max_entries': self.max_entries,
+            **self._metrics.snapshot()
+        }
+
+
+def create_cache_backend(path: Optional[str],
+                         max_entries: int = 100000) -> Optional[CacheBackend]:
+    """依照設定建立快取後端
+
+    Args:
+        path: SQLite 檔案路徑,空值表示不使用持久化快取
+        max_entries: 最大快取筆數
+
+    Returns:
+        Optional[CacheBackend]: 快取後端,未設定時為 None
+    """
+    if not path:
+        return None
+    return SQLiteCacheBackend(path, max_entries=max_entries)
+
+
+__all__ = ['CacheBackend', 'MemoryCacheBackend', 'SQLiteCacheBackend',
+           'create_cache_backend']
@@ -0,0 +1,241 @@
+# src/core/utils/cache_core.py
+
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _NegativeEntry:
+    """失敗查詢的快取項目,保存當時拋出的例外"""
+
+    __slots__ = ('error',)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class LRUCache:
+    """執行緒安全的 LRU 快取核心
+
+    cached 與 geo_cache 共用的快取實作，提供:
+    1. 真正的 LRU: 命中時移到最前面(O(1)),容量滿時移除最久未使用的項目
+    2. 選填的 TTL: 過期的項目視為未命中
+    3. 負向快取: 失敗的查詢在 negative_ttl 秒內直接拋出相同例外,
+       避免對同一個無效輸入重複呼叫 API
+    4. 每個快取一把鎖，以及同一鍵值的併發計算只執行一次
+    5. cache_info(): 命中、未命中、淘汰次數與記憶體用量估計
+
+    使用範例:
+        >>> cache = LRUCache(maxsize=256, ttl=3600)
+        >>> route = cache.get_or_compute(key, lambda: fetch_route())
+        >>> cache.cache_info()['hits']
+    """
+
+    _MISSING = object()
+
+    def __init__(self,
+                 maxsize: int = 128,
+                 ttl: Optional[float] = None,
+                 negative_ttl: Optional[float] = None):
+        """初始化
+
+        Args:
+            maxsize: 最大快取筆數
+            ttl: 項目存活秒數,None 表示不過期
+            negative_ttl: 失敗查詢的快取秒數,None 表示不快取失敗
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        # key -> (value, expires_at, size_bytes)
+        self._data: 'OrderedDict[Hashable, Tuple[Any, Optional[float], int]]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._inflight: Dict[Hashable, threading.Lock] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._negative_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key) is not self._MISSING
+
+    def peek(self, key: Hashable) -> Any:
+        """查詢但不更新 LRU 順序與統計,找不到時回傳 LRUCache._MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._is_expired(entry):
+                return self._MISSING
+            return entry[0]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """取得快取值
+
+        負向快取的項目會直接拋出當初的例外。
+
+        Args:
+            key: 鍵值
+            default: 找不到時的回傳值
+
+        Returns:
+            Any: 快取值或 default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+
+            if self._is_expired(entry):
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            value = entry[0]
+            if isinstance(value, _NegativeEntry):
+                self._negative_hits += 1
+                raise value.error
+
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """寫入快取
+
+        Args:
+            key: 鍵值
+            value: 快取值
+            ttl: 本項目的存活秒數,未指定時使用預設 ttl
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        size = self._estimate_size(value)
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while len(self._data) > self.maxsize:
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def set_error(self, key: Hashable, error: BaseException) -> None:
+        """記錄失敗的查詢(只有設定 negative_ttl 時才會保存)"""
+        if self.negative_ttl:
+            self.set(key, _NegativeEntry(error), ttl=self.negative_ttl)
+
+    def delete(self, key: Hashable) -> bool:
+        """刪除項目
+
+        Returns:
+            bool: True 表示有刪除
+        """
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._remove(key)
+            return True
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """取得快取值,不存在時計算並寫入
+
+        同一個鍵值同時只會有一個執行緒在計算，其他執行緒等待結果，
+        避免多個 gunicorn 執行緒同時對同一段路線呼叫 API。
+
+        Args:
+            key: 鍵值
+            compute: 計算函數
+
+        Returns:
+            Any: 快取值或計算結果
+        """
+        value = self.get(key, self._MISSING)
+        if value is not self._MISSING:
+            return value
+
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+
+        with key_lock:
+            try:
+                # 等待期間其他執行緒可能已經完成計算
+                with self._lock:
+                    entry = self._data.get(key)
+                    ready = entry is not None and not self._is_expired(entry)
+                if ready:
+                    return self.get(key)
+
+                try:
+                    value = compute()
+                except Exception as e:
+                    self.set_error(key, e)
+                    raise
+
+                self.set(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """清除所有項目(統計資料保留)"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def keys(self):
+        """目前的鍵值,由最久未使用到最近使用"""
+        with self._lock:
+            return list(self._data.keys())
+
+    def cache_info(self) -> Dict[str, Any]:
+        """快取統計資訊"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self._hits,
+                'misses': self._misses,
+                'negative_hits': self._negative_hits,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'bytes': self._bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        """移除項目並更新用量(呼叫前需持有鎖)"""
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _is_expired(entry: Tuple[Any, Optional[float], int]) -> bool:
+        expires_at = entry[1]
+        return expires_at is not None and expires_at <= time.monotonic()
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """估計項目的記憶體用量(位元組)"""
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return sys.getsizeof(value)
+
+
+__all__ = ['LRUCache']
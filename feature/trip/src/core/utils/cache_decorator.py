@@ -1,135 +1,279 @@
 # src/core/utils/cache_decorator.py
 
+import inspect
+import json
+import threading
 from functools import wraps
-from typing import Callable, TypeVar
+from typing import Callable, Dict, Hashable, List, Optional, TypeVar
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from .cache_backend import CacheBackend
+from .cache_core import LRUCache
+from . import profiler
+
 T = TypeVar('T')  # 定義泛型型別，用於函數回傳值
 
 
-def cached(maxsize: int = 128) -> Callable:
+def cached(maxsize: int = 128,
+           ttl: Optional[float] = None,
+           negative_ttl: Optional[float] = None) -> Callable:
     """一般用途的快取裝飾器
 
-    用於快取一般函數的回傳值，適用於輸入參數簡單的情況
+    用於快取一般函數的回傳值，適用於輸入參數簡單的情況。
+    使用執行緒安全的 LRU 快取，可在多執行緒環境下共用。
 
     Args:
-        maxsize: int - 快取的最大容量，超過此容量將移除最舊的項目
+        maxsize: int - 快取的最大容量，超過此容量將移除最久未使用的項目
+        ttl: float - 項目存活秒數(選填)
+        negative_ttl: float - 執行失敗時快取例外的秒數(選填),
+                      未設定時失敗不會被快取
 
     Returns:
         Callable - 裝飾過的函數
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        cache = {}  # 使用字典儲存快取
+        cache = LRUCache(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
 
         @wraps(func)
         def wrapper(*args, **kwargs) -> T:
             # 產生快取的鍵值
-            key = str(args) + str(sorted(kwargs.items()))
-
-            # 如果結果在快取中，直接返回
-            if key in cache:
-                return cache[key]
+            key = _make_hashable_key(args, kwargs)
 
-            # 執行函數並存入快取
-            try:
-                result = func(*args, **kwargs)
-                cache[key] = result
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
 
-                # 如果快取太大，移除最舊的項目
-                if len(cache) > maxsize:
-                    oldest_key = next(iter(cache))
-                    del cache[oldest_key]
-
-                return result
-            except Exception as e:
-                # 如果執行出錯，清除快取並重新拋出異常
-                cache.clear()
-                raise e
-
-        # 加入清除快取的方法
-        wrapper.cache_clear = lambda: cache.clear()
+        # 加入輔助方法
+        wrapper.cache_clear = cache.clear
+        wrapper.cache_info = cache.cache_info
         return wrapper
     return decorator
 
 
-def geo_cache(maxsize: int = 256):
-    """地理位置專用的快取裝飾器"""
+def _make_hashable_key(args: tuple, kwargs: dict) -> Hashable:
+    """把函數參數轉成可雜湊的鍵值,無法雜湊時退回字串表示"""
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        return str(args) + str(sorted(kwargs.items()))
 
-    def make_cache_key(func_args: tuple, func_kwargs: dict) -> str:
-        """從函數參數建立快取鍵值
 
-        Args:
-            func_args: 原始函數的位置參數
-            func_kwargs: 原始函數的關鍵字參數
+def _format_point(point: Dict) -> str:
+    """座標在快取鍵值中的表示方式"""
+    return f"{float(point['lat']):.6f},{float(point['lon']):.6f}"
 
-        Returns:
-            str: 由座標和交通方式組成的唯一鍵值
-        """
-        try:
-            # 確認是否有足夠的參數（self, origin, destination, ...）
-            if len(func_args) < 3:
-                return f"default_key_{datetime.now(ZoneInfo('Asia/Taipei')).timestamp()}"
 
-            # 解析座標參數
-            origin = func_args[1]
-            destination = func_args[2]
-            mode = func_args[3] if len(func_args) > 3 else 'driving'
+def route_key_prefix(origin: Dict) -> str:
+    """從指定起點出發的路線鍵值前綴
 
-            # 檢查座標格式
-            if not isinstance(origin, dict) or not isinstance(destination, dict):
-                return f"invalid_format_key_{datetime.now(ZoneInfo('Asia/Taipei')).timestamp()}"
+    Args:
+        origin: Dict - 起點座標 {'lat': float, 'lon': float}
 
-            if 'lat' not in origin or 'lon' not in origin or \
-               'lat' not in destination or 'lon' not in destination:
-                return f"missing_coord_key_{datetime.now(ZoneInfo('Asia/Taipei')).timestamp()}"
+    Returns:
+        str: geo_cache 鍵值的前綴,可用來找出從該點出發的所有快取路線
+    """
+    return f"route:{_format_point(origin)}_"
+
+
+def geo_cache(maxsize: int = 256,
+              backend: Optional[CacheBackend] = None,
+              ttl: Optional[int] = None,
+              time_bucket_minutes: int = 30,
+              negative_ttl: Optional[float] = None):
+    """地理位置專用的快取裝飾器
 
-            # 建立標準化的鍵值
-            key = (f"{float(origin['lat']):.6f},{float(origin['lon']):.6f}_"
-                   f"{float(destination['lat']):.6f},{float(destination['lon']):.6f}_"
-                   f"{mode}")
+    兩層快取:
+    1. 行程內的 LRU 快取(最多 maxsize 筆,執行緒安全)
+    2. 選填的持久化後端(SQLite 檔案或 Redis 相容用戶端)，
+       重新啟動後仍然有效，並可在多個 worker 之間共用
 
-            return key
+    鍵值由起訖座標、交通方式與出發時間所在的時段組成。
 
-        except Exception as e:
-            print(f"建立快取鍵值時發生錯誤: {str(e)}")
-            return f"error_key_{datetime.now(ZoneInfo('Asia/Taipei')).timestamp()}"
+    Args:
+        maxsize: int - 行程內快取的最大容量
+        backend: CacheBackend - 持久化後端(選填)
+        ttl: int - 項目的存活秒數(選填,兩層共用)
+        time_bucket_minutes: int - 出發時間的分段長度(分鐘)
+        negative_ttl: float - 執行失敗時快取例外的秒數(選填)
+    """
 
     def decorator(func):
-        # 使用字典儲存快取
-        cache = {}
+        signature = inspect.signature(func)
+
+        # 行程內的 LRU 快取
+        cache = LRUCache(maxsize=maxsize, ttl=ttl, negative_ttl=negative_ttl)
+        state = {'backend': backend}
+        stats_lock = threading.Lock()
+        stats = {'backend_hits': 0, 'backend_errors': 0}
+
+        def count(name: str) -> None:
+            with stats_lock:
+                stats[name] += 1
+
+        def time_bucket(departure_time: Optional[datetime]) -> str:
+            """計算出發時間所屬的時段編號,未指定時使用現在時間"""
+            if departure_time is None:
+                departure_time = datetime.now(ZoneInfo('Asia/Taipei'))
+            minutes = departure_time.hour * 60 + departure_time.minute
+            return f"t{minutes // time_bucket_minutes}"
+
+        def make_cache_key(func_args: tuple, func_kwargs: dict) -> Optional[str]:
+            """從函數參數建立快取鍵值
+
+            Args:
+                func_args: 原始函數的位置參數
+                func_kwargs: 原始函數的關鍵字參數
+
+            Returns:
+                Optional[str]: 由座標、交通方式和出發時段組成的唯一鍵值,
+                               參數無法辨識時為 None(不使用快取)
+            """
+            try:
+                bound = signature.bind(*func_args, **func_kwargs)
+                bound.apply_defaults()
+                arguments = bound.arguments
 
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # 使用 make_cache_key 建立鍵值
-            cache_key = make_cache_key(args, kwargs)
+                origin = arguments.get('origin')
+                destination = arguments.get('destination')
+                mode = arguments.get('mode') or 'driving'
 
-            # 檢查快取
-            if cache_key in cache:
-                print(f"使用快取的路線資訊: {cache_key}")
-                return cache[cache_key]
+                # 檢查座標格式
+                if not isinstance(origin, dict) or not isinstance(destination, dict):
+                    return None
 
-            # 執行原始函數
-            result = func(*args, **kwargs)
+                # 建立標準化的鍵值
+                return (f"{route_key_prefix(origin)}"
+                        f"{_format_point(destination)}_"
+                        f"{mode}_"
+                        f"{time_bucket(arguments.get('departure_time'))}")
 
-            # 存入快取
-            cache[cache_key] = result
-            # print(f"新增路線資訊到快取: {cache_key}")
+            except Exception as e:
+                print(f"建立快取鍵值時發生錯誤: {str(e)}")
+                return None
 
-            # 管理快取大小
-            if len(cache) > maxsize:
-                oldest_key = next(iter(cache))
-                del cache[oldest_key]
+        def backend_get(cache_key: str):
+            """查詢持久化後端,找不到或失敗時回傳 None"""
+            if state['backend'] is None:
+                return None
+            try:
+                raw = state['backend'].get(cache_key)
+            except Exception as e:
+                count('backend_errors')
+                print(f"讀取持久化快取失敗: {str(e)}")
+                return None
+            if raw is None:
+                return None
+            count('backend_hits')
+            return json.loads(raw)
+
+        def backend_set(cache_key: str, result) -> None:
+            """寫入持久化後端;預估的結果不寫入"""
+            if state['backend'] is None:
+                return
+            if isinstance(result, dict) and result.get('is_estimated'):
+                return
+            try:
+                state['backend'].set(
+                    cache_key,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    ex=ttl
+                )
+            except Exception as e:
+                count('backend_errors')
+                print(f"寫入持久化快取失敗: {str(e)}")
+
+        def cache_get(cache_key: str):
+            """依序查詢行程內快取與持久化後端,找不到時回傳 None
+
+            找到時計入 profiler 的 route_cache.hits;找不到時由呼叫端
+            在實際取得路線時計入 route_cache.misses。
+            """
+            result = cache.get(cache_key)
+            if result is None:
+                result = backend_get(cache_key)
+                if result is not None:
+                    cache.set(cache_key, result)
+            if result is not None:
+                profiler.count('route_cache.hits')
+            return result
 
+        def cache_set(cache_key: str, result) -> None:
+            """同時寫入兩層快取"""
+            cache.set(cache_key, result)
+            backend_set(cache_key, result)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # 使用 make_cache_key 建立鍵值
+            cache_key = make_cache_key(args, kwargs)
+            if cache_key is None:
+                return func(*args, **kwargs)
+
+            computed = []
+
+            def compute():
+                # 行程內未命中時先查持久化後端,再執行原始函數
+                result = backend_get(cache_key)
+                if result is None:
+                    computed.append(True)
+                    result = func(*args, **kwargs)
+                    backend_set(cache_key, result)
+                return result
+
+            result = cache.get_or_compute(cache_key, compute)
+            profiler.count('route_cache.misses' if computed
+                           else 'route_cache.hits')
             return result
 
+        def scan_keys(prefix: str = '') -> List[str]:
+            """列出兩層快取中以 prefix 開頭的鍵值
+
+            持久化後端需支援 scan_iter(與 Redis 相同),不支援時只列出行程內快取。
+            """
+            keys = {key for key in cache.keys()
+                    if isinstance(key, str) and key.startswith(prefix)}
+            scan = getattr(state['backend'], 'scan_iter', None)
+            if scan is not None:
+                try:
+                    for key in scan(match=prefix + '*'):
+                        keys.add(key.decode('utf-8') if isinstance(key, bytes)
+                                 else key)
+                except Exception as e:
+                    count('backend_errors')
+                    print(f"讀取持久化快取失敗: {str(e)}")
+            return sorted(keys)
+
+        def set_backend(new_backend: Optional[CacheBackend]) -> None:
+            """更換持久化後端(例如改用 Redis 用戶端)"""
+            state['backend'] = new_backend
+
+        def get_backend() -> Optional[CacheBackend]:
+            """目前的持久化後端(暫時更換後用來還原)"""
+            return state['backend']
+
+        def cache_info() -> Dict:
+            info = cache.cache_info()
+            with stats_lock:
+                info.update(stats)
+            # 兩層都沒有命中才算真正的未命中
+            info['misses'] = info['misses'] - info['backend_hits']
+            info['keys'] = cache.keys()
+            if state['backend'] is not None and hasattr(state['backend'], 'info'):
+                info['backend'] = state['backend'].info()
+            return info
+
         # 加入輔助方法
-        wrapper.cache_clear = lambda: cache.clear()
-        wrapper.cache_info = lambda: {
-            'size': len(cache),
-            'maxsize': maxsize,
-            'keys': list(cache.keys())
-        }
+        wrapper.cache_clear = cache.clear
+        wrapper.cache_info = cache_info
+        wrapper.cache_keys = cache.keys
+        wrapper.scan_keys = scan_keys
+        wrapper.time_bucket_minutes = time_bucket_minutes
+        wrapper.cache_key = lambda *args, **kwargs: make_cache_key(args, kwargs)
+        wrapper.cache_get = cache_get
+        wrapper.cache_set = cache_set
+        wrapper.set_backend = set_backend
+        wrapper.get_backend = get_backend
 
         return wrapper
 
@@ -137,4 +281,4 @@ def geo_cache(maxsize: int = 256):
 
 
 # 匯出可用的裝飾器
-__all__ = ['cached', 'geo_cache']
+__all__ = ['cached', 'geo_cache', 'route_key_prefix']
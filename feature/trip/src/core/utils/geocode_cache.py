@@ -0,0 +1,213 @@
+# src/core/utils/geocode_cache.py
+
+import json
+import re
+import threading
+import unicodedata
+from typing import Callable, Dict, Optional
+
+from .cache_backend import CacheBackend
+from .cache_core import LRUCache
+
+
+# 常見的地名別稱,統一對應到同一個查詢字串
+# 鍵值與對應值都要是 normalize_address 處理後的格式
+GEOCODE_ALIASES = {
+    '臺北車站': '台北車站',
+    '北車': '台北車站',
+    '台北火車站': '台北車站',
+    '臺北火車站': '台北車站',
+    'taipei main station': '台北車站',
+    'taipei station': '台北車站',
+    '中壢車站': '中壢火車站',
+    '中壢站': '中壢火車站',
+    '桃園車站': '桃園火車站',
+    '新竹車站': '新竹火車站',
+    '台中車站': '台中火車站',
+    '臺中車站': '台中火車站',
+    '臺中火車站': '台中火車站',
+    '高雄車站': '高雄火車站',
+    '台北101': '台北101',
+    '臺北101': '台北101',
+    '101大樓': '台北101',
+}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_address(address: str) -> str:
+    """標準化地址或地名,作為快取鍵值
+
+    處理步驟:
+    1. NFKC 正規化(全形英數字與空白轉為半形)
+    2. 去除前後空白，連續空白縮為一個
+    3. 英文轉小寫
+    4. 「臺」統一為「台」後查詢別稱表
+
+    Args:
+        address: 地址或地點名稱
+
+    Returns:
+        str: 標準化後的字串
+
+    使用範例:
+        >>> normalize_address(' 臺北車站 ')
+        '台北車站'
+        >>> normalize_address('ＴＡＩＰＥＩ　１０１')
+        'taipei 101'
+    """
+    text = unicodedata.normalize('NFKC', str(address))
+    text = _WHITESPACE.sub(' ', text).strip().lower()
+
+    alias = GEOCODE_ALIASES.get(text)
+    if alias is not None:
+        return alias
+
+    text = text.replace('臺', '台')
+    return GEOCODE_ALIASES.get(text, text)
+
+
+class GeocodeCache:
+    """地理編碼的兩層快取
+
+    1. 行程內的 LRU 快取(以標準化後的地名為鍵值)
+    2. 選填的持久化後端(與路線快取相同的 SQLite / Redis 介面)
+
+    只保存座標與 Google 回傳的正式地址，回傳給呼叫端的字典由
+    GeoService 依照使用者輸入的名稱重新組合。
+    查無結果的地名只在行程內做短暫的負向快取，不寫入持久化後端。
+
+    使用範例:
+        >>> cache = GeocodeCache(backend=SQLiteCacheBackend('geo.sqlite3'))
+        >>> cache.get_or_fetch('台北車站', lambda q: fetch(q))
+        {'lat': 25.0478, 'lon': 121.5170, 'formatted_address': '...'}
+    """
+
+    KEY_PREFIX = 'geocode:'
+
+    def __init__(self,
+                 backend: Optional[CacheBackend] = None,
+                 ttl: Optional[int] = None,
+                 maxsize: int = 1024,
+                 negative_ttl: Optional[float] = 600):
+        """初始化
+
+        Args:
+            backend: 持久化後端,None 表示只使用行程內快取
+            ttl: 項目存活秒數(兩層共用)
+            maxsize: 行程內快取的最大筆數
+            negative_ttl: 查無結果時的快取秒數
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl,
+                                negative_ttl=negative_ttl)
+        self._stats_lock = threading.Lock()
+        self._stats = {'backend_hits': 0, 'backend_errors': 0, 'fetches': 0}
+
+    def key(self, address: str) -> str:
+        """取得地名的快取鍵值"""
+        return self.KEY_PREFIX + normalize_address(address)
+
+    def get(self, address: str) -> Optional[Dict]:
+        """查詢快取,找不到時回傳 None(不會呼叫 API)"""
+        cache_key = self.key(address)
+        value = self._memory.peek(cache_key)
+        if isinstance(value, dict):
+            return self._memory.get(cache_key)
+        if value is not LRUCache._MISSING:
+            # 負向快取中的地名
+            return None
+
+        value = self._backend_get(cache_key)
+        if value is not None:
+            self._memory.set(cache_key, value)
+        return value
+
+    def set(self, address: str, location: Dict) -> None:
+        """寫入兩層快取
+
+        Args:
+            address: 地址或地點名稱
+            location: {'lat': float, 'lon': float, 'formatted_address': str}
+        """
+        cache_key = self.key(address)
+        self._memory.set(cache_key, location)
+        self._backend_set(cache_key, location)
+
+    def get_or_fetch(self,
+                     address: str,
+                     fetch: Callable[[str], Dict]) -> Dict:
+        """查詢快取,找不到時呼叫 fetch 並寫入快取
+
+        同一個地名同時只會呼叫一次 fetch。
+
+        Args:
+            address: 地址或地點名稱
+            fetch: 實際查詢座標的函數,參數為原始地名
+
+        Returns:
+            Dict: {'lat': float, 'lon': float, 'formatted_address': str}
+
+        異常:
+            fetch 拋出的例外(負向快取期間會直接拋出同一個例外)
+        """
+        cache_key = self.key(address)
+
+        def compute() -> Dict:
+            location = self._backend_get(cache_key)
+            if location is None:
+                self._count('fetches')
+                location = fetch(address)
+                self._backend_set(cache_key, location)
+            return location
+
+        return self._memory.get_or_compute(cache_key, compute)
+
+    def clear(self) -> None:
+        """清除行程內快取(持久化後端保留)"""
+        self._memory.clear()
+
+    def cache_info(self) -> Dict:
+        """快取統計資訊"""
+        info = self._memory.cache_info()
+        with self._stats_lock:
+            info.update(self._stats)
+        info['misses'] = info['misses'] - info['backend_hits']
+        if self.backend is not None and hasattr(self.backend, 'info'):
+            info['backend'] = self.backend.info()
+        return info
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _backend_get(self, cache_key: str) -> Optional[Dict]:
+        """查詢持久化後端,找不到或失敗時回傳 None"""
+        if self.backend is None:
+            return None
+        try:
+            raw = self.backend.get(cache_key)
+        except Exception as e:
+            self._count('backend_errors')
+            print(f"讀取地理編碼快取失敗: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        self._count('backend_hits')
+        return json.loads(raw)
+
+    def _backend_set(self, cache_key: str, location: Dict) -> None:
+        """寫入持久化後端"""
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(cache_key,
+                             json.dumps(location, ensure_ascii=False),
+                             ex=self.ttl)
+        except Exception as e:
+            self._count('backend_errors')
+            print(f"寫入地理編碼快取失敗: {str(e)}")
+
+
+__all__ = ['GEOCODE_ALIASES', 'GeocodeCache', 'normalize_address']
@@ -0,0 +1,196 @@
+# src/core/utils/profiler.py
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+
+# 呼叫外部服務(Google Maps)的階段,其餘時間視為本地運算
+EXTERNAL_SPANS = ('route_fetching', 'geocoding')
+
+
+class MetricsHook:
+    """指標後端的介面
+
+    繼承後覆寫需要的方法，再透過 TripPlanningSystem.add_metrics_hook 註冊，
+    即可把規劃過程的計時與計數送到 StatsD、Prometheus 等後端。
+    預設的實作不做任何事。
+
+    使用範例:
+        >>> class PrintHook(MetricsHook):
+        ...     def on_span(self, name, seconds):
+        ...         print(f"{name}: {seconds * 1000:.1f}ms")
+        >>> system.add_metrics_hook(PrintHook())
+    """
+
+    def on_span(self, name: str, seconds: float) -> None:
+        """某個階段結束時呼叫"""
+
+    def on_count(self, name: str, value: int) -> None:
+        """計數器增加時呼叫"""
+
+    def on_report(self, report: Dict) -> None:
+        """規劃完成時呼叫,report 格式見 PlanProfiler.report"""
+
+
+class PlanProfiler:
+    """規劃過程的計時與計數
+
+    收集三種資料:
+    1. 階段計時(span):candidate_filtering、scoring、route_fetching、
+       itinerary_building、geocoding 等，記錄次數、總耗時與最長耗時
+    2. 計數器(count):路線快取命中/未命中、API 呼叫次數、評估的候選地點數、
+       搜尋迭代次數等
+    3. 每一步的紀錄(record_step):例如每一步評估了幾個候選地點
+
+    規劃時透過 activate 設為目前的 profiler，各服務以模組層級的
+    profile_span / count / record_step 記錄資料;沒有啟用時這些函數不做任何事。
+
+    可以在多個執行緒中同時記錄(例如同時取得多段路線)，此時同時進行的
+    route_fetching 耗時會分別累加，external_ms 可能大於實際等待的時間。
+    """
+
+    def __init__(self, hooks: Optional[List[MetricsHook]] = None):
+        """初始化
+
+        Args:
+            hooks: 選填,接收即時指標的 MetricsHook 列表
+        """
+        self.hooks = list(hooks or [])
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.steps: List[Dict] = []
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """計算區塊的執行時間"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, time.perf_counter() - start)
+
+    def add_span(self, name: str, seconds: float) -> None:
+        """記錄一次階段耗時"""
+        elapsed_ms = seconds * 1000
+        with self._lock:
+            stats = self.spans.get(name)
+            if stats is None:
+                stats = self.spans[name] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+        for hook in self.hooks:
+            hook.on_span(name, seconds)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """增加計數器"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+        for hook in self.hooks:
+            hook.on_count(name, value)
+
+    def record_step(self, **fields) -> None:
+        """記錄一個規劃步驟的資料"""
+        with self._lock:
+            self.steps.append(fields)
+
+    def finish(self) -> Dict:
+        """結束計時,產生報告並通知所有 hook
+
+        Returns:
+            Dict: 與 report() 相同
+        """
+        self._finished = time.perf_counter()
+        report = self.report()
+        for hook in self.hooks:
+            hook.on_report(report)
+        return report
+
+    def report(self) -> Dict:
+        """產生結構化的報告
+
+        Returns:
+            Dict: {
+                'total_ms': float,      # 規劃總耗時
+                'external_ms': float,   # 等待外部服務(路線/地理編碼 API)的時間
+                'compute_ms': float,    # 其餘的本地運算時間
+                'spans': {名稱: {'count', 'total_ms', 'max_ms'}},
+                'counters': {名稱: int},
+                'steps': [每一步的紀錄]
+            }
+        """
+        end = self._finished if self._finished is not None else time.perf_counter()
+        total_ms = (end - self._started) * 1000
+        with self._lock:
+            external_ms = sum(self.spans[name]['total_ms']
+                              for name in EXTERNAL_SPANS if name in self.spans)
+            return {
+                'total_ms': round(total_ms, 3),
+                'external_ms': round(external_ms, 3),
+                'compute_ms': round(max(total_ms - external_ms, 0.0), 3),
+                'spans': {name: {'count': int(stats['count']),
+                                 'total_ms': round(stats['total_ms'], 3),
+                                 'max_ms': round(stats['max_ms'], 3)}
+                          for name, stats in self.spans.items()},
+                'counters': dict(self.counters),
+                'steps': list(self.steps),
+            }
+
+
+# 目前啟用的 profiler(每個執行緒/非同步工作各自獨立)
+_active_profiler: ContextVar[Optional[PlanProfiler]] = ContextVar(
+    'plan_profiler', default=None)
+
+
+@contextmanager
+def activate(profiler: PlanProfiler) -> Iterator[PlanProfiler]:
+    """在區塊內把 profiler 設為目前的 profiler"""
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+
+
+def active_profiler() -> Optional[PlanProfiler]:
+    """取得目前啟用的 profiler,沒有時為 None"""
+    return _active_profiler.get()
+
+
+def profile_span(name: str):
+    """計算區塊的執行時間,沒有啟用 profiler 時不做任何事
+
+    使用範例:
+        >>> with profile_span('scoring'):
+        ...     scores = place_scoring.score_batch(table, current, now)
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return nullcontext()
+    return profiler.span(name)
+
+
+def count(name: str, value: int = 1) -> None:
+    """增加目前 profiler 的計數器"""
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.count(name, value)
+
+
+def record_step(**fields) -> None:
+    """記錄目前 profiler 的規劃步驟"""
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.record_step(**fields)
+
+
+__all__ = ['EXTERNAL_SPANS', 'MetricsHook', 'PlanProfiler', 'activate',
+           'active_profiler', 'count', 'profile_span', 'record_step']
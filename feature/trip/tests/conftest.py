@@ -0,0 +1,78 @@
+# tests/conftest.py
+
+import os
+
+import pytest
+
+# GeoService 匯入設定檔時需要金鑰,測試環境給一個假的金鑰即可(不會呼叫 API)
+os.environ.setdefault('GOOGLE_MAPS_API_KEY', 'test-api-key')
+
+from feature.trip.benchmarks.planner_benchmark import make_requirement  # noqa: E402
+from feature.trip.benchmarks.synthetic_catalog import generate_catalog  # noqa: E402
+from feature.trip.src.core.planner.system import TripPlanningSystem  # noqa: E402
+from feature.trip.src.core.services.geo_service import GeoService  # noqa: E402
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clear_route_cache():
+    """路線快取是類別層級共用的,每個測試前後清除"""
+    GeoService.get_route.cache_clear()
+    yield
+    GeoService.get_route.cache_clear()
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    """2000 筆合成地點資料(同一個測試檔共用)"""
+    return generate_catalog(2000, seed=1)
+
+
+@pytest.fixture
+def requirement():
+    """固定的開車規劃需求(台北車站 09:00-21:00,日期固定)"""
+    return make_requirement('driving')
+
+
+@pytest.fixture
+def make_system():
+    """建立使用本機地圖服務的 TripPlanningSystem
+
+    使用範例:
+        >>> system = make_system()
+        >>> slow = make_system(latency_ms=2)
+        >>> counted = make_system(client)
+    """
+    def build(client=None, latency_ms=0):
+        system = TripPlanningSystem()
+        system.geo_service = GeoService(
+            maps_client=client or LocalMapsClient(latency_ms=latency_ms))
+        return system
+
+    return build
+
+
+@pytest.fixture
+def system(make_system):
+    return make_system()
+
+
+@pytest.fixture
+def plan(make_system):
+    """以本機地圖服務規劃一次行程
+
+    每次規劃前清除路線快取，結果不受之前的規劃影響。
+
+    使用範例:
+        >>> itinerary, system, client = plan(catalog, 'transit', seed=3,
+                                             profile=True)
+    """
+    def plan_trip(locations, mode='driving', latency_ms=0, seed=1, **options):
+        GeoService.get_route.cache_clear()
+        client = LocalMapsClient(latency_ms=latency_ms)
+        system = make_system(client)
+        itinerary = system.plan_trip(locations, make_requirement(mode),
+                                     seed=seed, **options)
+        return itinerary, system, client
+
+    return plan_trip
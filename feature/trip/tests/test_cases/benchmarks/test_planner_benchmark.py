@@ -0,0 +1,31 @@
+import pytest
+
+from feature.trip.benchmarks.planner_benchmark import measure
+from feature.trip.benchmarks.synthetic_catalog import generate_catalog
+from feature.trip.src.core.models.place_table import PERIODS, PlaceTable
+
+
+def test_catalog_is_deterministic_and_valid():
+    catalog = generate_catalog(500, seed=3)
+
+    assert catalog == generate_catalog(500, seed=3)
+    assert catalog != generate_catalog(500, seed=4)
+
+    table = PlaceTable.from_locations(catalog)
+    assert len(table) == 500
+    assert len(set(table.names)) == 500
+    # 每個時段都有地點
+    assert set(table.period_code.tolist()) == set(range(len(PERIODS)))
+
+
+@pytest.mark.parametrize('scenario', ['fresh', 'restart'])
+def test_measure_reports_api_calls(scenario):
+    catalog = generate_catalog(100)
+
+    result = measure(scenario, catalog, 'driving', repeat=1, memory=False)
+
+    assert result['size'] == 100
+    assert result['stops'] > 2
+    assert result['api_calls'] > 0
+    assert result['ms'] >= result['external_ms']
+    assert result['peak_kb'] is None
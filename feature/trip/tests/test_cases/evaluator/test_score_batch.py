@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.evaluator.place_scoring import PlaceScoring, ScoreWeights
+from feature.trip.src.core.models.place import PlaceDetail
+from feature.trip.src.core.models.place_table import PlaceTable
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.time_service import TimeService
+
+
+START = PlaceDetail(
+    name='台北車站',
+    lat=25.0480194,
+    lon=121.5168608,
+    duration_min=0,
+    label='交通樞紐',
+    period='morning',
+    hours={i: [{'start': '00:00', 'end': '23:59'}] for i in range(1, 8)}
+)
+
+
+@pytest.fixture(scope='module')
+def table():
+    return PlaceTable.from_locations(DEFAULT_LOCATIONS)
+
+
+def make_scoring(travel_mode='driving', weights=None):
+    time_service = TimeService(lunch_time="12:00", dinner_time="18:00")
+    return PlaceScoring(time_service, GeoService(), travel_mode, weights)
+
+
+def scalar_scores(scoring, table, current, current_time, distances):
+    return np.array([
+        scoring.calculate_score(
+            place=table[row],
+            current_location=current,
+            current_time=current_time,
+            travel_time=distance * 2,
+            distance=distance
+        )
+        for row, distance in enumerate(distances.tolist())
+    ])
+
+
+@pytest.mark.parametrize('travel_mode', ['driving', 'walking'])
+@pytest.mark.parametrize('hour,minute', [(9, 0), (12, 10), (15, 45), (18, 30), (22, 5)])
+def test_batch_matches_scalar(table, travel_mode, hour, minute):
+    scoring = make_scoring(travel_mode)
+    current_time = datetime(2024, 10, 21, hour, minute)  # 週一
+    distances = scoring.geo_service.calculate_distances(
+        {'lat': START.lat, 'lon': START.lon}, table.lat, table.lon)
+
+    expected = scalar_scores(scoring, table, START, current_time, distances)
+    scores = scoring.score_batch(table, START, current_time)
+
+    assert np.array_equal(np.isinf(scores), np.isinf(expected))
+    finite = np.isfinite(expected)
+    assert np.allclose(scores[finite], expected[finite])
+
+
+def test_rows_and_table_index_as_current(table):
+    scoring = make_scoring(weights=ScoreWeights(0.4, 0.2, 0.2, 0.2))
+    current_time = datetime(2024, 10, 23, 14, 0)
+    rows = np.array([5, 1, 9])
+
+    current = table[3]
+    geo = scoring.geo_service
+    expected = [
+        scoring.calculate_score(
+            place=table[row],
+            current_location=current,
+            current_time=current_time,
+            travel_time=geo.calculate_distance(
+                {'lat': current.lat, 'lon': current.lon},
+                {'lat': table[row].lat, 'lon': table[row].lon}) * 2
+        )
+        for row in rows.tolist()
+    ]
+
+    scores = scoring.score_batch(table, 3, current_time, rows=rows)
+    assert np.allclose(scores, expected)
+
+
+def test_zero_travel_time_is_most_efficient(table):
+    scoring = make_scoring()
+    current_time = datetime(2024, 10, 21, 9, 0)
+
+    scores = scoring.score_batch(
+        table, START, current_time,
+        rows=np.array([0]), distances=np.array([0.0]), travel_times=np.array([0.0]))
+    expected = scoring.calculate_score(table[0], START, current_time, 0, 0.0)
+    assert np.allclose(scores, [expected])
+
+
+def test_static_components_cached_per_table(table):
+    """交替評分兩個地點表時,各自的靜態分數都保留在快取中"""
+    scoring = make_scoring()
+    other = table.take(np.arange(0, len(table), 2))
+
+    first = scoring._static_components(table)
+    second = scoring._static_components(other)
+
+    assert scoring._static_components(table) is first
+    assert scoring._static_components(other) is second
+    assert len(second['rating']) == len(other)
@@ -0,0 +1,80 @@
+import pytest
+from feature.trip.src.core.models.place import PlaceDetail
+
+
+def create_place(hours):
+    """建立測試用地點"""
+    return PlaceDetail(
+        name="測試地點",
+        rating=4.5,
+        lat=25.0,
+        lon=121.5,
+        duration_min=60,
+        label="景點",
+        period="morning",
+        hours=hours
+    )
+
+
+class TestCompiledHours:
+    """測試編譯後的營業時間查詢"""
+
+    def test_regular_slots(self):
+        """一般營業時段,包含結束時間"""
+        place = create_place({1: [{'start': '09:00', 'end': '12:00'},
+                                  {'start': '14:00', 'end': '17:00'}]})
+
+        assert place.is_open_at(1, '09:00')
+        assert place.is_open_at(1, '12:00')
+        assert not place.is_open_at(1, '13:00')
+        assert place.is_open_at(1, '16:59')
+        assert not place.is_open_at(2, '10:00')
+
+    def test_overnight_slot_split(self):
+        """跨日時段的凌晨部分屬於隔天"""
+        place = create_place({1: [{'start': '22:00', 'end': '03:00'}]})
+
+        assert place.is_open_at(1, '23:30')
+        assert place.is_open_at(2, '01:00')
+        assert place.is_open_at(2, '03:00')
+        assert not place.is_open_at(2, '03:01')
+        assert not place.is_open_at(1, '21:59')
+
+    def test_sunday_overnight_wraps_to_monday(self):
+        """週日跨日營業會接回週一凌晨"""
+        place = create_place({7: [{'start': '20:00', 'end': '02:00'}]})
+
+        assert place.is_open_at(1, '01:30')
+        assert place.minutes_until_close(1, 1 * 60 + 30) == 30
+
+    @pytest.mark.parametrize("day,minute,expected", [
+        (1, 10 * 60, 120),        # 09:00-12:00 時段
+        (1, 15 * 60, 120),        # 14:00-17:00 時段
+        (1, 13 * 60, None),       # 午休
+        (1, 23 * 60, 240),        # 跨日時段,打烊在隔天 03:00
+        (2, 60, 120),             # 跨日時段的凌晨部分
+    ])
+    def test_minutes_until_close(self, day, minute, expected):
+        """剩餘營業時間只看目前所在的時段"""
+        place = create_place({1: [{'start': '09:00', 'end': '12:00'},
+                                  {'start': '14:00', 'end': '17:00'},
+                                  {'start': '22:00', 'end': '03:00'}]})
+
+        assert place.minutes_until_close(day, minute) == expected
+
+    def test_find_open_slot(self):
+        """取得符合時間的原始營業時段"""
+        place = create_place({1: [{'start': '09:00', 'end': '12:00'},
+                                  {'start': '14:00', 'end': '17:00'}]})
+
+        assert place.find_open_slot(1, 15 * 60) == {'start': '14:00',
+                                                    'end': '17:00'}
+        assert place.find_open_slot(1, 13 * 60) is None
+
+    def test_recompile_after_hours_replaced(self):
+        """整個替換 hours 後重新編譯"""
+        place = create_place({1: [{'start': '09:00', 'end': '12:00'}]})
+        place.hours = {1: [{'start': '18:00', 'end': '20:00'}]}
+
+        assert not place.is_open_at(1, '10:00')
+        assert place.is_open_at(1, '19:00')
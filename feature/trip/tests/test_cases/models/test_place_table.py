@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.models.place import PlaceDetail
+from feature.trip.src.core.models.place_table import PERIOD_CODES, PlaceTable
+from feature.trip.src.core.services.spatial_index import SpatialIndex
+
+
+@pytest.fixture(scope='module')
+def table():
+    return PlaceTable.from_locations(DEFAULT_LOCATIONS)
+
+
+def test_places_match_place_detail(table):
+    """建立的 PlaceDetail 與逐一驗證的結果相同"""
+    for idx, location in enumerate(DEFAULT_LOCATIONS):
+        assert table[idx].model_dump() == PlaceDetail(**location).model_dump()
+
+    assert table[0] is table[0]
+    assert table.period_code[0] == PERIOD_CODES[DEFAULT_LOCATIONS[0]['period']]
+
+
+def test_batch_hours_match_place_detail(table):
+    places = [PlaceDetail(**location) for location in DEFAULT_LOCATIONS]
+
+    for weekday in (1, 5, 7):
+        for minute in range(0, 24 * 60, 37):
+            open_mask = table.open_mask(weekday, minute)
+            remaining = table.minutes_until_close(weekday, minute)
+            for idx, place in enumerate(places):
+                assert open_mask[idx] == place.is_open_at_minute(weekday, minute)
+                expected = place.minutes_until_close(weekday, minute)
+                assert remaining[idx] == (-1 if expected is None else expected)
+
+
+def test_bulk_validation_reports_row():
+    locations = [dict(DEFAULT_LOCATIONS[0]), dict(DEFAULT_LOCATIONS[1])]
+    locations[1]['lat'] = 123.0
+
+    with pytest.raises(ValueError, match='第 1 筆'):
+        PlaceTable.from_locations(locations)
+
+    locations[1] = dict(DEFAULT_LOCATIONS[1], period='brunch')
+    with pytest.raises(ValueError, match='第 1 筆'):
+        PlaceTable.from_locations(locations)
+
+
+def test_mask_of_marks_all_rows_with_name():
+    locations = [DEFAULT_LOCATIONS[0], DEFAULT_LOCATIONS[1], DEFAULT_LOCATIONS[0]]
+    table = PlaceTable.from_locations(locations)
+
+    mask = table.mask_of({DEFAULT_LOCATIONS[0]['name'], '不存在的地點'})
+    assert mask.tolist() == [True, False, True]
+    assert table.index_of(DEFAULT_LOCATIONS[1]['name']) == 1
+
+
+def test_spatial_index_uses_table_rows(table):
+    index = SpatialIndex(table, cell_size_km=2)
+    center = {'lat': 25.0480194, 'lon': 121.5168608}
+
+    rows, distances = index.query_radius(center, 3)
+    expected = SpatialIndex([table[i] for i in range(len(table))],
+                            cell_size_km=2).query_radius(center, 3)
+    assert np.array_equal(rows, expected[0])
+    assert np.allclose(distances, expected[1])
+
+
+def test_multi_period_place_is_one_row():
+    location = dict(DEFAULT_LOCATIONS[0], place_id='place-a',
+                    periods=['night', 'morning'],
+                    period_scores={'morning': 0.8, 'night': 0.6})
+    location.pop('period')
+    table = PlaceTable.from_locations([location, DEFAULT_LOCATIONS[1]])
+
+    assert len(table) == 2
+    assert table.periods_of(0) == ['morning', 'night']
+    assert table.period_match('night').tolist() == [
+        True, DEFAULT_LOCATIONS[1]['period'] == 'night']
+    assert table.period_scores[0, PERIOD_CODES['morning']] == pytest.approx(0.8)
+
+    place = table[0]
+    assert place.period == 'morning' and place.periods == ['morning', 'night']
+    assert place.has_period('night') and not place.has_period('lunch')
+    night = table.place(0, 'night')
+    assert night.period == 'night' and table.place(0, 'night') is night
+    assert night.compiled_hours is place.compiled_hours
+
+    # 評分使用最接近的時段
+    rows = np.array([0])
+    assert table.period_distance(rows, PERIOD_CODES['dinner']).tolist() == [1]
+    assert table.period_distance(rows, PERIOD_CODES['morning']).tolist() == [0]
+
+    # PlaceDetail 保留所有時段,重新建立的地點表相同
+    rebuilt = PlaceTable.from_locations([PlaceDetail(**place.model_dump())])
+    assert rebuilt.period_mask.tolist() == table.period_mask[:1].tolist()
+    assert rebuilt[0].period_scores == place.period_scores
+
+
+def test_mask_of_uses_place_id():
+    same_name = [dict(DEFAULT_LOCATIONS[0], place_id='place-a'),
+                 dict(DEFAULT_LOCATIONS[0], place_id='place-b'),
+                 DEFAULT_LOCATIONS[1]]
+    table = PlaceTable.from_locations(same_name)
+
+    assert table.mask_of({'place-a'}).tolist() == [True, False, False]
+    # 沒有 place_id 的地點(或只記錄名稱的舊行程)以名稱比對
+    assert table.mask_of({DEFAULT_LOCATIONS[1]['name']}).tolist() == [False, False, True]
+    assert table.mask_of({DEFAULT_LOCATIONS[0]['name']}).tolist() == [True, True, False]
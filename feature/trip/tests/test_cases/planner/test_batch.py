@@ -0,0 +1,118 @@
+import io
+import json
+
+import pytest
+
+from feature.trip import batch_planner
+from feature.trip.benchmarks.planner_benchmark import make_requirement
+from feature.trip.benchmarks.synthetic_catalog import generate_catalog
+from feature.trip.src.core.planner import batch
+from feature.trip.src.core.planner.batch import BatchPlanner
+from feature.trip.src.core.planner.system import TripPlanningSystem
+from feature.trip.src.core.services.geo_service import GeoService, route_cache_backend
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+
+
+CATALOG = generate_catalog(200, seed=5)
+
+
+def make_requests():
+    return [
+        {'id': 'driving', 'requirement': make_requirement('driving'), 'seed': 1},
+        {'id': 'walking', 'requirement': make_requirement('walking')[0], 'seed': 2},
+        {'id': 'subset', 'requirement': make_requirement('transit'), 'seed': 3,
+         'place_ids': [place['place_id'] for place in CATALOG[:60]]},
+        {'id': 'broken', 'requirement': make_requirement('driving'),
+         'place_ids': ['missing-place']},
+    ]
+
+
+def expected_itinerary(request):
+    GeoService.get_route.cache_clear()
+    system = TripPlanningSystem()
+    system.geo_service = GeoService(maps_client=LocalMapsClient())
+    requirement = request['requirement']
+    if isinstance(requirement, dict):
+        requirement = [requirement]
+    places = CATALOG
+    if 'place_ids' in request:
+        ids = set(request['place_ids'])
+        places = [place for place in CATALOG if place['place_id'] in ids]
+    itinerary = system.plan_trip(places, requirement, seed=request['seed'])
+    return [(item['name'], item['start_time']) for item in itinerary]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_matches_single_plans(workers, tmp_path):
+    requests = make_requests()
+    planner = BatchPlanner(CATALOG, workers=workers,
+                           cache_path=str(tmp_path / 'routes.sqlite3'),
+                           maps_client=LocalMapsClient())
+
+    results = {result['id']: result for result in planner.run(iter(requests))}
+
+    assert set(results) == {'driving', 'walking', 'subset', 'broken'}
+    assert 'missing-place' in results['broken']['error']
+    for request in requests[:3]:
+        result = results[request['id']]
+        assert result['error'] is None
+        assert result['seed'] == request['seed']
+        assert ([(item['name'], item['start_time']) for item in result['itinerary']]
+                == expected_itinerary(request))
+
+    stats = planner.stats
+    assert stats['requests'] == 4
+    assert stats['failed'] == 1
+    assert stats['plans_per_second'] > 0
+
+
+def test_in_process_batch_restores_state(tmp_path):
+    """workers=1 時結束後還原路線快取後端與規劃系統"""
+    system = batch._batch_system
+    planner = BatchPlanner(CATALOG, workers=1,
+                           cache_path=str(tmp_path / 'routes.sqlite3'),
+                           maps_client=LocalMapsClient())
+
+    result, = planner.run([{'requirement': make_requirement('driving'), 'seed': 1}])
+
+    assert result['error'] is None
+    assert GeoService.get_route.get_backend() is route_cache_backend
+    assert batch._batch_system is system
+
+
+def test_workers_share_route_cache(tmp_path):
+    cache_path = str(tmp_path / 'routes.sqlite3')
+    request = {'requirement': make_requirement('driving'), 'seed': 1}
+
+    first = BatchPlanner(CATALOG, workers=2, cache_path=cache_path,
+                         maps_client=LocalMapsClient())
+    list(first.run([request]))
+
+    # 新的工作行程(空的行程內快取)直接使用共用快取中的路線
+    client = LocalMapsClient()
+    second = BatchPlanner(CATALOG, workers=2, cache_path=cache_path,
+                          maps_client=client)
+    result, = second.run([dict(request, id='again')])
+
+    assert result['error'] is None
+    assert client.total_calls == 0
+
+
+def test_cli_streams_jsonl(tmp_path, monkeypatch):
+    requests_path = tmp_path / 'requests.jsonl'
+    requests_path.write_text(
+        json.dumps({'id': 'a', 'requirement': make_requirement('driving'),
+                    'locations': CATALOG[:80], 'seed': 1}, ensure_ascii=False)
+        + '\n\nnot json\n', encoding='utf-8')
+    output_path = tmp_path / 'results.jsonl'
+    monkeypatch.setattr('sys.stderr', io.StringIO())
+
+    stats = batch_planner.main([str(requests_path), '-o', str(output_path),
+                                '--workers', '1', '--progress-every', '0'])
+
+    lines = [json.loads(line) for line in
+             output_path.read_text(encoding='utf-8').splitlines()]
+    assert [line['id'] for line in lines] == ['a', 'line-3']
+    assert lines[0]['error'] is None and lines[0]['itinerary']
+    assert lines[1]['error']
+    assert stats['requests'] == 2
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.planner.beam_search import BeamSearchStrategy
+from feature.trip.src.core.planner.registry import (
+    available_strategies,
+    get_strategy
+)
+from feature.trip.src.core.planner.strategy import BasePlanningStrategy
+
+
+def test_registry():
+    assert get_strategy() is BasePlanningStrategy
+    assert get_strategy('beam') is BeamSearchStrategy
+    assert {'greedy', 'beam'} <= set(available_strategies())
+
+    with pytest.raises(ValueError):
+        get_strategy('unknown')
+
+
+def test_beam_plan_routes_only_final_path(system, requirement):
+    itinerary = system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                                 strategy='beam')
+
+    names = [item['name'] for item in itinerary]
+    assert names[0] == names[-1] == '台北車站'
+    assert len(set(names[1:-1])) == len(names) - 2
+    assert itinerary[-1]['start_time'] <= '21:00'
+
+    # 只有勝出的行程會取得實際路線:每段一次,包含返回終點
+    calls = system.geo_service.maps_client.call_counts
+    assert calls['distance_matrix'] == 0
+    assert calls['directions'] == len(itinerary) - 1
+
+
+def test_expansion_budget_is_respected(system, requirement):
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, strategy='beam',
+                     strategy_options={'expansion_budget': 30,
+                                       'beam_width': 2})
+
+    assert isinstance(system.strategy, BeamSearchStrategy)
+    assert system.strategy.beam_width == 2
+    assert system.strategy.expansions <= 30
+
+
+def test_beam_does_not_end_earlier_than_greedy(catalog, plan):
+    greedy, _, _ = plan(catalog, 'transit')
+    beam, system, _ = plan(catalog, 'transit', strategy='beam')
+
+    assert beam[-1]['start_time'] >= greedy[-1]['start_time']
+    assert system.strategy.expansions < system.strategy.expansion_budget
+
+
+def test_exhausted_budget_completes_path_greedily(catalog, plan):
+    """延伸次數只夠第一輪時,仍以貪婪法排滿行程"""
+    itinerary, system, _ = plan(catalog, 'transit', strategy='beam',
+                                strategy_options={'expansion_budget': 5})
+
+    assert system.strategy.expansions == 5
+    assert len(itinerary) - 2 > 1
+    assert itinerary[-1]['start_time'] >= '19:00'
+
+
+def test_advance_period_does_not_change_state(system):
+    time_service = system.time_service
+    time_service.reset()
+    lunch = time_service.lunch_time
+
+    noon = datetime(1900, 1, 1, lunch.hour, lunch.minute)
+    assert time_service.advance_period('morning', noon, False, False) == 'lunch'
+    assert time_service.advance_period('lunch', noon, True, False) == 'afternoon'
+    assert time_service.current_period == 'morning'
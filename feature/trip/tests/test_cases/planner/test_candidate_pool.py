@@ -0,0 +1,56 @@
+import pytest
+
+from feature.trip.src.core.models.place_table import PlaceTable
+
+
+VIEW_PERIODS = ['morning', 'afternoon', 'night']
+
+
+@pytest.fixture(scope='module')
+def catalog(catalog):
+    """景點在上午、下午、晚上都被檢索到,每個地點一筆"""
+    locations = []
+    for location in catalog:
+        location = dict(location)
+        if location['period'] in VIEW_PERIODS:
+            location['periods'] = VIEW_PERIODS
+            location['period_scores'] = {period: 0.7 for period in VIEW_PERIODS}
+        locations.append(location)
+    return locations
+
+
+def duplicated(catalog):
+    """原本的格式:每個 (時段, 地點) 一筆"""
+    rows = []
+    for location in catalog:
+        for period in location.get('periods') or [location['period']]:
+            row = dict(location, period=period)
+            row.pop('periods', None)
+            row.pop('period_scores', None)
+            rows.append(row)
+    return rows
+
+
+def test_pool_has_one_row_per_place(catalog):
+    table = PlaceTable.from_locations(catalog)
+    legacy = PlaceTable.from_locations(duplicated(catalog))
+
+    assert len(table) == len(catalog) < len(legacy)
+    for period in VIEW_PERIODS:
+        assert (table.period_match(period).sum() ==
+                legacy.period_match(period).sum())
+
+
+@pytest.mark.parametrize('strategy', ['greedy', 'beam', 'optw'])
+def test_multi_period_places_are_planned_once(catalog, plan, strategy):
+    itinerary, _, _ = plan(catalog, strategy=strategy, seed=2)
+    by_id = {location['place_id']: location for location in catalog}
+
+    stops = itinerary[1:-1]
+    assert stops
+    assert len({item['place_id'] for item in stops}) == len(stops)
+    for item in stops:
+        location = by_id[item['place_id']]
+        # 行程項目的時段是實際排入的時段
+        assert item['period'] in (location.get('periods') or [location['period']])
+    assert itinerary[-1]['end_time'] <= '21:00'
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from feature.trip.src.core.models.place_table import PlaceTable
+from feature.trip.src.core.planner.deadline import PlanDeadline
+from feature.trip.src.core.planner.post_optimizer import ItineraryOptimizer
+
+
+def test_deadline_state():
+    deadline = PlanDeadline(10, route_reserve=9.99)
+
+    assert not deadline.expired()
+    assert 9 < deadline.remaining() <= 10
+    assert not deadline.truncated
+    time.sleep(0.02)
+    assert deadline.low()
+
+    deadline.truncate('search')
+    deadline.record_estimated()
+    report = deadline.report()
+    assert report['truncated'] is True
+    assert report['reasons'] == ['search', 'estimated_routes']
+    assert report['estimated_legs'] == 1
+
+    assert PlanDeadline.of(None) is None
+    assert PlanDeadline.of(deadline) is deadline
+    with pytest.raises(ValueError):
+        PlanDeadline(0)
+
+
+def test_generous_deadline_keeps_itinerary(catalog, plan):
+    original, system, _ = plan(catalog)
+    assert system.last_context.deadline is None
+
+    itinerary, system, _ = plan(catalog, deadline=60)
+
+    assert itinerary == original
+    assert system.last_context.deadline['truncated'] is False
+
+
+@pytest.mark.parametrize('strategy', ['greedy', 'beam', 'optw'])
+def test_slow_api_finishes_within_deadline(catalog, plan, strategy):
+    """路線 API 很慢時(沒有期限時需要 1.2-3 秒)仍在期限內回傳完整的行程"""
+    # 保留的時間需要涵蓋一次 API 呼叫
+    deadline = PlanDeadline(1.0, route_reserve=0.5)
+    started = time.perf_counter()
+    itinerary, system, _ = plan(
+        catalog, latency_ms=300, strategy=strategy, deadline=deadline)
+    elapsed = time.perf_counter() - started
+
+    report = system.last_context.deadline
+    assert report['truncated'] is True
+    assert report['estimated_legs'] > 0
+    # 期限到後不再呼叫 API;只檢查沒有等待所有路線,不依賴機器速度
+    assert elapsed < 3.0
+    assert len(itinerary) > 2
+    assert itinerary[-1]['label'] == '終點'
+
+
+def expired_deadline():
+    deadline = PlanDeadline(0.001)
+    time.sleep(0.01)
+    return deadline
+
+
+def test_expired_deadline_stops_samples(catalog, plan):
+    itinerary, system, _ = plan(catalog, samples=3, workers=1,
+                                deadline=expired_deadline())
+
+    report = system.last_context.deadline
+    assert len(system.last_context.sample_results) == 1
+    assert report['reasons'] == ['search', 'samples']
+    # 第一步就已到期,沒有選出任何地點
+    assert len(itinerary) <= 2
+
+
+def test_low_deadline_skips_post_optimization(catalog, plan):
+    itinerary, system, _ = plan(catalog)
+    deadline = expired_deadline()
+
+    optimizer = ItineraryOptimizer(
+        system.strategy, PlaceTable.from_locations(catalog), deadline=deadline)
+
+    assert optimizer.optimize(itinerary) is itinerary
+    assert optimizer.stats['moves'] == 0
+    assert deadline.reasons == ['post_optimization']
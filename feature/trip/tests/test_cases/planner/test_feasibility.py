@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+
+
+@pytest.mark.parametrize('mode', ['driving', 'transit', 'walking', 'bicycling'])
+def test_lower_bound_never_exceeds_route(mode):
+    geo_service = GeoService(maps_client=LocalMapsClient())
+    rng = random.Random(0)
+    origin = {'lat': 25.0478, 'lon': 121.5170}
+
+    for _ in range(50):
+        destination = {'lat': 25.0478 + rng.uniform(-0.2, 0.2),
+                       'lon': 121.5170 + rng.uniform(-0.2, 0.2)}
+        straight_km = GeoService.haversine_matrix(
+            np.array([origin['lat']]), np.array([origin['lon']]),
+            np.array([destination['lat']]), np.array([destination['lon']]))[0, 0]
+        route = geo_service.get_route(origin, destination, mode)
+
+        assert (geo_service.min_travel_minutes(straight_km, mode) <=
+                int(route['duration_minutes']))
+
+
+def test_pruning_reduces_scoring_and_routing(catalog, plan):
+    _, full_system, full_client = plan(
+        catalog, 'transit', seed=3, profile=True,
+        strategy_options={'feasibility_pruning': False})
+    itinerary, system, client = plan(catalog, 'transit', seed=3, profile=True)
+
+    counters = system.profile_report['counters']
+    full_counters = full_system.profile_report['counters']
+    assert counters['feasibility.rejected.end_time_overrun'] > 0
+    assert counters['candidates_evaluated'] < full_counters['candidates_evaluated']
+    assert (client.call_counts['distance_matrix_elements'] <=
+            full_client.call_counts['distance_matrix_elements'])
+    assert system.strategy.rejections['end_time_overrun'] == \
+        counters['feasibility.rejected.end_time_overrun']
+    assert itinerary[-1]['end_time'] <= '21:00'
+
+
+def test_infeasible_pick_is_skipped(catalog, plan):
+    itinerary, system, _ = plan(catalog, 'driving', seed=3, profile=True,
+                                strategy_options={'feasibility_pruning': False})
+
+    rejected = system.strategy.rejected_places
+    assert 0 < system.strategy.rejections['route_overrun'] <= 3
+    assert len(rejected) == system.strategy.rejections['route_overrun']
+    assert not rejected & {item['name'] for item in itinerary}
+    assert itinerary[-1]['end_time'] <= '21:00'
+
+    # max_route_rejections=0 時與原本相同,第一次超過結束時間就結束規劃
+    stopped, stopped_system, _ = plan(
+        catalog, 'driving', seed=3, profile=True,
+        strategy_options={'feasibility_pruning': False, 'max_route_rejections': 0})
+    assert not stopped_system.strategy.rejected_places
+    assert len(stopped) <= len(itinerary)
+
+
+def test_greedy_requests_only_used_legs(catalog, plan):
+    """距離矩陣只用於返回終點的檢查,排入行程的路段都有導航資訊"""
+    itinerary, _, client = plan(catalog, 'transit')
+
+    calls = client.call_counts
+    assert calls['distance_matrix_elements'] == calls['distance_matrix']
+    assert all(item['route_info'] is not None for item in itinerary[1:])
@@ -0,0 +1,34 @@
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.planner.orienteering import OrienteeringStrategy
+from feature.trip.src.core.planner.registry import get_strategy
+
+
+def test_registry():
+    assert get_strategy('optw') is OrienteeringStrategy
+
+
+def test_optw_plan_is_feasible(system, requirement):
+    itinerary = system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                                 strategy='optw', seed=1,
+                                 strategy_options={'max_iterations': 20})
+
+    names = [item['name'] for item in itinerary]
+    assert names[0] == names[-1] == '台北車站'
+    assert len(names) > 2
+    assert len(set(names[1:-1])) == len(names) - 2
+    assert itinerary[-1]['start_time'] <= '21:00'
+
+    # 搜尋只使用估算的交通時間,實際路線只取最後的行程
+    calls = system.geo_service.maps_client.call_counts
+    assert calls['distance_matrix'] == 0
+    assert calls['directions'] == len(itinerary) - 1
+
+
+def test_search_limits_are_respected(system, requirement):
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, strategy='optw',
+                     strategy_options={'max_iterations': 3,
+                                       'max_candidates': 20})
+
+    assert isinstance(system.strategy, OrienteeringStrategy)
+    assert system.strategy.iterations <= 3
+    assert len(system.strategy._places) <= 22
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.services.geo_service import GeoService
+
+
+def make_requirement(start, end, mode, lunch="none"):
+    return [{
+        "出發時間": start,
+        "結束時間": end,
+        "出發地點": "台北車站",
+        "交通方式": mode,
+        "午餐時間": lunch,
+        "出發日": "10-20"
+    }]
+
+
+REQUESTS = [
+    (make_requirement("09:00", "21:00", "開車"), 1),
+    (make_requirement("10:30", "18:00", "大眾運輸", lunch="11:30"), 2),
+    (make_requirement("13:30", "21:00", "步行"), 3),
+    (make_requirement("08:00", "18:00", "開車", lunch="13:00"), 4),
+]
+
+
+def schedule(itinerary):
+    return [(item['name'], item['start_time'], item['end_time']) for item in itinerary]
+
+
+def test_shared_system_plans_concurrently(make_system):
+    expected = [schedule(make_system().plan_trip(DEFAULT_LOCATIONS, requirement, seed=seed))
+                for requirement, seed in REQUESTS]
+
+    GeoService.get_route.cache_clear()
+    shared = make_system(latency_ms=2)
+    barrier = threading.Barrier(len(REQUESTS) * 2)
+
+    def plan(index):
+        requirement, seed = REQUESTS[index % len(REQUESTS)]
+        barrier.wait()
+        itinerary = shared.plan_trip(DEFAULT_LOCATIONS, requirement, seed=seed)
+        # 每個執行緒看到自己的規劃結果
+        return index, schedule(itinerary), shared.seed, shared.start_time
+
+    with ThreadPoolExecutor(max_workers=len(REQUESTS) * 2) as pool:
+        results = list(pool.map(plan, range(len(REQUESTS) * 2)))
+
+    for index, itinerary, seed, start_time in results:
+        requirement, expected_seed = REQUESTS[index % len(REQUESTS)]
+        assert itinerary == expected[index % len(REQUESTS)]
+        assert seed == expected_seed
+        assert start_time.strftime('%H:%M') == requirement[0]["出發時間"]
+
+
+def test_lunch_time_does_not_leak_between_requests(make_system):
+    system = make_system()
+    system.plan_trip(DEFAULT_LOCATIONS, REQUESTS[3][0], seed=4)
+    after_custom_lunch = schedule(system.plan_trip(DEFAULT_LOCATIONS, REQUESTS[2][0], seed=3))
+
+    fresh = schedule(make_system().plan_trip(DEFAULT_LOCATIONS, REQUESTS[2][0], seed=3))
+
+    assert after_custom_lunch == fresh
+    assert system.time_service.lunch_time.strftime('%H:%M') == "12:00"
+
+
+def test_context_is_per_thread(make_system):
+    system = make_system()
+    itinerary = system.plan_trip(DEFAULT_LOCATIONS, REQUESTS[0][0], seed=1)
+
+    other_thread = {}
+    thread = threading.Thread(
+        target=lambda: other_thread.update(context=system.last_context,
+                                           seed=system.seed))
+    thread.start()
+    thread.join()
+
+    assert other_thread == {'context': None, 'seed': None}
+    assert system.last_context.seed == 1
+    assert system.export_plan_state(itinerary)['seed'] == 1
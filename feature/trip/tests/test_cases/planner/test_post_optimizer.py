@@ -0,0 +1,56 @@
+import pytest
+
+from feature.trip.src.core.models.place_table import PlaceTable
+from feature.trip.src.core.planner.post_optimizer import ItineraryOptimizer
+
+
+def total_distance(itinerary):
+    return sum(item['transport']['travel_distance'] for item in itinerary)
+
+
+def test_reorders_stops_and_shortens_trip(catalog, plan):
+    original, _, original_client = plan(catalog, seed=2, post_optimize=False)
+    optimized, system, client = plan(catalog, seed=2, post_optimize=True)
+    stats = system.last_context.post_optimization
+
+    assert stats['moves'] > 0
+    assert total_distance(optimized) < total_distance(original)
+    assert stats['distance_after'] == pytest.approx(total_distance(optimized), abs=1e-3)
+    # 只調整順序,不更換地點
+    assert ([item['name'] for item in optimized] !=
+            [item['name'] for item in original])
+    assert (sorted(item['name'] for item in optimized) ==
+            sorted(item['name'] for item in original))
+    assert [item['step'] for item in optimized] == list(range(len(optimized)))
+    # 時段順序(含用餐)不變,時間遞增且不超過結束時間
+    assert ([item['period'] for item in optimized] ==
+            [item['period'] for item in original])
+    times = [item['start_time'] for item in optimized]
+    assert times == sorted(times) and times[-1] <= '21:00'
+    # 只對順序改變的路段呼叫 API
+    extra_calls = client.total_calls - original_client.total_calls
+    assert stats['refetched_legs'] > 0
+    assert extra_calls <= stats['refetched_legs']
+
+
+def test_keeps_itinerary_without_improvement(catalog, plan):
+    itinerary, system, client = plan(catalog, seed=0, post_optimize=False)
+    calls = client.total_calls
+
+    optimizer = ItineraryOptimizer(
+        system.strategy, PlaceTable.from_locations(catalog))
+    result = optimizer.optimize(itinerary)
+
+    assert optimizer.stats['moves'] == 0
+    assert result is itinerary
+    assert client.total_calls == calls
+
+
+def test_short_itinerary_is_untouched(catalog, plan):
+    itinerary, system, _ = plan(catalog, seed=0, post_optimize=False)
+    short = [itinerary[0], itinerary[1], itinerary[-1]]
+
+    optimizer = ItineraryOptimizer(
+        system.strategy, PlaceTable.from_locations(catalog))
+
+    assert optimizer.optimize(short) is short
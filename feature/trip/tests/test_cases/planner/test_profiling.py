@@ -0,0 +1,103 @@
+import pytest
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+from feature.trip.src.core.utils import profiler
+from feature.trip.src.core.utils.profiler import MetricsHook, PlanProfiler
+
+
+class RecordingHook(MetricsHook):
+    def __init__(self):
+        self.spans = []
+        self.counts = {}
+        self.reports = []
+
+    def on_span(self, name, seconds):
+        self.spans.append(name)
+
+    def on_count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def on_report(self, report):
+        self.reports.append(report)
+
+
+def test_profile_report_is_opt_in(make_system, requirement):
+    system = make_system()
+
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=1)
+
+    assert system.profile_report is None
+
+
+@pytest.mark.parametrize('strategy', ['greedy', 'beam'])
+def test_profile_report_matches_plan(strategy, make_system, requirement):
+    client = LocalMapsClient()
+    system = make_system(client)
+
+    itinerary = system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                                 strategy=strategy, seed=1, profile=True)
+    report = system.profile_report
+
+    for stage in ('candidate_loading', 'candidate_filtering', 'scoring',
+                  'route_fetching', 'itinerary_building'):
+        assert report['spans'][stage]['count'] > 0
+    assert report['spans']['itinerary_building']['count'] == len(itinerary)
+
+    counters = report['counters']
+    api_calls = sum(value for name, value in counters.items()
+                    if name.startswith('api_calls.'))
+    assert api_calls == client.total_calls
+    assert counters['candidates_evaluated'] > 0
+    assert counters['iterations'] > 0
+    assert report['external_ms'] + report['compute_ms'] == pytest.approx(
+        report['total_ms'], abs=0.01)
+
+
+def test_profile_counts_route_cache_hits(make_system, requirement):
+    system = make_system()
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=1)
+
+    # 相同輸入再規劃一次,路線全部來自快取
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=1, profile=True)
+    counters = system.profile_report['counters']
+
+    assert counters['route_cache.hits'] > 0
+    assert 'route_cache.misses' not in counters
+    assert not any(name.startswith('api_calls.') for name in counters)
+
+
+def test_metrics_hooks_receive_spans_and_report(make_system, requirement):
+    system = make_system()
+    hook = RecordingHook()
+    system.add_metrics_hook(hook)
+
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=1)
+
+    assert 'scoring' in hook.spans
+    assert len(hook.reports) == 1
+    assert hook.counts == hook.reports[0]['counters']
+
+
+def test_sequential_samples_share_one_profiler(make_system, requirement):
+    system = make_system()
+
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, samples=2, seed=1,
+                     workers=1, profile=True)
+
+    # 兩個樣本各建立一次地點表,都記錄在同一份報告中
+    assert system.profile_report['spans']['candidate_loading']['count'] == 2
+
+
+def test_helpers_do_nothing_without_active_profiler():
+    assert profiler.active_profiler() is None
+    with profiler.profile_span('scoring'):
+        profiler.count('iterations')
+        profiler.record_step(candidates=1)
+
+    plan_profiler = PlanProfiler()
+    with profiler.activate(plan_profiler):
+        profiler.count('iterations', 2)
+    profiler.count('iterations')
+
+    assert plan_profiler.finish()['counters'] == {'iterations': 2}
@@ -0,0 +1,125 @@
+import copy
+import json
+
+import pytest
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.models.place import PlaceDetail
+from feature.trip.src.core.models.place_table import PlaceTable
+from feature.trip.src.core.planner.replan import (
+    place_from_document,
+    place_to_document
+)
+from feature.trip.src.core.services.geo_service import GeoService
+
+
+@pytest.fixture
+def planned(make_system, requirement):
+    """規劃一次並模擬存入 MongoDB 後讀回的規劃狀態"""
+    system = make_system()
+    itinerary = system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=3)
+    state = json.loads(json.dumps(system.export_plan_state(itinerary),
+                                  ensure_ascii=False))
+    return itinerary, state
+
+
+def test_place_document_round_trip():
+    place = PlaceDetail(**DEFAULT_LOCATIONS[0])
+    document = place_to_document(place)
+
+    assert all(isinstance(day, str) for day in document['hours'])
+    restored = place_from_document(json.loads(json.dumps(document)))
+    assert restored.hours == place.hours
+    assert restored.model_dump() == place.model_dump()
+
+
+def test_plan_state_contents(planned, requirement):
+    itinerary, state = planned
+
+    assert len(state['pool']) == len(DEFAULT_LOCATIONS)
+    assert state['requirement'] == requirement
+    assert state['seed'] == 3
+    assert state['routes']
+
+
+def test_plan_state_exports_every_leg(planned):
+    itinerary, state = planned
+    # 路線或距離矩陣的快取 key:<種類>:<起點>_<終點>_<交通方式>_<時段>
+    legs = {tuple(item['key'].split(':', 1)[1].split('_')[:2])
+            for item in state['routes']}
+
+    for previous, item in zip(itinerary, itinerary[1:]):
+        leg = (f"{previous['lat']:.6f},{previous['lon']:.6f}",
+               f"{item['lat']:.6f},{item['lon']:.6f}")
+        assert leg in legs
+
+
+def test_pool_documents_match_place_details():
+    table = PlaceTable.from_locations(DEFAULT_LOCATIONS)
+    for idx in range(len(table)):
+        place = PlaceDetail(**DEFAULT_LOCATIONS[idx])
+        assert table.document(idx) == place_to_document(place)
+
+
+def test_replan_keeps_prefix_and_skips_cancelled_place(planned, make_system):
+    itinerary, state = planned
+    restart_index = 3
+    cancelled = itinerary[restart_index]['name']
+
+    GeoService.get_route.cache_clear()
+    system = make_system()
+    result = system.replan(state, itinerary, restart_index)
+
+    names = [item['name'] for item in result]
+    assert names[:restart_index] == [item['name']
+                                     for item in itinerary[:restart_index]]
+    assert cancelled not in names
+    assert names[-1] == '台北車站'
+    assert len(set(names[1:-1])) == len(names) - 2
+
+    # 起點直接使用之前行程的座標,不需要重新查詢
+    assert system.geo_service.maps_client.call_counts['geocode'] == 0
+
+
+def test_replan_excludes_cancelled_place_by_key(planned, monkeypatch, make_system):
+    """只排除被取消的分店,同名的其他分店仍在候選地點中"""
+    itinerary, state = planned
+    restart_index = 3
+    cancelled = dict(itinerary[restart_index], place_id='branch-1')
+    trip = itinerary[:restart_index] + [cancelled] + itinerary[restart_index + 1:]
+
+    state = copy.deepcopy(state)
+    for document in state['pool']:
+        if document['name'] == cancelled['name']:
+            document['place_id'] = 'branch-1'
+            state['pool'].append(dict(document, place_id='branch-2'))
+            break
+    state['pool_key'] = 'chain-branches'   # 與原本的地點池分開快取
+
+    system = make_system()
+    captured = {}
+    monkeypatch.setattr(system, 'plan_trip',
+                        lambda places, *args, **kwargs: captured.setdefault('places', places))
+    system.replan(state, trip, restart_index)
+
+    keys = {place.place_id for place in captured['places']
+            if place.name == cancelled['name']}
+    assert keys == {'branch-2'}
+
+
+def test_replan_restores_fetched_routes(planned, make_system):
+    itinerary, state = planned
+
+    GeoService.get_route.cache_clear()
+    system = make_system()
+    system.geo_service.import_routes(state['routes'])
+
+    leg = state['routes'][0]
+    assert GeoService.get_route.cache_get(leg['key']) == leg['route']
+
+
+def test_replan_rejects_invalid_state(planned, make_system):
+    itinerary, _ = planned
+
+    with pytest.raises(ValueError):
+        make_system().replan({'version': 0}, itinerary, 3)
@@ -0,0 +1,58 @@
+import pytest
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.planner.objectives import (
+    get_objective,
+    itinerary_stats
+)
+
+
+def names(itinerary):
+    return [item['name'] for item in itinerary]
+
+
+def test_same_seed_same_itinerary(system, requirement):
+    first = system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=7)
+    second = system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=7)
+
+    assert names(first) == names(second)
+
+
+def test_samples_return_best_by_objective(system, requirement):
+    best = system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                            samples=4, seed=1, workers=1,
+                            objective='travel_time')
+
+    scores = [result['score'] for result in system.sample_results]
+    assert [result['seed'] for result in system.sample_results] == [1, 2, 3, 4]
+    assert get_objective('travel_time')(best) == max(scores)
+
+    # 最佳樣本可以用它的種子單獨重現
+    replay = system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                              seed=system.best_seed)
+    assert names(replay) == names(best)
+
+
+def test_process_pool_matches_sequential(system, requirement):
+    sequential = system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                                  samples=2, seed=3, workers=1)
+    parallel = system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                                samples=2, seed=3, workers=2)
+
+    assert names(parallel) == names(sequential)
+
+
+def test_itinerary_stats():
+    itinerary = [
+        {'label': '起點', 'duration': 0, 'transport': {'time': 0}},
+        {'label': '景點', 'duration': 120,
+         'transport': {'time': 15, 'travel_distance': 5.0}},
+        {'label': '終點', 'duration': 0,
+         'transport': {'time': 10, 'travel_distance': 3.2}},
+    ]
+
+    assert itinerary_stats(itinerary) == {
+        'stops': 1, 'travel_minutes': 25, 'travel_km': 8.2,
+        'visit_minutes': 120}
+    with pytest.raises(ValueError):
+        get_objective('unknown')
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from feature.trip.benchmarks.planner_benchmark import make_requirement
+from feature.trip.benchmarks.synthetic_catalog import generate_catalog
+from feature.trip.src.core.services.async_geo_service import AsyncGeoService, RouteFetcher
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+
+
+class CountingClient(LocalMapsClient):
+    """記錄同時進行的請求數"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def directions(self, *args, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            return super().directions(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_legs(count):
+    origin = {'lat': 25.0478, 'lon': 121.5170}
+    return [(origin, {'lat': 25.0 + i * 0.01, 'lon': 121.5 + i * 0.005})
+            for i in range(count)]
+
+
+def test_get_routes_runs_concurrently_under_limit():
+    client = CountingClient(latency_ms=30)
+    async_geo = AsyncGeoService(GeoService(maps_client=client), concurrency=4)
+    legs = make_legs(8)
+
+    start = time.perf_counter()
+    routes = asyncio.run(async_geo.get_routes(legs, mode='transit'))
+    elapsed = time.perf_counter() - start
+
+    assert client.call_counts['directions'] == 8
+    assert client.max_active == 4
+    assert elapsed < 8 * 0.03 * 0.75
+    # 結果與同步版本相同(已寫入共用快取)
+    sync_geo = GeoService(maps_client=client)
+    for (origin, destination), route in zip(legs, routes):
+        assert sync_geo.get_route(origin, destination, 'transit') == route
+    assert client.call_counts['directions'] == 8
+
+
+def test_duplicate_legs_share_one_request():
+    client = LocalMapsClient(latency_ms=10)
+    async_geo = AsyncGeoService(GeoService(maps_client=client), concurrency=4)
+    leg = make_legs(1)[0]
+
+    routes = asyncio.run(async_geo.get_routes([leg, leg, leg]))
+
+    assert client.call_counts['directions'] == 1
+    assert routes[0] == routes[1] == routes[2]
+
+
+def test_route_fetcher_prefetch_warms_cache():
+    client = LocalMapsClient(latency_ms=10)
+    geo_service = GeoService(maps_client=client)
+    legs = make_legs(3)
+
+    with RouteFetcher(geo_service, concurrency=4) as fetcher:
+        fetcher.prefetch(legs, 'walking')
+        routes = fetcher.fetch(legs, 'walking')
+
+    assert client.call_counts['directions'] == 3
+    assert all(not route['is_estimated'] for route in routes)
+    origin, destination = legs[0]
+    assert geo_service.get_cached_route(origin, destination, 'walking') == routes[0]
+    with pytest.raises(RuntimeError):
+        fetcher.fetch(legs, 'walking')
+
+
+def test_greedy_prefetch_keeps_itinerary(make_system):
+    catalog = generate_catalog(300, seed=3)
+    requirement = make_requirement('driving')
+
+    def plan(options):
+        GeoService.get_route.cache_clear()
+        system = make_system()
+        itinerary = system.plan_trip(catalog, requirement, seed=2,
+                                     strategy_options=options, profile=True)
+        return itinerary, system.profile_report['counters']
+
+    baseline, _ = plan(None)
+    prefetched, counters = plan({'prefetch': 3})
+
+    assert ([(item['name'], item['start_time']) for item in prefetched] ==
+            [(item['name'], item['start_time']) for item in baseline])
+    assert counters['prefetched_legs'] > 0
+    assert not any(thread.name == 'route-fetcher' and thread.is_alive()
+                   for thread in threading.enumerate())
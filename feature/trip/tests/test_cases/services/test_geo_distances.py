@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from feature.trip.src.core.services.geo_service import GeoService
+
+
+@pytest.fixture
+def geo_service():
+    return GeoService()
+
+
+POINTS = [
+    {'lat': 25.0339, 'lon': 121.5619},   # 台北101
+    {'lat': 25.0421, 'lon': 121.5079},   # 西門町
+    {'lat': 25.1024, 'lon': 121.5485},   # 故宮
+    {'lat': 24.9537, 'lon': 121.2256},   # 中壢
+]
+ORIGIN = {'lat': 25.0480194, 'lon': 121.5168608}
+
+
+def test_one_to_many_matches_scalar(geo_service):
+    """向量化距離應與逐一計算的結果相同"""
+    lats, lons = geo_service.coordinates_to_arrays(POINTS)
+    distances = geo_service.calculate_distances(ORIGIN, lats, lons)
+
+    expected = [geo_service.calculate_distance(ORIGIN, p) for p in POINTS]
+    assert distances.tolist() == pytest.approx(expected, abs=0.1)
+
+
+def test_many_to_many_matrix(geo_service):
+    """距離矩陣的形狀與對稱性"""
+    lats, lons = geo_service.coordinates_to_arrays(POINTS)
+    matrix = geo_service.calculate_distance_matrix(lats, lons, lats, lons)
+
+    assert matrix.shape == (len(POINTS), len(POINTS))
+    assert np.allclose(np.diag(matrix), 0.0)
+    assert np.allclose(matrix, matrix.T)
+
+
+def test_invalid_coordinates(geo_service):
+    """任何一個座標無效都應拋出錯誤"""
+    lats = np.array([25.0, 91.0])
+    lons = np.array([121.5, 121.5])
+    with pytest.raises(ValueError):
+        geo_service.calculate_distances(ORIGIN, lats, lons)
@@ -0,0 +1,75 @@
+import pytest
+
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+from feature.trip.src.core.utils.cache_backend import SQLiteCacheBackend
+from feature.trip.src.core.utils.geocode_cache import (
+    GeocodeCache,
+    normalize_address
+)
+
+
+PLACES = {
+    '台北車站': (25.0480194, 121.5168608),
+    '台北101': (25.0339, 121.5645),
+}
+
+
+def make_service(backend=None):
+    client = LocalMapsClient(places=PLACES)
+    service = GeoService(maps_client=client,
+                         geocode_cache=GeocodeCache(backend=backend, ttl=60))
+    return service, client
+
+
+@pytest.mark.parametrize('raw, expected', [
+    (' 台北車站 ', '台北車站'),
+    ('臺北車站', '台北車站'),
+    ('北車', '台北車站'),
+    ('ＴＡＩＰＥＩ　１０１', 'taipei 101'),
+    ('臺北101', '台北101'),
+])
+def test_normalize_address(raw, expected):
+    assert normalize_address(raw) == expected
+
+
+def test_repeat_geocode_uses_cache():
+    service, client = make_service()
+
+    first = service.geocode('台北車站')
+    second = service.geocode('臺北車站')
+
+    assert client.call_counts['geocode'] == 1
+    assert second['name'] == '臺北車站'
+    assert (second['lat'], second['lon']) == (first['lat'], first['lon'])
+
+
+def test_geocode_persists_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    service, client = make_service(SQLiteCacheBackend(path))
+    service.geocode('台北101')
+
+    service, client = make_service(SQLiteCacheBackend(path))
+    result = service.geocode('台北101')
+
+    assert client.call_counts['geocode'] == 0
+    assert result['lat'] == PLACES['台北101'][0]
+
+
+def test_geocode_many_deduplicates_and_skips_failures():
+    service, client = make_service()
+
+    results = service.geocode_many(['台北車站', '北車', '不存在的地方', '台北101'])
+
+    assert set(results) == {'台北車站', '北車', '台北101'}
+    assert client.call_counts['geocode'] == 3
+
+
+def test_unknown_place_is_negatively_cached():
+    service, client = make_service()
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            service.geocode('不存在的地方')
+
+    assert client.call_counts['geocode'] == 1
@@ -0,0 +1,126 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from feature.trip.benchmarks.planner_benchmark import make_requirement
+from feature.trip.benchmarks.synthetic_catalog import generate_catalog
+from feature.trip.src.core.models.place_table import PlaceTable
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.isochrone import (
+    REACH_BANDS, IsochroneFilter, clear_isochrone_cache)
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+
+
+START = {'lat': 25.0478, 'lon': 121.5170}   # 台北車站
+START_TIME = datetime(2024, 1, 1, 18, 0)
+END_TIME = datetime(2024, 1, 1, 21, 0)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    clear_isochrone_cache()
+    yield
+    clear_isochrone_cache()
+
+
+@pytest.fixture(scope='module')
+def table():
+    return PlaceTable.from_locations(generate_catalog(400, seed=1))
+
+
+def make_filter(**options):
+    return IsochroneFilter(GeoService(maps_client=LocalMapsClient()), **options)
+
+
+def test_bound_never_drops_reachable_places(table):
+    """被判定為 unreachable 的地點,以實際路線也無法往返"""
+    isochrone = make_filter()
+    bands = isochrone.classify(table, START, START, 'walking', START_TIME, END_TIME)
+    budget = (END_TIME - START_TIME).total_seconds() // 60
+
+    unreachable = np.flatnonzero(bands == REACH_BANDS.index('unreachable'))
+    assert len(unreachable) > 0
+    geo_service = isochrone.geo_service
+    for row in unreachable[:50]:
+        place = {'lat': float(table.lat[row]), 'lon': float(table.lon[row])}
+        to = geo_service.get_route(START, place, 'walking', START_TIME)
+        back = geo_service.get_route(place, START, 'walking', START_TIME)
+        total = (to['duration_minutes'] + back['duration_minutes'] +
+                 int(table.duration[row]))
+        assert total > budget
+
+
+def test_estimate_drops_more_than_bound(table):
+    bound_table, bound = make_filter().filter(
+        table, START, START, 'walking', START_TIME, END_TIME)
+    estimate_table, estimate = make_filter(policy='estimate').filter(
+        table, START, START, 'walking', START_TIME, END_TIME)
+
+    assert 0 < bound['dropped'] < estimate['dropped']
+    assert bound['candidates'] == len(table)
+    assert len(bound_table) == len(table) - bound['dropped']
+    assert len(estimate_table) == len(table) - estimate['dropped']
+    assert sum(bound[band] for band in REACH_BANDS) == len(table)
+
+
+def test_full_day_keeps_table(table):
+    """時間充足時不移除地點,直接回傳原地點表"""
+    filtered, stats = make_filter().filter(
+        table, START, START, 'driving',
+        datetime(2024, 1, 1, 9, 0), datetime(2024, 1, 1, 21, 0))
+
+    assert filtered is table
+    assert stats['dropped'] == 0
+
+
+def test_same_cell_and_time_bucket_reuses_cache(table, monkeypatch):
+    isochrone = make_filter()
+    isochrone.round_trip_minutes(table, START, START, 'walking', START_TIME)
+
+    calls = []
+    monkeypatch.setattr(isochrone, '_compute',
+                        lambda *args: calls.append(args))
+    nearby = {'lat': START['lat'] + 0.0005, 'lon': START['lon']}
+    first = isochrone.round_trip_minutes(table, START, START, 'walking', START_TIME)
+    second = isochrone.round_trip_minutes(
+        table, nearby, nearby, 'walking', START_TIME.replace(minute=10))
+
+    assert calls == []
+    assert second[1].tolist() == first[1].tolist()
+
+
+def test_take_keeps_rows_and_hours(table):
+    rows = np.arange(0, len(table), 3)
+    subset = table.take(rows)
+
+    assert len(subset) == len(rows)
+    assert subset.names == [table.names[i] for i in rows]
+    assert (subset.lat == table.lat[rows]).all()
+    for weekday in (1, 6):
+        for minute in (9 * 60, 13 * 60 + 30, 20 * 60):
+            assert (subset.open_mask(weekday, minute) ==
+                    table.open_mask(weekday, minute)[rows]).all()
+            assert (subset.minutes_until_close(weekday, minute) ==
+                    table.minutes_until_close(weekday, minute)[rows]).all()
+
+
+def test_unsupported_policy():
+    with pytest.raises(ValueError):
+        make_filter(policy='fastest')
+
+
+@pytest.mark.parametrize('isochrone', ['bound', 'estimate'])
+def test_plan_trip_records_stats(isochrone, system):
+    catalog = generate_catalog(1500, seed=1)
+    requirement = make_requirement('walking')
+    requirement[0]['出發時間'] = '18:00'
+    requirement[0]['結束時間'] = '21:00'
+
+    itinerary = system.plan_trip(catalog, requirement, seed=1, isochrone=isochrone)
+
+    stats = system.last_context.isochrone
+    assert stats['candidates'] == len(catalog)
+    assert stats['dropped'] > 0
+    assert len(itinerary) > 2
+    assert itinerary[-1]['end_time'] <= '21:00'
@@ -0,0 +1,88 @@
+import pytest
+
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+
+
+def make_points(count):
+    """在台北附近產生測試座標"""
+    return [{'lat': 25.0 + i * 0.01, 'lon': 121.5 + i * 0.005}
+            for i in range(count)]
+
+
+def test_matrix_shape_and_values():
+    """矩陣結果與單段路線一致"""
+    client = LocalMapsClient()
+    geo_service = GeoService(maps_client=client)
+    origins, destinations = make_points(2), make_points(3)
+
+    matrix = geo_service.get_route_matrix(origins, destinations, mode='walking')
+
+    assert len(matrix) == 2
+    assert all(len(row) == 3 for row in matrix)
+    single = geo_service._get_google_maps_route(
+        origins[1], destinations[2], 'walking', None)
+    assert matrix[1][2]['duration_minutes'] == single['duration_minutes']
+    assert matrix[1][2]['is_estimated'] is False
+
+
+@pytest.mark.parametrize("n_origins,n_destinations,expected_calls", [
+    (1, 1, 1),
+    (30, 10, 3),     # 每批 10 x 10
+    (2, 60, 3),      # 終點每批最多 25 個
+])
+def test_matrix_chunked_to_api_limits(n_origins, n_destinations, expected_calls):
+    """依照 API 限制分批呼叫"""
+    client = LocalMapsClient()
+    geo_service = GeoService(maps_client=client)
+
+    matrix = geo_service.get_route_matrix(
+        make_points(n_origins), make_points(n_destinations))
+
+    assert client.call_counts['distance_matrix'] == expected_calls
+    assert client.call_counts['distance_matrix_elements'] == (
+        n_origins * n_destinations)
+    assert all(leg is not None for row in matrix for leg in row)
+
+
+def test_matrix_reuses_route_cache():
+    """已快取的路線不會重新請求"""
+    client = LocalMapsClient()
+    geo_service = GeoService(maps_client=client)
+    origins, destinations = make_points(3), make_points(4)
+
+    first = geo_service.get_route_matrix(origins, destinations)
+    second = geo_service.get_route_matrix(origins, destinations)
+
+    assert client.call_counts['distance_matrix'] == 1
+    assert first == second
+    assert geo_service.get_route_estimate(origins[0], destinations[1]) == first[0][1]
+    assert client.call_counts['directions'] == 0
+
+
+def test_matrix_does_not_replace_navigation():
+    """矩陣元素沒有 route_info,之後的 get_route 仍取得完整路線"""
+    client = LocalMapsClient()
+    geo_service = GeoService(maps_client=client)
+    origins, destinations = make_points(2), make_points(2)
+
+    matrix = geo_service.get_route_matrix(origins, destinations)
+    route = geo_service.get_route(origins[0], destinations[1])
+
+    assert matrix[0][1]['route_info'] is None
+    assert client.call_counts['directions'] == 1
+    assert route['route_info'] is not None
+    assert route['duration_minutes'] == matrix[0][1]['duration_minutes']
+    assert geo_service.get_cached_route(origins[0], destinations[1]) == route
+    # 已有完整路線時矩陣直接使用
+    assert geo_service.get_route_matrix(origins, destinations)[0][1] == route
+
+
+def test_matrix_falls_back_to_estimate():
+    """沒有地圖服務時改用直線距離預估"""
+    geo_service = GeoService(maps_client=LocalMapsClient())
+    geo_service.has_google_maps = False
+
+    matrix = geo_service.get_route_matrix(make_points(2), make_points(2))
+
+    assert matrix[0][1]['is_estimated'] is True
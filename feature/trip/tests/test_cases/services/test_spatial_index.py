@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.spatial_index import SpatialIndex
+
+
+CENTER = {'lat': 25.0480194, 'lon': 121.5168608}
+
+
+@pytest.fixture
+def points():
+    rng = random.Random(7)
+    return [{'name': f'p{i}',
+             'lat': 24.9 + rng.random() * 0.3,
+             'lon': 121.4 + rng.random() * 0.3}
+            for i in range(500)]
+
+
+@pytest.fixture
+def geo_service():
+    return GeoService(maps_client=object())
+
+
+def brute_force(points):
+    lats = np.array([p['lat'] for p in points])
+    lons = np.array([p['lon'] for p in points])
+    distances = GeoService.haversine_matrix(
+        np.array([CENTER['lat']]), np.array([CENTER['lon']]), lats, lons)[0]
+    return distances
+
+
+@pytest.mark.parametrize('cell_size', [0.5, 2.0, 50.0])
+def test_query_radius_matches_brute_force(points, cell_size):
+    index = SpatialIndex(points, cell_size_km=cell_size)
+    distances = brute_force(points)
+
+    indices, found = index.query_radius(CENTER, 5)
+
+    assert set(indices.tolist()) == set(np.nonzero(distances <= 5)[0].tolist())
+    assert list(found) == sorted(found)
+    assert np.allclose(found, distances[indices])
+
+
+def test_query_radius_unsorted_keeps_original_order(points):
+    index = SpatialIndex(points, cell_size_km=1.0)
+
+    indices, _ = index.query_radius(CENTER, 8, sort=False)
+
+    assert list(indices) == sorted(indices)
+
+
+def test_nearest(points):
+    index = SpatialIndex(points, cell_size_km=0.5)
+    distances = brute_force(points)
+
+    indices, found = index.nearest(CENTER, k=10)
+
+    assert list(indices) == list(np.argsort(distances, kind='stable')[:10])
+    assert len(found) == 10
+
+
+def test_query_bounds(points, geo_service):
+    index = SpatialIndex(points)
+    bounds = geo_service.calculate_bounds(CENTER, 3)
+
+    indices = index.query_bounds(bounds)
+
+    expected = [i for i, p in enumerate(points)
+                if geo_service._is_point_in_bounds(p, bounds)]
+    assert indices.tolist() == expected
+
+
+def test_find_points_in_range_uses_index(points, geo_service):
+    index = geo_service.build_spatial_index(points, 4)
+
+    nearby = geo_service.find_points_in_range(CENTER, points, 4, index=index)
+
+    assert nearby == geo_service.find_points_in_range(CENTER, points, 4)
+    assert all(p['distance'] <= 4 for p in nearby)
+    assert [p['distance'] for p in nearby] == sorted(
+        p['distance'] for p in nearby)
+
+
+def test_empty_index():
+    index = SpatialIndex([])
+
+    indices, distances = index.query_radius(CENTER, 5)
+
+    assert len(indices) == 0 and len(distances) == 0
+    assert len(index.nearest(CENTER, 3)[0]) == 0
@@ -0,0 +1,97 @@
+from datetime import datetime, time
+
+import numpy as np
+import pytest
+
+from feature.trip.src.core.services.time_service import TimeService
+
+
+def reference_period(service, minute):
+    """原本逐一比較 time 物件的時段判斷"""
+    window = service.MEAL_WINDOW
+    lunch = service.lunch_minutes
+    dinner = service.dinner_minutes
+    lunch_start, lunch_end = (lunch - window) % 1440, (lunch + window) % 1440
+    dinner_start, dinner_end = (dinner - window) % 1440, (dinner + window) % 1440
+
+    if minute < lunch_start:
+        return 'morning'
+    if lunch_start <= minute <= lunch_end:
+        return 'lunch'
+    if minute > lunch_end:
+        if minute < dinner_start:
+            return 'afternoon'
+        if dinner_start <= minute <= dinner_end:
+            return 'dinner'
+        return 'night'
+
+    hour = minute // 60
+    if hour < 11:
+        return 'morning'
+    if hour < 14:
+        return 'lunch'
+    if hour < 17:
+        return 'afternoon'
+    if hour < 20:
+        return 'dinner'
+    return 'night'
+
+
+@pytest.mark.parametrize('lunch,dinner', [
+    ("12:00", "18:00"), ("00:30", "18:00"), ("11:00", "23:30")])
+def test_period_table_matches_reference(lunch, dinner):
+    service = TimeService(lunch_time=lunch, dinner_time=dinner)
+
+    expected = [reference_period(service, minute) for minute in range(1440)]
+
+    assert [service.get_time_period(minute) for minute in range(1440)] == expected
+    codes = service.get_time_periods(np.arange(1440))
+    assert [service.PERIODS[code] for code in codes] == expected
+
+
+def test_changing_meal_time_rebuilds_table():
+    service = TimeService()
+    assert service.get_time_period("12:30") == 'lunch'
+
+    service.lunch_time = "10:00"
+
+    assert service.lunch_time == time(10, 0)
+    assert service.lunch_minutes == 600
+    assert service.get_time_period("12:30") == 'afternoon'
+
+
+def test_in_meal_window_matches_advance_period():
+    service = TimeService()
+    minutes = np.arange(0, 1440, 7)
+
+    mask = service.in_meal_window(minutes, 'lunch')
+
+    for minute, hit in zip(minutes, mask):
+        current = datetime(2024, 1, 1, int(minute) // 60, int(minute) % 60)
+        next_period = service.advance_period('morning', current, False, False)
+        assert (next_period == 'lunch') == hit
+
+
+def test_business_hours_overnight_slot():
+    service = TimeService()
+    hours = {1: [{'start': '22:00', 'end': '02:00'}]}
+
+    assert service.is_business_hours(datetime(2024, 1, 1, 23, 0), hours, 60) == (True, 60)
+    assert service.is_business_hours(datetime(2024, 1, 1, 1, 30), hours, 60) == (True, 30)
+    assert service.is_business_hours(datetime(2024, 1, 1, 12, 0), hours, 60) == (False, None)
+
+    is_open, remaining = service.is_business_hours_batch(
+        np.array([23 * 60, 90, 12 * 60]), 1, hours, 60)
+    assert is_open.tolist() == [True, True, False]
+    assert remaining.tolist() == [60, 30, -1]
+
+
+def test_find_next_available_time_wait_minutes():
+    service = TimeService()
+    hours = {2: [{'start': '09:00', 'end': '17:00'}]}
+
+    # 週一 20:00,下一個時段是週二 09:00
+    result = service.find_next_available_time(datetime(2024, 1, 1, 20, 0), hours, 60)
+
+    assert result == {'day': 2, 'start': '09:00', 'end': '17:00',
+                      'wait_minutes': 13 * 60}
@@ -0,0 +1,118 @@
+import random
+
+import numpy as np
+import pytest
+
+from feature.trip.sample_data import DEFAULT_LOCATIONS
+from feature.trip.src.core.services.geo_service import GeoService
+from feature.trip.src.core.services.local_maps_client import LocalMapsClient
+from feature.trip.src.core.services.travel_estimator import TravelTimeEstimator
+
+
+def make_samples(count, seed=0):
+    """開車的實際時間約為未校正估算的 1.5 倍,尖峰時段再多 20%"""
+    rng = random.Random(seed)
+    base = TravelTimeEstimator()
+    samples = []
+    for _ in range(count):
+        straight_km = rng.uniform(0.5, 15)
+        departure_minute = rng.choice([8 * 60, 13 * 60])
+        factor = 1.5 * (1.2 if departure_minute == 8 * 60 else 1.0)
+        samples.append({
+            'mode': 'driving',
+            'straight_km': straight_km,
+            'departure_minute': departure_minute,
+            'duration_minutes': float(base.base_minutes(straight_km)) * factor
+                                * rng.uniform(0.95, 1.05),
+            'distance_km': straight_km * 1.4,
+        })
+    return samples
+
+
+@pytest.mark.parametrize('mode', ['driving', 'transit', 'walking', 'bicycling'])
+def test_uncalibrated_matches_fixed_formula(mode):
+    geo_service = GeoService(maps_client=LocalMapsClient(),
+                             estimator=TravelTimeEstimator())
+    distances = np.array([0.0, 0.4, 1.0, 2.7, 12.3])
+
+    minutes = geo_service.estimate_travel_minutes(distances, mode)
+
+    speed = GeoService.DEFAULT_SPEEDS[mode]
+    time_factor = 1.4 if mode == 'driving' else 1.3
+    expected = [int(d / speed * 60 * time_factor) for d in distances]
+    assert minutes.tolist() == expected
+
+
+def test_fit_reduces_error():
+    estimator = TravelTimeEstimator()
+    samples = make_samples(200)
+
+    stats = estimator.fit(samples)
+
+    assert estimator.is_calibrated
+    assert stats['samples'] == 200
+    assert stats['after']['mae_minutes'] < stats['before']['mae_minutes'] / 3
+    # 尖峰時段的係數較高
+    morning = estimator.estimate_minutes(5.0, 'driving', 8 * 60)
+    afternoon = estimator.estimate_minutes(5.0, 'driving', 13 * 60)
+    assert morning > afternoon
+    # 沒有樣本的交通方式不校正
+    assert (estimator.estimate_minutes(5.0, 'walking') ==
+            TravelTimeEstimator().estimate_minutes(5.0, 'walking'))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    estimator = TravelTimeEstimator()
+    estimator.fit(make_samples(100))
+    path = tmp_path / 'estimator.json'
+
+    estimator.save(str(path))
+    loaded = TravelTimeEstimator.load(str(path))
+
+    assert loaded.time_corrections == estimator.time_corrections
+    assert loaded.distance_corrections == estimator.distance_corrections
+    assert not TravelTimeEstimator.load(str(tmp_path / 'missing.json')).is_calibrated
+
+
+def test_calibrate_from_cached_routes(tmp_path, system, requirement):
+    geo_service = GeoService(maps_client=LocalMapsClient(),
+                             estimator=TravelTimeEstimator())
+    system.geo_service = geo_service
+    system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=1)
+
+    samples = geo_service.collect_route_samples()
+    path = tmp_path / 'estimator.json'
+    stats = geo_service.calibrate_estimator(samples, path=str(path))
+
+    assert samples and all(sample['mode'] == 'driving' for sample in samples)
+    assert stats['samples'] > 0
+    assert path.exists()
+
+
+def test_estimate_routing_fetches_only_committed_legs(make_system,
+                                                      requirement):
+    api_client = LocalMapsClient()
+    api_system = make_system(api_client)
+    api_system.plan_trip(DEFAULT_LOCATIONS, requirement, seed=1)
+
+    GeoService.get_route.cache_clear()
+    estimate_client = LocalMapsClient()
+    estimate_system = make_system(estimate_client)
+    itinerary = estimate_system.plan_trip(
+        DEFAULT_LOCATIONS, requirement, seed=1,
+        strategy_options={'routing': 'estimate'})
+
+    def billed(client):
+        counts = client.call_counts
+        return counts['directions'] + counts['distance_matrix_elements']
+
+    # 只查詢採用的路段、返回終點,以及最後因超過結束時間而放棄的地點
+    assert estimate_client.call_counts['directions'] <= len(itinerary)
+    assert billed(estimate_client) < billed(api_client)
+    assert all(item['route_info'] is not None for item in itinerary[1:])
+
+
+def test_unknown_routing_mode_rejected(system, requirement):
+    with pytest.raises(ValueError):
+        system.plan_trip(DEFAULT_LOCATIONS, requirement,
+                         strategy_options={'routing': 'offline'})
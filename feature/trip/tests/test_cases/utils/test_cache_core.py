@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from feature.trip.src.core.utils.cache_core import LRUCache
+from feature.trip.src.core.utils.cache_decorator import cached
+
+
+class TestLRUCache:
+    """測試 LRU 快取核心"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1  # a 變成最近使用
+
+        cache.set('c', 3)
+
+        assert 'b' not in cache
+        assert cache.keys() == ['a', 'c']
+        assert cache.cache_info()['evictions'] == 1
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(maxsize=4, ttl=0.05)
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+
+        time.sleep(0.1)
+
+        assert cache.get('a') is None
+        info = cache.cache_info()
+        assert info['expirations'] == 1
+        assert info['size'] == 0
+
+    def test_cache_info_counts_and_bytes(self):
+        cache = LRUCache(maxsize=4)
+        cache.set('a', {'distance_km': 5.0})
+        cache.get('a')
+        cache.get('missing')
+
+        info = cache.cache_info()
+        assert info['hits'] == 1
+        assert info['misses'] == 1
+        assert info['hit_rate'] == 0.5
+        assert info['bytes'] > 0
+
+        cache.clear()
+        assert cache.cache_info()['bytes'] == 0
+
+    def test_negative_cache_reraises(self):
+        cache = LRUCache(maxsize=4, negative_ttl=60)
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ValueError('找不到地點')
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                cache.get_or_compute('bad', fail)
+
+        assert len(calls) == 1
+        assert cache.cache_info()['negative_hits'] == 2
+
+    def test_errors_not_cached_without_negative_ttl(self):
+        cache = LRUCache(maxsize=4)
+        calls = []
+
+        def fail():
+            calls.append(1)
+            raise ValueError('失敗')
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                cache.get_or_compute('bad', fail)
+
+        assert len(calls) == 2
+
+    def test_concurrent_compute_runs_once(self):
+        cache = LRUCache(maxsize=4)
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return 42
+
+        threads = [threading.Thread(
+            target=lambda: results.append(cache.get_or_compute('k', slow)))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [42] * 8
+
+
+class TestCachedDecorator:
+    """測試 cached 裝飾器"""
+
+    def test_exception_keeps_existing_entries(self):
+        calls = []
+
+        @cached(maxsize=8)
+        def square(x):
+            calls.append(x)
+            if x < 0:
+                raise ValueError('負數')
+            return x * x
+
+        assert square(3) == 9
+        with pytest.raises(ValueError):
+            square(-1)
+        assert square(3) == 9
+
+        assert calls == [3, -1]
+        assert square.cache_info()['size'] == 1
@@ -0,0 +1,110 @@
+import time
+from datetime import datetime
+
+from feature.trip.src.core.utils.cache_backend import (
+    MemoryCacheBackend,
+    SQLiteCacheBackend
+)
+from feature.trip.src.core.utils.cache_decorator import geo_cache
+
+
+ORIGIN = {'lat': 25.0480194, 'lon': 121.5168608}
+DESTINATION = {'lat': 25.0339, 'lon': 121.5619}
+
+
+def make_route_function(backend, calls):
+    """建立一個模擬 get_route 的函數"""
+    @geo_cache(maxsize=8, backend=backend, ttl=60)
+    def get_route(self, origin, destination, mode='driving', departure_time=None):
+        calls.append((origin['lat'], destination['lat'], mode))
+        return {'distance_km': 5.0, 'duration_minutes': 12,
+                'is_estimated': False, 'transport_mode': mode}
+    return get_route
+
+
+class TestSQLiteCacheBackend:
+    """測試 SQLite 持久化後端"""
+
+    def test_survives_new_instance(self, tmp_path):
+        """重新建立後端(模擬重新啟動)後資料仍存在"""
+        path = str(tmp_path / 'cache.sqlite3')
+        SQLiteCacheBackend(path).set('k', 'v')
+
+        assert SQLiteCacheBackend(path).get('k') == b'v'
+
+    def test_ttl_expiry(self, tmp_path):
+        """過期的項目視為不存在"""
+        backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite3'))
+        backend.set('k', 'v', ex=1)
+        backend._connection().execute(
+            'UPDATE cache SET expires_at = ?', (time.time() - 1,))
+
+        assert backend.get('k') is None
+        assert backend.info()['expired'] == 1
+
+    def test_size_limit(self, tmp_path):
+        """超過容量時移除最舊的項目"""
+        backend = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite3'),
+                                     max_entries=3)
+        for i in range(5):
+            backend.set(f'k{i}', str(i))
+        backend.prune()
+
+        assert backend.info()['size'] == 3
+        assert backend.get('k0') is None
+        assert backend.get('k4') == b'4'
+
+
+class TestGeoCacheWithBackend:
+    """測試 geo_cache 的兩層快取"""
+
+    def test_positional_and_keyword_share_key(self):
+        calls = []
+        get_route = make_route_function(None, calls)
+
+        get_route(None, ORIGIN, DESTINATION, 'driving')
+        get_route(None, origin=ORIGIN, destination=DESTINATION, mode='driving')
+
+        assert len(calls) == 1
+
+    def test_departure_time_bucket_in_key(self):
+        """不同時段的出發時間使用不同的快取"""
+        calls = []
+        get_route = make_route_function(None, calls)
+        morning = datetime(2025, 1, 1, 8, 0)
+
+        get_route(None, ORIGIN, DESTINATION, departure_time=morning)
+        get_route(None, ORIGIN, DESTINATION,
+                  departure_time=morning.replace(minute=10))
+        get_route(None, ORIGIN, DESTINATION,
+                  departure_time=morning.replace(hour=18))
+
+        assert len(calls) == 2
+
+    def test_backend_shared_between_processes(self):
+        """行程內快取清除後(模擬另一個 worker)仍可從後端取得"""
+        backend = MemoryCacheBackend()
+        calls = []
+        get_route = make_route_function(backend, calls)
+
+        first = get_route(None, ORIGIN, DESTINATION)
+        get_route.cache_clear()
+        second = get_route(None, ORIGIN, DESTINATION)
+
+        assert first == second
+        assert len(calls) == 1
+        info = get_route.cache_info()
+        assert info['backend_hits'] == 1
+        assert info['misses'] == 1
+
+    def test_estimated_routes_not_persisted(self):
+        """預估的路線不寫入持久化後端"""
+        backend = MemoryCacheBackend()
+
+        @geo_cache(backend=backend)
+        def get_route(self, origin, destination, mode='driving', departure_time=None):
+            return {'distance_km': 1.0, 'is_estimated': True}
+
+        get_route(None, ORIGIN, DESTINATION)
+
+        assert backend.info()['sets'] == 0
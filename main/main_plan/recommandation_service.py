@@ -1,9 +1,8 @@
 from typing import Optional, Dict, List, Tuple, Any
-from feature.llm.LLM import LLM_Manager
-from feature.retrieval.qdrant_search import qdrant_search
 from feature.plan.Contextual_Search_Main import filter_and_calculate_scores
 from feature.sql_csv import sql_csv
 from main.main_plan.check_location import is_in_new_taipei
+from main.service_container import get_services
 from pprint import pprint
 
 def recommandation(user_Q: str, config: dict[str, str], user_location: Optional[Dict[str, float]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
@@ -23,8 +22,9 @@ def recommandation(user_Q: str, config: dict[str, str], user_location: Optional[
     print("\n=== 開始處理用戶查詢 ===")
     print("用戶查詢:", user_Q)
     print("用戶位置:", user_location)
-    # 初始化 LLM 物件
-    LLM_obj = LLM_Manager(config['ChatGPT_api_key'])
+    # 使用行程共用的 LLM 與 Qdrant 用戶端
+    services = get_services(config)
+    LLM_obj = services.llm
     weights = {'distance': 0.2, 'comments': 0.4, 'similarity': 0.4}
     
     
@@ -58,9 +58,8 @@ def recommandation(user_Q: str, config: dict[str, str], user_location: Optional[
 
     
     # 向量搜索
-    qdrant_obj = qdrant_search(
+    qdrant_obj = services.qdrant_search(
         collection_name='view_restaurant',
-        config=config,
         score_threshold=0.6,
         limit=1000,
     )
@@ -1,8 +1,7 @@
-from feature.llm.LLM import LLM_Manager
-from feature.retrieval.qdrant_search import qdrant_search
 from feature.retrieval.utils import jina_embedding, json2txt, qdrant_control
 from feature.plan.Contextual_Search_Main import filter_and_calculate_scores
 from feature.sql_csv import sql_csv
+from main.service_container import get_services
 from typing import Dict, List, Tuple, Any
 
 def rerun_rec(query_info: Dict[str, Any], config: Dict[str, str]) -> List[Dict[str, Any]]:
@@ -18,10 +17,9 @@ def rerun_rec(query_info: Dict[str, Any], config: Dict[str, str]) -> List[Dict[s
     """
     weights = {'distance': 0.2, 'comments': 0.4, 'similarity': 0.4}
 
-    # 向量搜索，直接在此階段使用黑名單過濾
-    qdrant_obj = qdrant_search(
+    # 向量搜索，直接在此階段使用黑名單過濾(共用行程的 Qdrant 用戶端)
+    qdrant_obj = get_services(config).qdrant_search(
         collection_name='view_restaurant',
-        config=config,
         score_threshold=0.6,
         limit=1000,
         black_list=list(query_info["black_list"])  # 將 set 轉換為 list
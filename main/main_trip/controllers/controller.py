@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
@@ -10,11 +10,26 @@ from feature.retrieval.qdrant_search import qdrant_search
 from feature.sql_csv.sql_csv import pandas_search
 from feature.nosql_mongo.mongo_trip.db_helper import trip_db
 from feature.trip.trip import TripPlanningSystem
+from feature.trip.src.core.models.place import place_key
 
 class TripController:
-    """行程規劃系統控制器"""
+    """行程規劃系統控制器
 
-    def __init__(self, config: dict):
+    控制器本身不保存請求的狀態，可以在多個執行緒中共用
+    (見 main.service_container.ServiceContainer.trip_controller)。
+    """
+
+    # 規劃行程的期限(秒),LINE 的 reply token 與 gunicorn --timeout=30 都有時間限制,
+    # 可以用 config['plan_deadline_seconds'] 調整
+    PLAN_DEADLINE_SECONDS = 8
+
+    def __init__(
+        self,
+        config: dict,
+        llm: Optional[LLM_Manager] = None,
+        trip_planner: Optional[TripPlanningSystem] = None,
+        qdrant_client=None,
+    ):
         """
         初始化控制器
 
@@ -25,10 +40,14 @@ class TripController:
                 - qdrant_url: Qdrant 資料庫 URL
                 - qdrant_api_key: Qdrant API 金鑰
                 - ChatGPT_api_key: ChatGPT API 金鑰
+            llm: 共用的 LLM_Manager(選填,預設建立新的)
+            trip_planner: 共用的 TripPlanningSystem(選填,預設建立新的)
+            qdrant_client: 共用的 QdrantClient(選填,預設每次查詢建立連線)
         """
         self.config = config
-        self.LLM_obj = LLM_Manager(self.config['ChatGPT_api_key'])
-        self.trip_planner = TripPlanningSystem()
+        self.LLM_obj = llm or LLM_Manager(self.config['ChatGPT_api_key'])
+        self.trip_planner = trip_planner or TripPlanningSystem()
+        self.qdrant_client = qdrant_client
 
     def process_message(
         self,
@@ -59,6 +78,21 @@ class TripController:
             latest = trip_db.get_latest_plan(line_id=line_id)
             latest_itinerary = latest.get('itinerary') if latest else None
 
+            # 取消地點後重新規劃:使用保存的規劃狀態,
+            # 不需要重新分析意圖、向量檢索與查詢地點資料。
+            # 使用者輸入了新的需求時仍走完整流程(從 restart_index 開始)
+            if self._is_replan_request(input_text, latest):
+                result = self._replan(latest)
+                if result is not None:
+                    trip_db.save_plan(
+                        line_id=line_id,
+                        input_text=latest.get('input_text', input_text),
+                        requirement=latest['requirement'],
+                        itinerary=result,
+                        plan_state=self.trip_planner.export_plan_state(result)
+                    )
+                    return result
+
             # 3. 準備給LLM的文字(包含歷史整理)
             input_for_LLM = self._prepare_input_text(
                 text=input_text,
@@ -99,7 +133,8 @@ class TripController:
                 line_id=line_id,
                 input_text=input_text,
                 requirement=base_requirement,
-                itinerary=result
+                itinerary=result,
+                plan_state=self.trip_planner.export_plan_state(result)
             )
 
             return result
@@ -138,10 +173,10 @@ class TripController:
                 ]
 
         Returns:
-            Dict: 各時段對應的景點ID
+            Dict: 各時段對應的景點ID與相似分數
                 {
-                    '上午': ['id1', 'id2', ...],
-                    '中餐': ['id3', 'id4', ...]
+                    '上午': {'id1': 0.82, 'id2': 0.75, ...},
+                    '中餐': {'id3': 0.71, 'id4': 0.66, ...}
                 }
         """
         try:
@@ -150,7 +185,8 @@ class TripController:
                 collection_name='view_restaurant',
                 config=self.config,
                 score_threshold=0.5,
-                limit=100
+                limit=100,
+                qdrant_client=self.qdrant_client
             )
             # period_describe = [
             #     {'上午': '喜歡在文青咖啡廳裡享受幽靜且美麗的裝潢'},
@@ -164,7 +200,7 @@ class TripController:
             results = {}
             with ThreadPoolExecutor() as executor:
                 future_to_query = {
-                    executor.submit(qdrant_obj.trip_search, query): query
+                    executor.submit(qdrant_obj.trip_search, query, True): query
                     for query in period_describe
                 }
 
@@ -187,17 +223,18 @@ class TripController:
 
         Args:
             placeIDs: Dict 
-                各時段的景點ID，格式如：
+                各時段的景點ID(與相似分數)，格式如：
                 {
-                    '上午': ['id1', 'id2'],
-                    '中餐': ['id3', 'id4']
+                    '上午': {'id1': 0.82, 'id2': 0.75},
+                    '中餐': {'id3': 0.71, 'id4': 0.66}
                 }
             unique_requirement: List[Dict]
                 使用者的特殊需求，例如：
                 [{'無障礙': True, '適合兒童': True}]
 
         Returns:
-            List[Dict]: 景點的詳細資料列表
+            List[Dict]: 景點的詳細資料列表,每個地點一筆
+                        (periods 為所有時段,period_scores 為各時段的相似分數)
         """
         unique_requirement = [{'無障礙': False}]
 
@@ -210,6 +247,9 @@ class TripController:
     def _add_duration(self, places: List[Dict]) -> List[Dict]:
         """為地點加入停留時間資訊
 
+        地點已依 place_id 去除重複(見 trip_system),每個地點只查詢一次,
+        periods 與 period_scores 原樣保留給規劃系統。
+
         Args:
             places: List[Dict] - 地點列表
 
@@ -264,9 +304,66 @@ class TripController:
             locations=location_details,
             requirement=base_requirement,
             previous_trip=previous_trip,
-            restart_index=restart_index
+            restart_index=restart_index,
+            deadline=self._plan_deadline()
         )
 
+    def _plan_deadline(self) -> float:
+        """規劃行程的期限(秒)"""
+        return float(self.config.get('plan_deadline_seconds',
+                                     self.PLAN_DEADLINE_SECONDS))
+
+    @staticmethod
+    def _is_replan_request(input_text: str, latest: Optional[Dict]) -> bool:
+        """是否只是要求依取消的地點重新規劃
+
+        最新的行程有被取消的地點(restart_index)與規劃狀態，
+        且使用者沒有輸入新的需求(空白或與上次的輸入相同)時才成立。
+
+        Args:
+            input_text: 使用者輸入文字
+            latest: Dict - 最新的規劃記錄(選填)
+
+        Returns:
+            bool: 可以直接使用保存的規劃狀態重新規劃
+        """
+        if not latest or 'restart_index' not in latest or not latest.get('plan_state'):
+            return False
+        text = (input_text or '').strip()
+        return not text or text == (latest.get('input_text') or '').strip()
+
+    def _replan(self, latest: Dict) -> Optional[List[Dict]]:
+        """使用保存的規劃狀態重新規劃被取消地點之後的行程
+
+        Args:
+            latest: Dict - 最新的規劃記錄(含 restart_index 與 plan_state)
+
+        Returns:
+            Optional[List[Dict]]: 重新規劃的行程,
+                                  規劃狀態無法使用時為 None(改走完整規劃)
+        """
+        itinerary = latest['itinerary']
+
+        # 所有被取消的地點都不再選入,按鈕格式為 cancel_{plan_index}_{step}
+        cancelled_steps = {
+            int(button_id.split('_')[-1])
+            for button_id in latest.get('clicked_buttons', [])
+        }
+        excluded_places = [place_key(item) for item in itinerary
+                           if item['step'] in cancelled_steps]
+
+        try:
+            return self.trip_planner.replan(
+                plan_state=latest['plan_state'],
+                previous_trip=itinerary,
+                restart_index=latest['restart_index'],
+                excluded_places=excluded_places,
+                deadline=self._plan_deadline()
+            )
+        except ValueError as e:
+            print(f"無法使用保存的規劃狀態,重新規劃完整行程: {str(e)}")
+            return None
+
     def _prepare_input_text(
         self,
         text: str = "",
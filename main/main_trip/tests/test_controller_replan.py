@@ -0,0 +1,95 @@
+# test_controller_replan.py
+
+import pytest
+
+from main.main_trip.controllers import controller as controller_module
+from main.main_trip.controllers.controller import TripController
+
+
+OLD_ITINERARY = [{'step': 0, 'name': '台北車站', 'place_id': 'start'},
+                 {'step': 1, 'name': '西門紅樓', 'place_id': 'p1'}]
+NEW_ITINERARY = [{'step': 0, 'name': '台北車站', 'place_id': 'start'},
+                 {'step': 1, 'name': '淡水老街', 'place_id': 'p2'}]
+
+
+class FakeTripDB:
+    """只記錄 save_plan 的 trip_db"""
+
+    def __init__(self, latest):
+        self.latest = latest
+        self.saved = []
+
+    def get_user_location(self, line_id):
+        return None
+
+    def get_latest_plan(self, line_id):
+        return self.latest
+
+    def save_plan(self, **record):
+        self.saved.append(record)
+        return 2
+
+
+class FakePlanner:
+    def export_plan_state(self, itinerary):
+        return {'version': 1}
+
+
+@pytest.fixture
+def latest():
+    """使用者取消了第 1 個地點的最新規劃記錄"""
+    return {
+        'input_text': '旅遊推薦 台北文青',
+        'requirement': [{'出發時間': '09:00'}],
+        'itinerary': OLD_ITINERARY,
+        'restart_index': 1,
+        'plan_state': {'version': 1},
+    }
+
+
+@pytest.fixture
+def controller(monkeypatch, latest):
+    db = FakeTripDB(latest)
+    monkeypatch.setattr(controller_module, 'trip_db', db)
+
+    controller = TripController(config={}, llm=object(), trip_planner=FakePlanner())
+    calls = []
+    controller.calls = calls
+    controller.db = db
+
+    def replan(record):
+        calls.append('replan')
+        return NEW_ITINERARY
+
+    def full_plan(**kwargs):
+        calls.append(('plan', kwargs['restart_index']))
+        return NEW_ITINERARY
+
+    monkeypatch.setattr(controller, '_replan', replan)
+    monkeypatch.setattr(controller, '_prepare_input_text', lambda **kwargs: kwargs['text'])
+    monkeypatch.setattr(controller, '_analyze_intent', lambda text: (
+        ['淡水'], [], [{'出發時間': '09:00'}], ['0']))
+    monkeypatch.setattr(controller, '_vector_retrieval', lambda period_describe: [])
+    monkeypatch.setattr(controller, '_get_places', lambda ids, requirement: [])
+    monkeypatch.setattr(controller, '_add_duration', lambda places: places)
+    monkeypatch.setattr(controller, '_plan_trip', full_plan)
+    return controller
+
+
+@pytest.mark.parametrize('text', ['', '旅遊推薦 台北文青'])
+def test_cancel_without_new_request_uses_saved_state(controller, text):
+    result = controller.process_message(input_text=text, line_id='user')
+
+    assert result == NEW_ITINERARY
+    assert controller.calls == ['replan']
+    # 記錄的是原本的需求
+    assert controller.db.saved[0]['input_text'] == '旅遊推薦 台北文青'
+
+
+def test_new_request_after_cancel_runs_full_pipeline(controller):
+    result = controller.process_message(input_text='旅遊推薦 改去淡水', line_id='user')
+
+    assert result == NEW_ITINERARY
+    # 走完整流程,仍從被取消的地點開始
+    assert controller.calls == [('plan', 1)]
+    assert controller.db.saved[0]['input_text'] == '旅遊推薦 改去淡水'
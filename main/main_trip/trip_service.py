@@ -1,6 +1,6 @@
 from typing import Dict, List
 
-from main.main_trip.controllers.controller import TripController, init_config
+from main.service_container import get_services
 
 
 def run_trip_planner(
@@ -9,6 +9,9 @@ def run_trip_planner(
 ) -> List[Dict]:
     """執行行程規劃
 
+    使用行程(worker)共用的 TripController，
+    LLM、規劃系統與 Qdrant 用戶端只在第一次呼叫時建立。
+
     Args:
         text: str - 使用者輸入的需求描述
         line_id: user's line id (選填)
@@ -20,7 +23,7 @@ def run_trip_planner(
     """
 
     try:
-        controller_instance = TripController(init_config())
+        controller_instance = get_services().trip_controller
 
         result = controller_instance.process_message(
             input_text=text,
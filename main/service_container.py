@@ -0,0 +1,132 @@
+"""行程規劃與推薦共用的服務容器
+
+每個 gunicorn worker(行程)只建立一次下列用戶端，同一個 worker 的
+所有執行緒共用，不再每則 LINE 訊息重新建立:
+1. LLM_Manager
+2. TripPlanningSystem(含 GeoService 與 googlemaps 用戶端)
+3. QdrantClient
+4. TripController(組合上面三者)
+
+TripPlanningSystem 的請求狀態放在 PlanContext，TripController 不保存
+請求狀態，因此可以同時在多個執行緒中使用。
+
+使用範例:
+    >>> from main.service_container import get_services
+    >>> controller = get_services().trip_controller
+    >>> qdrant_obj = get_services(config).qdrant_search(score_threshold=0.6)
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+from qdrant_client import QdrantClient
+
+from feature.llm.LLM import LLM_Manager
+from feature.retrieval.qdrant_search import qdrant_search
+from feature.trip.trip import TripPlanningSystem
+from main.main_trip.controllers.controller import TripController, init_config
+
+
+class ServiceContainer:
+    """一組設定對應的共用用戶端,第一次使用時才建立"""
+
+    def __init__(self, config: Dict[str, str]):
+        """初始化
+
+        Args:
+            config: 設定字典(格式見 init_config)
+        """
+        self.config = config
+        # 建立 trip_controller 時會再取得其他服務,需要可重入的鎖
+        self._lock = threading.RLock()
+        self._services: Dict[str, object] = {}
+
+    def _get(self, name: str, factory: Callable[[], object]):
+        """取得服務,尚未建立時只由一個執行緒建立"""
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    service = self._services[name] = factory()
+        return service
+
+    @property
+    def llm(self) -> LLM_Manager:
+        return self._get('llm', lambda: LLM_Manager(self.config['ChatGPT_api_key']))
+
+    @property
+    def trip_planner(self) -> TripPlanningSystem:
+        return self._get('trip_planner', TripPlanningSystem)
+
+    @property
+    def qdrant_client(self) -> QdrantClient:
+        return self._get('qdrant_client', lambda: QdrantClient(
+            url=self.config.get('qdrant_url'),
+            api_key=self.config.get('qdrant_api_key'),
+            timeout=20,
+        ))
+
+    @property
+    def trip_controller(self) -> TripController:
+        return self._get('trip_controller', lambda: TripController(
+            self.config,
+            llm=self.llm,
+            trip_planner=self.trip_planner,
+            qdrant_client=self.qdrant_client,
+        ))
+
+    def qdrant_search(self, **kwargs) -> qdrant_search:
+        """建立使用共用 QdrantClient 的 qdrant_search
+
+        qdrant_search 只保存查詢參數，建立成本很低，每次查詢各自建立一個。
+
+        Args:
+            **kwargs: qdrant_search 的參數(collection_name、score_threshold、
+                      limit、black_list),config 預設為容器的設定
+        """
+        kwargs.setdefault('config', self.config)
+        return qdrant_search(qdrant_client=self.qdrant_client, **kwargs)
+
+
+# 每組設定一個容器 {設定: ServiceContainer},None 表示使用 init_config()
+_containers: Dict[Optional[frozenset], ServiceContainer] = {}
+_containers_lock = threading.Lock()
+
+
+def get_services(config: Optional[Dict[str, str]] = None) -> ServiceContainer:
+    """取得目前行程共用的服務容器
+
+    Args:
+        config: 設定字典,預設使用 init_config() 讀取的環境變數;
+                相同內容的設定共用同一個容器
+
+    Returns:
+        ServiceContainer: 共用的服務容器
+    """
+    key = None if config is None else frozenset(config.items())
+    container = _containers.get(key)
+    if container is None:
+        with _containers_lock:
+            container = _containers.get(key)
+            if container is None:
+                container = _containers[key] = ServiceContainer(
+                    init_config() if config is None else dict(config))
+    return container
+
+
+def reset_services() -> None:
+    """清除所有容器,下次使用時重新建立用戶端"""
+    global _containers_lock
+    _containers.clear()
+    _containers_lock = threading.Lock()
+
+
+# gunicorn 使用 --preload 時,worker 由已載入的主行程 fork 產生,
+# 網路連線不能跨行程共用,fork 後在子行程重新建立
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_services)
+
+
+__all__ = ['ServiceContainer', 'get_services', 'reset_services']